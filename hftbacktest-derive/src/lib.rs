@@ -50,6 +50,13 @@ pub fn dtype_derive(input: TokenStream) -> TokenStream {
                         s => panic!("\"{field_name}: {s}\": {s} is unsupported."),
                     };
 
+                    // Numpy marks single-byte types as not applicable to byte order.
+                    let endianess = if matches!(ty, "u1" | "i1") {
+                        "|"
+                    } else {
+                        endianess
+                    };
+
                     field_names.push(field_name);
                     field_types.push(endianess.to_string() + ty);
                 }
@@ -231,21 +238,38 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
                         } else {
                             (Ident::new("Local", Span::call_site()), em_ident.clone())
                         };
+                        // The level-2 processors can be forked, which the level-3 ones do not support.
+                        let (boxed_local, boxed_exch) = if l3 {
+                            (quote! { Box::new(local) }, quote! { Box::new(exch) })
+                        } else {
+                            (
+                                quote! { Box::new(Forkable(local)) },
+                                quote! { Box::new(Forkable(exch)) },
+                            )
+                        };
 
                         let depth_construct = match marketdepth.to_string().as_str() {
-                            "HashMapMarketDepth" => {
+                            "HashMapMarketDepth" | "BTreeMarketDepth" => {
                                 quote! {
                                     #marketdepth::new(#asset.tick_size, #asset.lot_size);
                                 }
                             }
                             "ROIVectorMarketDepth" => {
                                 quote! {
-                                    #marketdepth::new(
-                                        #asset.tick_size,
-                                        #asset.lot_size,
-                                        #asset.roi_lb,
-                                        #asset.roi_ub
-                                    );
+                                    if #asset.roi_width > 0.0 {
+                                        #marketdepth::adaptive(
+                                            #asset.tick_size,
+                                            #asset.lot_size,
+                                            #asset.roi_width
+                                        )
+                                    } else {
+                                        #marketdepth::new(
+                                            #asset.tick_size,
+                                            #asset.lot_size,
+                                            #asset.roi_lb,
+                                            #asset.roi_ub
+                                        )
+                                    };
                                 }
                             }
                             _ => panic!(),
@@ -262,12 +286,22 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
                             let reader = if #asset.latency_offset == 0 {
                                 Reader::builder()
                                     .parallel_load(#asset.parallel_load)
+                                    .readahead(#asset.readahead)
+                                    .memory_budget(#asset.memory_budget)
+                                    .chunk_size(#asset.chunk_size)
+                                    .time_window(#asset.start_time, #asset.end_time)
+                                    .stats(#asset.reader_stats.clone())
                                     .data(#asset.data.clone())
                                     .build()
                                     .unwrap()
                             } else {
                                 Reader::builder()
                                     .parallel_load(#asset.parallel_load)
+                                    .readahead(#asset.readahead)
+                                    .memory_budget(#asset.memory_budget)
+                                    .chunk_size(#asset.chunk_size)
+                                    .time_window(#asset.start_time, #asset.end_time)
+                                    .stats(#asset.reader_stats.clone())
                                     .data(#asset.data.clone())
                                     .preprocessor(FeedLatencyAdjustment::new(#asset.latency_offset))
                                     .build()
@@ -286,18 +320,23 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
                                     let data = read_npz_file(&file, "data").unwrap();
                                     market_depth.apply_snapshot(&data);
                                 }
+                                Some(DataSource::MmapFile(file)) => {
+                                    let data = read_npy_mmap(&file).unwrap();
+                                    market_depth.apply_snapshot(&data);
+                                }
                                 Some(DataSource::Data(data)) => {
                                     market_depth.apply_snapshot(data);
                                 }
                                 None => {}
                             }
 
-                            let local: Box<dyn LocalProcessor<#marketdepth>> = Box::new(#local_ident::new(
+                            let local = #local_ident::new(
                                 market_depth,
                                 State::new(asset_type.clone(), fee_model.clone()),
                                 #asset.last_trades_cap,
                                 order_l2e,
-                            ));
+                            );
+                            let local: Box<dyn LocalProcessor<#marketdepth>> = #boxed_local;
 
                             let mut market_depth = #depth_construct;
                             match #asset.initial_snapshot.as_ref() {
@@ -305,6 +344,10 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
                                     let data = read_npz_file(&file, "data").unwrap();
                                     market_depth.apply_snapshot(&data);
                                 }
+                                Some(DataSource::MmapFile(file)) => {
+                                    let data = read_npy_mmap(&file).unwrap();
+                                    market_depth.apply_snapshot(&data);
+                                }
                                 Some(DataSource::Data(data)) => {
                                     market_depth.apply_snapshot(data);
                                 }
@@ -313,12 +356,13 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
 
                             let queue_model = #qm_construct;
 
-                            let exch: Box<dyn Processor> = Box::new(#exch_ident::new(
+                            let exch = #exch_ident::new(
                                 market_depth,
                                 State::new(asset_type, fee_model.clone()),
                                 queue_model,
                                 order_e2l,
-                            ));
+                            );
+                            let exch: Box<dyn Processor> = #boxed_exch;
 
                             Asset {
                                 local,
@@ -0,0 +1,345 @@
+use std::{
+    io::{Error, ErrorKind},
+    mem::size_of,
+};
+
+use hftbacktest_derive::NpyDTyped;
+
+use crate::{
+    backtest::data::{Data, DataPtr, NpyDTyped, POD, read_npz_file},
+    types::{BUY_EVENT, EXCH_EVENT, Event, LOCAL_EVENT, SELL_EVENT},
+};
+
+/// The file name suffix of the compact feed data files, which [`read_compact_npz_file`] reads.
+pub const COMPACT_NPZ_SUFFIX: &str = ".compact.npz";
+
+/// The [`CompactEvent::ev`] that marks an event which cannot be represented in the compact form,
+/// stored in full in the escaped events instead.
+pub const ESCAPED_COMPACT_EVENT: u8 = 0;
+
+/// The event flags that the [`CompactEvent::ev`] byte can represent: the event kind in the low 4
+/// bits and the side and the event source flags in the high 4 bits.
+const COMPACT_EV_MASK: u64 = 0x0f | EXCH_EVENT | LOCAL_EVENT | BUY_EVENT | SELL_EVENT;
+
+/// Feed event data in a compact form, which takes less than a third of the space of [`Event`].
+///
+/// The timestamps are stored as `i32` deltas, the price as a tick offset from
+/// [`CompactEventMeta::base_px_tick`], and the quantity as a multiple of the lot size. The order
+/// ID and the reserved values are not stored, so an event that has any of them or does not fit in
+/// the compact form is escaped and stored in full.
+#[repr(C)]
+#[derive(Clone, Debug, NpyDTyped)]
+pub struct CompactEvent {
+    /// `exch_ts` minus the `exch_ts` of the preceding event, or of
+    /// [`CompactEventMeta::base_ts`] for the first event.
+    pub exch_dt: i32,
+    /// `local_ts - exch_ts`.
+    pub local_dt: i32,
+    /// The price in ticks minus [`CompactEventMeta::base_px_tick`].
+    pub px_tick: i32,
+    /// The quantity in lots.
+    pub qty_lot: i32,
+    /// The event kind in the low 4 bits, and [`SELL_EVENT`], [`BUY_EVENT`], [`LOCAL_EVENT`], and
+    /// [`EXCH_EVENT`] from the lowest of the high 4 bits; or [`ESCAPED_COMPACT_EVENT`] if the event
+    /// is the next one of the escaped events.
+    pub ev: u8,
+}
+
+unsafe impl POD for CompactEvent {}
+
+/// The parameters with which the [`CompactEvent`]s are decoded.
+#[repr(C)]
+#[derive(Clone, Debug, NpyDTyped)]
+pub struct CompactEventMeta {
+    pub tick_size: f64,
+    pub lot_size: f64,
+    pub base_ts: i64,
+    pub base_px_tick: i64,
+}
+
+unsafe impl POD for CompactEventMeta {}
+
+#[inline(always)]
+fn encode_ev(ev: u64) -> Option<u8> {
+    if ev & !COMPACT_EV_MASK != 0 {
+        return None;
+    }
+    let ev = ((ev & 0x0f) | ((ev >> 28) << 4)) as u8;
+    (ev != ESCAPED_COMPACT_EVENT).then_some(ev)
+}
+
+#[inline(always)]
+fn decode_ev(ev: u8) -> u64 {
+    (ev as u64 & 0x0f) | ((ev as u64 >> 4) << 28)
+}
+
+/// Encodes the feed events into the compact form. Returns the compact events, the escaped events
+/// that are stored in full, and the parameters with which they are decoded.
+///
+/// The price and the quantity are restored as multiples of the tick size and the lot size, so an
+/// event is escaped unless they are within a millionth of a tick or a lot of such a multiple.
+pub fn encode_compact_events(
+    events: &[Event],
+    tick_size: f64,
+    lot_size: f64,
+) -> (Vec<CompactEvent>, Vec<Event>, CompactEventMeta) {
+    let to_i32 = |value: i64| i32::try_from(value).ok();
+    let to_units = |value: f64, unit: f64| {
+        let units = (value / unit).round();
+        (units.is_finite() && (value / unit - units).abs() < 1e-6).then_some(units as i64)
+    };
+
+    let meta = CompactEventMeta {
+        tick_size,
+        lot_size,
+        base_ts: events.first().map(|event| event.exch_ts).unwrap_or(0),
+        base_px_tick: events
+            .iter()
+            .find_map(|event| to_units(event.px, tick_size))
+            .unwrap_or(0),
+    };
+
+    let mut compact = Vec::with_capacity(events.len());
+    let mut escaped = Vec::new();
+    let mut prev_exch_ts = meta.base_ts;
+    for event in events {
+        let encoded = (|| {
+            if event.order_id != 0 || event.ival != 0 || event.fval != 0.0 {
+                return None;
+            }
+            Some(CompactEvent {
+                exch_dt: to_i32(event.exch_ts.checked_sub(prev_exch_ts)?)?,
+                local_dt: to_i32(event.local_ts.checked_sub(event.exch_ts)?)?,
+                px_tick: to_i32(to_units(event.px, tick_size)?.checked_sub(meta.base_px_tick)?)?,
+                qty_lot: to_i32(to_units(event.qty, lot_size)?)?,
+                ev: encode_ev(event.ev)?,
+            })
+        })();
+        compact.push(encoded.unwrap_or_else(|| {
+            escaped.push(event.clone());
+            CompactEvent {
+                exch_dt: 0,
+                local_dt: 0,
+                px_tick: 0,
+                qty_lot: 0,
+                ev: ESCAPED_COMPACT_EVENT,
+            }
+        }));
+        prev_exch_ts = event.exch_ts;
+    }
+    (compact, escaped, meta)
+}
+
+/// Decodes the compact feed events into [`Event`]s, taking the escaped events in order for the
+/// compact events marked by [`ESCAPED_COMPACT_EVENT`].
+pub fn decode_compact_events(
+    compact: &Data<CompactEvent>,
+    escaped: &Data<Event>,
+    meta: &CompactEventMeta,
+) -> std::io::Result<Data<Event>> {
+    if compact.len() == 0 {
+        return Ok(Data::empty());
+    }
+    let mut data = unsafe {
+        Data::<Event>::from_data_ptr(DataPtr::new(compact.len() * size_of::<Event>()), 0)
+    };
+    let mut escaped_row = 0;
+    let mut exch_ts = meta.base_ts;
+    for row in 0..compact.len() {
+        let src = unsafe { compact.get_unchecked(row) };
+        let event = if src.ev == ESCAPED_COMPACT_EVENT {
+            if escaped_row >= escaped.len() {
+                return Err(Error::new(
+                    ErrorKind::InvalidData,
+                    "fewer escaped events than the compact events refer to",
+                ));
+            }
+            let event = unsafe { escaped.get_unchecked(escaped_row) }.clone();
+            escaped_row += 1;
+            event
+        } else {
+            let exch_ts = exch_ts + src.exch_dt as i64;
+            Event {
+                ev: decode_ev(src.ev),
+                exch_ts,
+                local_ts: exch_ts + src.local_dt as i64,
+                px: (meta.base_px_tick + src.px_tick as i64) as f64 * meta.tick_size,
+                qty: src.qty_lot as f64 * meta.lot_size,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            }
+        };
+        exch_ts = event.exch_ts;
+        data[row] = event;
+    }
+    Ok(data)
+}
+
+/// Reads a compact feed data file, which is a zip archive of `data.npy` containing the
+/// [`CompactEvent`]s, `escaped.npy` containing the escaped [`Event`]s, and `meta.npy` containing
+/// a single [`CompactEventMeta`], and decodes it into [`Event`]s.
+///
+/// `D` must be [`Event`]; it is generic only so that the [`Reader`](crate::backtest::data::Reader)
+/// can dispatch on the file name.
+pub fn read_compact_npz_file<D: NpyDTyped + Clone>(filepath: &str) -> std::io::Result<Data<D>> {
+    if D::descr() != Event::descr() || size_of::<D>() != size_of::<Event>() {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            "compact data files contain only feed events",
+        ));
+    }
+    let meta = read_npz_file::<CompactEventMeta>(filepath, "meta")?;
+    if meta.len() != 1 {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            "meta must contain exactly one row",
+        ));
+    }
+    let compact = read_npz_file::<CompactEvent>(filepath, "data")?;
+    let escaped = read_npz_file::<Event>(filepath, "escaped")?;
+    let data = decode_compact_events(&compact, &escaped, &meta[0])?;
+    // The layout of `D` is checked to be that of `Event` above.
+    Ok(unsafe { Data::from_data_ptr(data.into_data_ptr().unwrap(), 0) })
+}
+
+#[cfg(test)]
+mod tests {
+    use std::{fs::File, io::Write};
+
+    use zip::{CompressionMethod, ZipWriter, write::SimpleFileOptions};
+
+    use super::*;
+    use crate::{
+        backtest::data::write_npy,
+        types::{
+            EXCH_BID_DEPTH_EVENT,
+            EXCH_BUY_TRADE_EVENT,
+            LOCAL_ASK_DEPTH_EVENT,
+            LOCAL_BID_ADD_ORDER_EVENT,
+        },
+    };
+
+    fn event(ev: u64, exch_ts: i64, local_ts: i64, px: f64, qty: f64) -> Event {
+        Event {
+            ev,
+            exch_ts,
+            local_ts,
+            px,
+            qty,
+            order_id: 0,
+            ival: 0,
+            fval: 0.0,
+        }
+    }
+
+    fn events() -> Vec<Event> {
+        let ts = 10_000_000_000;
+        let mut add_order = event(LOCAL_BID_ADD_ORDER_EVENT, ts + 400, ts + 900, 99.8, 1.0);
+        add_order.order_id = 7;
+        vec![
+            event(EXCH_BID_DEPTH_EVENT, 1_000, 1_500, 100.1, 0.003),
+            event(LOCAL_ASK_DEPTH_EVENT, 1_100, 1_600, 100.2, 0.0),
+            event(EXCH_BUY_TRADE_EVENT, 1_050, 1_700, 100.2, 1.5),
+            // Exceeds the i32 timestamp delta.
+            event(EXCH_BID_DEPTH_EVENT, ts, ts + 500, 99.9, 2.0),
+            // Off the tick.
+            event(EXCH_BID_DEPTH_EVENT, ts + 100, ts + 600, 99.95, 2.0),
+            // Not representable flags.
+            event(
+                EXCH_BID_DEPTH_EVENT | (1 << 40),
+                ts + 200,
+                ts + 700,
+                99.9,
+                2.0,
+            ),
+            event(EXCH_BID_DEPTH_EVENT, ts + 300, ts + 800, 99.9, 0.001),
+            add_order,
+        ]
+    }
+
+    fn assert_restored(decoded: &Data<Event>, events: &[Event], tick_size: f64, lot_size: f64) {
+        assert_eq!(decoded.len(), events.len());
+        for (i, event) in events.iter().enumerate() {
+            let d = &decoded[i];
+            assert_eq!(d.ev, event.ev);
+            assert_eq!(d.exch_ts, event.exch_ts);
+            assert_eq!(d.local_ts, event.local_ts);
+            assert_eq!(d.order_id, event.order_id);
+            assert!((d.px - event.px).abs() < tick_size * 1e-6);
+            assert!((d.qty - event.qty).abs() < lot_size * 1e-6);
+        }
+    }
+
+    #[test]
+    fn test_encode_decode() {
+        let events = events();
+        let (compact, escaped, meta) = encode_compact_events(&events, 0.1, 0.001);
+        assert_eq!(compact.len(), events.len());
+        assert_eq!(escaped.len(), 4);
+        assert_eq!(meta.base_ts, 1_000);
+        assert_eq!(meta.base_px_tick, 1001);
+        assert_eq!(compact[2].exch_dt, -50);
+        assert_eq!(compact[2].qty_lot, 1500);
+        assert_eq!(compact[3].ev, ESCAPED_COMPACT_EVENT);
+        assert_eq!(compact[6].exch_dt, 100);
+
+        let decoded = decode_compact_events(
+            &Data::from_data(&compact),
+            &Data::from_data(&escaped),
+            &meta,
+        )
+        .unwrap();
+        assert_restored(&decoded, &events, 0.1, 0.001);
+
+        assert!(
+            decode_compact_events(
+                &Data::from_data(&compact),
+                &Data::from_data(&escaped[..3]),
+                &meta
+            )
+            .is_err()
+        );
+    }
+
+    #[test]
+    fn test_read_compact_npz_file() {
+        let events = events();
+        let (compact, escaped, meta) = encode_compact_events(&events, 0.1, 0.001);
+
+        let path = std::env::temp_dir().join(format!(
+            "test_read_compact_npz_file_{}{COMPACT_NPZ_SUFFIX}",
+            std::process::id()
+        ));
+        let mut zip = ZipWriter::new(File::create(&path).unwrap());
+        let options = SimpleFileOptions::default().compression_method(CompressionMethod::DEFLATE);
+        for (name, buf) in [
+            ("data.npy", {
+                let mut buf = Vec::new();
+                write_npy(&mut buf, &compact).unwrap();
+                buf
+            }),
+            ("escaped.npy", {
+                let mut buf = Vec::new();
+                write_npy(&mut buf, &escaped).unwrap();
+                buf
+            }),
+            ("meta.npy", {
+                let mut buf = Vec::new();
+                write_npy(&mut buf, &[meta]).unwrap();
+                buf
+            }),
+        ] {
+            zip.start_file(name, options).unwrap();
+            zip.write_all(&buf).unwrap();
+        }
+        zip.finish().unwrap();
+
+        let filepath = path.to_str().unwrap();
+        let decoded = read_compact_npz_file::<Event>(filepath).unwrap();
+        assert_restored(&decoded, &events, 0.1, 0.001);
+        assert!(read_compact_npz_file::<CompactEventMeta>(filepath).is_err());
+
+        std::fs::remove_file(&path).unwrap();
+    }
+}
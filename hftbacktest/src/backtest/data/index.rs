@@ -0,0 +1,226 @@
+use std::{fs::File, io::ErrorKind, ops::Range, path::Path};
+
+use hftbacktest_derive::NpyDTyped;
+
+use crate::{
+    backtest::data::{Data, POD, read_npy_file, write_npy},
+    types::{DEPTH_CLEAR_EVENT, DEPTH_SNAPSHOT_EVENT, EXCH_EVENT, Event, LOCAL_EVENT},
+};
+
+/// The default number of rows between the entries of a [`TimeIndexEntry`] index.
+pub const DEFAULT_INDEX_INTERVAL: usize = 65_536;
+
+/// An entry of the sparse timestamp index of a feed file, taken every `interval` rows. The entries
+/// are laid out to match `time_index_dtype` on the Python side.
+#[repr(C)]
+#[derive(NpyDTyped, Clone, Copy, Debug, Default, PartialEq)]
+pub struct TimeIndexEntry {
+    /// The row at which the entry is taken.
+    pub row: u64,
+    /// The latest exchange timestamp of the exchange-side events before the row, or `i64::MIN` if
+    /// there is none.
+    pub exch_ts: i64,
+    /// The latest local timestamp of the local-side events before the row, or `i64::MIN` if there
+    /// is none.
+    pub local_ts: i64,
+    /// The row at which the latest depth snapshot before the row begins, or `-1` if there is none.
+    pub snapshot_row: i64,
+}
+
+unsafe impl POD for TimeIndexEntry {}
+
+/// Returns the path of the index sidecar file for the given feed file.
+pub fn time_index_path(filepath: &str) -> String {
+    format!("{filepath}.idx.npy")
+}
+
+/// Builds the sparse timestamp index of the feed data with an entry every `interval` rows. The
+/// last entry is taken at the end of the data.
+///
+/// A depth snapshot begins at a [`DEPTH_CLEAR_EVENT`] that does not follow another clear or
+/// [`DEPTH_SNAPSHOT_EVENT`].
+pub fn build_time_index(data: &Data<Event>, interval: usize) -> Vec<TimeIndexEntry> {
+    let interval = interval.max(1);
+    let mut index = Vec::with_capacity(data.len() / interval + 2);
+    let mut entry = TimeIndexEntry {
+        row: 0,
+        exch_ts: i64::MIN,
+        local_ts: i64::MIN,
+        snapshot_row: -1,
+    };
+    let mut in_snapshot = false;
+    for row in 0..data.len() {
+        if row % interval == 0 {
+            entry.row = row as u64;
+            index.push(entry);
+        }
+        let ev = &data[row];
+        if ev.ev & EXCH_EVENT == EXCH_EVENT {
+            entry.exch_ts = entry.exch_ts.max(ev.exch_ts);
+        }
+        if ev.ev & LOCAL_EVENT == LOCAL_EVENT {
+            entry.local_ts = entry.local_ts.max(ev.local_ts);
+        }
+        let kind = ev.ev & 0xff;
+        if kind == DEPTH_CLEAR_EVENT && !in_snapshot {
+            entry.snapshot_row = row as i64;
+        }
+        in_snapshot = kind == DEPTH_CLEAR_EVENT || kind == DEPTH_SNAPSHOT_EVENT;
+    }
+    entry.row = data.len() as u64;
+    index.push(entry);
+    index
+}
+
+/// Writes the index sidecar file of the given feed file, which allows [`Reader`] to seek to a time
+/// window without scanning the feed data.
+///
+/// [`Reader`]: crate::backtest::data::Reader
+pub fn write_time_index(
+    filepath: &str,
+    data: &Data<Event>,
+    interval: usize,
+) -> std::io::Result<()> {
+    let index = build_time_index(data, interval);
+    let mut file = File::create(time_index_path(filepath))?;
+    write_npy(&mut file, &index)
+}
+
+/// Reads the index sidecar file of the given feed file if it exists.
+pub fn read_time_index(filepath: &str) -> std::io::Result<Option<Vec<TimeIndexEntry>>> {
+    let path = time_index_path(filepath);
+    if !Path::new(&path).exists() {
+        return Ok(None);
+    }
+    match read_npy_file::<TimeIndexEntry>(&path) {
+        Ok(index) => Ok(Some((0..index.len()).map(|i| index[i]).collect())),
+        Err(err) if err.kind() == ErrorKind::NotFound => Ok(None),
+        Err(err) => Err(err),
+    }
+}
+
+/// Provides the sparse timestamp index of the data, which allows [`Reader`] to read the data in a
+/// [`TimeWindow`].
+///
+/// [`Reader`]: crate::backtest::data::Reader
+pub trait TimeIndexed: POD + Clone {
+    /// Builds the index of the data with an entry every `interval` rows.
+    fn time_index(data: &Data<Self>, interval: usize) -> Vec<TimeIndexEntry>;
+}
+
+impl TimeIndexed for Event {
+    fn time_index(data: &Data<Self>, interval: usize) -> Vec<TimeIndexEntry> {
+        build_time_index(data, interval)
+    }
+}
+
+/// A time window in which the feed data is read.
+#[derive(Clone, Copy, Debug)]
+pub struct TimeWindow {
+    /// The start of the window, inclusive.
+    pub start_time: i64,
+    /// The end of the window, exclusive.
+    pub end_time: i64,
+}
+
+impl TimeWindow {
+    /// Returns the entry of the index from which the window can be read, that is, the last entry
+    /// before which all events occur before the start of the window.
+    pub fn seek_entry<'a>(&self, index: &'a [TimeIndexEntry]) -> Option<&'a TimeIndexEntry> {
+        index
+            .iter()
+            .take_while(|entry| entry.exch_ts < self.start_time && entry.local_ts < self.start_time)
+            .last()
+    }
+
+    /// Returns `true` if all events covered by the index occur before the start of the window.
+    pub fn is_before(&self, index: &[TimeIndexEntry]) -> bool {
+        index.last().is_some_and(|entry| {
+            entry.exch_ts < self.start_time && entry.local_ts < self.start_time
+        })
+    }
+
+    /// Returns the row at which the events begin to occur at or after the end of the window, if
+    /// the data covered by the index extends beyond it.
+    pub fn end_row(&self, index: &[TimeIndexEntry]) -> Option<usize> {
+        index
+            .iter()
+            .find(|entry| entry.exch_ts >= self.end_time && entry.local_ts >= self.end_time)
+            .map(|entry| entry.row as usize)
+    }
+
+    /// Returns the rows of the data to be read. If `seek` is `true`, the rows begin at the latest
+    /// depth snapshot before the start of the window, or at the beginning of the data if there is
+    /// none, so that the market depth can be rebuilt by replaying the rows before the window.
+    pub fn rows(&self, index: &[TimeIndexEntry], len: usize, seek: bool) -> Range<usize> {
+        let start = if seek {
+            self.seek_entry(index)
+                .map(|entry| entry.snapshot_row.max(0) as usize)
+                .unwrap_or(0)
+        } else {
+            0
+        };
+        let end = self.end_row(index).unwrap_or(len).min(len);
+        start.min(end)..end
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::{TimeWindow, build_time_index};
+    use crate::{
+        backtest::data::Data,
+        types::{
+            DEPTH_CLEAR_EVENT,
+            DEPTH_EVENT,
+            DEPTH_SNAPSHOT_EVENT,
+            EXCH_EVENT,
+            Event,
+            LOCAL_EVENT,
+        },
+    };
+
+    #[test]
+    fn test_time_window() {
+        let events: Vec<Event> = (0..100)
+            .map(|i| Event {
+                ev: if i == 40 {
+                    DEPTH_CLEAR_EVENT
+                } else if i == 41 {
+                    DEPTH_SNAPSHOT_EVENT
+                } else {
+                    DEPTH_EVENT
+                } | EXCH_EVENT
+                    | LOCAL_EVENT,
+                exch_ts: i * 10,
+                local_ts: i * 10 + 5,
+                px: 0.0,
+                qty: 0.0,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            })
+            .collect();
+        let data = Data::from_data(&events);
+        let index = build_time_index(&data, 10);
+        assert_eq!(index.len(), 11);
+        assert_eq!(index[10].row, 100);
+        assert_eq!(index[10].exch_ts, 990);
+        assert_eq!(index[5].snapshot_row, 40);
+
+        let window = TimeWindow {
+            start_time: 600,
+            end_time: 800,
+        };
+        assert_eq!(window.seek_entry(&index).unwrap().row, 60);
+        assert_eq!(window.rows(&index, data.len(), true), 40..90);
+        assert_eq!(window.rows(&index, data.len(), false), 0..90);
+        assert!(!window.is_before(&index));
+
+        let window = TimeWindow {
+            start_time: 300,
+            end_time: i64::MAX,
+        };
+        assert_eq!(window.rows(&index, data.len(), true), 0..100);
+    }
+}
@@ -1,17 +1,60 @@
+mod compact;
+mod index;
 mod npy;
 mod reader;
 
 use std::{
     marker::PhantomData,
     mem::size_of,
-    ops::{Index, IndexMut},
+    ops::{Index, IndexMut, Range},
     ptr::null_mut,
     rc::Rc,
     slice::SliceIndex,
 };
 
-pub use npy::{Field, NpyDTyped, NpyHeader, read_npy_file, read_npz_file, write_npy};
-pub use reader::{Cache, DataPreprocess, DataSource, FeedLatencyAdjustment, Reader, ReaderBuilder};
+pub use compact::{
+    COMPACT_NPZ_SUFFIX,
+    CompactEvent,
+    CompactEventMeta,
+    ESCAPED_COMPACT_EVENT,
+    decode_compact_events,
+    encode_compact_events,
+    read_compact_npz_file,
+};
+pub use index::{
+    DEFAULT_INDEX_INTERVAL,
+    TimeIndexEntry,
+    TimeIndexed,
+    TimeWindow,
+    build_time_index,
+    read_time_index,
+    time_index_path,
+    write_time_index,
+};
+#[cfg(unix)]
+use memmap2::Advice;
+use memmap2::MmapMut;
+pub use npy::{
+    Field,
+    MMAP_PREFETCH_SIZE,
+    NpyDTyped,
+    NpyHeader,
+    NpzStream,
+    read_npy_file,
+    read_npy_mmap,
+    read_npz_file,
+    write_npy,
+};
+pub use reader::{
+    Cache,
+    DataPreprocess,
+    DataSource,
+    FeedLatencyAdjustment,
+    LoaderPool,
+    Reader,
+    ReaderBuilder,
+    ReaderStats,
+};
 
 use crate::utils::{AlignedArray, CACHE_LINE_SIZE};
 
@@ -30,6 +73,7 @@ where
 {
     ptr: Rc<DataPtr>,
     offset: usize,
+    end: usize,
     _d_marker: PhantomData<D>,
 }
 
@@ -41,7 +85,7 @@ where
     #[inline(always)]
     pub fn len(&self) -> usize {
         let size = size_of::<D>();
-        (self.ptr.len() - self.offset) / size
+        (self.end - self.offset) / size
     }
 
     /// Returns `true` if the `Data` is empty.
@@ -55,6 +99,7 @@ where
         Self {
             ptr: Default::default(),
             offset: 0,
+            end: 0,
             _d_marker: PhantomData,
         }
     }
@@ -80,12 +125,28 @@ where
     /// offset.
     pub unsafe fn from_data_ptr(ptr: DataPtr, offset: usize) -> Self {
         Self {
+            end: ptr.len(),
             ptr: Rc::new(ptr),
             offset,
             _d_marker: PhantomData,
         }
     }
 
+    /// Returns a view of the given range of elements, which shares the underlying data. The range
+    /// is clamped to the length of the array.
+    pub fn slice(&self, range: Range<usize>) -> Self {
+        let size = size_of::<D>();
+        let len = self.len();
+        let start = range.start.min(len);
+        let end = range.end.clamp(start, len);
+        Self {
+            ptr: self.ptr.clone(),
+            offset: self.offset + start * size,
+            end: self.offset + end * size,
+            _d_marker: PhantomData,
+        }
+    }
+
     /// Returns a reference to an element, without doing bounds checking.
     ///
     /// # Safety
@@ -98,10 +159,30 @@ where
         unsafe { &*(self.ptr.at(i) as *const D) }
     }
 
+    /// Returns the underlying [`DataPtr`] if no other `Data` points to the same data.
+    pub fn into_data_ptr(self) -> Option<DataPtr> {
+        Rc::try_unwrap(self.ptr).ok()
+    }
+
     /// Returns `true` if the two `Data` point to the same data.
     pub fn data_eq(&self, other: &Self) -> bool {
         Rc::ptr_eq(&self.ptr, &other.ptr)
     }
+
+    /// Returns `true` if the data is memory-mapped from a file.
+    #[inline]
+    pub fn is_mapped(&self) -> bool {
+        self.ptr.is_mapped()
+    }
+
+    /// Hints that the `len` elements starting at `index` will be accessed soon, so that the pages
+    /// can be read ahead of the read cursor. This is effective only if the data is memory-mapped
+    /// from a file; otherwise, it does nothing.
+    #[inline]
+    pub fn prefetch(&self, index: usize, len: usize) {
+        let size = size_of::<D>();
+        self.ptr.will_need(self.offset + index * size, len * size);
+    }
 }
 
 impl<D> Index<usize> for Data<D>
@@ -114,7 +195,7 @@ where
     fn index(&self, index: usize) -> &Self::Output {
         let size = size_of::<D>();
         let i = self.offset + index * size;
-        if i + size > self.ptr.len() {
+        if i + size > self.end {
             panic!("Out of the size.");
         }
         unsafe { &*(self.ptr.at(i) as *const D) }
@@ -128,7 +209,7 @@ where
     fn index_mut(&mut self, index: usize) -> &mut Self::Output {
         let size = size_of::<D>();
         let i = self.offset + index * size;
-        if i + size > self.ptr.len() {
+        if i + size > self.end {
             panic!("Out of the size.");
         }
         unsafe { &mut *(self.ptr.at(i) as *mut D) }
@@ -139,6 +220,7 @@ where
 pub struct DataPtr {
     ptr: *mut [u8],
     managed: bool,
+    mmap: Option<MmapMut>,
 }
 
 impl DataPtr {
@@ -147,6 +229,17 @@ impl DataPtr {
         Self {
             ptr: arr.into_raw(),
             managed: true,
+            mmap: None,
+        }
+    }
+
+    /// Constructs a `DataPtr` that owns the given memory map. The mapping is released when the
+    /// resulting `DataPtr` is dropped.
+    pub fn from_mmap(mut mmap: MmapMut) -> Self {
+        Self {
+            ptr: mmap.as_mut() as *mut [u8],
+            managed: false,
+            mmap: Some(mmap),
         }
     }
 
@@ -161,6 +254,7 @@ impl DataPtr {
         Self {
             ptr,
             managed: false,
+            mmap: None,
         }
     }
 
@@ -180,6 +274,27 @@ impl DataPtr {
         let ptr = self.ptr as *const u8;
         unsafe { ptr.add(index) }
     }
+
+    /// Returns `true` if the memory is mapped from a file.
+    #[inline]
+    pub fn is_mapped(&self) -> bool {
+        self.mmap.is_some()
+    }
+
+    /// Advises the kernel that the given byte range will be accessed soon if the memory is mapped
+    /// from a file. Out-of-bounds parts of the range are ignored.
+    #[inline]
+    pub fn will_need(&self, offset: usize, len: usize) {
+        #[cfg(unix)]
+        if let Some(mmap) = &self.mmap {
+            if offset < mmap.len() {
+                let len = len.min(mmap.len() - offset);
+                let _ = mmap.advise_range(Advice::WillNeed, offset, len);
+            }
+        }
+        #[cfg(not(unix))]
+        let _ = (offset, len);
+    }
 }
 
 impl Default for DataPtr {
@@ -187,6 +302,7 @@ impl Default for DataPtr {
         Self {
             ptr: null_mut::<[u8; 0]>() as *mut [u8],
             managed: false,
+            mmap: None,
         }
     }
 }
@@ -1,8 +1,16 @@
 use std::{
     fs::File,
-    io::{Cursor, Error, ErrorKind, Read, Write},
+    io::{BufReader, Cursor, Error, ErrorKind, Read, Seek, SeekFrom, Write},
+    marker::PhantomData,
+    mem::size_of,
 };
 
+use flate2::read::DeflateDecoder;
+#[cfg(unix)]
+use memmap2::Advice;
+use memmap2::MmapOptions;
+use zip::CompressionMethod;
+
 use crate::{
     backtest::data::{Data, DataPtr, POD, npy::parser::Value},
     utils::CACHE_LINE_SIZE,
@@ -10,6 +18,10 @@ use crate::{
 
 mod parser;
 
+/// The number of bytes prefetched from the beginning of a memory-mapped file, and ahead of the read
+/// cursor while it is being read.
+pub const MMAP_PREFETCH_SIZE: usize = 16 * 1024 * 1024;
+
 /// Trait
 pub trait NpyDTyped: POD {
     fn descr() -> DType;
@@ -241,7 +253,15 @@ pub fn read_npy<R: Read, D: NpyDTyped + Clone>(
         read_size += reader.read(&mut buf[read_size..])?;
     }
 
-    if buf[0..6].to_vec() != b"\x93NUMPY" {
+    let (offset, _) = check_npy_header::<D>(&buf[..])?;
+    let data = unsafe { Data::from_data_ptr(buf, offset) };
+    Ok(data)
+}
+
+/// Validates the `numpy` header at the beginning of the buffer against `D` and returns the offset
+/// at which the array data starts and the number of elements.
+fn check_npy_header<D: NpyDTyped>(buf: &[u8]) -> std::io::Result<(usize, usize)> {
+    if buf.len() < 10 || buf[0..6].to_vec() != b"\x93NUMPY" {
         return Err(Error::new(
             ErrorKind::InvalidData,
             "must start with \\x93NUMPY",
@@ -254,6 +274,9 @@ pub fn read_npy<R: Read, D: NpyDTyped + Clone>(
         ));
     }
     let header_len = u16::from_le_bytes(buf[8..10].try_into().unwrap()) as usize;
+    if buf.len() < 10 + header_len {
+        return Err(Error::new(ErrorKind::InvalidData, "truncated header"));
+    }
     let header = String::from_utf8(buf[10..(10 + header_len)].to_vec())
         .map_err(|err| Error::new(ErrorKind::InvalidData, err.to_string()))?;
     let header = NpyHeader::from_header(&header).unwrap();
@@ -267,6 +290,8 @@ pub fn read_npy<R: Read, D: NpyDTyped + Clone>(
 
     if D::descr() != header.descr {
         match check_field_consistency(&D::descr(), &header.descr) {
+            // The trailing padding fields of an aligned structured array are not compared.
+            Ok(diff) if diff.is_empty() => {}
             Ok(diff) => {
                 println!("Warning: Field name mismatch - {diff:?}");
             }
@@ -287,7 +312,30 @@ pub fn read_npy<R: Read, D: NpyDTyped + Clone>(
         ));
     }
 
-    let data = unsafe { Data::from_data_ptr(buf, 10 + header_len) };
+    Ok((10 + header_len, header.shape[0]))
+}
+
+/// Memory-maps a structured array `numpy` file instead of reading it into memory, so that the
+/// data can be used immediately and the page cache can be shared by every process reading the same
+/// file. The file must be uncompressed `.npy`.
+///
+/// The mapping is private and copy-on-write: modifications are not written back to the file, but
+/// each modified page is copied into memory. [`Reader`](crate::backtest::data::Reader) therefore
+/// reads the file into memory instead if a
+/// [`DataPreprocess`](crate::backtest::data::DataPreprocess) is set.
+/// The kernel is advised that the data will be read sequentially, and the first
+/// [`MMAP_PREFETCH_SIZE`] bytes are prefetched.
+pub fn read_npy_mmap<D: NpyDTyped + Clone>(filepath: &str) -> std::io::Result<Data<D>> {
+    let file = File::open(filepath)?;
+    let mmap = unsafe { MmapOptions::new().map_copy(&file)? };
+    #[cfg(unix)]
+    {
+        let _ = mmap.advise(Advice::Sequential);
+        let _ = mmap.advise_range(Advice::WillNeed, 0, mmap.len().min(MMAP_PREFETCH_SIZE));
+    }
+
+    let (offset, _) = check_npy_header::<D>(&mmap[..])?;
+    let data = unsafe { Data::from_data_ptr(DataPtr::from_mmap(mmap), offset) };
     Ok(data)
 }
 
@@ -355,6 +403,93 @@ pub fn read_npz_file<D: NpyDTyped + Clone>(filepath: &str, name: &str) -> std::i
     }
 }
 
+/// Decodes a structured array `numpy` member of a zip archived file incrementally, in chunks of a
+/// fixed number of elements, so that only the chunks being read need to be held in memory.
+pub struct NpzStream<D> {
+    reader: Box<dyn Read + Send>,
+    remaining: usize,
+    _d_marker: PhantomData<fn() -> D>,
+}
+
+impl<D> NpzStream<D>
+where
+    D: NpyDTyped + Clone,
+{
+    /// Opens the `{name}.npy` member of the `.npz` file and reads its header. Only stored and
+    /// deflated members are supported.
+    pub fn open(filepath: &str, name: &str) -> std::io::Result<Self> {
+        let (data_start, compressed_size, compression) = {
+            let mut archive = zip::ZipArchive::new(File::open(filepath)?)?;
+            let file = archive.by_name(&format!("{name}.npy"))?;
+            (
+                file.data_start(),
+                file.compressed_size(),
+                file.compression(),
+            )
+        };
+
+        let mut file = File::open(filepath)?;
+        file.seek(SeekFrom::Start(data_start))?;
+        let raw = BufReader::new(file).take(compressed_size);
+        let mut reader: Box<dyn Read + Send> = match compression {
+            CompressionMethod::Stored => Box::new(raw),
+            CompressionMethod::Deflated => Box::new(DeflateDecoder::new(raw)),
+            method => {
+                return Err(Error::new(
+                    ErrorKind::Unsupported,
+                    format!("{method:?} compression is unsupported for streaming"),
+                ));
+            }
+        };
+
+        let mut header = vec![0u8; 10];
+        reader.read_exact(&mut header)?;
+        if header[0..6].to_vec() != b"\x93NUMPY" {
+            return Err(Error::new(
+                ErrorKind::InvalidData,
+                "must start with \\x93NUMPY",
+            ));
+        }
+        let header_len = u16::from_le_bytes(header[8..10].try_into().unwrap()) as usize;
+        header.resize(10 + header_len, 0);
+        reader.read_exact(&mut header[10..])?;
+        let (_, len) = check_npy_header::<D>(&header)?;
+
+        Ok(Self {
+            reader,
+            remaining: len,
+            _d_marker: PhantomData,
+        })
+    }
+
+    /// Returns the number of elements that have not been read yet.
+    pub fn remaining(&self) -> usize {
+        self.remaining
+    }
+
+    /// Reads the next chunk of up to `chunk_size` elements. If `buf` is given and its size is
+    /// exactly that of the chunk, it is reused instead of allocating a new buffer. Returns `None`
+    /// once all elements have been read.
+    pub fn next_chunk(
+        &mut self,
+        chunk_size: usize,
+        buf: Option<DataPtr>,
+    ) -> std::io::Result<Option<Data<D>>> {
+        let len = chunk_size.min(self.remaining);
+        if len == 0 {
+            return Ok(None);
+        }
+        let size = len * size_of::<D>();
+        let mut buf = match buf {
+            Some(buf) if buf.len() == size => buf,
+            _ => DataPtr::new(size),
+        };
+        self.reader.read_exact(&mut buf[..])?;
+        self.remaining -= len;
+        Ok(Some(unsafe { Data::from_data_ptr(buf, 0) }))
+    }
+}
+
 pub fn write_npy<W: Write, T: NpyDTyped>(write: &mut W, data: &[T]) -> std::io::Result<()> {
     let descr = T::descr();
     let header = NpyHeader {
@@ -377,3 +512,66 @@ fn vec_as_bytes<T>(vec: &[T]) -> &[u8] {
     let ptr = vec.as_ptr() as *const u8;
     unsafe { std::slice::from_raw_parts(ptr, len) }
 }
+
+#[cfg(test)]
+mod tests {
+    use std::fs::File;
+
+    use super::{Field, NpyHeader, read_npy_file, read_npy_mmap, write_npy};
+    use crate::types::{DEPTH_EVENT, Event};
+
+    #[test]
+    fn test_header_with_padding() {
+        let header = NpyHeader::from_header(
+            "{'descr': [('qty', '<i4'), ('ev', '|u1'), ('', '|V3')], 'fortran_order': False, \
+             'shape': (3,), }",
+        )
+        .unwrap();
+        let field = |name: &str, ty: &str| Field {
+            name: name.to_string(),
+            ty: ty.to_string(),
+        };
+        assert_eq!(
+            header.descr,
+            vec![field("qty", "<i4"), field("ev", "|u1"), field("", "|V3")]
+        );
+        assert_eq!(header.shape, vec![3]);
+    }
+
+    #[test]
+    fn test_read_npy_mmap() {
+        let events: Vec<Event> = (0..1000)
+            .map(|i| Event {
+                ev: DEPTH_EVENT,
+                exch_ts: i,
+                local_ts: i + 1,
+                px: i as f64,
+                qty: 1.0,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            })
+            .collect();
+        let path =
+            std::env::temp_dir().join(format!("test_read_npy_mmap_{}.npy", std::process::id()));
+        let filepath = path.to_str().unwrap();
+        write_npy(&mut File::create(&path).unwrap(), &events).unwrap();
+
+        let mut data = read_npy_mmap::<Event>(filepath).unwrap();
+        assert_eq!(data.len(), events.len());
+        for (i, event) in events.iter().enumerate() {
+            assert_eq!(data[i].exch_ts, event.exch_ts);
+            assert_eq!(data[i].local_ts, event.local_ts);
+            assert_eq!(data[i].px, event.px);
+        }
+        data.prefetch(500, 1000);
+
+        // The mapping is copy-on-write, so the file must remain intact.
+        data[0].local_ts = 100;
+        drop(data);
+        let data = read_npy_file::<Event>(filepath).unwrap();
+        assert_eq!(data[0].local_ts, 1);
+
+        std::fs::remove_file(&path).unwrap();
+    }
+}
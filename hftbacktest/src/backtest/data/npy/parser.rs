@@ -6,7 +6,7 @@ use std::{
 use nom::{
     IResult,
     branch::alt,
-    bytes::complete::{escaped, tag, take_while, take_while1},
+    bytes::complete::{escaped, tag, take_while},
     character::complete::{char, digit1, one_of},
     combinator::{cut, map, opt, value},
     error::{ContextError, ParseError, context},
@@ -86,8 +86,10 @@ fn sp_with_comma<'a, E: ParseError<&'a str>>(input: &'a str) -> IResult<&'a str,
 }
 
 pub fn parse_str<'a, E: ParseError<&'a str>>(input: &'a str) -> IResult<&'a str, &'a str, E> {
+    // Numpy names the padding fields of an aligned structured array with an empty string, and
+    // marks single-byte types with `|`.
     escaped(
-        take_while1(|c: char| c.is_alphanumeric() || "<>_".contains(c)),
+        take_while(|c: char| c.is_alphanumeric() || "<>|_".contains(c)),
         '\\',
         one_of("\"n\\n\'"),
     )(input)
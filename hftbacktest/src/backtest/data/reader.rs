@@ -1,13 +1,19 @@
 use std::{
     cell::RefCell,
-    collections::HashMap,
+    collections::{HashMap, HashSet},
+    fs::{File, metadata},
     io::{Error as IoError, ErrorKind},
+    mem::size_of,
     rc::Rc,
     sync::{
         Arc,
+        Mutex,
+        OnceLock,
+        atomic::{AtomicU64, Ordering},
         mpsc::{Receiver, Sender, channel},
     },
     thread,
+    time::{Duration, Instant},
 };
 
 use uuid::Uuid;
@@ -16,9 +22,18 @@ use crate::{
     backtest::{
         BacktestError,
         data::{
+            COMPACT_NPZ_SUFFIX,
+            CompactEvent,
+            DEFAULT_INDEX_INTERVAL,
             Data,
+            DataPtr,
             POD,
-            npy::{NpyDTyped, read_npy_file, read_npz_file},
+            TimeIndexEntry,
+            TimeIndexed,
+            TimeWindow,
+            npy::{NpyDTyped, NpzStream, read_npy_file, read_npy_mmap, read_npz_file},
+            read_compact_npz_file,
+            read_time_index,
         },
     },
     types::Event,
@@ -30,11 +45,22 @@ pub enum DataSource<D>
 where
     D: POD + Clone,
 {
-    /// Data needs to be loaded from the specified file. This should be a `numpy` file.
+    /// Data needs to be loaded from the specified file. This should be a `numpy` file, or a compact
+    /// feed data file ending with [`COMPACT_NPZ_SUFFIX`], which is decoded as it is loaded. See
+    /// [`read_compact_npz_file`].
     ///
     /// It will be loaded when needed and released
     /// when no [Processor](`crate::backtest::proc::Processor`) is reading the data.
     File(String),
+    /// Data needs to be memory-mapped from the specified uncompressed `.npy` file rather than read
+    /// into memory. See [`read_npy_mmap`].
+    ///
+    /// Like [`DataSource::File`], it will be mapped when needed and unmapped when no
+    /// [Processor](`crate::backtest::proc::Processor`) is reading the data. If a
+    /// [`DataPreprocess`] is set, such as the feed latency adjustment, the file is read into memory
+    /// instead, since the preprocessor modifies every row, which would copy every page of the
+    /// mapping anyway.
+    MmapFile(String),
     /// Data is loaded and set by the user.
     Data(Data<D>),
 }
@@ -47,6 +73,9 @@ where
     count: usize,
     ready: bool,
     data: Data<D>,
+    reserved: usize,
+    consumers: usize,
+    turned_in: usize,
 }
 
 impl<D> CachedData<D>
@@ -58,6 +87,9 @@ where
             count: 0,
             ready: true,
             data,
+            reserved: 0,
+            consumers: 0,
+            turned_in: 0,
         }
     }
 
@@ -66,11 +98,23 @@ where
             count: 0,
             ready: false,
             data: Data::empty(),
+            reserved: 0,
+            consumers: 0,
+            turned_in: 0,
         }
     }
 
     pub fn set(&mut self, data: Data<D>) {
         self.data = data;
+        self.reserved = 0;
+    }
+
+    pub fn memory_usage(&self) -> usize {
+        if self.ready {
+            self.data.len() * size_of::<D>()
+        } else {
+            self.reserved
+        }
     }
 
     pub fn checkout(&mut self) -> Data<D> {
@@ -80,14 +124,27 @@ where
 
     pub fn turn_in(&mut self) -> bool {
         self.count -= 1;
-        self.count == 0
+        if self.consumers > 0 {
+            self.turned_in += 1;
+            self.turned_in >= self.consumers
+        } else {
+            self.count == 0
+        }
     }
 }
 
+/// The maximum number of chunk buffers kept for reuse by a [`Cache`].
+const MAX_RECYCLED_BUFFERS: usize = 4;
+
 /// Provides a data cache that allows both the local processor and exchange processor to access the
 /// same or different data based on their timestamps without the need for reloading.
+///
+/// The buffers of released streamed chunks are kept for reuse by the next chunks.
 #[derive(Clone, Debug)]
-pub struct Cache<D>(Rc<RefCell<HashMap<String, CachedData<D>>>>)
+pub struct Cache<D>(
+    Rc<RefCell<HashMap<String, CachedData<D>>>>,
+    Rc<RefCell<Vec<DataPtr>>>,
+)
 where
     D: POD + Clone;
 
@@ -97,7 +154,7 @@ where
 {
     /// Constructs an instance of `Cache`.
     pub fn new() -> Self {
-        Self(Default::default())
+        Self(Default::default(), Default::default())
     }
 
     /// Inserts a key-value pair into the `Cache`.
@@ -111,6 +168,23 @@ where
         self.0.borrow_mut().insert(key, CachedData::empty());
     }
 
+    /// Prepares cached data that must be turned in `consumers` times, once by each reader, before
+    /// it is removed, rather than when no retrieved [`Data`] remains. This is used for streamed
+    /// chunks, which cannot be reloaded once removed.
+    pub fn prepare_shared(&mut self, key: String, consumers: usize) {
+        let mut cached_data = CachedData::empty();
+        cached_data.consumers = consumers;
+        self.0.borrow_mut().insert(key, cached_data);
+    }
+
+    /// Reserves the estimated size in bytes of the [`Data`] being loaded for the specified key,
+    /// which counts toward [`Cache::memory_usage`] until the [`Data`] is set.
+    pub fn reserve(&mut self, key: &str, size: usize) {
+        if let Some(cached_data) = self.0.borrow_mut().get_mut(key) {
+            cached_data.reserved = size;
+        }
+    }
+
     /// Removes the [`Data`] if all retrieved [`Data`] are released.
     pub fn remove(&mut self, data: Data<D>) {
         let mut remove = None;
@@ -122,11 +196,64 @@ where
                 break;
             }
         }
+        drop(data);
         if let Some(key) = remove {
-            self.0.borrow_mut().remove(&key).unwrap();
+            self.evict(&key);
+        }
+    }
+
+    /// Adds a reader that must turn in the shared data for the specified key before it is
+    /// removed. See [`Cache::prepare_shared`].
+    pub fn share(&mut self, key: &str) {
+        if let Some(cached_data) = self.0.borrow_mut().get_mut(key) {
+            cached_data.consumers += 1;
+        }
+    }
+
+    /// Removes a reader that no longer turns in the shared data for the specified key, and
+    /// removes the data if all the remaining readers have turned it in. See
+    /// [`Cache::prepare_shared`].
+    pub fn unshare(&mut self, key: &str) {
+        let remove = match self.0.borrow_mut().get_mut(key) {
+            Some(cached_data) if cached_data.consumers > 0 => {
+                cached_data.consumers -= 1;
+                cached_data.ready && cached_data.turned_in >= cached_data.consumers
+            }
+            _ => false,
+        };
+        if remove {
+            self.evict(key);
+        }
+    }
+
+    fn evict(&mut self, key: &str) {
+        let cached_data = self.0.borrow_mut().remove(key).unwrap();
+        if cached_data.consumers > 0 || cached_data.turned_in > 0 {
+            let mut buffers = self.1.borrow_mut();
+            if buffers.len() < MAX_RECYCLED_BUFFERS {
+                if let Some(ptr) = cached_data.data.into_data_ptr() {
+                    buffers.push(ptr);
+                }
+            }
+        }
+    }
+
+    /// Retrieves the given [`Data`] once more, so that it must be released once more before it is
+    /// removed.
+    pub fn retain(&mut self, data: &Data<D>) {
+        for cached_data in self.0.borrow_mut().values_mut() {
+            if data.data_eq(&cached_data.data) {
+                cached_data.checkout();
+                break;
+            }
         }
     }
 
+    /// Takes a buffer of a released streamed chunk for reuse, if any.
+    pub fn take_buffer(&mut self) -> Option<DataPtr> {
+        self.1.borrow_mut().pop()
+    }
+
     /// Returns `true` if the `Cache` contains the [`Data`] for the specified key.
     pub fn contains(&self, key: &str) -> bool {
         self.0.borrow().contains_key(key)
@@ -151,6 +278,12 @@ where
     pub fn is_ready(&self, key: &str) -> bool {
         self.0.borrow().get(key).unwrap().ready
     }
+
+    /// Returns the total size in bytes of the [`Data`] held in the `Cache`, including the size
+    /// reserved for the data that is still being loaded.
+    pub fn memory_usage(&self) -> usize {
+        self.0.borrow().values().map(CachedData::memory_usage).sum()
+    }
 }
 
 impl<D> Default for Cache<D>
@@ -179,22 +312,49 @@ where
 }
 unsafe impl<D> Send for DataSend<D> where D: NpyDTyped + Clone {}
 
+/// Wraps a [`DataPtr`] to hand a recycled buffer over to a loader thread. The buffer is no longer
+/// referenced by any [`Data`] once it has been recycled.
+struct DataPtrSend(DataPtr);
+
+unsafe impl Send for DataPtrSend {}
+
 struct LoadDataResult<D>
 where
     D: NpyDTyped + Clone,
 {
     key: String,
     result: Result<DataSend<D>, IoError>,
+    /// The file key and its stream, handed back after decoding a chunk of a streamed file.
+    stream: Option<(String, NpzStream<D>)>,
+    /// Whether the data was truncated at the end of the time window.
+    truncated: bool,
 }
 
 impl<D> LoadDataResult<D>
 where
     D: NpyDTyped + Clone,
 {
-    pub fn ok(key: String, data: Data<D>) -> Self {
+    pub fn ok(key: String, data: Data<D>, truncated: bool) -> Self {
+        Self {
+            key,
+            result: Ok(DataSend(data)),
+            stream: None,
+            truncated,
+        }
+    }
+
+    pub fn chunk(
+        key: String,
+        data: Data<D>,
+        file: String,
+        stream: NpzStream<D>,
+        truncated: bool,
+    ) -> Self {
         Self {
             key,
             result: Ok(DataSend(data)),
+            stream: Some((file, stream)),
+            truncated,
         }
     }
 
@@ -202,7 +362,143 @@ where
         Self {
             key,
             result: Err(error),
+            stream: None,
+            truncated: false,
+        }
+    }
+}
+
+/// Estimates the size in bytes of the data loaded from the file before it is loaded: the size of
+/// a `.npy` file, the uncompressed size of the `data.npy` member of a `.npz` file, or the decoded
+/// size of the compact events of a compact feed data file. Returns `0` if the file cannot be
+/// inspected, in which case loading it reports the error.
+fn estimate_size<D>(filepath: &str) -> usize
+where
+    D: POD,
+{
+    let member_size = || -> Result<usize, IoError> {
+        let mut archive = zip::ZipArchive::new(File::open(filepath)?)?;
+        Ok(archive.by_name("data.npy")?.size() as usize)
+    };
+    let size = if filepath.ends_with(COMPACT_NPZ_SUFFIX) {
+        member_size().map(|size| size / size_of::<CompactEvent>() * size_of::<D>())
+    } else if filepath.ends_with(".npz") {
+        member_size()
+    } else {
+        metadata(filepath).map(|metadata| metadata.len() as usize)
+    };
+    size.unwrap_or(0)
+}
+
+type IndexBuilder<D> = fn(&Data<D>, usize) -> Vec<TimeIndexEntry>;
+
+/// Slices the data to the rows to be read in the time window, and returns it with whether it was
+/// truncated at the end of the window. The index sidecar file is used if it exists and matches the
+/// data; otherwise, the index is built from the data.
+fn apply_time_window<D>(
+    data: Data<D>,
+    filepath: Option<&str>,
+    window: &TimeWindow,
+    build_index: IndexBuilder<D>,
+) -> Result<(Data<D>, bool), IoError>
+where
+    D: POD + Clone,
+{
+    let index = match filepath {
+        Some(filepath) => read_time_index(filepath)?.filter(|index| {
+            index
+                .last()
+                .is_some_and(|entry| entry.row as usize == data.len())
+        }),
+        None => None,
+    }
+    .unwrap_or_else(|| build_index(&data, DEFAULT_INDEX_INTERVAL));
+    let rows = window.rows(&index, data.len(), true);
+    let truncated = rows.end < data.len();
+    Ok((data.slice(rows), truncated))
+}
+
+type Job = Box<dyn FnOnce() + Send + 'static>;
+
+/// A bounded pool of threads that loads and decompresses data files for [`Reader`]s. Threads are
+/// reused across files and readers, so prefetching does not spawn a thread per file.
+pub struct LoaderPool {
+    tx: Sender<Job>,
+}
+
+impl LoaderPool {
+    /// Constructs a `LoaderPool` with the given number of threads.
+    pub fn new(num_threads: usize) -> Self {
+        let (tx, rx) = channel::<Job>();
+        let rx = Arc::new(Mutex::new(rx));
+        for _ in 0..num_threads.max(1) {
+            let rx = rx.clone();
+            thread::spawn(move || {
+                loop {
+                    // The lock must be released before running the job so that other threads can
+                    // receive the next job.
+                    let job = rx.lock().unwrap().recv();
+                    match job {
+                        Ok(job) => job(),
+                        Err(_) => break,
+                    }
+                }
+            });
         }
+        Self { tx }
+    }
+
+    /// Returns the pool shared by default, which has as many threads as the available parallelism.
+    pub fn global() -> Arc<LoaderPool> {
+        static POOL: OnceLock<Arc<LoaderPool>> = OnceLock::new();
+        POOL.get_or_init(|| {
+            let num_threads = thread::available_parallelism()
+                .map(|n| n.get())
+                .unwrap_or(1);
+            Arc::new(LoaderPool::new(num_threads))
+        })
+        .clone()
+    }
+
+    fn execute<F>(&self, job: F)
+    where
+        F: FnOnce() + Send + 'static,
+    {
+        // SendError occurs only if all threads have exited, which does not happen while the pool
+        // is alive.
+        let _ = self.tx.send(Box::new(job));
+    }
+}
+
+/// Statistics on the data loading of a [`Reader`]. It is shared by all clones of the reader and
+/// can also be shared across readers.
+#[derive(Debug, Default)]
+pub struct ReaderStats {
+    blocked_ns: AtomicU64,
+    blocked_count: AtomicU64,
+    loaded_files: AtomicU64,
+}
+
+impl ReaderStats {
+    /// Returns the total time spent blocked waiting for data to be loaded.
+    pub fn blocked_time(&self) -> Duration {
+        Duration::from_nanos(self.blocked_ns.load(Ordering::Relaxed))
+    }
+
+    /// Returns the number of times the reader had to wait for data to be loaded.
+    pub fn blocked_count(&self) -> u64 {
+        self.blocked_count.load(Ordering::Relaxed)
+    }
+
+    /// Returns the number of files loaded.
+    pub fn loaded_files(&self) -> u64 {
+        self.loaded_files.load(Ordering::Relaxed)
+    }
+
+    fn record_blocked(&self, elapsed: Duration) {
+        self.blocked_ns
+            .fetch_add(elapsed.as_nanos() as u64, Ordering::Relaxed);
+        self.blocked_count.fetch_add(1, Ordering::Relaxed);
     }
 }
 
@@ -212,9 +508,16 @@ where
     D: NpyDTyped + POD + Clone,
 {
     data_key_list: Vec<String>,
+    mmap_keys: HashSet<String>,
     cache: Cache<D>,
     temporary_data: HashMap<String, Data<D>>,
     parallel_load: bool,
+    readahead: usize,
+    memory_budget: usize,
+    pool: Option<Arc<LoaderPool>>,
+    stats: Arc<ReaderStats>,
+    chunk_size: usize,
+    time_window: Option<(TimeWindow, IndexBuilder<D>)>,
     preprocessor: Option<Arc<Box<dyn DataPreprocess<D> + Sync + Send + 'static>>>,
 }
 
@@ -225,9 +528,16 @@ where
     fn default() -> Self {
         Self {
             data_key_list: Default::default(),
+            mmap_keys: Default::default(),
             cache: Default::default(),
             temporary_data: Default::default(),
             parallel_load: false,
+            readahead: 1,
+            memory_budget: 0,
+            pool: None,
+            stats: Default::default(),
+            chunk_size: 0,
+            time_window: None,
             preprocessor: None,
         }
     }
@@ -245,7 +555,7 @@ where
     /// Sets whether to load the next data in parallel. This allows [`Reader`] to not only load the
     /// next data but also preload subsequent data, ensuring it is ready in advance.
     ///
-    /// Loading is performed by spawning a separate thread.
+    /// Loading is performed by the [`LoaderPool`].
     ///
     /// The default value is `true`.
     pub fn parallel_load(self, parallel_load: bool) -> Self {
@@ -255,6 +565,88 @@ where
         }
     }
 
+    /// Sets the number of subsequent files to preload when `parallel_load` is enabled.
+    ///
+    /// The default value is `1`.
+    pub fn readahead(self, readahead: usize) -> Self {
+        Self { readahead, ..self }
+    }
+
+    /// Sets the memory budget in bytes for preloading. Subsequent files are not preloaded while
+    /// the data held or being loaded by the reader exceeds the budget; the data currently needed
+    /// is always loaded. The size of the data being loaded is estimated from the file before it
+    /// is loaded. `0` means unlimited.
+    ///
+    /// The default value is `0`.
+    pub fn memory_budget(self, memory_budget: usize) -> Self {
+        Self {
+            memory_budget,
+            ..self
+        }
+    }
+
+    /// Sets the [`LoaderPool`] that loads the data. By default, [`LoaderPool::global`] is used.
+    pub fn pool(self, pool: Arc<LoaderPool>) -> Self {
+        Self {
+            pool: Some(pool),
+            ..self
+        }
+    }
+
+    /// Sets the [`ReaderStats`] into which the data loading statistics are recorded.
+    pub fn stats(self, stats: Arc<ReaderStats>) -> Self {
+        Self { stats, ..self }
+    }
+
+    /// Sets the number of rows in each chunk in which `.npz` files are decoded. Instead of
+    /// decompressing a whole file into memory, the file is decoded incrementally as the reader
+    /// advances, so only a few chunks are held in memory at a time regardless of the file size.
+    /// The buffers of the chunks released by all readers are reused for the subsequent chunks.
+    /// Files added with [`DataSource::MmapFile`] and compact feed data files are not affected. `0`
+    /// disables it.
+    ///
+    /// Chunk boundaries are not aligned with the events; since the reader yields the chunks as
+    /// consecutive [`Data`], the processors handle them in the same way as consecutive files.
+    ///
+    /// The default value is `0`.
+    pub fn chunk_size(self, chunk_size: usize) -> Self {
+        Self { chunk_size, ..self }
+    }
+
+    /// Sets the time window in which the data is read. `start_time` is inclusive and `end_time` is
+    /// exclusive; `i64::MIN` and `i64::MAX` leave the respective side unbounded.
+    ///
+    /// Reading begins at the latest depth snapshot before `start_time`, or at the beginning of the
+    /// data if there is none, so that the market depth can be rebuilt by replaying the events before
+    /// the window, and stops once all events at or after `end_time` are reached. Files that end
+    /// before `start_time` are skipped without being loaded if the depth can be rebuilt from a
+    /// later snapshot, which requires the index sidecar files written by
+    /// [`write_time_index`](crate::backtest::data::write_time_index). Without them, the index is
+    /// built after each file is loaded.
+    ///
+    /// The index sidecar files are not used if a [`DataPreprocess`] is set, since it can alter the
+    /// timestamps.
+    pub fn time_window(self, start_time: i64, end_time: i64) -> Self
+    where
+        D: TimeIndexed,
+    {
+        let time_window = if start_time == i64::MIN && end_time == i64::MAX {
+            None
+        } else {
+            Some((
+                TimeWindow {
+                    start_time,
+                    end_time,
+                },
+                D::time_index as IndexBuilder<D>,
+            ))
+        };
+        Self {
+            time_window,
+            ..self
+        }
+    }
+
     /// Sets a [`DataPreprocess`].
     pub fn preprocessor<Preprocessor>(self, preprocessor: Preprocessor) -> Self
     where
@@ -270,12 +662,17 @@ where
     /// the chronological order.
     pub fn data(self, data: Vec<DataSource<D>>) -> Self {
         let mut data_key_list = self.data_key_list;
+        let mut mmap_keys = self.mmap_keys;
         let mut temporary_data = self.temporary_data;
         for item in data {
             match item {
                 DataSource::File(filepath) => {
                     data_key_list.push(filepath);
                 }
+                DataSource::MmapFile(filepath) => {
+                    mmap_keys.insert(filepath.clone());
+                    data_key_list.push(filepath);
+                }
                 DataSource::Data(data) => {
                     let key = Uuid::new_v4().to_string();
                     data_key_list.push(key.clone());
@@ -285,6 +682,7 @@ where
         }
         Self {
             data_key_list,
+            mmap_keys,
             temporary_data,
             ..self
         }
@@ -293,38 +691,147 @@ where
     /// Builds a [`Reader`].
     pub fn build(self) -> Result<Reader<D>, IoError> {
         let mut cache = self.cache.clone();
+        let mut truncated = HashSet::new();
         for (key, mut data) in self.temporary_data {
             if let Some(p) = &self.preprocessor {
                 p.preprocess(&mut data)?;
             }
+            if let Some((window, build_index)) = &self.time_window {
+                let (sliced, is_truncated) = apply_time_window(data, None, window, *build_index)?;
+                data = sliced;
+                if is_truncated {
+                    truncated.insert(key.clone());
+                }
+            }
             cache.insert(key, data)
         }
 
+        // Skips the files that end before the time window if the market depth can be rebuilt from
+        // a depth snapshot in a later file, which is determined from the index sidecar files.
+        let mut data_num = 0;
+        if let Some((window, _)) = &self.time_window {
+            if self.preprocessor.is_none() {
+                let mut indexes = Vec::new();
+                for key in &self.data_key_list {
+                    match read_time_index(key)? {
+                        Some(index) => {
+                            let is_before = window.is_before(&index);
+                            indexes.push(index);
+                            if !is_before {
+                                break;
+                            }
+                        }
+                        None => break,
+                    }
+                }
+                for (i, index) in indexes.iter().enumerate().rev() {
+                    if window
+                        .seek_entry(index)
+                        .is_some_and(|entry| entry.snapshot_row >= 0)
+                    {
+                        data_num = i;
+                        break;
+                    }
+                }
+            }
+        }
+
         let (tx, rx) = channel();
         Ok(Reader {
             data_key_list: self.data_key_list.clone(),
+            mmap_keys: Rc::new(self.mmap_keys),
             cache,
-            data_num: 0,
+            data_num,
             tx,
             rx: Rc::new(rx),
-            parallel_load: self.parallel_load,
+            readahead: if self.parallel_load {
+                self.readahead
+            } else {
+                0
+            },
+            memory_budget: self.memory_budget,
+            pool: self.pool.unwrap_or_else(LoaderPool::global),
+            stats: self.stats,
+            chunk_size: self.chunk_size,
+            streams: Default::default(),
+            chunk_num: 0,
+            time_window: self.time_window,
+            truncated: Rc::new(RefCell::new(truncated)),
             preprocessor: self.preprocessor.clone(),
         })
     }
 }
 
+/// The decoding state of a `.npz` file that is read in chunks, shared by all clones of a
+/// [`Reader`].
+struct StreamState<D>
+where
+    D: NpyDTyped + Clone,
+{
+    /// The stream positioned at the next chunk. It is `None` before the file is opened, while a
+    /// chunk is being decoded, and after the last chunk is decoded.
+    stream: Option<NpzStream<D>>,
+    in_flight: bool,
+    next_chunk: usize,
+    num_chunks: Option<usize>,
+}
+
+impl<D> Default for StreamState<D>
+where
+    D: NpyDTyped + Clone,
+{
+    fn default() -> Self {
+        Self {
+            stream: None,
+            in_flight: false,
+            next_chunk: 0,
+            num_chunks: None,
+        }
+    }
+}
+
+/// The decoding states of the streamed `.npz` files, and the number of clones of a [`Reader`]
+/// alive, each of which must turn in every chunk that is decoded while it is alive.
+struct Streams<D>
+where
+    D: NpyDTyped + Clone,
+{
+    states: HashMap<String, StreamState<D>>,
+    readers: usize,
+}
+
+impl<D> Default for Streams<D>
+where
+    D: NpyDTyped + Clone,
+{
+    fn default() -> Self {
+        Self {
+            states: Default::default(),
+            readers: 1,
+        }
+    }
+}
+
 /// Provides `Data` reading based on the given sequence of data through `Cache`.
-#[derive(Clone)]
 pub struct Reader<D>
 where
     D: NpyDTyped + Clone,
 {
     data_key_list: Vec<String>,
+    mmap_keys: Rc<HashSet<String>>,
     cache: Cache<D>,
     data_num: usize,
     tx: Sender<LoadDataResult<D>>,
     rx: Rc<Receiver<LoadDataResult<D>>>,
-    parallel_load: bool,
+    readahead: usize,
+    memory_budget: usize,
+    pool: Arc<LoaderPool>,
+    stats: Arc<ReaderStats>,
+    chunk_size: usize,
+    streams: Rc<RefCell<Streams<D>>>,
+    chunk_num: usize,
+    time_window: Option<(TimeWindow, IndexBuilder<D>)>,
+    truncated: Rc<RefCell<HashSet<String>>>,
     preprocessor: Option<Arc<Box<dyn DataPreprocess<D> + Sync + Send + 'static>>>,
 }
 
@@ -337,6 +844,16 @@ where
         ReaderBuilder::default()
     }
 
+    /// Returns the data loading statistics.
+    pub fn stats(&self) -> &Arc<ReaderStats> {
+        &self.stats
+    }
+
+    /// Returns the time window in which the data is read, if set.
+    pub fn time_window(&self) -> Option<TimeWindow> {
+        self.time_window.map(|(window, _)| window)
+    }
+
     /// Releases this [`Data`] from the `Cache`. The `Cache` will delete the [`Data`] if there are
     /// no readers accessing it.
     pub fn release(&mut self, data: Data<D>) {
@@ -345,107 +862,409 @@ where
 
     /// Retrieves the next [`Data`] based on the order of your additions.
     pub fn next_data(&mut self) -> Result<Data<D>, BacktestError> {
-        if self.data_num < self.data_key_list.len() {
+        while self.data_num < self.data_key_list.len() {
+            // The data after the data truncated at the end of the time window is not read.
+            if self.data_num > 0
+                && self
+                    .truncated
+                    .borrow()
+                    .contains(&self.data_key_list[self.data_num - 1])
+            {
+                break;
+            }
+
             let key = self.data_key_list.get(self.data_num).cloned().unwrap();
+            if self.is_streamed(&key) {
+                match self.next_chunk(&key)? {
+                    Some(data) => {
+                        self.chunk_num += 1;
+                        return Ok(data);
+                    }
+                    None => {
+                        self.chunk_num = 0;
+                        self.data_num += 1;
+                        continue;
+                    }
+                }
+            }
+
             self.load_data(&key)?;
 
-            if self.parallel_load {
-                let next_key = self.data_key_list.get(self.data_num + 1).cloned();
-                if let Some(next_key) = next_key {
-                    self.load_data(&next_key)?;
+            let end = (self.data_num + 1 + self.readahead).min(self.data_key_list.len());
+            for next_num in (self.data_num + 1)..end {
+                if self.memory_budget > 0 && self.cache.memory_usage() >= self.memory_budget {
+                    break;
                 }
+                let next_key = self.data_key_list.get(next_num).cloned().unwrap();
+                self.load_data(&next_key)?;
             }
 
-            while !self.cache.is_ready(&key) {
-                match self.rx.recv().unwrap() {
-                    LoadDataResult {
-                        key,
-                        result: Ok(data),
-                    } => {
-                        self.cache.set(&key, data.unwrap());
-                    }
-                    LoadDataResult {
-                        result: Err(err), ..
-                    } => {
-                        return Err(BacktestError::DataError(std::io::Error::new(
-                            err.kind(),
-                            format!("Failed to read file '{key}': {err}"),
-                        )));
-                    }
+            // Stores the data that has already been loaded, so that only actual waits are
+            // recorded as blocked.
+            self.drain()?;
+            if !self.cache.is_ready(&key) {
+                let start = Instant::now();
+                while !self.cache.is_ready(&key) {
+                    self.recv()?;
                 }
+                self.stats.record_blocked(start.elapsed());
             }
 
             let data = self.cache.get(&key);
             self.data_num += 1;
-            Ok(data)
-        } else {
-            Err(BacktestError::EndOfData)
+            return Ok(data);
         }
+        Err(BacktestError::EndOfData)
     }
 
-    fn load_data(&mut self, key: &str) -> Result<(), BacktestError> {
-        if !self.cache.contains(key) {
-            self.cache.prepare(key.to_string());
+    /// Returns a copy of this reader positioned at the same data, which shares the cache with this
+    /// reader. `data` is the [`Data`] currently retrieved by this reader, which the copy holds
+    /// until it releases it.
+    ///
+    /// A streamed chunk cannot be reloaded once all readers have turned it in, and the chunk
+    /// currently retrieved would be turned in by both readers, so a reader that streams `.npz`
+    /// files cannot be forked.
+    pub fn fork(&self, data: &Data<D>) -> Result<Self, BacktestError> {
+        if self.data_key_list.iter().any(|key| self.is_streamed(key)) {
+            return Err(BacktestError::DataError(IoError::new(
+                ErrorKind::Unsupported,
+                "a reader that streams .npz files in chunks cannot be forked",
+            )));
+        }
+        let mut reader = self.clone();
+        reader.cache.retain(data);
+        Ok(reader)
+    }
+
+    fn is_streamed(&self, key: &str) -> bool {
+        self.chunk_size > 0
+            && key.ends_with(".npz")
+            && !key.ends_with(COMPACT_NPZ_SUFFIX)
+            && !self.mmap_keys.contains(key)
+    }
+
+    /// Retrieves the next chunk of the streamed file, or `None` if all chunks have been read.
+    fn next_chunk(&mut self, file: &str) -> Result<Option<Data<D>>, BacktestError> {
+        let key = format!("{file}#{}", self.chunk_num);
+        self.drain()?;
+        let mut start = None;
+        loop {
+            if self.cache.contains(&key) {
+                if self.cache.is_ready(&key) {
+                    break;
+                }
+                start.get_or_insert_with(Instant::now);
+                self.recv()?;
+                continue;
+            }
+
+            let (next_chunk, num_chunks) = {
+                let streams = self.streams.borrow();
+                streams
+                    .states
+                    .get(file)
+                    .map(|state| (state.next_chunk, state.num_chunks))
+                    .unwrap_or((0, None))
+            };
+            if num_chunks.is_some_and(|num_chunks| self.chunk_num >= num_chunks) {
+                if let Some(start) = start {
+                    self.stats.record_blocked(start.elapsed());
+                }
+                return Ok(None);
+            }
+            if self.chunk_num != next_chunk {
+                return Err(BacktestError::DataError(IoError::other(format!(
+                    "chunk {} of '{file}' is no longer available",
+                    self.chunk_num
+                ))));
+            }
+            self.request_chunk(file);
+        }
+        if let Some(start) = start {
+            self.stats.record_blocked(start.elapsed());
+        }
+
+        if self.readahead > 0 {
+            self.request_chunk(file);
+        }
+        Ok(Some(self.cache.get(&key)))
+    }
+
+    /// Requests the loader to decode the next chunk of the streamed file unless a chunk is
+    /// already being decoded or all chunks have been decoded.
+    fn request_chunk(&mut self, file: &str) {
+        let mut streams = self.streams.borrow_mut();
+        let readers = streams.readers;
+        let state = streams.states.entry(file.to_string()).or_default();
+        if state.in_flight || state.num_chunks.is_some() {
+            return;
+        }
+        state.in_flight = true;
 
-            if key.ends_with(".npy") {
-                let tx = self.tx.clone();
-                let filepath = key.to_string();
-                let preprocessor = self.preprocessor.clone();
+        // Each clone of the reader turns in each chunk once; the chunk can be removed only after
+        // all of them have read it, since it cannot be reloaded.
+        let key = format!("{file}#{}", state.next_chunk);
+        self.cache.prepare_shared(key.clone(), readers);
+        self.cache.reserve(&key, self.chunk_size * size_of::<D>());
 
-                let _ = thread::spawn(move || {
-                    let load_data = |filepath: &str| {
-                        let mut data = read_npy_file::<D>(filepath)?;
+        let stream = state.stream.take();
+        let buf = self.cache.take_buffer().map(DataPtrSend);
+        let tx = self.tx.clone();
+        let filepath = file.to_string();
+        let chunk_size = self.chunk_size;
+        let time_window = self.time_window;
+        let preprocessor = self.preprocessor.clone();
+
+        self.pool.execute(move || {
+            let load_chunk = |filepath: &str| {
+                let mut stream = match stream {
+                    Some(stream) => stream,
+                    None => NpzStream::<D>::open(filepath, "data")?,
+                };
+                let mut truncated = false;
+                let data = match stream.next_chunk(chunk_size, buf.map(|buf| buf.0))? {
+                    Some(mut data) => {
                         if let Some(preprocessor) = &preprocessor {
                             preprocessor.preprocess(&mut data)?;
                         }
-                        Ok(data)
-                    };
-                    // SendError occurs only if Reader is already destroyed. Since no data is needed
-                    // once the Reader is destroyed, SendError is safely suppressed.
-                    match load_data(&filepath) {
-                        Ok(data) => {
-                            let _ = tx.send(LoadDataResult::ok(filepath, data));
-                        }
-                        Err(err) => {
-                            let _ = tx.send(LoadDataResult::err(filepath, err));
+                        // The index is built from the chunk itself since the sidecar file
+                        // indexes the whole file.
+                        if let Some((window, build_index)) = &time_window {
+                            (data, truncated) =
+                                apply_time_window(data, None, window, *build_index)?;
                         }
+                        data
                     }
-                });
-            } else if key.ends_with(".npz") {
-                let tx = self.tx.clone();
-                let filepath = key.to_string();
-                let preprocessor = self.preprocessor.clone();
+                    None => Data::empty(),
+                };
+                Ok((data, stream, truncated))
+            };
+            // SendError occurs only if Reader is already destroyed. Since no data is needed once
+            // the Reader is destroyed, SendError is safely suppressed.
+            match load_chunk(&filepath) {
+                Ok((data, stream, truncated)) => {
+                    let _ = tx.send(LoadDataResult::chunk(
+                        key, data, filepath, stream, truncated,
+                    ));
+                }
+                Err(err) => {
+                    let _ = tx.send(LoadDataResult::err(filepath, err));
+                }
+            }
+        });
+    }
 
-                let _ = thread::spawn(move || {
-                    let load_data = |filepath: &str| {
-                        let mut data = read_npz_file::<D>(filepath, "data")?;
-                        if let Some(preprocessor) = &preprocessor {
-                            preprocessor.preprocess(&mut data)?;
-                        }
-                        Ok(data)
-                    };
-                    // SendError occurs only if Reader is already destroyed. Since no data is needed
-                    // once the Reader is destroyed, SendError is safely suppressed.
-                    match load_data(&filepath) {
-                        Ok(data) => {
-                            let _ = tx.send(LoadDataResult::ok(filepath, data));
-                        }
-                        Err(err) => {
-                            let _ = tx.send(LoadDataResult::err(filepath, err));
-                        }
+    /// Receives a loaded data and stores it in the `Cache`, waiting until one is loaded.
+    fn recv(&mut self) -> Result<(), BacktestError> {
+        let result = self.rx.recv().unwrap();
+        self.store(result)
+    }
+
+    /// Stores all the data that has already been loaded in the `Cache` without waiting.
+    fn drain(&mut self) -> Result<(), BacktestError> {
+        while let Ok(result) = self.rx.try_recv() {
+            self.store(result)?;
+        }
+        Ok(())
+    }
+
+    fn store(&mut self, result: LoadDataResult<D>) -> Result<(), BacktestError> {
+        match result {
+            LoadDataResult {
+                key,
+                result: Ok(data),
+                stream: None,
+                truncated,
+            } => {
+                self.cache.set(&key, data.unwrap());
+                if truncated {
+                    self.truncated.borrow_mut().insert(key);
+                }
+                self.stats.loaded_files.fetch_add(1, Ordering::Relaxed);
+            }
+            LoadDataResult {
+                key,
+                result: Ok(data),
+                stream: Some((file, stream)),
+                truncated,
+            } => {
+                let data = data.unwrap();
+                let mut streams = self.streams.borrow_mut();
+                let state = streams.states.get_mut(&file).unwrap();
+                state.in_flight = false;
+                if data.is_empty() {
+                    // The previous chunk was the last one.
+                    self.cache.0.borrow_mut().remove(&key);
+                    state.num_chunks = Some(state.next_chunk);
+                } else {
+                    self.cache.set(&key, data);
+                    state.next_chunk += 1;
+                    if stream.remaining() == 0 || truncated {
+                        state.num_chunks = Some(state.next_chunk);
+                    } else {
+                        state.stream = Some(stream);
                     }
-                });
+                }
+                if truncated {
+                    self.truncated.borrow_mut().insert(file);
+                }
+                if state.num_chunks.is_some() {
+                    self.stats.loaded_files.fetch_add(1, Ordering::Relaxed);
+                }
+            }
+            LoadDataResult {
+                key,
+                result: Err(err),
+                ..
+            } => {
+                return Err(BacktestError::DataError(IoError::new(
+                    err.kind(),
+                    format!("Failed to read file '{key}': {err}"),
+                )));
+            }
+        }
+        Ok(())
+    }
+
+    fn load_data(&mut self, key: &str) -> Result<(), BacktestError> {
+        if self.is_streamed(key) {
+            self.request_chunk(key);
+            return Ok(());
+        }
+        if !self.cache.contains(key) {
+            self.cache.prepare(key.to_string());
+            self.cache.reserve(key, estimate_size::<D>(key));
+
+            // A preprocessor rewrites every row, which would copy every page of the copy-on-write
+            // mapping, so the file is read into memory instead if one is set.
+            let read: fn(&str) -> Result<Data<D>, IoError> = if self.mmap_keys.contains(key) {
+                if self.preprocessor.is_some() {
+                    read_npy_file::<D>
+                } else {
+                    read_npy_mmap::<D>
+                }
+            } else if key.ends_with(".npy") {
+                read_npy_file::<D>
+            } else if key.ends_with(COMPACT_NPZ_SUFFIX) {
+                read_compact_npz_file::<D>
+            } else if key.ends_with(".npz") {
+                |filepath| read_npz_file::<D>(filepath, "data")
             } else {
                 return Err(BacktestError::DataError(IoError::new(
                     ErrorKind::InvalidData,
                     "unsupported data type",
                 )));
-            }
+            };
+
+            let tx = self.tx.clone();
+            let filepath = key.to_string();
+            let time_window = self.time_window;
+            let preprocessor = self.preprocessor.clone();
+
+            self.pool.execute(move || {
+                let load_data = |filepath: &str| {
+                    let mut data = read(filepath)?;
+                    if let Some(preprocessor) = &preprocessor {
+                        preprocessor.preprocess(&mut data)?;
+                    }
+                    let mut truncated = false;
+                    if let Some((window, build_index)) = &time_window {
+                        // The sidecar index no longer matches if the timestamps are altered.
+                        let index_file = preprocessor.is_none().then_some(filepath);
+                        (data, truncated) =
+                            apply_time_window(data, index_file, window, *build_index)?;
+                    }
+                    Ok((data, truncated))
+                };
+                // SendError occurs only if Reader is already destroyed. Since no data is needed
+                // once the Reader is destroyed, SendError is safely suppressed.
+                match load_data(&filepath) {
+                    Ok((data, truncated)) => {
+                        let _ = tx.send(LoadDataResult::ok(filepath, data, truncated));
+                    }
+                    Err(err) => {
+                        let _ = tx.send(LoadDataResult::err(filepath, err));
+                    }
+                }
+            });
         }
         Ok(())
     }
 }
 
+impl<D> Reader<D>
+where
+    D: NpyDTyped + Clone,
+{
+    /// Calls `f` with the key of every streamed chunk in the `Cache` that this reader has yet to
+    /// read.
+    fn for_each_unread_chunk(&self, mut f: impl FnMut(&mut Cache<D>, &str)) {
+        let mut cache = self.cache.clone();
+        let streams = self.streams.borrow();
+        for (file, state) in streams.states.iter() {
+            let first_chunk = if self.data_key_list.get(self.data_num) == Some(file) {
+                self.chunk_num
+            } else if self
+                .data_key_list
+                .iter()
+                .skip(self.data_num + 1)
+                .any(|key| key == file)
+            {
+                0
+            } else {
+                continue;
+            };
+            let end_chunk = state.next_chunk + state.in_flight as usize;
+            for chunk_num in first_chunk..end_chunk {
+                let key = format!("{file}#{chunk_num}");
+                if cache.contains(&key) {
+                    f(&mut cache, &key);
+                }
+            }
+        }
+    }
+}
+
+impl<D> Clone for Reader<D>
+where
+    D: NpyDTyped + Clone,
+{
+    fn clone(&self) -> Self {
+        // The copy also has to turn in the chunks already decoded that it is yet to read.
+        self.for_each_unread_chunk(|cache, key| cache.share(key));
+        self.streams.borrow_mut().readers += 1;
+        Self {
+            data_key_list: self.data_key_list.clone(),
+            mmap_keys: self.mmap_keys.clone(),
+            cache: self.cache.clone(),
+            data_num: self.data_num,
+            tx: self.tx.clone(),
+            rx: self.rx.clone(),
+            readahead: self.readahead,
+            memory_budget: self.memory_budget,
+            pool: self.pool.clone(),
+            stats: self.stats.clone(),
+            chunk_size: self.chunk_size,
+            streams: self.streams.clone(),
+            chunk_num: self.chunk_num,
+            time_window: self.time_window,
+            truncated: self.truncated.clone(),
+            preprocessor: self.preprocessor.clone(),
+        }
+    }
+}
+
+impl<D> Drop for Reader<D>
+where
+    D: NpyDTyped + Clone,
+{
+    fn drop(&mut self) {
+        // The chunks that this reader will no longer read must not wait for it to turn them in.
+        self.streams.borrow_mut().readers -= 1;
+        self.for_each_unread_chunk(|cache, key| cache.unshare(key));
+    }
+}
+
 /// `DataPreprocess` offers a function to preprocess data before it is fed into the backtesting.
 /// This feature is primarily introduced to adjust timestamps, making it particularly useful when
 /// backtesting the market from a location different from where your order latency was originally
@@ -492,3 +1311,317 @@ impl DataPreprocess<Event> for FeedLatencyAdjustment {
         Ok(())
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use std::fs::File;
+
+    use zip::{CompressionMethod, ZipWriter, write::SimpleFileOptions};
+
+    use super::{FeedLatencyAdjustment, Reader};
+    use crate::{
+        backtest::{
+            BacktestError,
+            data::{DataSource, write_npy},
+        },
+        types::{DEPTH_EVENT, Event},
+    };
+
+    /// Writes two `.npz` files of 25 events each, and returns their data sources.
+    fn write_npz_files(dir: &std::path::Path) -> Vec<DataSource<Event>> {
+        std::fs::create_dir_all(dir).unwrap();
+        let events: Vec<Event> = (0..25)
+            .map(|ts| Event {
+                ev: DEPTH_EVENT,
+                exch_ts: ts,
+                local_ts: ts + 1,
+                px: 0.0,
+                qty: 0.0,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            })
+            .collect();
+        let mut files = Vec::new();
+        for i in 0..2 {
+            let path = dir.join(format!("{i}.npz"));
+            let mut zip = ZipWriter::new(File::create(&path).unwrap());
+            let options =
+                SimpleFileOptions::default().compression_method(CompressionMethod::DEFLATE);
+            zip.start_file("data.npy", options).unwrap();
+            write_npy(&mut zip, &events).unwrap();
+            zip.finish().unwrap();
+            files.push(DataSource::File(path.to_str().unwrap().to_string()));
+        }
+        files
+    }
+
+    /// Reads the remaining data and returns the exchange timestamps.
+    fn read_to_end(reader: &mut Reader<Event>) -> Vec<i64> {
+        let mut ts = Vec::new();
+        loop {
+            match reader.next_data() {
+                Ok(data) => {
+                    ts.extend((0..data.len()).map(|i| data[i].exch_ts));
+                    reader.release(data);
+                }
+                Err(BacktestError::EndOfData) => return ts,
+                Err(err) => panic!("{err:?}"),
+            }
+        }
+    }
+
+    #[test]
+    fn test_readahead() {
+        let dir = std::env::temp_dir().join(format!("test_readahead_{}", std::process::id()));
+        std::fs::create_dir_all(&dir).unwrap();
+        let mut files = Vec::new();
+        for i in 0..4 {
+            let events: Vec<Event> = (0..(i + 1) * 10)
+                .map(|ts| Event {
+                    ev: DEPTH_EVENT,
+                    exch_ts: ts,
+                    local_ts: ts + 1,
+                    px: 0.0,
+                    qty: 0.0,
+                    order_id: 0,
+                    ival: 0,
+                    fval: 0.0,
+                })
+                .collect();
+            let path = dir.join(format!("{i}.npy"));
+            write_npy(&mut File::create(&path).unwrap(), &events).unwrap();
+            files.push(DataSource::File(path.to_str().unwrap().to_string()));
+        }
+
+        let mut reader = Reader::<Event>::builder()
+            .parallel_load(true)
+            .readahead(2)
+            .data(files)
+            .build()
+            .unwrap();
+        for i in 0..4 {
+            let data = reader.next_data().unwrap();
+            assert_eq!(data.len(), (i + 1) * 10);
+            reader.release(data);
+        }
+        assert!(matches!(reader.next_data(), Err(BacktestError::EndOfData)));
+        assert_eq!(reader.stats().loaded_files(), 4);
+
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_memory_budget() {
+        let dir = std::env::temp_dir().join(format!("test_memory_budget_{}", std::process::id()));
+        std::fs::create_dir_all(&dir).unwrap();
+        let mut keys = Vec::new();
+        for i in 0..4 {
+            let events: Vec<Event> = (0..100)
+                .map(|ts| Event {
+                    ev: DEPTH_EVENT,
+                    exch_ts: i * 100 + ts,
+                    local_ts: i * 100 + ts + 1,
+                    px: 0.0,
+                    qty: 0.0,
+                    order_id: 0,
+                    ival: 0,
+                    fval: 0.0,
+                })
+                .collect();
+            let path = dir.join(format!("{i}.npy"));
+            write_npy(&mut File::create(&path).unwrap(), &events).unwrap();
+            keys.push(path.to_str().unwrap().to_string());
+        }
+        let file_size = std::fs::metadata(&keys[0]).unwrap().len() as usize;
+
+        // The budget is reached once the file being read and the next one count toward it, whether
+        // they are still being loaded or not.
+        let mut reader = Reader::<Event>::builder()
+            .parallel_load(true)
+            .readahead(3)
+            .memory_budget(file_size + 1)
+            .data(keys.iter().cloned().map(DataSource::File).collect())
+            .build()
+            .unwrap();
+        let data = reader.next_data().unwrap();
+        assert!(reader.cache.contains(&keys[1]));
+        assert!(!reader.cache.contains(&keys[2]));
+        assert!(!reader.cache.contains(&keys[3]));
+        reader.release(data);
+
+        for _ in 1..4 {
+            let data = reader.next_data().unwrap();
+            assert_eq!(data.len(), 100);
+            reader.release(data);
+        }
+        assert!(matches!(reader.next_data(), Err(BacktestError::EndOfData)));
+
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_prefetched_data_is_not_blocked() {
+        let dir = std::env::temp_dir().join(format!("test_not_blocked_{}", std::process::id()));
+        std::fs::create_dir_all(&dir).unwrap();
+        let mut files = Vec::new();
+        for i in 0..2 {
+            let events: Vec<Event> = (0..10)
+                .map(|ts| Event {
+                    ev: DEPTH_EVENT,
+                    exch_ts: i * 10 + ts,
+                    local_ts: i * 10 + ts + 1,
+                    px: 0.0,
+                    qty: 0.0,
+                    order_id: 0,
+                    ival: 0,
+                    fval: 0.0,
+                })
+                .collect();
+            let path = dir.join(format!("{i}.npy"));
+            write_npy(&mut File::create(&path).unwrap(), &events).unwrap();
+            files.push(DataSource::File(path.to_str().unwrap().to_string()));
+        }
+
+        let mut reader = Reader::<Event>::builder()
+            .parallel_load(true)
+            .readahead(1)
+            .data(files)
+            .build()
+            .unwrap();
+        let data = reader.next_data().unwrap();
+        reader.release(data);
+        let blocked_count = reader.stats().blocked_count();
+
+        // The second file has been loaded in the meantime, so reading it does not block.
+        std::thread::sleep(std::time::Duration::from_millis(500));
+        let data = reader.next_data().unwrap();
+        assert_eq!(data.len(), 10);
+        reader.release(data);
+        assert_eq!(reader.stats().blocked_count(), blocked_count);
+
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_chunked_npz() {
+        let dir = std::env::temp_dir().join(format!("test_chunked_npz_{}", std::process::id()));
+        let files = write_npz_files(&dir);
+
+        let mut local = Reader::<Event>::builder()
+            .parallel_load(true)
+            .chunk_size(10)
+            .data(files)
+            .build()
+            .unwrap();
+        let mut exch = local.clone();
+        for reader in [&mut local, &mut exch] {
+            let mut ts = Vec::new();
+            for _ in 0..6 {
+                let data = reader.next_data().unwrap();
+                assert!(data.len() <= 10);
+                ts.extend((0..data.len()).map(|i| data[i].exch_ts));
+                reader.release(data);
+            }
+            assert!(matches!(reader.next_data(), Err(BacktestError::EndOfData)));
+            assert_eq!(
+                ts,
+                [(0..25).collect::<Vec<_>>(), (0..25).collect()].concat()
+            );
+        }
+        assert_eq!(local.stats().loaded_files(), 2);
+
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_chunked_npz_clone_after_decoding() {
+        let dir = std::env::temp_dir().join(format!("test_clone_chunked_{}", std::process::id()));
+        let files = write_npz_files(&dir);
+
+        let mut local = Reader::<Event>::builder()
+            .parallel_load(true)
+            .chunk_size(10)
+            .data(files)
+            .build()
+            .unwrap();
+        let data = local.next_data().unwrap();
+        local.release(data);
+
+        // The next chunk has already been requested, before the copy exists; it must still be
+        // kept until the copy reads it.
+        let mut exch = local.clone();
+        let expected = [(10..25).collect::<Vec<_>>(), (0..25).collect()].concat();
+        assert_eq!(read_to_end(&mut local), expected);
+        assert_eq!(read_to_end(&mut exch), expected);
+        assert!(local.cache.0.borrow().is_empty());
+
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_chunked_npz_dropped_clone() {
+        let dir = std::env::temp_dir().join(format!("test_drop_chunked_{}", std::process::id()));
+        let files = write_npz_files(&dir);
+
+        let mut local = Reader::<Event>::builder()
+            .parallel_load(true)
+            .chunk_size(10)
+            .data(files)
+            .build()
+            .unwrap();
+        let exch = local.clone();
+        assert_eq!(
+            read_to_end(&mut local),
+            [(0..25).collect::<Vec<_>>(), (0..25).collect()].concat()
+        );
+        // The chunks wait for the copy to turn them in until it is dropped.
+        assert!(!local.cache.0.borrow().is_empty());
+        drop(exch);
+        assert!(local.cache.0.borrow().is_empty());
+
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_mmap_file_with_preprocessor() {
+        let dir = std::env::temp_dir().join(format!("test_mmap_preproc_{}", std::process::id()));
+        std::fs::create_dir_all(&dir).unwrap();
+        let events: Vec<Event> = (0..10)
+            .map(|ts| Event {
+                ev: DEPTH_EVENT,
+                exch_ts: ts,
+                local_ts: ts + 1,
+                px: 0.0,
+                qty: 0.0,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            })
+            .collect();
+        let path = dir.join("0.npy");
+        write_npy(&mut File::create(&path).unwrap(), &events).unwrap();
+        let key = path.to_str().unwrap().to_string();
+
+        let mut reader = Reader::<Event>::builder()
+            .data(vec![DataSource::MmapFile(key.clone())])
+            .build()
+            .unwrap();
+        let data = reader.next_data().unwrap();
+        assert!(data.is_mapped());
+        reader.release(data);
+
+        // The latency adjustment rewrites every row, so the file is read into memory instead.
+        let mut reader = Reader::<Event>::builder()
+            .data(vec![DataSource::MmapFile(key)])
+            .preprocessor(FeedLatencyAdjustment::new(5))
+            .build()
+            .unwrap();
+        let data = reader.next_data().unwrap();
+        assert!(!data.is_mapped());
+        assert_eq!(data[9].local_ts, 15);
+        reader.release(data);
+
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+}
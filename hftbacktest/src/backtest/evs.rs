@@ -26,6 +26,14 @@ pub struct EventSet {
     timestamp: AlignedArray<i64, CACHE_LINE_SIZE>,
 }
 
+impl Clone for EventSet {
+    fn clone(&self) -> Self {
+        let mut timestamp = AlignedArray::<i64, CACHE_LINE_SIZE>::new(self.timestamp.len());
+        timestamp.copy_from_slice(&self.timestamp);
+        Self { timestamp }
+    }
+}
+
 impl EventSet {
     /// Constructs an instance of `EventSet`.
     pub fn new(num_assets: usize) -> Self {
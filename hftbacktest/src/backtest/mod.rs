@@ -1,7 +1,8 @@
 use std::{
     collections::HashMap,
-    io::Error as IoError,
-    ops::{Deref, DerefMut},
+    io::{Error as IoError, ErrorKind},
+    mem::size_of,
+    ops::{Deref, DerefMut, Range},
 };
 
 pub use data::DataSource;
@@ -12,15 +13,31 @@ use thiserror::Error;
 pub use crate::backtest::{
     models::L3QueueModel,
     proc::{L3Local, L3NoPartialFillExchange},
+    subscription::{
+        SUB_ALL,
+        SUB_BBO,
+        SUB_DEPTH,
+        SUB_NEAR_TOUCH,
+        SUB_OTHER,
+        SUB_TRADE,
+        Subscription,
+    },
 };
 use crate::{
     backtest::{
         assettype::AssetType,
-        data::{Data, FeedLatencyAdjustment, NpyDTyped},
+        data::{Data, FeedLatencyAdjustment, MMAP_PREFETCH_SIZE, NpyDTyped},
         evs::{EventIntentKind, EventSet},
         models::{LatencyModel, QueueModel},
-        order::order_bus,
-        proc::{Local, LocalProcessor, NoPartialFillExchange, PartialFillExchange, Processor},
+        order::{ForkedBuses, order_bus},
+        proc::{
+            Forkable,
+            Local,
+            LocalProcessor,
+            NoPartialFillExchange,
+            PartialFillExchange,
+            Processor,
+        },
         state::State,
     },
     depth::{L2MarketDepth, L3MarketDepth, MarketDepth},
@@ -32,6 +49,7 @@ use crate::{
         OrderRequest,
         Side,
         StateValues,
+        Status,
         TimeInForce,
         UNTIL_END_OF_DATA,
         WaitOrderResponse,
@@ -58,6 +76,7 @@ pub mod recorder;
 
 pub mod data;
 mod evs;
+mod subscription;
 
 /// Errors that can occur during backtesting.
 #[derive(Error, Debug)]
@@ -78,6 +97,120 @@ pub enum BacktestError {
     DataError(#[from] IoError),
 }
 
+/// The action of a [`BatchOrderRequest`].
+#[derive(Clone, Copy, Eq, PartialEq, Debug)]
+#[repr(u8)]
+pub enum BatchAction {
+    /// Submits a new order with the side, price, quantity, time-in-force, and order type of the
+    /// request.
+    Submit = 0,
+    /// Modifies the price and quantity of the existing order.
+    Modify = 1,
+    /// Cancels the existing order.
+    Cancel = 2,
+}
+
+impl TryFrom<u8> for BatchAction {
+    type Error = BacktestError;
+
+    fn try_from(value: u8) -> Result<Self, Self::Error> {
+        match value {
+            0 => Ok(BatchAction::Submit),
+            1 => Ok(BatchAction::Modify),
+            2 => Ok(BatchAction::Cancel),
+            _ => Err(BacktestError::InvalidOrderRequest),
+        }
+    }
+}
+
+/// An order request in a batch applied by [`Backtest::submit_batch`].
+///
+/// The action, the side, the time-in-force, and the order type are stored as their raw values, so
+/// that the requests can be read from a buffer filled by foreign code; the values that do not
+/// correspond to a variant make the request invalid.
+#[derive(Clone, Copy, Debug)]
+#[repr(C)]
+pub struct BatchOrderRequest {
+    pub order_id: OrderId,
+    pub price: f64,
+    pub qty: f64,
+    /// The raw value of the [`BatchAction`].
+    pub action: u8,
+    /// The raw value of the [`Side`], used only to submit.
+    pub side: i8,
+    /// The raw value of the [`TimeInForce`], used only to submit.
+    pub time_in_force: u8,
+    /// The raw value of the [`OrdType`], used only to submit.
+    pub order_type: u8,
+}
+
+impl BatchOrderRequest {
+    /// Constructs a request to submit a new order.
+    pub fn submit(
+        order_id: OrderId,
+        side: Side,
+        price: f64,
+        qty: f64,
+        time_in_force: TimeInForce,
+        order_type: OrdType,
+    ) -> Self {
+        Self {
+            order_id,
+            price,
+            qty,
+            action: BatchAction::Submit as u8,
+            side: side as i8,
+            time_in_force: time_in_force as u8,
+            order_type: order_type as u8,
+        }
+    }
+
+    /// Constructs a request to modify the price and quantity of an existing order.
+    pub fn modify(order_id: OrderId, price: f64, qty: f64) -> Self {
+        Self {
+            order_id,
+            price,
+            qty,
+            action: BatchAction::Modify as u8,
+            side: Side::None as i8,
+            time_in_force: TimeInForce::GTC as u8,
+            order_type: OrdType::Limit as u8,
+        }
+    }
+
+    /// Constructs a request to cancel an existing order.
+    pub fn cancel(order_id: OrderId) -> Self {
+        Self {
+            order_id,
+            price: 0.0,
+            qty: 0.0,
+            action: BatchAction::Cancel as u8,
+            side: Side::None as i8,
+            time_in_force: TimeInForce::GTC as u8,
+            order_type: OrdType::Limit as u8,
+        }
+    }
+
+    /// Converts the raw values of the request, returning the action, and the side, time-in-force,
+    /// and order type of an order to submit.
+    fn decode(&self) -> Result<(BatchAction, Side, TimeInForce, OrdType), BacktestError> {
+        let action = BatchAction::try_from(self.action)?;
+        if action != BatchAction::Submit {
+            return Ok((action, Side::None, TimeInForce::GTC, OrdType::Limit));
+        }
+        let side = Side::try_from(self.side)?;
+        if side == Side::None {
+            return Err(BacktestError::InvalidOrderRequest);
+        }
+        Ok((
+            action,
+            side,
+            TimeInForce::try_from(self.time_in_force)?,
+            OrdType::try_from(self.order_type)?,
+        ))
+    }
+}
+
 /// Backtesting Asset
 pub struct Asset<L: ?Sized, E: ?Sized, D: NpyDTyped + Clone /* todo: ugly bounds */> {
     pub local: Box<L>,
@@ -136,6 +269,11 @@ pub struct L2AssetBuilder<LM, AT, QM, MD, FM> {
     asset_type: Option<AT>,
     data: Vec<DataSource<Event>>,
     parallel_load: bool,
+    readahead: usize,
+    memory_budget: usize,
+    chunk_size: usize,
+    start_time: i64,
+    end_time: i64,
     latency_offset: i64,
     fee_model: Option<FM>,
     exch_kind: ExchangeKind,
@@ -159,6 +297,11 @@ where
             asset_type: None,
             data: vec![],
             parallel_load: false,
+            readahead: 1,
+            memory_budget: 0,
+            chunk_size: 0,
+            start_time: i64::MIN,
+            end_time: i64::MAX,
             latency_offset: 0,
             fee_model: None,
             exch_kind: ExchangeKind::NoPartialFillExchange,
@@ -183,9 +326,48 @@ where
         }
     }
 
+    /// Sets the number of subsequent files to preload when `parallel_load` is enabled.
+    /// The default value is `1`.
+    pub fn readahead(self, readahead: usize) -> Self {
+        Self { readahead, ..self }
+    }
+
+    /// Sets the memory budget in bytes that throttles preloading. `0` means unlimited.
+    /// The default value is `0`.
+    pub fn memory_budget(self, memory_budget: usize) -> Self {
+        Self {
+            memory_budget,
+            ..self
+        }
+    }
+
+    /// Sets the number of rows in each chunk in which `.npz` files are decoded incrementally,
+    /// bounding the memory held regardless of the file size. `0` disables it.
+    /// The default value is `0`.
+    pub fn chunk_size(self, chunk_size: usize) -> Self {
+        Self { chunk_size, ..self }
+    }
+
+    /// Sets the start of the time window to be backtested. The backtest begins at the first event
+    /// at or after it; the events before it are replayed only to rebuild the market depth, from
+    /// the latest depth snapshot before it if available. See
+    /// [`ReaderBuilder::time_window`](crate::backtest::data::ReaderBuilder::time_window).
+    pub fn start_time(self, start_time: i64) -> Self {
+        Self { start_time, ..self }
+    }
+
+    /// Sets the end of the time window to be backtested. Reading the data stops once all events at
+    /// or after it are reached.
+    pub fn end_time(self, end_time: i64) -> Self {
+        Self { end_time, ..self }
+    }
+
     /// Sets the latency offset to adjust the feed latency by the specified amount. This is
     /// particularly useful in cross-exchange backtesting, where the feed data is collected from a
     /// different site than the one where the strategy is intended to run.
+    ///
+    /// Since the adjustment rewrites every row, the files added as [`DataSource::MmapFile`] are
+    /// read into memory instead of being memory-mapped if it is set.
     pub fn latency_offset(self, latency_offset: i64) -> Self {
         Self {
             latency_offset,
@@ -252,15 +434,38 @@ where
 
     /// Builds an `Asset`.
     pub fn build(self) -> Result<Asset<dyn LocalProcessor<MD>, dyn Processor, Event>, BuildError> {
+        self.build_with(
+            |local| Box::new(local),
+            |exch| Box::new(exch),
+            |exch| Box::new(exch),
+        )
+    }
+
+    fn build_with(
+        self,
+        box_local: impl FnOnce(Local<AT, LM, MD, FM>) -> Box<dyn LocalProcessor<MD>>,
+        box_no_partial_fill: impl FnOnce(
+            NoPartialFillExchange<AT, LM, QM, MD, FM>,
+        ) -> Box<dyn Processor>,
+        box_partial_fill: impl FnOnce(PartialFillExchange<AT, LM, QM, MD, FM>) -> Box<dyn Processor>,
+    ) -> Result<Asset<dyn LocalProcessor<MD>, dyn Processor, Event>, BuildError> {
         let reader = if self.latency_offset == 0 {
             Reader::builder()
                 .parallel_load(self.parallel_load)
+                .readahead(self.readahead)
+                .memory_budget(self.memory_budget)
+                .chunk_size(self.chunk_size)
+                .time_window(self.start_time, self.end_time)
                 .data(self.data)
                 .build()
                 .map_err(|err| BuildError::Error(err.into()))?
         } else {
             Reader::builder()
                 .parallel_load(self.parallel_load)
+                .readahead(self.readahead)
+                .memory_budget(self.memory_budget)
+                .chunk_size(self.chunk_size)
+                .time_window(self.start_time, self.end_time)
                 .data(self.data)
                 .preprocessor(FeedLatencyAdjustment::new(self.latency_offset))
                 .build()
@@ -315,8 +520,8 @@ where
                 );
 
                 Ok(Asset {
-                    local: Box::new(local),
-                    exch: Box::new(exch),
+                    local: box_local(local),
+                    exch: box_no_partial_fill(exch),
                     reader,
                 })
             }
@@ -329,8 +534,8 @@ where
                 );
 
                 Ok(Asset {
-                    local: Box::new(local),
-                    exch: Box::new(exch),
+                    local: box_local(local),
+                    exch: box_partial_fill(exch),
                     reader,
                 })
             }
@@ -338,6 +543,28 @@ where
     }
 }
 
+impl<LM, AT, QM, MD, FM> L2AssetBuilder<LM, AT, QM, MD, FM>
+where
+    AT: AssetType + Clone + 'static,
+    MD: MarketDepth + L2MarketDepth + Clone + 'static,
+    QM: QueueModel<MD> + Clone + 'static,
+    LM: LatencyModel + Clone + 'static,
+    FM: FeeModel + Clone + 'static,
+{
+    /// Builds an `Asset` whose processors are wrapped in [`Forkable`], so that a backtest
+    /// consisting of such assets can be forked by [`Backtest::fork`]. This requires the models
+    /// and the market depth to be [`Clone`].
+    pub fn build_forkable(
+        self,
+    ) -> Result<Asset<dyn LocalProcessor<MD>, dyn Processor, Event>, BuildError> {
+        self.build_with(
+            |local| Box::new(Forkable(local)),
+            |exch| Box::new(Forkable(exch)),
+            |exch| Box::new(Forkable(exch)),
+        )
+    }
+}
+
 impl<LM, AT, QM, MD, FM> Default for L2AssetBuilder<LM, AT, QM, MD, FM>
 where
     AT: AssetType + Clone + 'static,
@@ -357,6 +584,11 @@ pub struct L3AssetBuilder<LM, AT, QM, MD, FM> {
     asset_type: Option<AT>,
     data: Vec<DataSource<Event>>,
     parallel_load: bool,
+    readahead: usize,
+    memory_budget: usize,
+    chunk_size: usize,
+    start_time: i64,
+    end_time: i64,
     latency_offset: i64,
     fee_model: Option<FM>,
     exch_kind: ExchangeKind,
@@ -381,6 +613,11 @@ where
             asset_type: None,
             data: vec![],
             parallel_load: false,
+            readahead: 1,
+            memory_budget: 0,
+            chunk_size: 0,
+            start_time: i64::MIN,
+            end_time: i64::MAX,
             latency_offset: 0,
             fee_model: None,
             exch_kind: ExchangeKind::NoPartialFillExchange,
@@ -405,9 +642,48 @@ where
         }
     }
 
+    /// Sets the number of subsequent files to preload when `parallel_load` is enabled.
+    /// The default value is `1`.
+    pub fn readahead(self, readahead: usize) -> Self {
+        Self { readahead, ..self }
+    }
+
+    /// Sets the memory budget in bytes that throttles preloading. `0` means unlimited.
+    /// The default value is `0`.
+    pub fn memory_budget(self, memory_budget: usize) -> Self {
+        Self {
+            memory_budget,
+            ..self
+        }
+    }
+
+    /// Sets the number of rows in each chunk in which `.npz` files are decoded incrementally,
+    /// bounding the memory held regardless of the file size. `0` disables it.
+    /// The default value is `0`.
+    pub fn chunk_size(self, chunk_size: usize) -> Self {
+        Self { chunk_size, ..self }
+    }
+
+    /// Sets the start of the time window to be backtested. The backtest begins at the first event
+    /// at or after it; the events before it are replayed only to rebuild the market depth, from
+    /// the latest depth snapshot before it if available. See
+    /// [`ReaderBuilder::time_window`](crate::backtest::data::ReaderBuilder::time_window).
+    pub fn start_time(self, start_time: i64) -> Self {
+        Self { start_time, ..self }
+    }
+
+    /// Sets the end of the time window to be backtested. Reading the data stops once all events at
+    /// or after it are reached.
+    pub fn end_time(self, end_time: i64) -> Self {
+        Self { end_time, ..self }
+    }
+
     /// Sets the latency offset to adjust the feed latency by the specified amount. This is
     /// particularly useful in cross-exchange backtesting, where the feed data is collected from a
     /// different site than the one where the strategy is intended to run.
+    ///
+    /// Since the adjustment rewrites every row, the files added as [`DataSource::MmapFile`] are
+    /// read into memory instead of being memory-mapped if it is set.
     pub fn latency_offset(self, latency_offset: i64) -> Self {
         Self {
             latency_offset,
@@ -477,12 +753,20 @@ where
         let reader = if self.latency_offset == 0 {
             Reader::builder()
                 .parallel_load(self.parallel_load)
+                .readahead(self.readahead)
+                .memory_budget(self.memory_budget)
+                .chunk_size(self.chunk_size)
+                .time_window(self.start_time, self.end_time)
                 .data(self.data)
                 .build()
                 .map_err(|err| BuildError::Error(err.into()))?
         } else {
             Reader::builder()
                 .parallel_load(self.parallel_load)
+                .readahead(self.readahead)
+                .memory_budget(self.memory_budget)
+                .chunk_size(self.chunk_size)
+                .time_window(self.start_time, self.end_time)
                 .data(self.data)
                 .preprocessor(FeedLatencyAdjustment::new(self.latency_offset))
                 .build()
@@ -594,6 +878,8 @@ impl<MD> BacktestBuilder<MD> {
             evs: EventSet::new(num_assets),
             local: self.local,
             exch: self.exch,
+            subscriptions: vec![Subscription::default(); num_assets],
+            last_wake: None,
         })
     }
 }
@@ -606,6 +892,8 @@ pub struct Backtest<MD> {
     evs: EventSet,
     local: Vec<BacktestProcessorState<Box<dyn LocalProcessor<MD>>>>,
     exch: Vec<BacktestProcessorState<Box<dyn Processor>>>,
+    subscriptions: Vec<Subscription>,
+    last_wake: Option<(usize, u8)>,
 }
 
 impl<P: Processor> Deref for BacktestProcessorState<P> {
@@ -622,6 +910,9 @@ impl<P: Processor> DerefMut for BacktestProcessorState<P> {
     }
 }
 
+/// The number of rows read ahead of the cursor at a time when the data is memory-mapped.
+const PREFETCH_ROWS: usize = MMAP_PREFETCH_SIZE / size_of::<Event>();
+
 /// Per asset backtesting state used internally to advance event buffers.
 pub struct BacktestProcessorState<P: Processor> {
     data: Data<Event>,
@@ -650,17 +941,53 @@ impl<P: Processor> BacktestProcessorState<P> {
         self.row.ok_or(BacktestError::EndOfData)
     }
 
+    /// Returns a copy of this state with the given processor, which is the fork of this state's
+    /// processor, reading the data from the same position.
+    fn fork<Q: Processor>(&self, processor: Q) -> Result<BacktestProcessorState<Q>, BacktestError> {
+        Ok(BacktestProcessorState {
+            data: self.data.clone(),
+            processor,
+            reader: self.reader.fork(&self.data)?,
+            row: self.row,
+        })
+    }
+
+    /// Finds the first row in the given range whose event the processor sees, and makes it the
+    /// current row.
+    #[inline(always)]
+    fn scan(&mut self, rows: Range<usize>) -> Option<i64> {
+        for rn in rows {
+            if let Some(ts) = self.processor.event_seen_timestamp(&self.data[rn]) {
+                self.row = Some(rn);
+                return Some(ts);
+            }
+        }
+        None
+    }
+
     /// Advance the state of this processor to the next available event and return the
     /// timestamp it occurred at, if any.
     fn advance(&mut self) -> Result<i64, BacktestError> {
         loop {
             let start = self.row.map(|rn| rn + 1).unwrap_or(0);
-
-            for rn in start..self.data.len() {
-                if let Some(ts) = self.processor.event_seen_timestamp(&self.data[rn]) {
-                    self.row = Some(rn);
-                    return Ok(ts);
+            let len = self.data.len();
+
+            if self.data.is_mapped() {
+                // Scans the rows a window at a time, reading the next window ahead on entering
+                // one, so that the rows are scanned without checking for prefetching.
+                let mut begin = start;
+                while begin < len {
+                    let end = (begin / PREFETCH_ROWS + 1) * PREFETCH_ROWS;
+                    if begin % PREFETCH_ROWS == 0 {
+                        self.data.prefetch(end, PREFETCH_ROWS);
+                    }
+                    if let Some(ts) = self.scan(begin..end.min(len)) {
+                        return Ok(ts);
+                    }
+                    begin = end;
                 }
+            } else if let Some(ts) = self.scan(start..len) {
+                return Ok(ts);
             }
 
             let next = self.reader.next_data()?;
@@ -708,6 +1035,8 @@ where
             exch,
             cur_ts: i64::MAX,
             evs: EventSet::new(num_assets),
+            subscriptions: vec![Subscription::default(); num_assets],
+            last_wake: None,
         }
     }
 
@@ -734,9 +1063,64 @@ where
                 }
             }
         }
+
+        // Replays the events before the time window, which only rebuild the market depth since no
+        // orders can have been submitted yet, so that the backtest begins at the start of the
+        // window.
+        let start_time = self
+            .local
+            .iter()
+            .filter_map(|local| local.reader.time_window())
+            .map(|window| window.start_time)
+            .max();
+        if let Some(start_time) = start_time {
+            if start_time > i64::MIN {
+                self.goto::<false>(start_time - 1, WaitOrderResponse::None)?;
+            }
+        }
         Ok(())
     }
 
+    /// Returns a copy of this backtest in its current state, including the market depth, the open
+    /// orders with their queue positions, the orders in transit, the state values, the latency
+    /// models, and the read position of the data, so that several variants of a strategy can be
+    /// continued from the same point without replaying the warm-up for each of them.
+    ///
+    /// Only the processors wrapped in [`Forkable`], such as those of the assets built by
+    /// [`L2AssetBuilder::build_forkable`], can be forked. The copy shares the data cache with this
+    /// backtest, so both must be used on the same thread. The readers that stream `.npz` files in
+    /// chunks cannot be forked.
+    pub fn fork(&self) -> Result<Self, BacktestError> {
+        let unsupported = || {
+            BacktestError::DataError(IoError::new(
+                ErrorKind::Unsupported,
+                "the processor cannot be forked",
+            ))
+        };
+        let mut forked = ForkedBuses::default();
+        let mut local = Vec::with_capacity(self.local.len());
+        for state in &self.local {
+            let processor = state
+                .processor
+                .fork_local(&mut forked)
+                .ok_or_else(unsupported)?;
+            local.push(state.fork(processor)?);
+        }
+        let mut exch = Vec::with_capacity(self.exch.len());
+        for state in &self.exch {
+            let processor = state.processor.fork(&mut forked).ok_or_else(unsupported)?;
+            exch.push(state.fork(processor)?);
+        }
+        Ok(Self {
+            cur_ts: self.cur_ts,
+            evs: self.evs.clone(),
+            local,
+            exch,
+            subscriptions: self.subscriptions.clone(),
+            last_wake: self.last_wake,
+        })
+    }
+
     pub fn goto_end(&mut self) -> Result<ElapseResult, BacktestError> {
         if self.cur_ts == i64::MAX {
             self.initialize_evs()?;
@@ -752,6 +1136,119 @@ where
         self.goto::<false>(UNTIL_END_OF_DATA, WaitOrderResponse::None)
     }
 
+    /// Sets the feed event classes of the asset that wake [`Bot::wait_next_feed`]. By default, every
+    /// feed event of every asset wakes it. The classes are evaluated as the events are processed,
+    /// so the events that are not subscribed to are processed without returning to the strategy.
+    pub fn subscribe(&mut self, asset_no: usize, subscription: Subscription) {
+        self.subscriptions[asset_no] = subscription;
+    }
+
+    /// Returns the asset number and the subscribed `SUB_*` classes of the feed event that woke the
+    /// last [`Bot::wait_next_feed`], or the asset number and zero if an order response woke it. If
+    /// several events at the wake timestamp are subscribed to, the last processed one is returned.
+    /// Returns `None` if it returned without being woken, on timeout or at the end of the data.
+    pub fn last_wake(&self) -> Option<(usize, u8)> {
+        self.last_wake
+    }
+
+    /// Applies the order requests for the asset in the given order, all at the current timestamp
+    /// and without processing any event in between, as an exchange's batch order endpoint does.
+    ///
+    /// The batch is applied atomically: all the requests are validated against the local orders
+    /// and the preceding requests in the batch before any of them is applied, and if any request
+    /// is invalid, none is applied and [`BacktestError::InvalidOrderRequest`] is returned. The
+    /// result of the validation of each request is stored in `results`, which is cleared first; a
+    /// request is invalid if its raw values do not correspond to a variant or a side to submit,
+    /// and otherwise for the same reasons as [`Bot::submit_buy_order`], [`Bot::modify`], and
+    /// [`Bot::cancel`] fail, including a request for an order that an earlier request in the
+    /// batch has already been made for. A custom local processor that rejects a request that
+    /// passes the validation makes this return its error with the preceding requests applied.
+    ///
+    /// If `wait` is `true`, it waits until the responses to all the requests are received.
+    pub fn submit_batch(
+        &mut self,
+        asset_no: usize,
+        requests: &[BatchOrderRequest],
+        results: &mut Vec<Result<(), BacktestError>>,
+        wait: bool,
+    ) -> Result<ElapseResult, BacktestError> {
+        let cur_ts = self.cur_ts;
+        let local = self.local.get_mut(asset_no).unwrap();
+        results.clear();
+        let mut valid = true;
+        for (i, req) in requests.iter().enumerate() {
+            // An order can be requested only once per batch, since the first request is still in
+            // process when the next one is applied.
+            let requested = requests[..i]
+                .iter()
+                .zip(results.iter())
+                .any(|(prev, result)| result.is_ok() && prev.order_id == req.order_id);
+            let result = req.decode().and_then(|(action, ..)| {
+                let order = local.orders().get(&req.order_id);
+                match action {
+                    BatchAction::Submit if order.is_some() || requested => {
+                        Err(BacktestError::OrderIdExist)
+                    }
+                    BatchAction::Submit => Ok(()),
+                    _ if requested => Err(BacktestError::OrderRequestInProcess),
+                    _ => match order {
+                        None => Err(BacktestError::OrderNotFound),
+                        Some(order) if order.req != Status::None => {
+                            Err(BacktestError::OrderRequestInProcess)
+                        }
+                        Some(_) => Ok(()),
+                    },
+                }
+            });
+            valid &= result.is_ok();
+            results.push(result);
+        }
+        if !valid {
+            return Err(BacktestError::InvalidOrderRequest);
+        }
+
+        for req in requests {
+            let (action, side, time_in_force, order_type) = req.decode()?;
+            match action {
+                BatchAction::Submit => local.submit_order(
+                    req.order_id,
+                    side,
+                    req.price,
+                    req.qty,
+                    order_type,
+                    time_in_force,
+                    cur_ts,
+                )?,
+                BatchAction::Modify => local.modify(req.order_id, req.price, req.qty, cur_ts)?,
+                BatchAction::Cancel => local.cancel(req.order_id, cur_ts)?,
+            }
+        }
+
+        if wait {
+            for req in requests {
+                // The response may already have been received while waiting for the preceding
+                // ones.
+                let pending = self.local[asset_no]
+                    .orders()
+                    .get(&req.order_id)
+                    .is_some_and(|order| order.req != Status::None);
+                if pending {
+                    let result = self.goto::<false>(
+                        UNTIL_END_OF_DATA,
+                        WaitOrderResponse::Specified {
+                            asset_no,
+                            order_id: req.order_id,
+                        },
+                    )?;
+                    if result == ElapseResult::EndOfData {
+                        return Ok(result);
+                    }
+                }
+            }
+        }
+        Ok(ElapseResult::Ok)
+    }
+
     fn goto<const WAIT_NEXT_FEED: bool>(
         &mut self,
         timestamp: i64,
@@ -775,8 +1272,15 @@ where
                     match ev.kind {
                         EventIntentKind::LocalData => {
                             let local = unsafe { self.local.get_unchecked_mut(ev.asset_no) };
+                            let mut woken = 0;
                             let next = local.next_row().and_then(|row| {
-                                local.processor.process(&local.data[row])?;
+                                if WAIT_NEXT_FEED {
+                                    let sub =
+                                        unsafe { self.subscriptions.get_unchecked(ev.asset_no) };
+                                    woken = sub.process(&mut *local.processor, &local.data[row])?;
+                                } else {
+                                    local.processor.process(&local.data[row])?;
+                                }
                                 local.advance()
                             });
 
@@ -791,9 +1295,10 @@ where
                                     return Err(e);
                                 }
                             }
-                            if WAIT_NEXT_FEED {
+                            if WAIT_NEXT_FEED && woken != 0 {
                                 timestamp = ev.timestamp;
                                 result = ElapseResult::MarketFeed;
+                                self.last_wake = Some((ev.asset_no, woken));
                             }
                         }
                         EventIntentKind::LocalOrder => {
@@ -811,6 +1316,7 @@ where
                                 timestamp = ev.timestamp;
                                 if WAIT_NEXT_FEED {
                                     result = ElapseResult::OrderResponse;
+                                    self.last_wake = Some((ev.asset_no, 0));
                                 }
                             }
                             self.evs.update_local_order(
@@ -1095,6 +1601,7 @@ where
                 }
             }
         }
+        self.last_wake = None;
         if include_order_resp {
             self.goto::<true>(self.cur_ts + timeout, WaitOrderResponse::Any)
         } else {
@@ -1146,9 +1653,14 @@ mod test {
     use crate::{
         backtest::{
             Backtest,
+            BacktestError,
+            BatchOrderRequest,
             DataSource,
             ExchangeKind::NoPartialFillExchange,
             L2AssetBuilder,
+            SUB_BBO,
+            SUB_TRADE,
+            Subscription,
             assettype::LinearAsset,
             data::Data,
             models::{
@@ -1159,9 +1671,17 @@ mod test {
                 TradingValueFeeModel,
             },
         },
-        depth::HashMapMarketDepth,
-        prelude::{Bot, Event},
-        types::{EXCH_EVENT, LOCAL_EVENT},
+        depth::{HashMapMarketDepth, MarketDepth},
+        prelude::{Bot, Event, OrdType, Side, Status, TimeInForce},
+        types::{
+            BUY_EVENT,
+            DEPTH_EVENT,
+            EXCH_EVENT,
+            ElapseResult,
+            LOCAL_EVENT,
+            SELL_EVENT,
+            TRADE_EVENT,
+        },
     };
 
     #[test]
@@ -1238,4 +1758,242 @@ mod test {
 
         Ok(())
     }
+
+    #[test]
+    fn fork() -> Result<(), Box<dyn Error>> {
+        let depth = |ts: i64, side: u64, px: f64| Event {
+            ev: EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT | side,
+            exch_ts: ts,
+            local_ts: ts + 5,
+            px,
+            qty: 1.0,
+            order_id: 0,
+            ival: 0,
+            fval: 0.0,
+        };
+        let data = Data::from_data(&[
+            depth(0, BUY_EVENT, 100.0),
+            depth(0, SELL_EVENT, 101.0),
+            depth(100, BUY_EVENT, 100.5),
+            depth(200, SELL_EVENT, 100.75),
+        ]);
+
+        let mut backtester = Backtest::builder()
+            .add_asset(
+                L2AssetBuilder::default()
+                    .data(vec![DataSource::Data(data)])
+                    .latency_model(ConstantLatency::new(50, 50))
+                    .asset_type(LinearAsset::new(1.0))
+                    .fee_model(TradingValueFeeModel::new(CommonFees::new(0.0, 0.0)))
+                    .queue_model(ProbQueueModel::new(PowerProbQueueFunc3::new(3.0)))
+                    .exchange(NoPartialFillExchange)
+                    .depth(|| HashMapMarketDepth::new(0.25, 1.0))
+                    .build_forkable()?,
+            )
+            .build()?;
+
+        backtester.elapse_bt(10)?;
+        backtester.submit_buy_order(0, 1, 100.0, 1.0, TimeInForce::GTC, OrdType::Limit, false)?;
+        backtester.elapse_bt(10)?;
+
+        // The order is in transit to the exchange when forked.
+        let mut forked = backtester.fork()?;
+        assert_eq!(forked.current_timestamp(), backtester.current_timestamp());
+
+        backtester.elapse_bt(100)?;
+        forked.elapse_bt(100)?;
+        assert_eq!(backtester.orders(0)[&1].status, Status::New);
+        assert_eq!(forked.orders(0)[&1].status, Status::New);
+        assert_eq!(forked.depth(0).best_bid(), 100.5);
+
+        // The fork proceeds independently of the original.
+        forked.cancel(0, 1, false)?;
+        forked.elapse_bt(200)?;
+        backtester.elapse_bt(200)?;
+        assert_eq!(forked.orders(0)[&1].status, Status::Canceled);
+        assert_eq!(backtester.orders(0)[&1].status, Status::New);
+        assert_eq!(backtester.depth(0).best_ask(), 100.75);
+        assert_eq!(forked.depth(0).best_ask(), 100.75);
+
+        Ok(())
+    }
+
+    #[test]
+    fn submit_batch() -> Result<(), Box<dyn Error>> {
+        let depth = |ts: i64, side: u64, px: f64| Event {
+            ev: EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT | side,
+            exch_ts: ts,
+            local_ts: ts + 5,
+            px,
+            qty: 1.0,
+            order_id: 0,
+            ival: 0,
+            fval: 0.0,
+        };
+        let data = Data::from_data(&[
+            depth(0, BUY_EVENT, 100.0),
+            depth(0, SELL_EVENT, 101.0),
+            depth(1000, BUY_EVENT, 100.25),
+        ]);
+
+        let mut backtester = Backtest::builder()
+            .add_asset(
+                L2AssetBuilder::default()
+                    .data(vec![DataSource::Data(data)])
+                    .latency_model(ConstantLatency::new(50, 50))
+                    .asset_type(LinearAsset::new(1.0))
+                    .fee_model(TradingValueFeeModel::new(CommonFees::new(0.0, 0.0)))
+                    .queue_model(ProbQueueModel::new(PowerProbQueueFunc3::new(3.0)))
+                    .exchange(NoPartialFillExchange)
+                    .depth(|| HashMapMarketDepth::new(0.25, 1.0))
+                    .build()?,
+            )
+            .build()?;
+
+        let submit = |order_id: u64, side: Side, price: f64| {
+            BatchOrderRequest::submit(order_id, side, price, 1.0, TimeInForce::GTC, OrdType::Limit)
+        };
+
+        backtester.elapse_bt(10)?;
+        let mut results = Vec::new();
+
+        // None of the requests is applied if any of them is invalid.
+        let mut undecodable = BatchOrderRequest::cancel(5);
+        undecodable.action = 3;
+        let result = backtester.submit_batch(
+            0,
+            &[
+                submit(1, Side::Buy, 99.5),
+                submit(1, Side::Sell, 102.0),
+                submit(3, Side::None, 102.0),
+                BatchOrderRequest::cancel(4),
+                undecodable,
+            ],
+            &mut results,
+            true,
+        );
+        assert!(matches!(result, Err(BacktestError::InvalidOrderRequest)));
+        assert!(results[0].is_ok());
+        assert!(matches!(results[1], Err(BacktestError::OrderIdExist)));
+        assert!(matches!(
+            results[2],
+            Err(BacktestError::InvalidOrderRequest)
+        ));
+        assert!(matches!(results[3], Err(BacktestError::OrderNotFound)));
+        assert!(matches!(
+            results[4],
+            Err(BacktestError::InvalidOrderRequest)
+        ));
+        assert!(backtester.orders(0).is_empty());
+        assert_eq!(backtester.current_timestamp(), 10);
+
+        backtester.submit_batch(
+            0,
+            &[submit(1, Side::Buy, 99.5), submit(2, Side::Sell, 101.5)],
+            &mut results,
+            true,
+        )?;
+        assert!(results.iter().all(|result| result.is_ok()));
+
+        // Both orders were submitted at the same timestamp and their responses are received.
+        assert_eq!(backtester.current_timestamp(), 110);
+        assert_eq!(backtester.orders(0)[&1].local_timestamp, 10);
+        assert_eq!(backtester.orders(0)[&2].local_timestamp, 10);
+        assert_eq!(backtester.orders(0)[&1].status, Status::New);
+        assert_eq!(backtester.orders(0)[&2].status, Status::New);
+
+        // An order cannot be requested twice in a batch.
+        let result = backtester.submit_batch(
+            0,
+            &[
+                BatchOrderRequest::modify(1, 99.75, 1.0),
+                BatchOrderRequest::cancel(1),
+            ],
+            &mut results,
+            false,
+        );
+        assert!(matches!(result, Err(BacktestError::InvalidOrderRequest)));
+        assert!(matches!(
+            results[1],
+            Err(BacktestError::OrderRequestInProcess)
+        ));
+
+        backtester.submit_batch(
+            0,
+            &[
+                BatchOrderRequest::modify(1, 99.75, 1.0),
+                BatchOrderRequest::cancel(2),
+            ],
+            &mut results,
+            true,
+        )?;
+        assert_eq!(results.len(), 2);
+        assert!(results.iter().all(|result| result.is_ok()));
+        assert_eq!(backtester.orders(0)[&1].price_tick, 399);
+        assert_eq!(backtester.orders(0)[&2].status, Status::Canceled);
+
+        Ok(())
+    }
+
+    #[test]
+    fn wait_next_feed_subscription() -> Result<(), Box<dyn Error>> {
+        let event = |ts: i64, ev: u64, px: f64| Event {
+            ev: EXCH_EVENT | LOCAL_EVENT | ev,
+            exch_ts: ts,
+            local_ts: ts + 5,
+            px,
+            qty: 1.0,
+            order_id: 0,
+            ival: 0,
+            fval: 0.0,
+        };
+        let data = Data::from_data(&[
+            event(0, DEPTH_EVENT | BUY_EVENT, 100.0),
+            event(0, DEPTH_EVENT | SELL_EVENT, 101.0),
+            event(100, DEPTH_EVENT | BUY_EVENT, 99.0),
+            event(200, TRADE_EVENT | SELL_EVENT, 100.0),
+            event(300, DEPTH_EVENT | SELL_EVENT, 102.0),
+            event(400, DEPTH_EVENT | BUY_EVENT, 100.5),
+        ]);
+
+        let mut backtester = Backtest::builder()
+            .add_asset(
+                L2AssetBuilder::default()
+                    .data(vec![DataSource::Data(data)])
+                    .latency_model(ConstantLatency::new(50, 50))
+                    .asset_type(LinearAsset::new(1.0))
+                    .fee_model(TradingValueFeeModel::new(CommonFees::new(0.0, 0.0)))
+                    .queue_model(ProbQueueModel::new(PowerProbQueueFunc3::new(3.0)))
+                    .exchange(NoPartialFillExchange)
+                    .depth(|| HashMapMarketDepth::new(0.5, 1.0))
+                    .build()?,
+            )
+            .build()?;
+
+        backtester.elapse_bt(10)?;
+        backtester.subscribe(0, Subscription::new(SUB_BBO | SUB_TRADE, 0));
+
+        // The depth changes behind the best prices are skipped.
+        assert_eq!(
+            backtester.wait_next_feed(false, 1000)?,
+            ElapseResult::MarketFeed
+        );
+        assert_eq!(backtester.current_timestamp(), 205);
+        assert_eq!(backtester.last_wake(), Some((0, SUB_TRADE)));
+
+        assert_eq!(
+            backtester.wait_next_feed(false, 1000)?,
+            ElapseResult::MarketFeed
+        );
+        assert_eq!(backtester.current_timestamp(), 405);
+        assert_eq!(backtester.last_wake(), Some((0, SUB_BBO)));
+
+        assert_eq!(
+            backtester.wait_next_feed(false, 100)?,
+            ElapseResult::EndOfData
+        );
+        assert_eq!(backtester.last_wake(), None);
+
+        Ok(())
+    }
 }
@@ -1,11 +1,9 @@
-use std::{io::Error as IoError, mem};
-
 use hftbacktest_derive::NpyDTyped;
 
 use crate::{
     backtest::{
         BacktestError,
-        data::{Data, DataPreprocess, DataSource, POD, Reader},
+        data::{DataSource, POD, Reader},
     },
     types::Order,
 };
@@ -70,6 +68,240 @@ pub struct OrderLatencyRow {
 
 unsafe impl POD for OrderLatencyRow {}
 
+/// The historical order latency data in a compact form, which takes half the space of
+/// [`OrderLatencyRow`] by storing the latencies as `i32` deltas, which covers latencies of up to
+/// about 2.1 seconds in nanoseconds.
+#[repr(C)]
+#[derive(Clone, Debug, NpyDTyped)]
+pub struct CompactOrderLatencyRow {
+    /// Timestamp at which the request occurs.
+    pub req_ts: i64,
+    /// `exch_ts - req_ts`, or [`REJECTED_ENTRY_LATENCY`] if the exchange timestamp is zero, which
+    /// indicates that the request was rejected.
+    pub entry_lat: i32,
+    /// `resp_ts - exch_ts`, or `resp_ts - req_ts` if the request was rejected.
+    pub resp_lat: i32,
+}
+
+unsafe impl POD for CompactOrderLatencyRow {}
+
+/// The [`CompactOrderLatencyRow::entry_lat`] that marks a request rejected by the exchange.
+pub const REJECTED_ENTRY_LATENCY: i32 = i32::MIN;
+
+impl From<&CompactOrderLatencyRow> for OrderLatencyRow {
+    fn from(row: &CompactOrderLatencyRow) -> Self {
+        if row.entry_lat == REJECTED_ENTRY_LATENCY {
+            Self {
+                req_ts: row.req_ts,
+                exch_ts: 0,
+                resp_ts: row.req_ts + row.resp_lat as i64,
+                _padding: 0,
+            }
+        } else {
+            let exch_ts = row.req_ts + row.entry_lat as i64;
+            Self {
+                req_ts: row.req_ts,
+                exch_ts,
+                resp_ts: exch_ts + row.resp_lat as i64,
+                _padding: 0,
+            }
+        }
+    }
+}
+
+/// A linear piece of the interpolated latency, which starts at `x`.
+#[derive(Clone, Copy, Debug)]
+struct Segment {
+    y: i64,
+    slope: f64,
+    rejected: bool,
+}
+
+impl Segment {
+    fn new(x1: i64, y1: i64, x2: i64, y2: i64, rejected: bool) -> Self {
+        Self {
+            y: y1,
+            slope: ((y2 - y1) as f64) / ((x2 - x1) as f64),
+            rejected,
+        }
+    }
+}
+
+/// The interpolation grid of either latency, precomputed once for each data file so that a lookup
+/// only finds the segment and evaluates it.
+#[derive(Clone, Default)]
+struct Grid {
+    xs: Vec<i64>,
+    segments: Vec<Segment>,
+    head: i64,
+    tail: i64,
+    cursor: usize,
+}
+
+impl Grid {
+    /// Finds the segment containing `x`, starting from the cursor. Since the timestamps of the
+    /// lookups mostly increase, the cursor mostly stays or moves by a few segments, which makes a
+    /// lookup amortized O(1); it falls back to a binary search for a jump or a step back.
+    #[inline]
+    fn lookup(&mut self, x: i64) -> i64 {
+        let xs = &self.xs;
+        let mut k = self.cursor;
+        if x < xs[k] {
+            k = xs[..k].partition_point(|&v| v <= x) - 1;
+        } else if xs[k + 1] <= x {
+            k += 1;
+            if xs[k + 1] <= x {
+                k += xs[k + 1..].partition_point(|&v| v <= x);
+            }
+        }
+        self.cursor = k;
+        let seg = &self.segments[k];
+        let lat = (seg.slope * ((x - xs[k]) as f64)) as i64 + seg.y;
+        if seg.rejected { -lat } else { lat }
+    }
+
+    /// Returns `true` if `x` lies before the end of the grid.
+    #[inline]
+    fn covers(&self, x: i64) -> bool {
+        self.xs.len() >= 2 && x < self.xs[self.xs.len() - 1]
+    }
+}
+
+/// The entry and response latency grids of a data file. Each grid also contains the first row of
+/// the next file, so that the interval between files is interpolated as well.
+#[derive(Clone, Default)]
+struct LatencyGrids {
+    entry: Grid,
+    resp: Grid,
+}
+
+impl LatencyGrids {
+    fn new(rows: &[OrderLatencyRow], next_first: Option<&OrderLatencyRow>) -> Self {
+        let first = &rows[0];
+        let last = &rows[rows.len() - 1];
+        let points: Vec<&OrderLatencyRow> = rows.iter().chain(next_first).collect();
+
+        let mut entry = Grid {
+            xs: Vec::with_capacity(points.len()),
+            segments: Vec::with_capacity(points.len()),
+            head: first.exch_ts - first.req_ts,
+            tail: last.exch_ts - last.req_ts,
+            cursor: 0,
+        };
+        for pair in points.windows(2) {
+            let (row, next_row) = (pair[0], pair[1]);
+            entry.xs.push(row.req_ts);
+            // The exchange may reject an order request due to technical issues such
+            // congestion, this is particularly common in crypto markets. A timestamp of
+            // zero on the exchange represents the occurrence of those kinds of errors at
+            // that time.
+            entry
+                .segments
+                .push(if row.exch_ts <= 0 || next_row.exch_ts <= 0 {
+                    // Negative latency indicates that the order is rejected for technical
+                    // reasons, and its value represents the latency that the local experiences
+                    // when receiving the rejection notification
+                    Segment::new(
+                        row.req_ts,
+                        row.resp_ts - row.req_ts,
+                        next_row.req_ts,
+                        next_row.resp_ts - next_row.req_ts,
+                        true,
+                    )
+                } else {
+                    Segment::new(
+                        row.req_ts,
+                        row.exch_ts - row.req_ts,
+                        next_row.req_ts,
+                        next_row.exch_ts - next_row.req_ts,
+                        false,
+                    )
+                });
+        }
+        entry.xs.extend(points.last().map(|row| row.req_ts));
+
+        // The response latency is only defined for the requests that reached the exchange.
+        let mut accepted: Vec<&OrderLatencyRow> =
+            rows.iter().filter(|row| row.exch_ts > 0).collect();
+        let (head, tail) = match (accepted.first(), accepted.last()) {
+            (Some(first), Some(last)) => {
+                (first.resp_ts - first.exch_ts, last.resp_ts - last.exch_ts)
+            }
+            _ => (0, 0),
+        };
+        accepted.extend(next_first.filter(|row| row.exch_ts > 0));
+        let mut resp = Grid {
+            xs: Vec::with_capacity(accepted.len()),
+            segments: Vec::with_capacity(accepted.len()),
+            head,
+            tail,
+            cursor: 0,
+        };
+        for pair in accepted.windows(2) {
+            let (row, next_row) = (pair[0], pair[1]);
+            resp.xs.push(row.exch_ts);
+            resp.segments.push(Segment::new(
+                row.exch_ts,
+                row.resp_ts - row.exch_ts,
+                next_row.exch_ts,
+                next_row.resp_ts - next_row.exch_ts,
+                false,
+            ));
+        }
+        resp.xs.extend(accepted.last().map(|row| row.exch_ts));
+
+        Self { entry, resp }
+    }
+}
+
+#[derive(Clone)]
+enum LatencyReader {
+    Full(Reader<OrderLatencyRow>),
+    Compact(Reader<CompactOrderLatencyRow>),
+}
+
+impl LatencyReader {
+    /// Reads the rows of the next data file, with the latency offset applied.
+    fn next_rows(
+        &mut self,
+        latency_offset: i64,
+    ) -> Result<Option<Vec<OrderLatencyRow>>, BacktestError> {
+        let mut rows: Vec<OrderLatencyRow> = match self {
+            LatencyReader::Full(reader) => match reader.next_data() {
+                Ok(data) => {
+                    let rows = (0..data.len()).map(|i| data[i].clone()).collect();
+                    reader.release(data);
+                    rows
+                }
+                Err(BacktestError::EndOfData) => return Ok(None),
+                Err(e) => return Err(e),
+            },
+            LatencyReader::Compact(reader) => match reader.next_data() {
+                Ok(data) => {
+                    let rows = (0..data.len()).map(|i| (&data[i]).into()).collect();
+                    reader.release(data);
+                    rows
+                }
+                Err(BacktestError::EndOfData) => return Ok(None),
+                Err(e) => return Err(e),
+            },
+        };
+        if rows.is_empty() {
+            return self.next_rows(latency_offset);
+        }
+        if latency_offset != 0 {
+            for row in rows.iter_mut() {
+                // Keeps the rejections, whose exchange timestamp is zero, rejected.
+                if row.exch_ts > 0 {
+                    row.exch_ts += latency_offset;
+                }
+                row.resp_ts += latency_offset + latency_offset;
+            }
+        }
+        Ok(Some(rows))
+    }
+}
+
 /// Provides order latency based on actual historical order latency data through interpolation.
 ///
 /// However, if you don't have the actual order latency history, you can generate order latencies
@@ -85,6 +317,12 @@ unsafe impl POD for OrderLatencyRow {}
 /// exchange, and its value represents the latency that the local experiences when receiving the
 /// rejection notification.
 ///
+/// The interpolation grid of each data file is precomputed when the file is loaded, and the
+/// lookups track a cursor into it, so a lookup takes amortized constant time as long as the
+/// timestamps mostly increase, however dense the data is. The rows must be sorted by the request
+/// timestamp. The data can also be given in the compact [`CompactOrderLatencyRow`] form through
+/// [`build_compact`](Self::build_compact()).
+///
 /// **Example**
 /// ```
 /// use hftbacktest::backtest::{DataSource, models::IntpOrderLatency};
@@ -96,11 +334,10 @@ unsafe impl POD for OrderLatencyRow {}
 /// ```
 #[derive(Clone)]
 pub struct IntpOrderLatency {
-    entry_rn: usize,
-    resp_rn: usize,
-    reader: Reader<OrderLatencyRow>,
-    data: Data<OrderLatencyRow>,
-    next_data: Data<OrderLatencyRow>,
+    reader: LatencyReader,
+    latency_offset: i64,
+    grids: LatencyGrids,
+    next_rows: Option<Vec<OrderLatencyRow>>,
 }
 
 impl IntpOrderLatency {
@@ -110,34 +347,39 @@ impl IntpOrderLatency {
         parallel_load: bool,
         latency_offset: i64,
     ) -> Result<Self, BacktestError> {
-        let mut reader = if latency_offset == 0 {
-            Reader::builder()
-                .parallel_load(parallel_load)
-                .data(data)
-                .build()?
+        let reader = Reader::builder()
+            .parallel_load(parallel_load)
+            .data(data)
+            .build()?;
+        Self::build_from(LatencyReader::Full(reader), latency_offset)
+    }
+
+    /// Constructs an `IntpOrderLatency` from the data in the compact form with options.
+    pub fn build_compact(
+        data: Vec<DataSource<CompactOrderLatencyRow>>,
+        parallel_load: bool,
+        latency_offset: i64,
+    ) -> Result<Self, BacktestError> {
+        let reader = Reader::builder()
+            .parallel_load(parallel_load)
+            .data(data)
+            .build()?;
+        Self::build_from(LatencyReader::Compact(reader), latency_offset)
+    }
+
+    fn build_from(mut reader: LatencyReader, latency_offset: i64) -> Result<Self, BacktestError> {
+        let rows = reader.next_rows(latency_offset)?.unwrap_or_default();
+        let next_rows = reader.next_rows(latency_offset)?;
+        let grids = if rows.is_empty() {
+            LatencyGrids::default()
         } else {
-            Reader::builder()
-                .parallel_load(parallel_load)
-                .data(data)
-                .preprocessor(OrderLatencyAdjustment::new(latency_offset))
-                .build()?
-        };
-        let data = match reader.next_data() {
-            Ok(data) => data,
-            Err(BacktestError::EndOfData) => Data::empty(),
-            Err(e) => return Err(e),
-        };
-        let next_data = match reader.next_data() {
-            Ok(data) => data,
-            Err(BacktestError::EndOfData) => Data::empty(),
-            Err(e) => return Err(e),
+            LatencyGrids::new(&rows, next_rows.as_ref().map(|rows| &rows[0]))
         };
         Ok(Self {
-            entry_rn: 0,
-            resp_rn: 0,
             reader,
-            data,
-            next_data,
+            latency_offset,
+            grids,
+            next_rows,
         })
     }
 
@@ -146,150 +388,183 @@ impl IntpOrderLatency {
         Self::build(data, true, latency_offset).unwrap()
     }
 
-    fn intp(&self, x: i64, x1: i64, y1: i64, x2: i64, y2: i64) -> i64 {
-        (((y2 - y1) as f64) / ((x2 - x1) as f64) * ((x - x1) as f64)) as i64 + y1
+    /// Constructs an `IntpOrderLatency` from the data in the compact form with default options.
+    pub fn new_compact(data: Vec<DataSource<CompactOrderLatencyRow>>, latency_offset: i64) -> Self {
+        Self::build_compact(data, true, latency_offset).unwrap()
     }
 
-    fn next_data(&mut self) -> Result<bool, BacktestError> {
-        if !self.next_data.is_empty() {
-            let next_data = match self.reader.next_data() {
-                Ok(data) => data,
-                Err(BacktestError::EndOfData) => Data::empty(),
-                Err(e) => return Err(e),
-            };
-            let next_data = mem::replace(&mut self.next_data, next_data);
-            let data = mem::replace(&mut self.data, next_data);
-            self.reader.release(data);
-            Ok(true)
-        } else {
-            Ok(false)
+    /// Moves on to the grids of the next data file, if any.
+    fn next_grids(&mut self) -> Result<bool, BacktestError> {
+        match self.next_rows.take() {
+            Some(rows) => {
+                self.next_rows = self.reader.next_rows(self.latency_offset)?;
+                self.grids = LatencyGrids::new(&rows, self.next_rows.as_ref().map(|rows| &rows[0]));
+                Ok(true)
+            }
+            None => Ok(false),
         }
     }
 }
 
 impl LatencyModel for IntpOrderLatency {
     fn entry(&mut self, timestamp: i64, _order: &Order) -> i64 {
-        let first_row = &self.data[0];
-        if timestamp < first_row.req_ts {
-            return first_row.exch_ts - first_row.req_ts;
-        }
-
-        loop {
-            let row = &self.data[self.entry_rn];
-            let next_row = if self.entry_rn + 1 < self.data.len() {
-                &self.data[self.entry_rn + 1]
-            } else if !self.next_data.is_empty() {
-                &self.next_data[0]
-            } else {
-                let last_row = &self.data[self.data.len() - 1];
-                return last_row.exch_ts - last_row.req_ts;
-            };
-
-            let req_local_timestamp = row.req_ts;
-            let next_req_local_timestamp = next_row.req_ts;
-
-            if row.req_ts <= timestamp && timestamp < next_row.req_ts {
-                let exch_timestamp = row.exch_ts;
-                let next_exch_timestamp = next_row.exch_ts;
-
-                // The exchange may reject an order request due to technical issues such
-                // congestion, this is particularly common in crypto markets. A timestamp of
-                // zero on the exchange represents the occurrence of those kinds of errors at
-                // that time.
-                if exch_timestamp <= 0 || next_exch_timestamp <= 0 {
-                    let resp_timestamp = row.resp_ts;
-                    let next_resp_timestamp = next_row.resp_ts;
-                    let lat1 = resp_timestamp - req_local_timestamp;
-                    let lat2 = next_resp_timestamp - next_req_local_timestamp;
-
-                    // Negative latency indicates that the order is rejected for technical
-                    // reasons, and its value represents the latency that the local experiences
-                    // when receiving the rejection notification
-                    return -self.intp(
-                        timestamp,
-                        req_local_timestamp,
-                        lat1,
-                        next_req_local_timestamp,
-                        lat2,
-                    );
+        while !self.grids.entry.covers(timestamp) {
+            if !self.next_grids().unwrap() {
+                let grid = &self.grids.entry;
+                if grid.xs.is_empty() || timestamp >= grid.xs[grid.xs.len() - 1] {
+                    return grid.tail;
                 }
-
-                let lat1 = exch_timestamp - req_local_timestamp;
-                let lat2 = next_exch_timestamp - next_req_local_timestamp;
-                return self.intp(
-                    timestamp,
-                    req_local_timestamp,
-                    lat1,
-                    next_req_local_timestamp,
-                    lat2,
-                );
-            } else if self.entry_rn == self.data.len() - 1 {
-                if self.next_data().unwrap() {
-                    self.entry_rn = 0;
-                }
-            } else {
-                self.entry_rn += 1;
+                break;
             }
         }
+        let grid = &mut self.grids.entry;
+        if timestamp < grid.xs[0] {
+            return grid.head;
+        }
+        grid.lookup(timestamp)
     }
 
     fn response(&mut self, timestamp: i64, _order: &Order) -> i64 {
-        let first_row = &self.data[0];
-        if timestamp < first_row.exch_ts {
-            return first_row.resp_ts - first_row.exch_ts;
-        }
-
-        loop {
-            let row = &self.data[self.resp_rn];
-            let next_row = if self.resp_rn + 1 < self.data.len() {
-                &self.data[self.resp_rn + 1]
-            } else if !self.next_data.is_empty() {
-                &self.next_data[0]
-            } else {
-                let last_row = &self.data[self.data.len() - 1];
-                return last_row.resp_ts - last_row.exch_ts;
-            };
-
-            let exch_timestamp = row.exch_ts;
-            let next_exch_timestamp = next_row.exch_ts;
-            if exch_timestamp <= timestamp && timestamp < next_exch_timestamp {
-                let resp_local_timestamp = row.resp_ts;
-                let next_resp_local_timestamp = next_row.resp_ts;
-
-                let lat1 = resp_local_timestamp - exch_timestamp;
-                let lat2 = next_resp_local_timestamp - next_exch_timestamp;
-
-                let lat = self.intp(timestamp, exch_timestamp, lat1, next_exch_timestamp, lat2);
-                assert!(lat >= 0);
-                return lat;
-            } else if self.resp_rn == self.data.len() - 1 {
-                if self.next_data().unwrap() {
-                    self.resp_rn = 0;
+        while !self.grids.resp.covers(timestamp) {
+            if !self.next_grids().unwrap() {
+                let grid = &self.grids.resp;
+                if grid.xs.is_empty() || timestamp >= grid.xs[grid.xs.len() - 1] {
+                    return grid.tail;
                 }
-            } else {
-                self.resp_rn += 1;
+                break;
             }
         }
+        let grid = &mut self.grids.resp;
+        if timestamp < grid.xs[0] {
+            return grid.head;
+        }
+        let lat = grid.lookup(timestamp);
+        assert!(lat >= 0);
+        lat
     }
 }
 
-#[derive(Clone)]
-struct OrderLatencyAdjustment {
-    latency_offset: i64,
-}
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{
+        backtest::data::Data,
+        types::{OrdType, Side, TimeInForce},
+    };
 
-impl OrderLatencyAdjustment {
-    pub fn new(latency_offset: i64) -> Self {
-        Self { latency_offset }
+    fn row(req_ts: i64, exch_ts: i64, resp_ts: i64) -> OrderLatencyRow {
+        OrderLatencyRow {
+            req_ts,
+            exch_ts,
+            resp_ts,
+            _padding: 0,
+        }
     }
-}
 
-impl DataPreprocess<OrderLatencyRow> for OrderLatencyAdjustment {
-    fn preprocess(&self, data: &mut Data<OrderLatencyRow>) -> Result<(), IoError> {
-        for i in 0..data.len() {
-            data[i].exch_ts += self.latency_offset;
-            data[i].resp_ts += self.latency_offset + self.latency_offset;
+    fn order() -> Order {
+        Order::new(0, 0, 1.0, 1.0, Side::Buy, OrdType::Limit, TimeInForce::GTC)
+    }
+
+    #[test]
+    fn test_intp() {
+        let mut model = IntpOrderLatency::new(
+            vec![
+                DataSource::Data(Data::from_data(&[
+                    row(100, 110, 130),
+                    row(200, 230, 250),
+                    row(300, 0, 340),
+                ])),
+                DataSource::Data(Data::from_data(&[row(400, 410, 420), row(500, 510, 530)])),
+            ],
+            0,
+        );
+        let order = order();
+
+        assert_eq!(model.entry(50, &order), 10);
+        assert_eq!(model.entry(100, &order), 10);
+        assert_eq!(model.entry(150, &order), 20);
+        // Jumps forward and steps back.
+        assert_eq!(model.entry(350, &order), -30);
+        assert_eq!(model.entry(250, &order), -45);
+        // Rejected rows are interpolated with the response latency.
+        assert_eq!(model.entry(200, &order), -50);
+        // Across the boundary between the files.
+        assert_eq!(model.entry(450, &order), 10);
+        assert_eq!(model.entry(600, &order), 10);
+
+        let mut model = IntpOrderLatency::new(
+            vec![
+                DataSource::Data(Data::from_data(&[
+                    row(100, 110, 130),
+                    row(200, 230, 250),
+                    row(300, 0, 340),
+                ])),
+                DataSource::Data(Data::from_data(&[row(400, 410, 420), row(500, 510, 530)])),
+            ],
+            5,
+        );
+        assert_eq!(model.response(100, &order), 25);
+        assert_eq!(model.response(120, &order), 25);
+        assert_eq!(model.response(175, &order), 25);
+        assert_eq!(model.response(115, &order), 25);
+        // The rejected row has no response latency.
+        assert_eq!(model.response(325, &order), 20);
+        assert_eq!(model.response(515, &order), 25);
+        assert_eq!(model.response(600, &order), 25);
+    }
+
+    #[test]
+    fn test_compact() {
+        let full = [
+            row(100, 110, 130),
+            row(200, 230, 250),
+            row(300, 0, 340),
+            row(400, 410, 420),
+        ];
+        let compact = [
+            CompactOrderLatencyRow {
+                req_ts: 100,
+                entry_lat: 10,
+                resp_lat: 20,
+            },
+            CompactOrderLatencyRow {
+                req_ts: 200,
+                entry_lat: 30,
+                resp_lat: 20,
+            },
+            CompactOrderLatencyRow {
+                req_ts: 300,
+                entry_lat: REJECTED_ENTRY_LATENCY,
+                resp_lat: 40,
+            },
+            CompactOrderLatencyRow {
+                req_ts: 400,
+                entry_lat: 10,
+                resp_lat: 10,
+            },
+        ];
+        for (full_row, compact_row) in full.iter().zip(compact.iter()) {
+            let decoded: OrderLatencyRow = compact_row.into();
+            assert_eq!(decoded.req_ts, full_row.req_ts);
+            assert_eq!(decoded.exch_ts, full_row.exch_ts);
+            assert_eq!(decoded.resp_ts, full_row.resp_ts);
+        }
+
+        let mut model = IntpOrderLatency::new(vec![DataSource::Data(Data::from_data(&full))], 0);
+        let mut compact_model =
+            IntpOrderLatency::new_compact(vec![DataSource::Data(Data::from_data(&compact))], 0);
+        let order = order();
+        for timestamp in (0..500).step_by(7) {
+            assert_eq!(
+                model.entry(timestamp, &order),
+                compact_model.entry(timestamp, &order)
+            );
+        }
+        for timestamp in (0..500).step_by(7) {
+            assert_eq!(
+                model.response(timestamp, &order),
+                compact_model.response(timestamp, &order)
+            );
         }
-        Ok(())
     }
 }
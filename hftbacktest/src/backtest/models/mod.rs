@@ -15,7 +15,14 @@ pub use fee::{
     TradingQtyFeeModel,
     TradingValueFeeModel,
 };
-pub use latency::{ConstantLatency, IntpOrderLatency, LatencyModel, OrderLatencyRow};
+pub use latency::{
+    CompactOrderLatencyRow,
+    ConstantLatency,
+    IntpOrderLatency,
+    LatencyModel,
+    OrderLatencyRow,
+    REJECTED_ENTRY_LATENCY,
+};
 pub use queue::{
     L3FIFOQueueModel,
     L3QueueModel,
@@ -28,5 +35,7 @@ pub use queue::{
     Probability,
     QueueModel,
     QueuePos,
+    RelativeProbability,
     RiskAdverseQueueModel,
+    TabulatedProbQueueFunc,
 };
@@ -41,6 +41,7 @@ where
 
 /// Provides a conservative queue position model, where your order's queue position advances only
 /// when trades occur at the same price level.
+#[derive(Clone)]
 pub struct RiskAdverseQueueModel<MD>(PhantomData<MD>);
 
 impl AnyClone for f64 {
@@ -136,6 +137,7 @@ pub trait Probability {
 /// the relative queue position. To avoid double counting the quantity decrease caused by trades,
 /// all trade quantities occurring at the level before the book quantity changes will be subtracted
 /// from the book quantity changes.
+#[derive(Clone)]
 pub struct ProbQueueModel<P, MD>
 where
     P: Probability,
@@ -218,6 +220,7 @@ where
 
 /// This probability model uses a power function `f(x) = x ** n` to adjust the probability which is
 /// calculated as `f(back) / (f(back) + f(front))`.
+#[derive(Clone)]
 pub struct PowerProbQueueFunc {
     n: f64,
 }
@@ -239,9 +242,11 @@ impl Probability for PowerProbQueueFunc {
     }
 }
 
+impl RelativeProbability for PowerProbQueueFunc {}
+
 /// This probability model uses a logarithmic function `f(x) = log(1 + x)` to adjust the
 /// probability which is calculated as `f(back) / (f(back) + f(front))`.
-#[derive(Default)]
+#[derive(Clone, Default)]
 pub struct LogProbQueueFunc(());
 
 impl LogProbQueueFunc {
@@ -263,7 +268,7 @@ impl Probability for LogProbQueueFunc {
 
 /// This probability model uses a logarithmic function `f(x) = log(1 + x)` to adjust the
 /// probability which is calculated as `f(back) / f(back + front)`.
-#[derive(Default)]
+#[derive(Clone, Default)]
 pub struct LogProbQueueFunc2(());
 
 impl LogProbQueueFunc2 {
@@ -285,6 +290,7 @@ impl Probability for LogProbQueueFunc2 {
 
 /// This probability model uses a power function `f(x) = x ** n` to adjust the probability which is
 /// calculated as `f(back) / f(back + front)`.
+#[derive(Clone)]
 pub struct PowerProbQueueFunc2 {
     n: f64,
 }
@@ -306,8 +312,11 @@ impl Probability for PowerProbQueueFunc2 {
     }
 }
 
+impl RelativeProbability for PowerProbQueueFunc2 {}
+
 /// This probability model uses a power function `f(x) = x ** n` to adjust the probability which is
 /// calculated as `1 - f(front / (front + back))`.
+#[derive(Clone)]
 pub struct PowerProbQueueFunc3 {
     n: f64,
 }
@@ -329,6 +338,95 @@ impl Probability for PowerProbQueueFunc3 {
     }
 }
 
+impl RelativeProbability for PowerProbQueueFunc3 {}
+
+/// Marks a [`Probability`] that depends only on the relative queue position
+/// `front / (front + back)`, which allows [`TabulatedProbQueueFunc`] to tabulate it.
+pub trait RelativeProbability: Probability {}
+
+/// The number of points within each interval of the table at which [`TabulatedProbQueueFunc`]
+/// measures its error.
+const ERROR_SAMPLES: usize = 16;
+
+/// Evaluates a [`RelativeProbability`] by linear interpolation over a table of its values at
+/// evenly spaced relative queue positions, instead of evaluating `powf` on every depth change of
+/// every resting order.
+///
+/// The error against the exact function is measured when the table is built and is available
+/// through [`max_error`](Self::max_error()). With 1024 intervals, it is zero for `n = 1` and
+/// below `2e-5` for `1 <= n <= 10`, but exceeds `1e-3` for `n < 1`, since the slope of `x ** n`
+/// is unbounded at zero. If the relative queue position falls outside `[0, 1]`, for example when
+/// trades have overtaken the quantity ahead of the order, the exact function is evaluated instead.
+///
+/// **Example**
+/// ```
+/// use hftbacktest::backtest::models::{PowerProbQueueFunc, TabulatedProbQueueFunc};
+///
+/// let prob = TabulatedProbQueueFunc::new(PowerProbQueueFunc::new(3.0), 1024);
+/// assert!(prob.max_error() < 1e-5);
+/// ```
+#[derive(Clone)]
+pub struct TabulatedProbQueueFunc<P> {
+    prob: P,
+    table: Vec<f64>,
+    max_error: f64,
+}
+
+impl<P> TabulatedProbQueueFunc<P>
+where
+    P: RelativeProbability,
+{
+    /// Constructs an instance of `TabulatedProbQueueFunc` whose table divides the relative queue
+    /// position into `size` intervals.
+    pub fn new(prob: P, size: usize) -> Self {
+        let size = size.max(1);
+        let exact = |x: f64| {
+            let r = x / size as f64;
+            prob.prob(r, 1.0 - r)
+        };
+        let table: Vec<f64> = (0..=size).map(|i| exact(i as f64)).collect();
+
+        let mut max_error: f64 = 0.0;
+        for i in 0..size {
+            for k in 1..ERROR_SAMPLES {
+                let frac = k as f64 / ERROR_SAMPLES as f64;
+                let approx = table[i] + (table[i + 1] - table[i]) * frac;
+                max_error = max_error.max((exact(i as f64 + frac) - approx).abs());
+            }
+        }
+
+        Self {
+            prob,
+            table,
+            max_error,
+        }
+    }
+
+    /// Returns the maximum absolute error against the exact function, measured at evenly spaced
+    /// points within every interval of the table.
+    pub fn max_error(&self) -> f64 {
+        self.max_error
+    }
+}
+
+impl<P> Probability for TabulatedProbQueueFunc<P>
+where
+    P: RelativeProbability,
+{
+    #[inline]
+    fn prob(&self, front: f64, back: f64) -> f64 {
+        let r = front / (front + back);
+        if !(0.0..=1.0).contains(&r) {
+            return self.prob.prob(front, back);
+        }
+        let size = self.table.len() - 1;
+        let x = r * size as f64;
+        let i = (x as usize).min(size - 1);
+        let y = self.table[i];
+        y + (self.table[i + 1] - y) * (x - i as f64)
+    }
+}
+
 /// Represents the order source for the Level 3 Market-By-Order queue model, which is stored in
 /// [`order.q`](crate::types::Order::q)
 #[derive(Copy, Clone, Eq, PartialEq)]
@@ -1356,3 +1454,40 @@ mod l3_tests {
         );
     }
 }
+
+#[cfg(test)]
+mod prob_tests {
+    use super::*;
+
+    fn check<P: RelativeProbability>(prob: P, bound: f64) {
+        let exact = |front: f64, back: f64| prob.prob(front, back);
+        let expected: Vec<(f64, f64, f64)> = (0..=200)
+            .flat_map(|i| (0..=50).map(move |j| (i as f64 * 0.37, j as f64 * 1.9)))
+            .map(|(front, back)| (front, back, exact(front, back)))
+            .collect();
+
+        let tabulated = TabulatedProbQueueFunc::new(prob, 1024);
+        assert!(tabulated.max_error() <= bound);
+        for (front, back, exact) in expected {
+            let approx = tabulated.prob(front, back);
+            if exact.is_nan() {
+                assert!(approx.is_nan());
+            } else {
+                assert!((approx - exact).abs() <= tabulated.max_error() * 1.01 + 1e-12);
+            }
+        }
+        // Outside the table, the exact function is evaluated.
+        assert_eq!(tabulated.prob(-1.0, 3.0), tabulated.prob.prob(-1.0, 3.0));
+    }
+
+    #[test]
+    fn test_tabulated_error() {
+        check(PowerProbQueueFunc::new(1.0), 1e-12);
+        for n in [2.0, 3.0, 5.0, 10.0] {
+            check(PowerProbQueueFunc::new(n), 2e-5);
+            check(PowerProbQueueFunc2::new(n), 2e-5);
+            check(PowerProbQueueFunc3::new(n), 2e-5);
+        }
+        check(PowerProbQueueFunc::new(0.5), 1e-2);
+    }
+}
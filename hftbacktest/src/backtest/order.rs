@@ -1,4 +1,8 @@
-use std::{cell::UnsafeCell, collections::VecDeque, rc::Rc};
+use std::{
+    cell::UnsafeCell,
+    collections::{HashMap, VecDeque},
+    rc::Rc,
+};
 
 use crate::{backtest::models::LatencyModel, types::Order};
 
@@ -65,8 +69,26 @@ impl OrderBus {
     pub fn pop_front(&mut self) -> Option<(Order, i64)> {
         unsafe { &mut *self.order_list.get() }.pop_front()
     }
+
+    /// Returns a copy of this bus holding the same orders in transit. The copies made with the
+    /// same [`ForkedBuses`] share their buses just as the original ends do.
+    pub fn fork(&self, forked: &mut ForkedBuses) -> Self {
+        let key = Rc::as_ptr(&self.order_list) as usize;
+        forked
+            .0
+            .entry(key)
+            .or_insert_with(|| Self {
+                order_list: Rc::new(UnsafeCell::new(unsafe { &*self.order_list.get() }.clone())),
+            })
+            .clone()
+    }
 }
 
+/// Maps the order buses of a backtest being forked to their copies, so that the forked local and
+/// exchange processors are connected to each other rather than to the original ones.
+#[derive(Default)]
+pub struct ForkedBuses(HashMap<usize, OrderBus>);
+
 /// Provides a bidirectional order bus connecting the exchange to the local.
 pub struct ExchToLocal<LM> {
     to_exch: OrderBus,
@@ -95,6 +117,18 @@ where
         self.to_local.append(order, local_recv_timestamp);
     }
 
+    /// Returns a copy of this end of the bus. See [`OrderBus::fork`].
+    pub fn fork(&self, forked: &mut ForkedBuses) -> Self
+    where
+        LM: Clone,
+    {
+        Self {
+            to_exch: self.to_exch.fork(forked),
+            to_local: self.to_local.fork(forked),
+            order_latency: self.order_latency.clone(),
+        }
+    }
+
     /// Receives the order request from the local, which is expected to be received at
     /// `receipt_timestamp`.
     pub fn receive(&mut self, receipt_timestamp: i64) -> Option<Order> {
@@ -155,6 +189,18 @@ where
         }
     }
 
+    /// Returns a copy of this end of the bus. See [`OrderBus::fork`].
+    pub fn fork(&self, forked: &mut ForkedBuses) -> Self
+    where
+        LM: Clone,
+    {
+        Self {
+            to_exch: self.to_exch.fork(forked),
+            to_local: self.to_local.fork(forked),
+            order_latency: self.order_latency.clone(),
+        }
+    }
+
     /// Receives the order response from the exchange, which is expected to be received at
     /// `receipt_timestamp`.
     pub fn receive(&mut self, receipt_timestamp: i64) -> Option<Order> {
@@ -5,8 +5,8 @@ use crate::{
         BacktestError,
         assettype::AssetType,
         models::{FeeModel, LatencyModel},
-        order::LocalToExch,
-        proc::{LocalProcessor, Processor},
+        order::{ForkedBuses, LocalToExch},
+        proc::{ForkableProcessor, LocalProcessor, Processor},
         state::State,
     },
     depth::{L2MarketDepth, MarketDepth},
@@ -329,3 +329,25 @@ where
             .unwrap_or(i64::MAX)
     }
 }
+
+impl<AT, LM, MD, FM> ForkableProcessor for Local<AT, LM, MD, FM>
+where
+    AT: AssetType + Clone,
+    LM: LatencyModel + Clone,
+    MD: MarketDepth + L2MarketDepth + Clone,
+    FM: FeeModel + Clone,
+{
+    fn fork_processor(&self, forked: &mut ForkedBuses) -> Self {
+        let mut trades = Vec::with_capacity(self.trades.capacity());
+        trades.extend_from_slice(&self.trades);
+        Self {
+            orders: self.orders.clone(),
+            order_l2e: self.order_l2e.fork(forked),
+            depth: self.depth.clone(),
+            state: self.state.clone(),
+            trades,
+            last_feed_latency: self.last_feed_latency,
+            last_order_latency: self.last_order_latency,
+        }
+    }
+}
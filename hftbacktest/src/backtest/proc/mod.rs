@@ -2,7 +2,10 @@ mod local;
 mod nopartialfillexchange;
 mod partialfillexchange;
 
-use std::collections::HashMap;
+use std::{
+    collections::HashMap,
+    ops::{Deref, DerefMut},
+};
 
 pub use local::Local;
 pub use nopartialfillexchange::NoPartialFillExchange;
@@ -16,11 +19,19 @@ pub use l3_local::L3Local;
 pub use l3_nopartialfillexchange::L3NoPartialFillExchange;
 
 use crate::{
-    backtest::BacktestError,
+    backtest::{BacktestError, order::ForkedBuses},
     depth::MarketDepth,
     prelude::{Event, OrdType, Order, OrderId, Side, StateValues, TimeInForce},
 };
 
+/// Provides a copy of a processor in its current state. Wrapping a processor in [`Forkable`]
+/// allows [`Backtest::fork`](crate::backtest::Backtest::fork) to fork it.
+pub trait ForkableProcessor {
+    /// Returns a copy of this processor in its current state, connected to the counterpart
+    /// processor forked with the same [`ForkedBuses`].
+    fn fork_processor(&self, forked: &mut ForkedBuses) -> Self;
+}
+
 /// Provides local-specific interaction.
 pub trait LocalProcessor<MD>: Processor
 where
@@ -98,6 +109,12 @@ where
     /// Returns the last order's request timestamp, exchange timestamp, and response receipt
     /// timestamp.
     fn order_latency(&self) -> Option<(i64, i64, i64)>;
+
+    /// Returns a copy of this processor in its current state, connected to the exchange processor
+    /// forked with the same [`ForkedBuses`], or `None` if the processor cannot be forked.
+    fn fork_local(&self, _forked: &mut ForkedBuses) -> Option<Box<dyn LocalProcessor<MD>>> {
+        None
+    }
 }
 
 impl<P: Processor + ?Sized> Processor for Box<P> {
@@ -124,6 +141,10 @@ impl<P: Processor + ?Sized> Processor for Box<P> {
     fn earliest_send_order_timestamp(&self) -> i64 {
         P::earliest_send_order_timestamp(self)
     }
+
+    fn fork(&self, forked: &mut ForkedBuses) -> Option<Box<dyn Processor>> {
+        P::fork(self, forked)
+    }
 }
 /// Processes the historical feed data and the order interaction.
 pub trait Processor {
@@ -153,4 +174,145 @@ pub trait Processor {
     /// Returns the foremost timestamp at which an order sent by this processor is to be received by
     /// the corresponding processor.
     fn earliest_send_order_timestamp(&self) -> i64;
+
+    /// Returns a copy of this processor in its current state, connected to the local processor
+    /// forked with the same [`ForkedBuses`], or `None` if the processor cannot be forked.
+    fn fork(&self, _forked: &mut ForkedBuses) -> Option<Box<dyn Processor>> {
+        None
+    }
+}
+
+/// Wraps a processor so that it can be forked through [`Processor::fork`] and
+/// [`LocalProcessor::fork_local`]. The processor types themselves do not require their models and
+/// market depth to be [`Clone`]; only the wrapped ones that are forked do.
+pub struct Forkable<P>(pub P);
+
+impl<P> Deref for Forkable<P> {
+    type Target = P;
+
+    fn deref(&self) -> &Self::Target {
+        &self.0
+    }
+}
+
+impl<P> DerefMut for Forkable<P> {
+    fn deref_mut(&mut self) -> &mut Self::Target {
+        &mut self.0
+    }
+}
+
+impl<P> Processor for Forkable<P>
+where
+    P: Processor + ForkableProcessor + 'static,
+{
+    #[inline(always)]
+    fn event_seen_timestamp(&self, event: &Event) -> Option<i64> {
+        self.0.event_seen_timestamp(event)
+    }
+
+    #[inline(always)]
+    fn process(&mut self, event: &Event) -> Result<(), BacktestError> {
+        self.0.process(event)
+    }
+
+    fn process_recv_order(
+        &mut self,
+        timestamp: i64,
+        wait_resp_order_id: Option<OrderId>,
+    ) -> Result<bool, BacktestError> {
+        self.0.process_recv_order(timestamp, wait_resp_order_id)
+    }
+
+    fn earliest_recv_order_timestamp(&self) -> i64 {
+        self.0.earliest_recv_order_timestamp()
+    }
+
+    fn earliest_send_order_timestamp(&self) -> i64 {
+        self.0.earliest_send_order_timestamp()
+    }
+
+    fn fork(&self, forked: &mut ForkedBuses) -> Option<Box<dyn Processor>> {
+        Some(Box::new(Forkable(self.0.fork_processor(forked))))
+    }
+}
+
+impl<P, MD> LocalProcessor<MD> for Forkable<P>
+where
+    P: LocalProcessor<MD> + ForkableProcessor + 'static,
+    MD: MarketDepth,
+{
+    fn submit_order(
+        &mut self,
+        order_id: OrderId,
+        side: Side,
+        price: f64,
+        qty: f64,
+        order_type: OrdType,
+        time_in_force: TimeInForce,
+        current_timestamp: i64,
+    ) -> Result<(), BacktestError> {
+        self.0.submit_order(
+            order_id,
+            side,
+            price,
+            qty,
+            order_type,
+            time_in_force,
+            current_timestamp,
+        )
+    }
+
+    fn modify(
+        &mut self,
+        order_id: OrderId,
+        price: f64,
+        qty: f64,
+        current_timestamp: i64,
+    ) -> Result<(), BacktestError> {
+        self.0.modify(order_id, price, qty, current_timestamp)
+    }
+
+    fn cancel(&mut self, order_id: OrderId, current_timestamp: i64) -> Result<(), BacktestError> {
+        self.0.cancel(order_id, current_timestamp)
+    }
+
+    fn clear_inactive_orders(&mut self) {
+        self.0.clear_inactive_orders()
+    }
+
+    fn position(&self) -> f64 {
+        self.0.position()
+    }
+
+    fn state_values(&self) -> &StateValues {
+        self.0.state_values()
+    }
+
+    fn depth(&self) -> &MD {
+        self.0.depth()
+    }
+
+    fn orders(&self) -> &HashMap<OrderId, Order> {
+        self.0.orders()
+    }
+
+    fn last_trades(&self) -> &[Event] {
+        self.0.last_trades()
+    }
+
+    fn clear_last_trades(&mut self) {
+        self.0.clear_last_trades()
+    }
+
+    fn feed_latency(&self) -> Option<(i64, i64)> {
+        self.0.feed_latency()
+    }
+
+    fn order_latency(&self) -> Option<(i64, i64, i64)> {
+        self.0.order_latency()
+    }
+
+    fn fork_local(&self, forked: &mut ForkedBuses) -> Option<Box<dyn LocalProcessor<MD>>> {
+        Some(Box::new(Forkable(self.0.fork_processor(forked))))
+    }
 }
@@ -10,8 +10,8 @@ use crate::{
         BacktestError,
         assettype::AssetType,
         models::{FeeModel, LatencyModel, QueueModel},
-        order::ExchToLocal,
-        proc::Processor,
+        order::{ExchToLocal, ForkedBuses},
+        proc::{ForkableProcessor, Processor},
         state::State,
     },
     depth::{INVALID_MAX, INVALID_MIN, L2MarketDepth, MarketDepth},
@@ -860,3 +860,25 @@ where
             .unwrap_or(i64::MAX)
     }
 }
+
+impl<AT, LM, QM, MD, FM> ForkableProcessor for PartialFillExchange<AT, LM, QM, MD, FM>
+where
+    AT: AssetType + Clone,
+    LM: LatencyModel + Clone,
+    QM: QueueModel<MD> + Clone,
+    MD: MarketDepth + L2MarketDepth + Clone,
+    FM: FeeModel + Clone,
+{
+    fn fork_processor(&self, forked: &mut ForkedBuses) -> Self {
+        Self {
+            orders: Rc::new(RefCell::new(self.orders.borrow().clone())),
+            buy_orders: self.buy_orders.clone(),
+            sell_orders: self.sell_orders.clone(),
+            order_e2l: self.order_e2l.fork(forked),
+            depth: self.depth.clone(),
+            state: self.state.clone(),
+            queue_model: self.queue_model.clone(),
+            filled_orders: self.filled_orders.clone(),
+        }
+    }
+}
@@ -13,21 +13,61 @@ use crate::{
     types::{Bot, Recorder},
 };
 
+/// A single record of an asset's state values, laid out to match `record_dtype` on the Python
+/// side so that all assets can be exported at once into a caller-owned buffer.
 #[repr(C)]
-#[derive(NpyDTyped)]
-struct Record {
-    timestamp: i64,
-    price: f64,
-    position: f64,
-    balance: f64,
-    fee: f64,
-    num_trades: i64,
-    trading_volume: f64,
-    trading_value: f64,
+#[derive(NpyDTyped, Clone, Copy, Debug, Default)]
+pub struct Record {
+    pub timestamp: i64,
+    pub price: f64,
+    pub position: f64,
+    pub balance: f64,
+    pub fee: f64,
+    pub num_trades: i64,
+    pub trading_volume: f64,
+    pub trading_value: f64,
 }
 
 unsafe impl POD for Record {}
 
+impl Record {
+    /// Constructs a `Record` from the current mid price and state values of the given asset.
+    pub fn new<MD, I>(hbt: &I, asset_no: usize, timestamp: i64) -> Self
+    where
+        MD: MarketDepth,
+        I: Bot<MD>,
+    {
+        let depth = hbt.depth(asset_no);
+        let mid_price = (depth.best_bid() + depth.best_ask()) / 2.0;
+        let state_values = hbt.state_values(asset_no);
+        Self {
+            timestamp,
+            price: mid_price,
+            balance: state_values.balance,
+            position: state_values.position,
+            fee: state_values.fee,
+            trading_volume: state_values.trading_volume,
+            trading_value: state_values.trading_value,
+            num_trades: state_values.num_trades,
+        }
+    }
+
+    /// Writes the records of all assets at the current timestamp into `out` and returns the number
+    /// of records written, which is the smaller of the number of assets and `out.len()`.
+    pub fn write_all<MD, I>(hbt: &I, out: &mut [Record]) -> usize
+    where
+        MD: MarketDepth,
+        I: Bot<MD>,
+    {
+        let timestamp = hbt.current_timestamp();
+        let n = hbt.num_assets().min(out.len());
+        for (asset_no, record) in out[..n].iter_mut().enumerate() {
+            *record = Record::new(hbt, asset_no, timestamp);
+        }
+        n
+    }
+}
+
 /// Provides recording of the backtesting strategy's state values, which are needed to compute
 /// performance metrics.
 pub struct BacktestRecorder {
@@ -44,20 +84,8 @@ impl Recorder for BacktestRecorder {
     {
         let timestamp = hbt.current_timestamp();
         for asset_no in 0..hbt.num_assets() {
-            let depth = hbt.depth(asset_no);
-            let mid_price = (depth.best_bid() + depth.best_ask()) / 2.0;
-            let state_values = hbt.state_values(asset_no);
             let values = unsafe { self.values.get_unchecked_mut(asset_no) };
-            values.push(Record {
-                timestamp,
-                price: mid_price,
-                balance: state_values.balance,
-                position: state_values.position,
-                fee: state_values.fee,
-                trading_volume: state_values.trading_volume,
-                trading_value: state_values.trading_value,
-                num_trades: state_values.num_trades,
-            });
+            values.push(Record::new(hbt, asset_no, timestamp));
         }
         Ok(())
     }
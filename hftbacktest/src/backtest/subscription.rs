@@ -0,0 +1,211 @@
+use crate::{
+    backtest::{BacktestError, proc::LocalProcessor},
+    depth::{INVALID_MAX, INVALID_MIN, MarketDepth},
+    types::{
+        ADD_ORDER_EVENT,
+        BUY_EVENT,
+        CANCEL_ORDER_EVENT,
+        DEPTH_BBO_EVENT,
+        DEPTH_CLEAR_EVENT,
+        DEPTH_EVENT,
+        DEPTH_SNAPSHOT_EVENT,
+        Event,
+        FILL_EVENT,
+        MODIFY_ORDER_EVENT,
+        SELL_EVENT,
+        TRADE_EVENT,
+    },
+};
+
+/// Subscribes to any change of the market depth, including clears, snapshots, and Level-3 order
+/// events.
+pub const SUB_DEPTH: u8 = 1;
+
+/// Subscribes to changes of the best bid or ask price or quantity.
+pub const SUB_BBO: u8 = 1 << 1;
+
+/// Subscribes to market trades, including Level-3 fills.
+pub const SUB_TRADE: u8 = 1 << 2;
+
+/// Subscribes to market depth changes within [`Subscription::depth_range`] ticks of the best price
+/// of their side, including clears and snapshots.
+pub const SUB_NEAR_TOUCH: u8 = 1 << 3;
+
+/// Subscribes to the feed events that fall into none of the other classes.
+pub const SUB_OTHER: u8 = 1 << 4;
+
+/// Subscribes to every feed event.
+pub const SUB_ALL: u8 = SUB_DEPTH | SUB_BBO | SUB_TRADE | SUB_NEAR_TOUCH | SUB_OTHER;
+
+/// The feed event classes of an asset that wake a strategy waiting in
+/// [`Bot::wait_next_feed`](crate::types::Bot::wait_next_feed) in backtesting.
+#[derive(Clone, Copy, Debug, Eq, PartialEq)]
+pub struct Subscription {
+    /// The bitwise OR of the `SUB_*` classes.
+    pub classes: u8,
+    /// The distance in ticks from the best price within which a depth change is
+    /// [`SUB_NEAR_TOUCH`].
+    pub depth_range: i64,
+}
+
+impl Default for Subscription {
+    fn default() -> Self {
+        Self {
+            classes: SUB_ALL,
+            depth_range: 0,
+        }
+    }
+}
+
+impl Subscription {
+    /// Constructs a `Subscription`.
+    pub fn new(classes: u8, depth_range: i64) -> Self {
+        Self {
+            classes,
+            depth_range,
+        }
+    }
+
+    /// Processes the event with the local processor and returns the subscribed classes the event
+    /// falls into, which are zero if the event should not wake the strategy.
+    #[inline]
+    pub(crate) fn process<MD, P>(
+        &self,
+        processor: &mut P,
+        event: &Event,
+    ) -> Result<u8, BacktestError>
+    where
+        MD: MarketDepth,
+        P: LocalProcessor<MD> + ?Sized,
+    {
+        let kind = event.ev & 0xff;
+        let mut classes = match kind {
+            DEPTH_EVENT | DEPTH_BBO_EVENT | ADD_ORDER_EVENT | CANCEL_ORDER_EVENT
+            | MODIFY_ORDER_EVENT => SUB_DEPTH,
+            DEPTH_CLEAR_EVENT | DEPTH_SNAPSHOT_EVENT => SUB_DEPTH | SUB_NEAR_TOUCH,
+            TRADE_EVENT | FILL_EVENT => SUB_TRADE,
+            _ => SUB_OTHER,
+        };
+
+        if self.classes & SUB_NEAR_TOUCH != 0 && classes & SUB_DEPTH != 0 {
+            // The distance is measured from the best price before the change.
+            let depth = processor.depth();
+            let price_tick = (event.px / depth.tick_size()).round() as i64;
+            let near = if event.ev & BUY_EVENT == BUY_EVENT {
+                depth.best_bid_tick() == INVALID_MIN
+                    || depth.best_bid_tick() - price_tick <= self.depth_range
+            } else if event.ev & SELL_EVENT == SELL_EVENT {
+                depth.best_ask_tick() == INVALID_MAX
+                    || price_tick - depth.best_ask_tick() <= self.depth_range
+            } else {
+                true
+            };
+            if near {
+                classes |= SUB_NEAR_TOUCH;
+            }
+        }
+
+        if self.classes & SUB_BBO != 0 {
+            let bbo = |depth: &MD| {
+                (
+                    depth.best_bid_tick(),
+                    depth.best_ask_tick(),
+                    depth.best_bid_qty(),
+                    depth.best_ask_qty(),
+                )
+            };
+            let prev = bbo(processor.depth());
+            processor.process(event)?;
+            if bbo(processor.depth()) != prev {
+                classes |= SUB_BBO;
+            }
+        } else {
+            processor.process(event)?;
+        }
+        Ok(classes & self.classes)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{
+        backtest::{
+            assettype::LinearAsset,
+            models::{CommonFees, ConstantLatency, TradingValueFeeModel},
+            order::order_bus,
+            proc::Local,
+            state::State,
+        },
+        depth::HashMapMarketDepth,
+        types::{EXCH_EVENT, LOCAL_EVENT},
+    };
+
+    fn event(ev: u64, px: f64, qty: f64) -> Event {
+        Event {
+            ev: EXCH_EVENT | LOCAL_EVENT | ev,
+            exch_ts: 0,
+            local_ts: 0,
+            px,
+            qty,
+            order_id: 0,
+            ival: 0,
+            fval: 0.0,
+        }
+    }
+
+    #[test]
+    fn test_classes() {
+        let (_order_e2l, order_l2e) = order_bus(ConstantLatency::new(0, 0));
+        let mut local = Local::new(
+            HashMapMarketDepth::new(1.0, 1.0),
+            State::new(
+                LinearAsset::new(1.0),
+                TradingValueFeeModel::new(CommonFees::new(0.0, 0.0)),
+            ),
+            0,
+            order_l2e,
+        );
+
+        let sub = Subscription::new(SUB_BBO | SUB_TRADE | SUB_NEAR_TOUCH, 2);
+        assert_eq!(
+            sub.process(&mut local, &event(DEPTH_EVENT | BUY_EVENT, 100.0, 1.0))
+                .unwrap(),
+            SUB_BBO | SUB_NEAR_TOUCH
+        );
+        assert_eq!(
+            sub.process(&mut local, &event(DEPTH_EVENT | SELL_EVENT, 110.0, 1.0))
+                .unwrap(),
+            SUB_BBO | SUB_NEAR_TOUCH
+        );
+        // Within the range but not at the best.
+        assert_eq!(
+            sub.process(&mut local, &event(DEPTH_EVENT | BUY_EVENT, 98.0, 1.0))
+                .unwrap(),
+            SUB_NEAR_TOUCH
+        );
+        // Out of the range.
+        assert_eq!(
+            sub.process(&mut local, &event(DEPTH_EVENT | SELL_EVENT, 113.0, 1.0))
+                .unwrap(),
+            0
+        );
+        assert_eq!(
+            sub.process(&mut local, &event(TRADE_EVENT | BUY_EVENT, 110.0, 1.0))
+                .unwrap(),
+            SUB_TRADE
+        );
+        assert_eq!(
+            sub.process(&mut local, &event(DEPTH_EVENT | BUY_EVENT, 100.0, 2.0))
+                .unwrap(),
+            SUB_BBO | SUB_NEAR_TOUCH
+        );
+
+        let sub = Subscription::default();
+        assert_eq!(
+            sub.process(&mut local, &event(DEPTH_EVENT | SELL_EVENT, 120.0, 1.0))
+                .unwrap(),
+            SUB_DEPTH
+        );
+    }
+}
@@ -2,6 +2,7 @@ use std::collections::{BTreeMap, HashMap, hash_map::Entry};
 
 use super::{
     ApplySnapshot,
+    DepthLevel,
     INVALID_MAX,
     INVALID_MIN,
     L2MarketDepth,
@@ -12,7 +13,7 @@ use super::{
 use crate::{
     backtest::{BacktestError, data::Data},
     prelude::{OrderId, Side},
-    types::{BUY_EVENT, Event, SELL_EVENT},
+    types::{BUY_EVENT, DEPTH_SNAPSHOT_EVENT, EXCH_EVENT, Event, LOCAL_EVENT, SELL_EVENT},
 };
 
 /// L2 Market depth implementation based on a B-Tree map.
@@ -20,7 +21,7 @@ use crate::{
 /// If feed data is missing, it may result in the crossing of the best bid and ask, making it
 /// impossible to restore them to the most recent values through natural refreshing.
 /// Ensuring data integrity is imperative.
-#[derive(Debug)]
+#[derive(Clone, Debug)]
 pub struct BTreeMarketDepth {
     pub tick_size: f64,
     pub lot_size: f64,
@@ -47,6 +48,36 @@ impl BTreeMarketDepth {
         }
     }
 
+    /// Writes the best bid price levels, from the best bid downward, into `levels` and returns the
+    /// number of levels written. At most `levels.len()` levels are written; the remaining elements
+    /// are left untouched.
+    ///
+    /// Unlike [`HashMapMarketDepth::bid_levels`](crate::depth::HashMapMarketDepth::bid_levels),
+    /// this walks only the populated levels, so it takes `O(log n + levels.len())` regardless of
+    /// how sparse the book is.
+    pub fn bid_levels(&self, levels: &mut [DepthLevel]) -> usize {
+        let mut n = 0;
+        for (level, (&price_tick, &qty)) in levels.iter_mut().zip(self.bid_depth.iter().rev()) {
+            *level = DepthLevel { price_tick, qty };
+            n += 1;
+        }
+        n
+    }
+
+    /// Writes the best ask price levels, from the best ask upward, into `levels` and returns the
+    /// number of levels written. At most `levels.len()` levels are written; the remaining elements
+    /// are left untouched.
+    ///
+    /// Like [`BTreeMarketDepth::bid_levels`], this walks only the populated levels.
+    pub fn ask_levels(&self, levels: &mut [DepthLevel]) -> usize {
+        let mut n = 0;
+        for (level, (&price_tick, &qty)) in levels.iter_mut().zip(self.ask_depth.iter()) {
+            *level = DepthLevel { price_tick, qty };
+            n += 1;
+        }
+        n
+    }
+
     fn add(&mut self, order: L3Order) -> Result<(), BacktestError> {
         let order = match self.orders.entry(order.order_id) {
             Entry::Occupied(_) => return Err(BacktestError::OrderIdExist),
@@ -118,14 +149,10 @@ impl L2MarketDepth for BTreeMarketDepth {
         match side {
             Side::Buy => {
                 if clear_upto_price.is_finite() {
+                    // Drops every level at or above the given price at once, rather than visiting
+                    // each tick up to the best bid, which may be far apart in a sparse book.
                     let clear_upto = (clear_upto_price / self.tick_size).round() as i64;
-                    if self.best_bid_tick != INVALID_MIN {
-                        for t in clear_upto..(self.best_bid_tick + 1) {
-                            if self.bid_depth.contains_key(&t) {
-                                self.bid_depth.remove(&t);
-                            }
-                        }
-                    }
+                    drop(self.bid_depth.split_off(&clear_upto));
                     self.best_bid_tick = *self.bid_depth.keys().last().unwrap_or(&INVALID_MIN);
                 } else {
                     self.bid_depth.clear();
@@ -134,14 +161,9 @@ impl L2MarketDepth for BTreeMarketDepth {
             }
             Side::Sell => {
                 if clear_upto_price.is_finite() {
+                    // Keeps only the levels above the given price.
                     let clear_upto = (clear_upto_price / self.tick_size).round() as i64;
-                    if self.best_ask_tick != INVALID_MAX {
-                        for t in self.best_ask_tick..(clear_upto + 1) {
-                            if self.ask_depth.contains_key(&t) {
-                                self.ask_depth.remove(&t);
-                            }
-                        }
-                    }
+                    self.ask_depth = self.ask_depth.split_off(&(clear_upto + 1));
                     self.best_ask_tick = *self.ask_depth.keys().next().unwrap_or(&INVALID_MAX);
                 } else {
                     self.ask_depth.clear();
@@ -241,7 +263,37 @@ impl ApplySnapshot for BTreeMarketDepth {
     }
 
     fn snapshot(&self) -> Vec<Event> {
-        todo!()
+        let mut events = Vec::with_capacity(self.bid_depth.len() + self.ask_depth.len());
+
+        for (&px_tick, &qty) in self.bid_depth.iter().rev() {
+            events.push(Event {
+                ev: EXCH_EVENT | LOCAL_EVENT | BUY_EVENT | DEPTH_SNAPSHOT_EVENT,
+                // todo: it's not a problem now, but it would be better to have valid timestamps.
+                exch_ts: 0,
+                local_ts: 0,
+                px: px_tick as f64 * self.tick_size,
+                qty,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            });
+        }
+
+        for (&px_tick, &qty) in self.ask_depth.iter() {
+            events.push(Event {
+                ev: EXCH_EVENT | LOCAL_EVENT | SELL_EVENT | DEPTH_SNAPSHOT_EVENT,
+                // todo: it's not a problem now, but it would be better to have valid timestamps.
+                exch_ts: 0,
+                local_ts: 0,
+                px: px_tick as f64 * self.tick_size,
+                qty,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            });
+        }
+
+        events
     }
 }
 
@@ -309,7 +361,7 @@ impl L3MarketDepth for BTreeMarketDepth {
             if (*depth_qty / self.lot_size).round() as i64 == 0 {
                 self.bid_depth.remove(&order.price_tick).unwrap();
                 if order.price_tick == self.best_bid_tick {
-                    self.best_bid_tick = *self.bid_depth.keys().next().unwrap_or(&INVALID_MIN);
+                    self.best_bid_tick = *self.bid_depth.keys().last().unwrap_or(&INVALID_MIN);
                 }
             }
             Ok((Side::Buy, prev_best_tick, self.best_bid_tick))
@@ -444,8 +496,18 @@ impl L3MarketDepth for BTreeMarketDepth {
 #[cfg(test)]
 mod tests {
     use crate::{
-        depth::{BTreeMarketDepth, INVALID_MAX, INVALID_MIN, L3MarketDepth, MarketDepth},
-        types::Side,
+        backtest::data::Data,
+        depth::{
+            ApplySnapshot,
+            BTreeMarketDepth,
+            DepthLevel,
+            INVALID_MAX,
+            INVALID_MIN,
+            L2MarketDepth,
+            L3MarketDepth,
+            MarketDepth,
+        },
+        types::{BUY_EVENT, Side},
     };
 
     macro_rules! assert_eq_qty {
@@ -668,4 +730,88 @@ mod tests {
         assert_eq_qty!(depth.ask_qty_at_tick(4981), 0.0, lot_size);
         assert_eq_qty!(depth.ask_qty_at_tick(5002), 0.002, lot_size);
     }
+
+    #[test]
+    fn test_top_levels() {
+        let mut depth = BTreeMarketDepth::new(0.1, 0.001);
+        depth.update_bid_depth(500.0, 1.0, 0);
+        depth.update_bid_depth(499.5, 2.0, 0);
+        depth.update_bid_depth(499.8, 3.0, 0);
+        depth.update_ask_depth(500.3, 4.0, 0);
+        depth.update_ask_depth(501.0, 5.0, 0);
+
+        let mut levels = [DepthLevel::default(); 2];
+        assert_eq!(depth.bid_levels(&mut levels), 2);
+        assert_eq!(
+            levels,
+            [
+                DepthLevel {
+                    price_tick: 5000,
+                    qty: 1.0
+                },
+                DepthLevel {
+                    price_tick: 4998,
+                    qty: 3.0
+                }
+            ]
+        );
+
+        let mut levels = [DepthLevel::default(); 5];
+        assert_eq!(depth.ask_levels(&mut levels), 2);
+        assert_eq!(levels[0].price_tick, 5003);
+        assert_eq!(levels[1].price_tick, 5010);
+        assert_eq!(levels[2], DepthLevel::default());
+
+        depth.update_bid_depth(500.0, 0.0, 0);
+        assert_eq!(depth.bid_levels(&mut levels), 2);
+        assert_eq!(levels[0].price_tick, 4998);
+        assert_eq!(levels[1].price_tick, 4995);
+    }
+
+    #[test]
+    fn test_clear_depth() {
+        let mut depth = BTreeMarketDepth::new(0.1, 0.001);
+        depth.update_bid_depth(500.0, 1.0, 0);
+        depth.update_bid_depth(499.5, 2.0, 0);
+        depth.update_bid_depth(10.0, 3.0, 0);
+        depth.update_ask_depth(500.3, 4.0, 0);
+        depth.update_ask_depth(501.0, 5.0, 0);
+        depth.update_ask_depth(90000.0, 6.0, 0);
+
+        depth.clear_depth(Side::Buy, 499.5);
+        assert_eq!(depth.best_bid_tick(), 100);
+        assert_eq!(depth.bid_depth.len(), 1);
+
+        depth.clear_depth(Side::Sell, 501.0);
+        assert_eq!(depth.best_ask_tick(), 900000);
+        assert_eq!(depth.ask_depth.len(), 1);
+
+        depth.clear_depth(Side::None, f64::NAN);
+        assert_eq!(depth.best_bid_tick(), INVALID_MIN);
+        assert_eq!(depth.best_ask_tick(), INVALID_MAX);
+    }
+
+    #[test]
+    fn test_snapshot() {
+        let mut depth = BTreeMarketDepth::new(0.1, 0.001);
+        depth.update_bid_depth(500.0, 1.0, 0);
+        depth.update_bid_depth(499.5, 2.0, 0);
+        depth.update_ask_depth(500.3, 4.0, 0);
+        depth.update_ask_depth(501.0, 5.0, 0);
+
+        let snapshot = depth.snapshot();
+        assert_eq!(snapshot.len(), 4);
+        assert!(snapshot[0].is(BUY_EVENT));
+        assert_eq!((snapshot[0].px / 0.1).round() as i64, 5000);
+        assert_eq!((snapshot[1].px / 0.1).round() as i64, 4995);
+        assert_eq!((snapshot[2].px / 0.1).round() as i64, 5003);
+        assert_eq!((snapshot[3].px / 0.1).round() as i64, 5010);
+
+        let mut restored = BTreeMarketDepth::new(0.1, 0.001);
+        restored.apply_snapshot(&Data::from_data(&snapshot));
+        assert_eq!(restored.bid_depth, depth.bid_depth);
+        assert_eq!(restored.ask_depth, depth.ask_depth);
+        assert_eq!(restored.best_bid_tick(), 5000);
+        assert_eq!(restored.best_ask_tick(), 5003);
+    }
 }
@@ -1,6 +1,17 @@
-use std::collections::{HashMap, hash_map::Entry};
+use std::{
+    collections::{BTreeSet, HashMap, hash_map::Entry},
+    ops::Bound::{Excluded, Included},
+};
 
-use super::{ApplySnapshot, INVALID_MAX, INVALID_MIN, L3MarketDepth, L3Order, MarketDepth};
+use super::{
+    ApplySnapshot,
+    DepthLevel,
+    INVALID_MAX,
+    INVALID_MIN,
+    L3MarketDepth,
+    L3Order,
+    MarketDepth,
+};
 use crate::{
     backtest::{BacktestError, data::Data},
     prelude::{L2MarketDepth, OrderId, Side},
@@ -18,6 +29,12 @@ use crate::{
 /// In contrast, a HashMap-based Market Depth tracks the latest best bid and ask prices, updating
 /// them accordingly. This allows for natural refresh of market depth, even in cases where there are
 /// missing feeds.
+///
+/// Alongside the hash maps, the populated price ticks of each side are kept in an ordered index, so
+/// finding the next best price after the best level is removed, clearing a price range, and walking
+/// the top levels cost in proportion to the populated levels rather than to the ticks in between,
+/// which matters for sparse books whose tick size is tiny relative to the price.
+#[derive(Clone)]
 pub struct HashMapMarketDepth {
     pub tick_size: f64,
     pub lot_size: f64,
@@ -29,26 +46,51 @@ pub struct HashMapMarketDepth {
     pub low_bid_tick: i64,
     pub high_ask_tick: i64,
     pub orders: HashMap<OrderId, L3Order>,
+    bid_ticks: BTreeSet<i64>,
+    ask_ticks: BTreeSet<i64>,
 }
 
+/// Returns the highest populated price tick in `[end, start)`, or [`INVALID_MIN`] if there is none.
 #[inline(always)]
-fn depth_below(depth: &HashMap<i64, f64>, start: i64, end: i64) -> i64 {
-    for t in (end..start).rev() {
-        if *depth.get(&t).unwrap_or(&0f64) > 0f64 {
-            return t;
-        }
+fn depth_below(depth: &HashMap<i64, f64>, ticks: &BTreeSet<i64>, start: i64, end: i64) -> i64 {
+    if end >= start {
+        return INVALID_MIN;
     }
-    INVALID_MIN
+    ticks
+        .range(end..start)
+        .rev()
+        .find(|t| *depth.get(t).unwrap_or(&0f64) > 0f64)
+        .copied()
+        .unwrap_or(INVALID_MIN)
 }
 
+/// Returns the lowest populated price tick in `(start, end]`, or [`INVALID_MAX`] if there is none.
 #[inline(always)]
-fn depth_above(depth: &HashMap<i64, f64>, start: i64, end: i64) -> i64 {
-    for t in (start + 1)..(end + 1) {
-        if *depth.get(&t).unwrap_or(&0f64) > 0f64 {
-            return t;
-        }
+fn depth_above(depth: &HashMap<i64, f64>, ticks: &BTreeSet<i64>, start: i64, end: i64) -> i64 {
+    if start >= end {
+        return INVALID_MAX;
+    }
+    ticks
+        .range((Excluded(start), Included(end)))
+        .find(|t| *depth.get(t).unwrap_or(&0f64) > 0f64)
+        .copied()
+        .unwrap_or(INVALID_MAX)
+}
+
+/// Removes the price ticks in `[from, to]` from both the depth and the index.
+#[inline(always)]
+fn remove_range(depth: &mut HashMap<i64, f64>, ticks: &mut BTreeSet<i64>, from: i64, to: i64) {
+    if from > to {
+        return;
+    }
+    let mut removed = ticks.split_off(&from);
+    if to < INVALID_MAX {
+        let mut above = removed.split_off(&(to + 1));
+        ticks.append(&mut above);
+    }
+    for t in removed {
+        depth.remove(&t);
     }
-    INVALID_MAX
 }
 
 impl HashMapMarketDepth {
@@ -65,7 +107,64 @@ impl HashMapMarketDepth {
             low_bid_tick: INVALID_MAX,
             high_ask_tick: INVALID_MIN,
             orders: HashMap::new(),
+            bid_ticks: BTreeSet::new(),
+            ask_ticks: BTreeSet::new(),
+        }
+    }
+
+    /// Writes the best bid price levels, from the best bid downward, into `levels` and returns the
+    /// number of levels written. At most `levels.len()` levels are written; the remaining elements
+    /// are left untouched.
+    pub fn bid_levels(&self, levels: &mut [DepthLevel]) -> usize {
+        if self.best_bid_tick == INVALID_MIN {
+            return 0;
+        }
+        if self.low_bid_tick > self.best_bid_tick {
+            return 0;
+        }
+        let mut n = 0;
+        for &t in self
+            .bid_ticks
+            .range(self.low_bid_tick..=self.best_bid_tick)
+            .rev()
+        {
+            if n == levels.len() {
+                break;
+            }
+            let qty = *self.bid_depth.get(&t).unwrap_or(&0f64);
+            if qty > 0f64 {
+                levels[n] = DepthLevel { price_tick: t, qty };
+                n += 1;
+            }
+        }
+        n
+    }
+
+    /// Writes the best ask price levels, from the best ask upward, into `levels` and returns the
+    /// number of levels written. At most `levels.len()` levels are written; the remaining elements
+    /// are left untouched.
+    pub fn ask_levels(&self, levels: &mut [DepthLevel]) -> usize {
+        if self.best_ask_tick == INVALID_MAX {
+            return 0;
         }
+        if self.best_ask_tick > self.high_ask_tick {
+            return 0;
+        }
+        let mut n = 0;
+        for &t in self
+            .ask_ticks
+            .range(self.best_ask_tick..=self.high_ask_tick)
+        {
+            if n == levels.len() {
+                break;
+            }
+            let qty = *self.ask_depth.get(&t).unwrap_or(&0f64);
+            if qty > 0f64 {
+                levels[n] = DepthLevel { price_tick: t, qty };
+                n += 1;
+            }
+        }
+        n
     }
 
     fn add(&mut self, order: L3Order) -> Result<(), BacktestError> {
@@ -75,8 +174,10 @@ impl HashMapMarketDepth {
         };
         if order.side == Side::Buy {
             *self.bid_depth.entry(order.price_tick).or_insert(0.0) += order.qty;
+            self.bid_ticks.insert(order.price_tick);
         } else {
             *self.ask_depth.entry(order.price_tick).or_insert(0.0) += order.qty;
+            self.ask_ticks.insert(order.price_tick);
         }
         Ok(())
     }
@@ -100,20 +201,26 @@ impl L2MarketDepth for HashMapMarketDepth {
                     *entry.get_mut() = qty;
                 } else {
                     entry.remove();
+                    self.bid_ticks.remove(&price_tick);
                 }
             }
             Entry::Vacant(entry) => {
                 prev_qty = 0f64;
                 if qty_lot > 0 {
                     entry.insert(qty);
+                    self.bid_ticks.insert(price_tick);
                 }
             }
         }
 
         if qty_lot == 0 {
             if price_tick == self.best_bid_tick {
-                self.best_bid_tick =
-                    depth_below(&self.bid_depth, self.best_bid_tick, self.low_bid_tick);
+                self.best_bid_tick = depth_below(
+                    &self.bid_depth,
+                    &self.bid_ticks,
+                    self.best_bid_tick,
+                    self.low_bid_tick,
+                );
                 if self.best_bid_tick == INVALID_MIN {
                     self.low_bid_tick = INVALID_MAX
                 }
@@ -122,8 +229,12 @@ impl L2MarketDepth for HashMapMarketDepth {
             if price_tick > self.best_bid_tick {
                 self.best_bid_tick = price_tick;
                 if self.best_bid_tick >= self.best_ask_tick {
-                    self.best_ask_tick =
-                        depth_above(&self.ask_depth, self.best_bid_tick, self.high_ask_tick);
+                    self.best_ask_tick = depth_above(
+                        &self.ask_depth,
+                        &self.ask_ticks,
+                        self.best_bid_tick,
+                        self.high_ask_tick,
+                    );
                 }
             }
             self.low_bid_tick = self.low_bid_tick.min(price_tick);
@@ -155,20 +266,26 @@ impl L2MarketDepth for HashMapMarketDepth {
                     *entry.get_mut() = qty;
                 } else {
                     entry.remove();
+                    self.ask_ticks.remove(&price_tick);
                 }
             }
             Entry::Vacant(entry) => {
                 prev_qty = 0f64;
                 if qty_lot > 0 {
                     entry.insert(qty);
+                    self.ask_ticks.insert(price_tick);
                 }
             }
         }
 
         if qty_lot == 0 {
             if price_tick == self.best_ask_tick {
-                self.best_ask_tick =
-                    depth_above(&self.ask_depth, self.best_ask_tick, self.high_ask_tick);
+                self.best_ask_tick = depth_above(
+                    &self.ask_depth,
+                    &self.ask_ticks,
+                    self.best_ask_tick,
+                    self.high_ask_tick,
+                );
                 if self.best_ask_tick == INVALID_MAX {
                     self.high_ask_tick = INVALID_MIN
                 }
@@ -177,8 +294,12 @@ impl L2MarketDepth for HashMapMarketDepth {
             if price_tick < self.best_ask_tick {
                 self.best_ask_tick = price_tick;
                 if self.best_bid_tick >= self.best_ask_tick {
-                    self.best_bid_tick =
-                        depth_below(&self.bid_depth, self.best_ask_tick, self.low_bid_tick);
+                    self.best_bid_tick = depth_below(
+                        &self.bid_depth,
+                        &self.bid_ticks,
+                        self.best_ask_tick,
+                        self.low_bid_tick,
+                    );
                 }
             }
             self.high_ask_tick = self.high_ask_tick.max(price_tick);
@@ -199,16 +320,22 @@ impl L2MarketDepth for HashMapMarketDepth {
                 if clear_upto_price.is_finite() {
                     let clear_upto = (clear_upto_price / self.tick_size).round() as i64;
                     if self.best_bid_tick != INVALID_MIN {
-                        for t in clear_upto..(self.best_bid_tick + 1) {
-                            if self.bid_depth.contains_key(&t) {
-                                self.bid_depth.remove(&t);
-                            }
-                        }
+                        remove_range(
+                            &mut self.bid_depth,
+                            &mut self.bid_ticks,
+                            clear_upto,
+                            self.best_bid_tick,
+                        );
                     }
-                    self.best_bid_tick =
-                        depth_below(&self.bid_depth, clear_upto - 1, self.low_bid_tick);
+                    self.best_bid_tick = depth_below(
+                        &self.bid_depth,
+                        &self.bid_ticks,
+                        clear_upto - 1,
+                        self.low_bid_tick,
+                    );
                 } else {
                     self.bid_depth.clear();
+                    self.bid_ticks.clear();
                     self.best_bid_tick = INVALID_MIN;
                 }
                 if self.best_bid_tick == INVALID_MIN {
@@ -219,16 +346,22 @@ impl L2MarketDepth for HashMapMarketDepth {
                 if clear_upto_price.is_finite() {
                     let clear_upto = (clear_upto_price / self.tick_size).round() as i64;
                     if self.best_ask_tick != INVALID_MAX {
-                        for t in self.best_ask_tick..(clear_upto + 1) {
-                            if self.ask_depth.contains_key(&t) {
-                                self.ask_depth.remove(&t);
-                            }
-                        }
+                        remove_range(
+                            &mut self.ask_depth,
+                            &mut self.ask_ticks,
+                            self.best_ask_tick,
+                            clear_upto,
+                        );
                     }
-                    self.best_ask_tick =
-                        depth_above(&self.ask_depth, clear_upto + 1, self.high_ask_tick);
+                    self.best_ask_tick = depth_above(
+                        &self.ask_depth,
+                        &self.ask_ticks,
+                        clear_upto + 1,
+                        self.high_ask_tick,
+                    );
                 } else {
                     self.ask_depth.clear();
+                    self.ask_ticks.clear();
                     self.best_ask_tick = INVALID_MAX;
                 }
                 if self.best_ask_tick == INVALID_MAX {
@@ -237,7 +370,9 @@ impl L2MarketDepth for HashMapMarketDepth {
             }
             Side::None => {
                 self.bid_depth.clear();
+                self.bid_ticks.clear();
                 self.ask_depth.clear();
+                self.ask_ticks.clear();
                 self.best_bid_tick = INVALID_MIN;
                 self.best_ask_tick = INVALID_MAX;
                 self.low_bid_tick = INVALID_MAX;
@@ -317,7 +452,9 @@ impl ApplySnapshot for HashMapMarketDepth {
         self.low_bid_tick = INVALID_MAX;
         self.high_ask_tick = INVALID_MIN;
         self.bid_depth.clear();
+        self.bid_ticks.clear();
         self.ask_depth.clear();
+        self.ask_ticks.clear();
         for row_num in 0..data.len() {
             let price = data[row_num].px;
             let qty = data[row_num].qty;
@@ -327,24 +464,21 @@ impl ApplySnapshot for HashMapMarketDepth {
                 self.best_bid_tick = self.best_bid_tick.max(price_tick);
                 self.low_bid_tick = self.low_bid_tick.min(price_tick);
                 *self.bid_depth.entry(price_tick).or_insert(0f64) = qty;
+                self.bid_ticks.insert(price_tick);
             } else if data[row_num].ev & SELL_EVENT == SELL_EVENT {
                 self.best_ask_tick = self.best_ask_tick.min(price_tick);
                 self.high_ask_tick = self.high_ask_tick.max(price_tick);
                 *self.ask_depth.entry(price_tick).or_insert(0f64) = qty;
+                self.ask_ticks.insert(price_tick);
             }
         }
     }
 
     fn snapshot(&self) -> Vec<Event> {
-        let mut events = Vec::new();
-
-        let mut bid_depth = self
-            .bid_depth
-            .iter()
-            .map(|(&px_tick, &qty)| (px_tick, qty))
-            .collect::<Vec<_>>();
-        bid_depth.sort_by(|a, b| b.0.cmp(&a.0));
-        for (px_tick, qty) in bid_depth {
+        let mut events = Vec::with_capacity(self.bid_ticks.len() + self.ask_ticks.len());
+
+        for &px_tick in self.bid_ticks.iter().rev() {
+            let qty = self.bid_depth[&px_tick];
             events.push(Event {
                 ev: EXCH_EVENT | LOCAL_EVENT | BUY_EVENT | DEPTH_SNAPSHOT_EVENT,
                 // todo: it's not a problem now, but it would be better to have valid timestamps.
@@ -358,13 +492,8 @@ impl ApplySnapshot for HashMapMarketDepth {
             });
         }
 
-        let mut ask_depth = self
-            .ask_depth
-            .iter()
-            .map(|(&px_tick, &qty)| (px_tick, qty))
-            .collect::<Vec<_>>();
-        ask_depth.sort_by(|a, b| a.0.cmp(&b.0));
-        for (px_tick, qty) in ask_depth {
+        for &px_tick in self.ask_ticks.iter() {
+            let qty = self.ask_depth[&px_tick];
             events.push(Event {
                 ev: EXCH_EVENT | LOCAL_EVENT | SELL_EVENT | DEPTH_SNAPSHOT_EVENT,
                 // todo: it's not a problem now, but it would be better to have valid timestamps.
@@ -404,8 +533,12 @@ impl L3MarketDepth for HashMapMarketDepth {
         if price_tick > self.best_bid_tick {
             self.best_bid_tick = price_tick;
             if self.best_bid_tick >= self.best_ask_tick {
-                self.best_ask_tick =
-                    depth_above(&self.ask_depth, self.best_bid_tick, self.high_ask_tick);
+                self.best_ask_tick = depth_above(
+                    &self.ask_depth,
+                    &self.ask_ticks,
+                    self.best_bid_tick,
+                    self.high_ask_tick,
+                );
             }
         }
         self.low_bid_tick = self.low_bid_tick.min(price_tick);
@@ -431,8 +564,12 @@ impl L3MarketDepth for HashMapMarketDepth {
         if price_tick < self.best_ask_tick {
             self.best_ask_tick = price_tick;
             if self.best_bid_tick >= self.best_ask_tick {
-                self.best_bid_tick =
-                    depth_below(&self.bid_depth, self.best_ask_tick, self.low_bid_tick);
+                self.best_bid_tick = depth_below(
+                    &self.bid_depth,
+                    &self.bid_ticks,
+                    self.best_ask_tick,
+                    self.low_bid_tick,
+                );
             }
         }
         self.high_ask_tick = self.high_ask_tick.max(price_tick);
@@ -455,9 +592,14 @@ impl L3MarketDepth for HashMapMarketDepth {
             *depth_qty -= order.qty;
             if (*depth_qty / self.lot_size).round() as i64 == 0 {
                 self.bid_depth.remove(&order.price_tick).unwrap();
+                self.bid_ticks.remove(&order.price_tick);
                 if order.price_tick == self.best_bid_tick {
-                    self.best_bid_tick =
-                        depth_below(&self.bid_depth, self.best_bid_tick, self.low_bid_tick);
+                    self.best_bid_tick = depth_below(
+                        &self.bid_depth,
+                        &self.bid_ticks,
+                        self.best_bid_tick,
+                        self.low_bid_tick,
+                    );
                     if self.best_bid_tick == INVALID_MIN {
                         self.low_bid_tick = INVALID_MAX
                     }
@@ -471,9 +613,14 @@ impl L3MarketDepth for HashMapMarketDepth {
             *depth_qty -= order.qty;
             if (*depth_qty / self.lot_size).round() as i64 == 0 {
                 self.ask_depth.remove(&order.price_tick).unwrap();
+                self.ask_ticks.remove(&order.price_tick);
                 if order.price_tick == self.best_ask_tick {
-                    self.best_ask_tick =
-                        depth_above(&self.ask_depth, self.best_ask_tick, self.high_ask_tick);
+                    self.best_ask_tick = depth_above(
+                        &self.ask_depth,
+                        &self.ask_ticks,
+                        self.best_ask_tick,
+                        self.high_ask_tick,
+                    );
                     if self.best_ask_tick == INVALID_MAX {
                         self.high_ask_tick = INVALID_MIN
                     }
@@ -502,9 +649,14 @@ impl L3MarketDepth for HashMapMarketDepth {
                 *depth_qty -= order.qty;
                 if (*depth_qty / self.lot_size).round() as i64 == 0 {
                     self.bid_depth.remove(&order.price_tick).unwrap();
+                    self.bid_ticks.remove(&order.price_tick);
                     if order.price_tick == self.best_bid_tick {
-                        self.best_bid_tick =
-                            depth_below(&self.bid_depth, self.best_bid_tick, self.low_bid_tick);
+                        self.best_bid_tick = depth_below(
+                            &self.bid_depth,
+                            &self.bid_ticks,
+                            self.best_bid_tick,
+                            self.low_bid_tick,
+                        );
                         if self.best_bid_tick == INVALID_MIN {
                             self.low_bid_tick = INVALID_MAX
                         }
@@ -516,12 +668,17 @@ impl L3MarketDepth for HashMapMarketDepth {
                 order.timestamp = timestamp;
 
                 *self.bid_depth.entry(order.price_tick).or_insert(0.0) += order.qty;
+                self.bid_ticks.insert(order.price_tick);
 
                 if price_tick > self.best_bid_tick {
                     self.best_bid_tick = price_tick;
                     if self.best_bid_tick >= self.best_ask_tick {
-                        self.best_ask_tick =
-                            depth_above(&self.ask_depth, self.best_bid_tick, self.high_ask_tick);
+                        self.best_ask_tick = depth_above(
+                            &self.ask_depth,
+                            &self.ask_ticks,
+                            self.best_bid_tick,
+                            self.high_ask_tick,
+                        );
                     }
                 }
                 self.low_bid_tick = self.low_bid_tick.min(price_tick);
@@ -540,9 +697,14 @@ impl L3MarketDepth for HashMapMarketDepth {
                 *depth_qty -= order.qty;
                 if (*depth_qty / self.lot_size).round() as i64 == 0 {
                     self.ask_depth.remove(&order.price_tick).unwrap();
+                    self.ask_ticks.remove(&order.price_tick);
                     if order.price_tick == self.best_ask_tick {
-                        self.best_ask_tick =
-                            depth_above(&self.ask_depth, self.best_ask_tick, self.high_ask_tick);
+                        self.best_ask_tick = depth_above(
+                            &self.ask_depth,
+                            &self.ask_ticks,
+                            self.best_ask_tick,
+                            self.high_ask_tick,
+                        );
                         if self.best_ask_tick == INVALID_MAX {
                             self.high_ask_tick = INVALID_MIN
                         }
@@ -554,12 +716,17 @@ impl L3MarketDepth for HashMapMarketDepth {
                 order.timestamp = timestamp;
 
                 *self.ask_depth.entry(order.price_tick).or_insert(0.0) += order.qty;
+                self.ask_ticks.insert(order.price_tick);
 
                 if price_tick < self.best_ask_tick {
                     self.best_ask_tick = price_tick;
                     if self.best_bid_tick >= self.best_ask_tick {
-                        self.best_bid_tick =
-                            depth_below(&self.bid_depth, self.best_ask_tick, self.low_bid_tick);
+                        self.best_bid_tick = depth_below(
+                            &self.bid_depth,
+                            &self.bid_ticks,
+                            self.best_ask_tick,
+                            self.low_bid_tick,
+                        );
                     }
                 }
                 self.high_ask_tick = self.high_ask_tick.max(price_tick);
@@ -617,7 +784,15 @@ impl L3MarketDepth for HashMapMarketDepth {
 #[cfg(test)]
 mod tests {
     use crate::{
-        depth::{HashMapMarketDepth, INVALID_MAX, INVALID_MIN, L3MarketDepth, MarketDepth},
+        depth::{
+            DepthLevel,
+            HashMapMarketDepth,
+            INVALID_MAX,
+            INVALID_MIN,
+            L2MarketDepth,
+            L3MarketDepth,
+            MarketDepth,
+        },
         types::Side,
     };
 
@@ -841,4 +1016,100 @@ mod tests {
         assert_eq_qty!(depth.ask_qty_at_tick(4981), 0.0, lot_size);
         assert_eq_qty!(depth.ask_qty_at_tick(5002), 0.002, lot_size);
     }
+
+    #[test]
+    fn test_top_levels() {
+        let mut depth = HashMapMarketDepth::new(0.1, 0.001);
+        depth.update_bid_depth(500.0, 1.0, 0);
+        depth.update_bid_depth(499.5, 2.0, 0);
+        depth.update_bid_depth(499.8, 3.0, 0);
+        depth.update_ask_depth(500.3, 4.0, 0);
+        depth.update_ask_depth(501.0, 5.0, 0);
+
+        let mut levels = [DepthLevel::default(); 2];
+        assert_eq!(depth.bid_levels(&mut levels), 2);
+        assert_eq!(
+            levels,
+            [
+                DepthLevel {
+                    price_tick: 5000,
+                    qty: 1.0
+                },
+                DepthLevel {
+                    price_tick: 4998,
+                    qty: 3.0
+                }
+            ]
+        );
+
+        let mut levels = [DepthLevel::default(); 5];
+        assert_eq!(depth.ask_levels(&mut levels), 2);
+        assert_eq!(levels[0].price_tick, 5003);
+        assert_eq!(levels[1].price_tick, 5010);
+        assert_eq!(levels[2], DepthLevel::default());
+
+        depth.update_bid_depth(500.0, 0.0, 0);
+        assert_eq!(depth.bid_levels(&mut levels), 2);
+        assert_eq!(levels[0].price_tick, 4998);
+        assert_eq!(levels[1].price_tick, 4995);
+    }
+
+    #[test]
+    fn test_sparse_best_price_recovery() {
+        // A tick size far smaller than the price gaps between the populated levels.
+        let lot_size = 0.001;
+        let mut depth = HashMapMarketDepth::new(0.00001, lot_size);
+        depth.update_bid_depth(10.0, 1.0, 0);
+        depth.update_bid_depth(90.0, 2.0, 0);
+        depth.update_bid_depth(100.0, 3.0, 0);
+        depth.update_ask_depth(110.0, 4.0, 0);
+        depth.update_ask_depth(1000.0, 5.0, 0);
+
+        depth.update_bid_depth(100.0, 0.0, 0);
+        assert_eq!(depth.best_bid_tick(), 9_000_000);
+        assert_eq_qty!(depth.best_bid_qty(), 2.0, lot_size);
+
+        depth.update_ask_depth(110.0, 0.0, 0);
+        assert_eq!(depth.best_ask_tick(), 100_000_000);
+
+        // A bid crossing the asks removes them and recovers the best ask above it.
+        depth.update_bid_depth(2000.0, 6.0, 0);
+        assert_eq!(depth.best_bid_tick(), 200_000_000);
+        assert_eq!(depth.best_ask_tick(), INVALID_MAX);
+
+        depth.update_bid_depth(2000.0, 0.0, 0);
+        depth.update_bid_depth(90.0, 0.0, 0);
+        depth.update_bid_depth(10.0, 0.0, 0);
+        assert_eq!(depth.best_bid_tick(), INVALID_MIN);
+    }
+
+    #[test]
+    fn test_sparse_clear_depth() {
+        let mut depth = HashMapMarketDepth::new(0.00001, 0.001);
+        depth.update_bid_depth(10.0, 1.0, 0);
+        depth.update_bid_depth(90.0, 2.0, 0);
+        depth.update_bid_depth(100.0, 3.0, 0);
+        depth.update_ask_depth(110.0, 4.0, 0);
+        depth.update_ask_depth(1000.0, 5.0, 0);
+        depth.update_ask_depth(5000.0, 6.0, 0);
+
+        depth.clear_depth(Side::Buy, 90.0);
+        assert_eq!(depth.best_bid_tick(), 1_000_000);
+        assert_eq!(depth.bid_qty_at_tick(9_000_000), 0.0);
+        assert_eq!(depth.bid_qty_at_tick(10_000_000), 0.0);
+
+        depth.clear_depth(Side::Sell, 1000.0);
+        assert_eq!(depth.best_ask_tick(), 500_000_000);
+        assert_eq!(depth.ask_qty_at_tick(100_000_000), 0.0);
+
+        let mut levels = [DepthLevel::default(); 4];
+        assert_eq!(depth.bid_levels(&mut levels), 1);
+        assert_eq!(depth.ask_levels(&mut levels), 1);
+        assert_eq!(levels[0].price_tick, 500_000_000);
+
+        depth.clear_depth(Side::None, 0.0);
+        assert_eq!(depth.best_bid_tick(), INVALID_MIN);
+        assert_eq!(depth.best_ask_tick(), INVALID_MAX);
+        assert_eq!(depth.bid_levels(&mut levels), 0);
+    }
 }
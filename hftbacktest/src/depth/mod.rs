@@ -23,6 +23,14 @@ pub const INVALID_MIN: i64 = i64::MIN;
 /// Represents no best ask in ticks.
 pub const INVALID_MAX: i64 = i64::MAX;
 
+/// A single price level of the market depth, used to export multiple levels at once.
+#[repr(C)]
+#[derive(Clone, Copy, Debug, Default, PartialEq)]
+pub struct DepthLevel {
+    pub price_tick: i64,
+    pub qty: f64,
+}
+
 /// Provides MarketDepth interface.
 pub trait MarketDepth {
     /// Returns the best bid price.
@@ -104,7 +112,7 @@ pub trait ApplySnapshot {
 }
 
 /// Level3 order from the market feed.
-#[derive(Debug)]
+#[derive(Clone, Debug)]
 pub struct L3Order {
     pub order_id: OrderId,
     pub side: Side,
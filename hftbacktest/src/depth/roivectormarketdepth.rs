@@ -1,4 +1,8 @@
-use std::collections::{HashMap, hash_map::Entry};
+use std::{
+    collections::{BTreeMap, HashMap, hash_map::Entry},
+    mem,
+    ops::Bound::{Excluded, Included},
+};
 
 use super::{ApplySnapshot, INVALID_MAX, INVALID_MIN, L3MarketDepth, L3Order, MarketDepth};
 use crate::{
@@ -12,6 +16,14 @@ use crate::{
 /// This is a variant of the HashMap-based market depth implementation, which only handles the
 /// specific range of interest. By doing so, it improves performance, especially when the strategy
 /// requires computing values based on the order book around the mid-price.
+///
+/// In the adaptive mode, constructed by [`adaptive`](Self::adaptive()), the range of interest is
+/// not fixed but follows the mid-price, so that a small vector suffices however far the price
+/// drifts. The vectors then act as ring buffers, and once the mid-price comes within a quarter of
+/// the width of either bound, the range is re-centered on the mid-price by moving only the levels
+/// that leave or enter it. The levels outside the range are kept in ordered overflow maps instead
+/// of being discarded.
+#[derive(Clone)]
 pub struct ROIVectorMarketDepth {
     pub tick_size: f64,
     pub lot_size: f64,
@@ -25,30 +37,56 @@ pub struct ROIVectorMarketDepth {
     pub roi_ub: i64,
     pub roi_lb: i64,
     pub orders: HashMap<OrderId, L3Order>,
+    roi_offset: usize,
+    adaptive: bool,
+    bid_overflow: BTreeMap<i64, f64>,
+    ask_overflow: BTreeMap<i64, f64>,
 }
 
 #[inline(always)]
-fn depth_below(depth: &[f64], start: i64, end: i64, roi_lb: i64, roi_ub: i64) -> i64 {
-    let start = (start.min(roi_ub) - roi_lb) as usize;
-    let end = (end.max(roi_lb) - roi_lb) as usize;
-    for t in (end..start).rev() {
-        if unsafe { *depth.get_unchecked(t) } > 0f64 {
-            return t as i64 + roi_lb;
-        }
-    }
-    INVALID_MIN
+fn scan_below(depth: &[f64], from: usize, to: usize) -> Option<usize> {
+    (from..to)
+        .rev()
+        .find(|&t| unsafe { *depth.get_unchecked(t) } > 0f64)
 }
 
 #[inline(always)]
-fn depth_above(depth: &[f64], start: i64, end: i64, roi_lb: i64, roi_ub: i64) -> i64 {
-    let start = (start.max(roi_lb) - roi_lb) as usize;
-    let end = (end.min(roi_ub) - roi_lb) as usize;
-    for t in (start + 1)..(end + 1) {
-        if unsafe { *depth.get_unchecked(t) } > 0f64 {
-            return t as i64 + roi_lb;
-        }
-    }
-    INVALID_MAX
+fn scan_above(depth: &[f64], from: usize, to: usize) -> Option<usize> {
+    (from..to).find(|&t| unsafe { *depth.get_unchecked(t) } > 0f64)
+}
+
+/// Returns the highest index in `from..to` that has quantity. The indices are relative to the ROI
+/// lower bound, which is stored at `offset`, and wrap around the end of the vector.
+#[inline(always)]
+fn depth_below(depth: &[f64], offset: usize, from: usize, to: usize) -> Option<usize> {
+    let len = depth.len();
+    let (from, to) = (from + offset, to + offset);
+    let found = if to <= len {
+        scan_below(depth, from, to)
+    } else if from >= len {
+        scan_below(depth, from - len, to - len).map(|t| t + len)
+    } else {
+        scan_below(depth, 0, to - len)
+            .map(|t| t + len)
+            .or_else(|| scan_below(depth, from, len))
+    };
+    found.map(|t| t - offset)
+}
+
+/// Returns the lowest index in `from..to` that has quantity. The indices are relative to the ROI
+/// lower bound, which is stored at `offset`, and wrap around the end of the vector.
+#[inline(always)]
+fn depth_above(depth: &[f64], offset: usize, from: usize, to: usize) -> Option<usize> {
+    let len = depth.len();
+    let (from, to) = (from + offset, to + offset);
+    let found = if to <= len {
+        scan_above(depth, from, to)
+    } else if from >= len {
+        scan_above(depth, from - len, to - len).map(|t| t + len)
+    } else {
+        scan_above(depth, from, len).or_else(|| scan_above(depth, 0, to - len).map(|t| t + len))
+    };
+    found.map(|t| t - offset)
 }
 
 impl ROIVectorMarketDepth {
@@ -56,6 +94,17 @@ impl ROIVectorMarketDepth {
     pub fn new(tick_size: f64, lot_size: f64, roi_lb: f64, roi_ub: f64) -> Self {
         let roi_lb = (roi_lb / tick_size).round() as i64;
         let roi_ub = (roi_ub / tick_size).round() as i64;
+        Self::with_roi(tick_size, lot_size, roi_lb, roi_ub, false)
+    }
+
+    /// Constructs an instance of `ROIVectorMarketDepth` in the adaptive mode, whose range of
+    /// interest spans `roi_width` in price and follows the mid-price.
+    pub fn adaptive(tick_size: f64, lot_size: f64, roi_width: f64) -> Self {
+        let width = ((roi_width / tick_size).round() as i64).max(4);
+        Self::with_roi(tick_size, lot_size, 0, width - 1, true)
+    }
+
+    fn with_roi(tick_size: f64, lot_size: f64, roi_lb: i64, roi_ub: i64, adaptive: bool) -> Self {
         let roi_range = (roi_ub + 1 - roi_lb) as usize;
         Self {
             tick_size,
@@ -78,36 +127,269 @@ impl ROIVectorMarketDepth {
             roi_lb,
             roi_ub,
             orders: HashMap::new(),
+            roi_offset: 0,
+            adaptive,
+            bid_overflow: BTreeMap::new(),
+            ask_overflow: BTreeMap::new(),
         }
     }
 
-    fn add(&mut self, order: L3Order) -> Result<(), BacktestError> {
-        let order = match self.orders.entry(order.order_id) {
-            Entry::Occupied(_) => return Err(BacktestError::OrderIdExist),
-            Entry::Vacant(entry) => entry.insert(order),
+    #[inline(always)]
+    fn in_roi(&self, price_tick: i64) -> bool {
+        price_tick >= self.roi_lb && price_tick <= self.roi_ub
+    }
+
+    /// Returns the index in the depth vectors of the price within the range of interest.
+    #[inline(always)]
+    fn index(&self, price_tick: i64) -> usize {
+        let t = (price_tick - self.roi_lb) as usize + self.roi_offset;
+        if t >= self.bid_depth.len() {
+            t - self.bid_depth.len()
+        } else {
+            t
+        }
+    }
+
+    #[inline(always)]
+    fn side_mut(&mut self, side: Side) -> (&mut Vec<f64>, &mut BTreeMap<i64, f64>) {
+        if side == Side::Buy {
+            (&mut self.bid_depth, &mut self.bid_overflow)
+        } else {
+            (&mut self.ask_depth, &mut self.ask_overflow)
+        }
+    }
+
+    /// Sets the quantity at the price and returns the previous quantity, or `None` if the price is
+    /// outside the range of interest in the fixed mode.
+    #[inline(always)]
+    fn set_qty(&mut self, side: Side, price_tick: i64, qty: f64) -> Option<f64> {
+        if self.in_roi(price_tick) {
+            let t = self.index(price_tick);
+            let (depth, _) = self.side_mut(side);
+            Some(mem::replace(unsafe { depth.get_unchecked_mut(t) }, qty))
+        } else if self.adaptive {
+            let qty_lot = (qty / self.lot_size).round() as i64;
+            let (_, overflow) = self.side_mut(side);
+            let prev_qty = if qty_lot == 0 {
+                overflow.remove(&price_tick)
+            } else {
+                overflow.insert(price_tick, qty)
+            };
+            Some(prev_qty.unwrap_or(0.0))
+        } else {
+            None
+        }
+    }
+
+    /// Adds the quantity at the price and returns the resulting quantity, or `None` if the price is
+    /// outside the range of interest in the fixed mode. If `clean` is set, the resulting quantity
+    /// is set to zero when it is less than half a lot.
+    #[inline(always)]
+    fn add_qty(&mut self, side: Side, price_tick: i64, qty: f64, clean: bool) -> Option<f64> {
+        let lot_size = self.lot_size;
+        if self.in_roi(price_tick) {
+            let t = self.index(price_tick);
+            let (depth, _) = self.side_mut(side);
+            let depth_qty = unsafe { depth.get_unchecked_mut(t) };
+            *depth_qty += qty;
+            if clean && (*depth_qty / lot_size).round() as i64 == 0 {
+                *depth_qty = 0.0;
+            }
+            Some(*depth_qty)
+        } else if self.adaptive {
+            let (_, overflow) = self.side_mut(side);
+            let depth_qty = overflow.entry(price_tick).or_insert(0.0);
+            *depth_qty += qty;
+            if (*depth_qty / lot_size).round() as i64 == 0 {
+                let depth_qty = overflow.remove(&price_tick).unwrap();
+                Some(if clean { 0.0 } else { depth_qty })
+            } else {
+                Some(*depth_qty)
+            }
+        } else {
+            None
+        }
+    }
+
+    /// Returns the highest bid price in ticks in `end..start` that has quantity.
+    fn bid_below(&self, start: i64, end: i64) -> i64 {
+        if self.adaptive {
+            let from = end.max(self.roi_ub + 1);
+            if from < start {
+                if let Some((&price_tick, _)) = self.bid_overflow.range(from..start).next_back() {
+                    return price_tick;
+                }
+            }
+        }
+        let from = end.max(self.roi_lb);
+        let to = start.min(self.roi_ub + 1);
+        if from < to {
+            if let Some(t) = depth_below(
+                &self.bid_depth,
+                self.roi_offset,
+                (from - self.roi_lb) as usize,
+                (to - self.roi_lb) as usize,
+            ) {
+                return t as i64 + self.roi_lb;
+            }
+        }
+        if self.adaptive {
+            let to = start.min(self.roi_lb);
+            if end < to {
+                if let Some((&price_tick, _)) = self.bid_overflow.range(end..to).next_back() {
+                    return price_tick;
+                }
+            }
+        }
+        INVALID_MIN
+    }
+
+    /// Returns the lowest ask price in ticks in `start + 1..=end` that has quantity.
+    fn ask_above(&self, start: i64, end: i64) -> i64 {
+        if self.adaptive {
+            let to = end.min(self.roi_lb - 1);
+            if start < to {
+                if let Some((&price_tick, _)) = self
+                    .ask_overflow
+                    .range((Excluded(start), Included(to)))
+                    .next()
+                {
+                    return price_tick;
+                }
+            }
+        }
+        let from = start.max(self.roi_lb - 1);
+        let to = end.min(self.roi_ub);
+        if from < to {
+            if let Some(t) = depth_above(
+                &self.ask_depth,
+                self.roi_offset,
+                (from + 1 - self.roi_lb) as usize,
+                (to + 1 - self.roi_lb) as usize,
+            ) {
+                return t as i64 + self.roi_lb;
+            }
+        }
+        if self.adaptive {
+            let from = start.max(self.roi_ub);
+            if from < end {
+                if let Some((&price_tick, _)) = self
+                    .ask_overflow
+                    .range((Excluded(from), Included(end)))
+                    .next()
+                {
+                    return price_tick;
+                }
+            }
+        }
+        INVALID_MAX
+    }
+
+    /// Re-centers the range of interest on the mid-price if the mid-price is within a quarter of
+    /// the width of either bound. This only applies in the adaptive mode.
+    #[inline(always)]
+    fn follow_mid(&mut self) {
+        if !self.adaptive {
+            return;
+        }
+        let mid_tick = match (self.best_bid_tick, self.best_ask_tick) {
+            (INVALID_MIN, INVALID_MAX) => return,
+            (INVALID_MIN, best_ask_tick) => best_ask_tick,
+            (best_bid_tick, INVALID_MAX) => best_bid_tick,
+            (best_bid_tick, best_ask_tick) => best_bid_tick + (best_ask_tick - best_bid_tick) / 2,
         };
-        if order.price_tick < self.roi_lb || order.price_tick > self.roi_ub {
-            // This is outside the range of interest.
-            return Ok(());
+        let margin = self.bid_depth.len() as i64 / 4;
+        if mid_tick < self.roi_lb + margin || mid_tick > self.roi_ub - margin {
+            self.recenter(mid_tick);
         }
-        let t = (order.price_tick - self.roi_lb) as usize;
-        if order.side == Side::Buy {
+    }
+
+    /// Moves the range of interest so that it is centered on the given price in ticks. This takes
+    /// time proportional to the shift, bounded by the width.
+    fn recenter(&mut self, center_tick: i64) {
+        let len = self.bid_depth.len() as i64;
+        let roi_lb = center_tick - len / 2;
+        let shift = roi_lb - self.roi_lb;
+        if shift == 0 {
+            return;
+        }
+        if shift.abs() >= len {
+            // No level stays within the range.
+            self.spill(self.roi_lb, self.roi_ub);
+            self.roi_offset = 0;
+            self.roi_lb = roi_lb;
+            self.roi_ub = roi_lb + len - 1;
+            self.fill(self.roi_lb, self.roi_ub);
+        } else if shift > 0 {
+            let prev_roi_ub = self.roi_ub;
+            self.spill(self.roi_lb, roi_lb - 1);
+            self.roi_offset = (self.roi_offset + shift as usize) % len as usize;
+            self.roi_lb = roi_lb;
+            self.roi_ub = roi_lb + len - 1;
+            self.fill(prev_roi_ub + 1, self.roi_ub);
+        } else {
+            let prev_roi_lb = self.roi_lb;
+            self.spill(roi_lb + len, self.roi_ub);
+            self.roi_offset = (self.roi_offset + (len + shift) as usize) % len as usize;
+            self.roi_lb = roi_lb;
+            self.roi_ub = roi_lb + len - 1;
+            self.fill(self.roi_lb, prev_roi_lb - 1);
+        }
+    }
+
+    /// Moves the levels from `from` to `to` inclusive out of the range of interest into the
+    /// overflow maps.
+    fn spill(&mut self, from: i64, to: i64) {
+        for price_tick in from..=to {
+            let t = self.index(price_tick);
+            let bid_qty = mem::replace(unsafe { self.bid_depth.get_unchecked_mut(t) }, 0.0);
+            if (bid_qty / self.lot_size).round() as i64 != 0 {
+                self.bid_overflow.insert(price_tick, bid_qty);
+            }
+            let ask_qty = mem::replace(unsafe { self.ask_depth.get_unchecked_mut(t) }, 0.0);
+            if (ask_qty / self.lot_size).round() as i64 != 0 {
+                self.ask_overflow.insert(price_tick, ask_qty);
+            }
+        }
+    }
+
+    /// Moves the levels from `from` to `to` inclusive out of the overflow maps into the range of
+    /// interest, which must contain them.
+    fn fill(&mut self, from: i64, to: i64) {
+        let mut bids = self.bid_overflow.split_off(&from);
+        self.bid_overflow.append(&mut bids.split_off(&(to + 1)));
+        for (price_tick, qty) in bids {
+            let t = self.index(price_tick);
             unsafe {
-                *self.bid_depth.get_unchecked_mut(t) += order.qty;
+                *self.bid_depth.get_unchecked_mut(t) = qty;
             }
-        } else {
+        }
+        let mut asks = self.ask_overflow.split_off(&from);
+        self.ask_overflow.append(&mut asks.split_off(&(to + 1)));
+        for (price_tick, qty) in asks {
+            let t = self.index(price_tick);
             unsafe {
-                *self.ask_depth.get_unchecked_mut(t) += order.qty;
+                *self.ask_depth.get_unchecked_mut(t) = qty;
             }
         }
+    }
+
+    fn add(&mut self, order: L3Order) -> Result<(), BacktestError> {
+        let order = match self.orders.entry(order.order_id) {
+            Entry::Occupied(_) => return Err(BacktestError::OrderIdExist),
+            Entry::Vacant(entry) => entry.insert(order),
+        };
+        let (side, price_tick, qty) = (order.side, order.price_tick, order.qty);
+        self.add_qty(side, price_tick, qty, false);
         Ok(())
     }
 
     /// Returns the bid market depth array, which contains the quantity at each price. Its length is
     /// `ROI upper bound in ticks + 1 - ROI lower bound in ticks`, the array contains the quantities
     /// at prices from the ROI lower bound to the ROI upper bound.
-    /// The index is calculated as `price in ticks - ROI lower bound in ticks`.
-    /// Respectively, the price is `(index + ROI lower bound in ticks) * tick_size`.
+    /// The index is calculated as
+    /// `(price in ticks - ROI lower bound in ticks + ROI offset) % length`, where the
+    /// [ROI offset](Self::roi_offset()) is always zero unless in the adaptive mode.
     pub fn bid_depth(&self) -> &[f64] {
         self.bid_depth.as_slice()
     }
@@ -115,8 +397,9 @@ impl ROIVectorMarketDepth {
     /// Returns the ask market depth array, which contains the quantity at each price. Its length is
     /// `ROI upper bound in ticks + 1 - ROI lower bound in ticks`, the array contains the quantities
     /// at prices from the ROI lower bound to the ROI upper bound.
-    /// The index is calculated as `price in ticks - ROI lower bound in ticks`.
-    /// Respectively, the price is `(index + ROI lower bound in ticks) * tick_size`.
+    /// The index is calculated as
+    /// `(price in ticks - ROI lower bound in ticks + ROI offset) % length`, where the
+    /// [ROI offset](Self::roi_offset()) is always zero unless in the adaptive mode.
     pub fn ask_depth(&self) -> &[f64] {
         self.ask_depth.as_slice()
     }
@@ -133,6 +416,17 @@ impl ROIVectorMarketDepth {
     pub fn roi_tick(&self) -> (i64, i64) {
         (self.roi_lb, self.roi_ub)
     }
+
+    /// Returns the index in the depth arrays at which the quantity at the ROI lower bound is
+    /// stored, which is always zero unless in the adaptive mode.
+    pub fn roi_offset(&self) -> usize {
+        self.roi_offset
+    }
+
+    /// Returns `true` if the range of interest follows the mid-price.
+    pub fn is_adaptive(&self) -> bool {
+        self.adaptive
+    }
 }
 
 impl L2MarketDepth for ROIVectorMarketDepth {
@@ -145,9 +439,8 @@ impl L2MarketDepth for ROIVectorMarketDepth {
         let price_tick = (price / self.tick_size).round() as i64;
         let qty_lot = (qty / self.lot_size).round() as i64;
         let prev_best_bid_tick = self.best_bid_tick;
-        let prev_qty;
 
-        if price_tick < self.roi_lb || price_tick > self.roi_ub {
+        let Some(prev_qty) = self.set_qty(Side::Buy, price_tick, qty) else {
             // This is outside the range of interest.
             return (
                 price_tick,
@@ -157,23 +450,11 @@ impl L2MarketDepth for ROIVectorMarketDepth {
                 qty,
                 timestamp,
             );
-        }
-        let t = (price_tick - self.roi_lb) as usize;
-        unsafe {
-            let v = self.bid_depth.get_unchecked_mut(t);
-            prev_qty = *v;
-            *v = qty;
-        }
+        };
 
         if qty_lot == 0 {
             if price_tick == self.best_bid_tick {
-                self.best_bid_tick = depth_below(
-                    &self.bid_depth,
-                    self.best_bid_tick,
-                    self.low_bid_tick,
-                    self.roi_lb,
-                    self.roi_ub,
-                );
+                self.best_bid_tick = self.bid_below(self.best_bid_tick, self.low_bid_tick);
                 if self.best_bid_tick == INVALID_MIN {
                     self.low_bid_tick = INVALID_MAX
                 }
@@ -182,17 +463,12 @@ impl L2MarketDepth for ROIVectorMarketDepth {
             if price_tick > self.best_bid_tick {
                 self.best_bid_tick = price_tick;
                 if self.best_bid_tick >= self.best_ask_tick {
-                    self.best_ask_tick = depth_above(
-                        &self.ask_depth,
-                        self.best_bid_tick,
-                        self.high_ask_tick,
-                        self.roi_lb,
-                        self.roi_ub,
-                    );
+                    self.best_ask_tick = self.ask_above(self.best_bid_tick, self.high_ask_tick);
                 }
             }
             self.low_bid_tick = self.low_bid_tick.min(price_tick);
         }
+        self.follow_mid();
         (
             price_tick,
             prev_best_bid_tick,
@@ -212,9 +488,8 @@ impl L2MarketDepth for ROIVectorMarketDepth {
         let price_tick = (price / self.tick_size).round() as i64;
         let qty_lot = (qty / self.lot_size).round() as i64;
         let prev_best_ask_tick = self.best_ask_tick;
-        let prev_qty;
 
-        if price_tick < self.roi_lb || price_tick > self.roi_ub {
+        let Some(prev_qty) = self.set_qty(Side::Sell, price_tick, qty) else {
             // This is outside the range of interest.
             return (
                 price_tick,
@@ -224,23 +499,11 @@ impl L2MarketDepth for ROIVectorMarketDepth {
                 qty,
                 timestamp,
             );
-        }
-        let t = (price_tick - self.roi_lb) as usize;
-        unsafe {
-            let v = self.ask_depth.get_unchecked_mut(t);
-            prev_qty = *v;
-            *v = qty;
-        }
+        };
 
         if qty_lot == 0 {
             if price_tick == self.best_ask_tick {
-                self.best_ask_tick = depth_above(
-                    &self.ask_depth,
-                    self.best_ask_tick,
-                    self.high_ask_tick,
-                    self.roi_lb,
-                    self.roi_ub,
-                );
+                self.best_ask_tick = self.ask_above(self.best_ask_tick, self.high_ask_tick);
                 if self.best_ask_tick == INVALID_MAX {
                     self.high_ask_tick = INVALID_MIN
                 }
@@ -249,17 +512,12 @@ impl L2MarketDepth for ROIVectorMarketDepth {
             if price_tick < self.best_ask_tick {
                 self.best_ask_tick = price_tick;
                 if self.best_bid_tick >= self.best_ask_tick {
-                    self.best_bid_tick = depth_below(
-                        &self.bid_depth,
-                        self.best_ask_tick,
-                        self.low_bid_tick,
-                        self.roi_lb,
-                        self.roi_ub,
-                    );
+                    self.best_bid_tick = self.bid_below(self.best_ask_tick, self.low_bid_tick);
                 }
             }
             self.high_ask_tick = self.high_ask_tick.max(price_tick);
         }
+        self.follow_mid();
         (
             price_tick,
             prev_best_ask_tick,
@@ -276,35 +534,20 @@ impl L2MarketDepth for ROIVectorMarketDepth {
                 if clear_upto_price.is_finite() {
                     let clear_upto = (clear_upto_price / self.tick_size).round() as i64;
                     if self.best_bid_tick != INVALID_MIN {
-                        let from = (clear_upto - self.roi_lb).max(0);
-                        let to = self.best_bid_tick + 1 - self.roi_lb;
-                        for t in from..to {
+                        let from = clear_upto.max(self.roi_lb);
+                        let to = self.best_bid_tick.min(self.roi_ub);
+                        for price_tick in from..=to {
+                            let t = self.index(price_tick);
                             unsafe {
-                                *self.bid_depth.get_unchecked_mut(t as usize) = 0.0;
+                                *self.bid_depth.get_unchecked_mut(t) = 0.0;
                             }
                         }
+                        self.bid_overflow.split_off(&clear_upto);
                     }
-                    let low_bid_tick = if self.low_bid_tick == INVALID_MAX {
-                        self.roi_lb
-                    } else {
-                        self.low_bid_tick
-                    };
-                    let clear_upto = if clear_upto - 1 < self.roi_lb {
-                        self.roi_lb
-                    } else if clear_upto - 1 > self.roi_ub {
-                        self.roi_ub
-                    } else {
-                        clear_upto - 1
-                    };
-                    self.best_bid_tick = depth_below(
-                        &self.bid_depth,
-                        clear_upto,
-                        low_bid_tick,
-                        self.roi_lb,
-                        self.roi_ub,
-                    );
+                    self.best_bid_tick = self.bid_below(clear_upto - 1, self.low_bid_tick);
                 } else {
                     self.bid_depth.iter_mut().for_each(|q| *q = 0.0);
+                    self.bid_overflow.clear();
                     self.best_bid_tick = INVALID_MIN;
                 }
                 if self.best_bid_tick == INVALID_MIN {
@@ -315,35 +558,20 @@ impl L2MarketDepth for ROIVectorMarketDepth {
                 if clear_upto_price.is_finite() {
                     let clear_upto = (clear_upto_price / self.tick_size).round() as i64;
                     if self.best_ask_tick != INVALID_MAX {
-                        let from = self.best_ask_tick - self.roi_lb;
-                        let to = (clear_upto + 1 - self.roi_ub).min(self.ask_depth.len() as i64);
-                        for t in from..to {
+                        let from = self.best_ask_tick.max(self.roi_lb);
+                        let to = clear_upto.min(self.roi_ub);
+                        for price_tick in from..=to {
+                            let t = self.index(price_tick);
                             unsafe {
-                                *self.ask_depth.get_unchecked_mut(t as usize) = 0.0;
+                                *self.ask_depth.get_unchecked_mut(t) = 0.0;
                             }
                         }
+                        self.ask_overflow = self.ask_overflow.split_off(&(clear_upto + 1));
                     }
-                    let high_ask_tick = if self.high_ask_tick == INVALID_MIN {
-                        self.roi_ub
-                    } else {
-                        self.high_ask_tick
-                    };
-                    let clear_upto = if clear_upto + 1 < self.roi_lb {
-                        self.roi_lb
-                    } else if clear_upto + 1 > self.roi_ub {
-                        self.roi_ub
-                    } else {
-                        clear_upto + 1
-                    };
-                    self.best_ask_tick = depth_above(
-                        &self.ask_depth,
-                        clear_upto,
-                        high_ask_tick,
-                        self.roi_lb,
-                        self.roi_ub,
-                    );
+                    self.best_ask_tick = self.ask_above(clear_upto + 1, self.high_ask_tick);
                 } else {
                     self.ask_depth.iter_mut().for_each(|q| *q = 0.0);
+                    self.ask_overflow.clear();
                     self.best_ask_tick = INVALID_MAX;
                 }
                 if self.best_ask_tick == INVALID_MAX {
@@ -353,6 +581,8 @@ impl L2MarketDepth for ROIVectorMarketDepth {
             Side::None => {
                 self.bid_depth.iter_mut().for_each(|q| *q = 0.0);
                 self.ask_depth.iter_mut().for_each(|q| *q = 0.0);
+                self.bid_overflow.clear();
+                self.ask_overflow.clear();
                 self.best_bid_tick = INVALID_MIN;
                 self.best_ask_tick = INVALID_MAX;
                 self.low_bid_tick = INVALID_MAX;
@@ -362,6 +592,7 @@ impl L2MarketDepth for ROIVectorMarketDepth {
                 unreachable!();
             }
         }
+        self.follow_mid();
     }
 }
 
@@ -396,29 +627,31 @@ impl MarketDepth for ROIVectorMarketDepth {
 
     #[inline(always)]
     fn best_bid_qty(&self) -> f64 {
-        if self.best_bid_tick < self.roi_lb || self.best_bid_tick > self.roi_ub {
+        if self.in_roi(self.best_bid_tick) {
+            unsafe { *self.bid_depth.get_unchecked(self.index(self.best_bid_tick)) }
+        } else if self.adaptive {
+            self.bid_overflow
+                .get(&self.best_bid_tick)
+                .copied()
+                .unwrap_or(0.0)
+        } else {
             // This is outside the range of interest.
             0.0
-        } else {
-            unsafe {
-                *self
-                    .bid_depth
-                    .get_unchecked((self.best_bid_tick - self.roi_lb) as usize)
-            }
         }
     }
 
     #[inline(always)]
     fn best_ask_qty(&self) -> f64 {
-        if self.best_ask_tick < self.roi_lb || self.best_ask_tick > self.roi_ub {
+        if self.in_roi(self.best_ask_tick) {
+            unsafe { *self.ask_depth.get_unchecked(self.index(self.best_ask_tick)) }
+        } else if self.adaptive {
+            self.ask_overflow
+                .get(&self.best_ask_tick)
+                .copied()
+                .unwrap_or(0.0)
+        } else {
             // This is outside the range of interest.
             f64::NAN
-        } else {
-            unsafe {
-                *self
-                    .ask_depth
-                    .get_unchecked((self.best_ask_tick - self.roi_lb) as usize)
-            }
         }
     }
 
@@ -434,29 +667,25 @@ impl MarketDepth for ROIVectorMarketDepth {
 
     #[inline(always)]
     fn bid_qty_at_tick(&self, price_tick: i64) -> f64 {
-        if price_tick < self.roi_lb || price_tick > self.roi_ub {
+        if self.in_roi(price_tick) {
+            unsafe { *self.bid_depth.get_unchecked(self.index(price_tick)) }
+        } else if self.adaptive {
+            self.bid_overflow.get(&price_tick).copied().unwrap_or(0.0)
+        } else {
             // This is outside the range of interest.
             f64::NAN
-        } else {
-            unsafe {
-                *self
-                    .bid_depth
-                    .get_unchecked((price_tick - self.roi_lb) as usize)
-            }
         }
     }
 
     #[inline(always)]
     fn ask_qty_at_tick(&self, price_tick: i64) -> f64 {
-        if price_tick < self.roi_lb || price_tick > self.roi_ub {
+        if self.in_roi(price_tick) {
+            unsafe { *self.ask_depth.get_unchecked(self.index(price_tick)) }
+        } else if self.adaptive {
+            self.ask_overflow.get(&price_tick).copied().unwrap_or(0.0)
+        } else {
             // This is outside the range of interest.
             f64::NAN
-        } else {
-            unsafe {
-                *self
-                    .ask_depth
-                    .get_unchecked((price_tick - self.roi_lb) as usize)
-            }
         }
     }
 }
@@ -473,28 +702,40 @@ impl ApplySnapshot for ROIVectorMarketDepth {
         for qty in &mut self.ask_depth {
             *qty = 0.0;
         }
+        self.bid_overflow.clear();
+        self.ask_overflow.clear();
+        if self.adaptive {
+            // Places the range of interest around the snapshot's mid-price first, so that the
+            // levels around it go directly into the range.
+            for row_num in 0..data.len() {
+                let price_tick = (data[row_num].px / self.tick_size).round() as i64;
+                if data[row_num].ev & BUY_EVENT == BUY_EVENT {
+                    self.best_bid_tick = self.best_bid_tick.max(price_tick);
+                } else if data[row_num].ev & SELL_EVENT == SELL_EVENT {
+                    self.best_ask_tick = self.best_ask_tick.min(price_tick);
+                }
+            }
+            self.follow_mid();
+            self.best_bid_tick = INVALID_MIN;
+            self.best_ask_tick = INVALID_MAX;
+        }
         for row_num in 0..data.len() {
             let price = data[row_num].px;
             let qty = data[row_num].qty;
 
             let price_tick = (price / self.tick_size).round() as i64;
-            if price_tick < self.roi_lb || price_tick > self.roi_ub {
-                continue;
-            }
             if data[row_num].ev & BUY_EVENT == BUY_EVENT {
+                if self.set_qty(Side::Buy, price_tick, qty).is_none() {
+                    continue;
+                }
                 self.best_bid_tick = self.best_bid_tick.max(price_tick);
                 self.low_bid_tick = self.low_bid_tick.min(price_tick);
-                let t = (price_tick - self.roi_lb) as usize;
-                unsafe {
-                    *self.bid_depth.get_unchecked_mut(t) = qty;
-                }
             } else if data[row_num].ev & SELL_EVENT == SELL_EVENT {
+                if self.set_qty(Side::Sell, price_tick, qty).is_none() {
+                    continue;
+                }
                 self.best_ask_tick = self.best_ask_tick.min(price_tick);
                 self.high_ask_tick = self.high_ask_tick.max(price_tick);
-                let t = (price_tick - self.roi_lb) as usize;
-                unsafe {
-                    *self.ask_depth.get_unchecked_mut(t) = qty;
-                }
             }
         }
     }
@@ -526,16 +767,11 @@ impl L3MarketDepth for ROIVectorMarketDepth {
         if price_tick > self.best_bid_tick {
             self.best_bid_tick = price_tick;
             if self.best_bid_tick >= self.best_ask_tick {
-                self.best_ask_tick = depth_above(
-                    &self.ask_depth,
-                    self.best_bid_tick,
-                    self.high_ask_tick,
-                    self.roi_lb,
-                    self.roi_ub,
-                );
+                self.best_ask_tick = self.ask_above(self.best_bid_tick, self.high_ask_tick);
             }
         }
         self.low_bid_tick = self.low_bid_tick.min(price_tick);
+        self.follow_mid();
         Ok((prev_best_tick, self.best_bid_tick))
     }
 
@@ -558,16 +794,11 @@ impl L3MarketDepth for ROIVectorMarketDepth {
         if price_tick < self.best_ask_tick {
             self.best_ask_tick = price_tick;
             if self.best_bid_tick >= self.best_ask_tick {
-                self.best_bid_tick = depth_below(
-                    &self.bid_depth,
-                    self.best_ask_tick,
-                    self.low_bid_tick,
-                    self.roi_lb,
-                    self.roi_ub,
-                );
+                self.best_bid_tick = self.bid_below(self.best_ask_tick, self.low_bid_tick);
             }
         }
         self.high_ask_tick = self.high_ask_tick.max(price_tick);
+        self.follow_mid();
         Ok((prev_best_tick, self.best_ask_tick))
     }
 
@@ -583,50 +814,28 @@ impl L3MarketDepth for ROIVectorMarketDepth {
         if order.side == Side::Buy {
             let prev_best_tick = self.best_bid_tick;
 
-            if !(order.price_tick < self.roi_lb || order.price_tick > self.roi_ub) {
-                let t = (order.price_tick - self.roi_lb) as usize;
-                let depth_qty = unsafe { self.bid_depth.get_unchecked_mut(t) };
-                *depth_qty -= order.qty;
-                if (*depth_qty / self.lot_size).round() as i64 == 0 {
-                    *depth_qty = 0.0;
-                    if order.price_tick == self.best_bid_tick {
-                        self.best_bid_tick = depth_below(
-                            &self.bid_depth,
-                            self.best_bid_tick,
-                            self.low_bid_tick,
-                            self.roi_lb,
-                            self.roi_ub,
-                        );
-                        if self.best_bid_tick == INVALID_MIN {
-                            self.low_bid_tick = INVALID_MAX
-                        }
-                    }
+            if self.add_qty(Side::Buy, order.price_tick, -order.qty, true) == Some(0.0)
+                && order.price_tick == self.best_bid_tick
+            {
+                self.best_bid_tick = self.bid_below(self.best_bid_tick, self.low_bid_tick);
+                if self.best_bid_tick == INVALID_MIN {
+                    self.low_bid_tick = INVALID_MAX
                 }
             }
+            self.follow_mid();
             Ok((Side::Buy, prev_best_tick, self.best_bid_tick))
         } else {
             let prev_best_tick = self.best_ask_tick;
 
-            if !(order.price_tick < self.roi_lb || order.price_tick > self.roi_ub) {
-                let t = (order.price_tick - self.roi_lb) as usize;
-                let depth_qty = unsafe { self.ask_depth.get_unchecked_mut(t) };
-                *depth_qty -= order.qty;
-                if (*depth_qty / self.lot_size).round() as i64 == 0 {
-                    *depth_qty = 0.0;
-                    if order.price_tick == self.best_ask_tick {
-                        self.best_ask_tick = depth_above(
-                            &self.ask_depth,
-                            self.best_ask_tick,
-                            self.high_ask_tick,
-                            self.roi_lb,
-                            self.roi_ub,
-                        );
-                        if self.best_ask_tick == INVALID_MAX {
-                            self.high_ask_tick = INVALID_MIN
-                        }
-                    }
+            if self.add_qty(Side::Sell, order.price_tick, -order.qty, true) == Some(0.0)
+                && order.price_tick == self.best_ask_tick
+            {
+                self.best_ask_tick = self.ask_above(self.best_ask_tick, self.high_ask_tick);
+                if self.best_ask_tick == INVALID_MAX {
+                    self.high_ask_tick = INVALID_MIN
                 }
             }
+            self.follow_mid();
             Ok((Side::Sell, prev_best_tick, self.best_ask_tick))
         }
     }
@@ -642,122 +851,67 @@ impl L3MarketDepth for ROIVectorMarketDepth {
             .orders
             .get_mut(&order_id)
             .ok_or(BacktestError::OrderNotFound)?;
-        if order.side == Side::Buy {
+        let side = order.side;
+        let prev_price_tick = order.price_tick;
+        let prev_qty = order.qty;
+        let price_tick = (px / self.tick_size).round() as i64;
+        if price_tick == prev_price_tick {
+            order.qty = qty;
+            self.add_qty(side, price_tick, qty - prev_qty, false);
+            return if side == Side::Buy {
+                Ok((Side::Buy, self.best_bid_tick, self.best_bid_tick))
+            } else {
+                Ok((Side::Sell, self.best_ask_tick, self.best_ask_tick))
+            };
+        }
+        order.price_tick = price_tick;
+        order.qty = qty;
+        order.timestamp = timestamp;
+
+        if side == Side::Buy {
             let prev_best_tick = self.best_bid_tick;
-            let price_tick = (px / self.tick_size).round() as i64;
-            if price_tick != order.price_tick {
-                if !(order.price_tick < self.roi_lb || order.price_tick > self.roi_ub) {
-                    let t = (order.price_tick - self.roi_lb) as usize;
-                    let depth_qty = unsafe { self.bid_depth.get_unchecked_mut(t) };
-                    *depth_qty -= order.qty;
-                    if (*depth_qty / self.lot_size).round() as i64 == 0 {
-                        *depth_qty = 0.0;
-                        if order.price_tick == self.best_bid_tick {
-                            self.best_bid_tick = depth_below(
-                                &self.bid_depth,
-                                self.best_bid_tick,
-                                self.low_bid_tick,
-                                self.roi_lb,
-                                self.roi_ub,
-                            );
-                            if self.best_bid_tick == INVALID_MIN {
-                                self.low_bid_tick = INVALID_MAX
-                            }
-                        }
-                    }
+            if self.add_qty(Side::Buy, prev_price_tick, -prev_qty, true) == Some(0.0)
+                && prev_price_tick == self.best_bid_tick
+            {
+                self.best_bid_tick = self.bid_below(self.best_bid_tick, self.low_bid_tick);
+                if self.best_bid_tick == INVALID_MIN {
+                    self.low_bid_tick = INVALID_MAX
                 }
+            }
 
-                order.price_tick = price_tick;
-                order.qty = qty;
-                order.timestamp = timestamp;
-
-                if !(price_tick < self.roi_lb || price_tick > self.roi_ub) {
-                    let t = (price_tick - self.roi_lb) as usize;
-                    let depth_qty = unsafe { self.bid_depth.get_unchecked_mut(t) };
-                    *depth_qty += order.qty;
-
-                    if price_tick > self.best_bid_tick {
-                        self.best_bid_tick = price_tick;
-                        if self.best_bid_tick >= self.best_ask_tick {
-                            self.best_ask_tick = depth_above(
-                                &self.ask_depth,
-                                self.best_bid_tick,
-                                self.high_ask_tick,
-                                self.roi_lb,
-                                self.roi_ub,
-                            );
-                        }
+            if self.add_qty(Side::Buy, price_tick, qty, false).is_some() {
+                if price_tick > self.best_bid_tick {
+                    self.best_bid_tick = price_tick;
+                    if self.best_bid_tick >= self.best_ask_tick {
+                        self.best_ask_tick = self.ask_above(self.best_bid_tick, self.high_ask_tick);
                     }
-                    self.low_bid_tick = self.low_bid_tick.min(price_tick);
                 }
-                Ok((Side::Buy, prev_best_tick, self.best_bid_tick))
-            } else {
-                if !(order.price_tick < self.roi_lb || order.price_tick > self.roi_ub) {
-                    let t = (order.price_tick - self.roi_lb) as usize;
-                    let depth_qty = unsafe { self.bid_depth.get_unchecked_mut(t) };
-                    *depth_qty += qty - order.qty;
-                }
-                order.qty = qty;
-                Ok((Side::Buy, self.best_bid_tick, self.best_bid_tick))
+                self.low_bid_tick = self.low_bid_tick.min(price_tick);
             }
+            self.follow_mid();
+            Ok((Side::Buy, prev_best_tick, self.best_bid_tick))
         } else {
             let prev_best_tick = self.best_ask_tick;
-            let price_tick = (px / self.tick_size).round() as i64;
-            if price_tick != order.price_tick {
-                if !(order.price_tick < self.roi_lb || order.price_tick > self.roi_ub) {
-                    let t = (order.price_tick - self.roi_lb) as usize;
-                    let depth_qty = unsafe { self.ask_depth.get_unchecked_mut(t) };
-                    *depth_qty -= order.qty;
-                    if (*depth_qty / self.lot_size).round() as i64 == 0 {
-                        *depth_qty = 0.0;
-                        if order.price_tick == self.best_ask_tick {
-                            self.best_ask_tick = depth_above(
-                                &self.ask_depth,
-                                self.best_ask_tick,
-                                self.high_ask_tick,
-                                self.roi_lb,
-                                self.roi_ub,
-                            );
-                            if self.best_ask_tick == INVALID_MAX {
-                                self.high_ask_tick = INVALID_MIN
-                            }
-                        }
-                    }
+            if self.add_qty(Side::Sell, prev_price_tick, -prev_qty, true) == Some(0.0)
+                && prev_price_tick == self.best_ask_tick
+            {
+                self.best_ask_tick = self.ask_above(self.best_ask_tick, self.high_ask_tick);
+                if self.best_ask_tick == INVALID_MAX {
+                    self.high_ask_tick = INVALID_MIN
                 }
+            }
 
-                order.price_tick = price_tick;
-                order.qty = qty;
-                order.timestamp = timestamp;
-
-                if !(price_tick < self.roi_lb || price_tick > self.roi_ub) {
-                    let t = (price_tick - self.roi_lb) as usize;
-                    let depth_qty = unsafe { self.ask_depth.get_unchecked_mut(t) };
-                    *depth_qty += order.qty;
-
-                    if price_tick < self.best_ask_tick {
-                        self.best_ask_tick = price_tick;
-                        if self.best_bid_tick >= self.best_ask_tick {
-                            self.best_bid_tick = depth_below(
-                                &self.bid_depth,
-                                self.best_ask_tick,
-                                self.low_bid_tick,
-                                self.roi_lb,
-                                self.roi_ub,
-                            );
-                        }
+            if self.add_qty(Side::Sell, price_tick, qty, false).is_some() {
+                if price_tick < self.best_ask_tick {
+                    self.best_ask_tick = price_tick;
+                    if self.best_bid_tick >= self.best_ask_tick {
+                        self.best_bid_tick = self.bid_below(self.best_ask_tick, self.low_bid_tick);
                     }
-                    self.high_ask_tick = self.high_ask_tick.max(price_tick);
-                }
-                Ok((Side::Sell, prev_best_tick, self.best_ask_tick))
-            } else {
-                if !(order.price_tick < self.roi_lb || order.price_tick > self.roi_ub) {
-                    let t = (order.price_tick - self.roi_lb) as usize;
-                    let depth_qty = unsafe { self.ask_depth.get_unchecked_mut(t) };
-                    *depth_qty += qty - order.qty;
                 }
-                order.qty = qty;
-                Ok((Side::Sell, self.best_ask_tick, self.best_ask_tick))
+                self.high_ask_tick = self.high_ask_tick.max(price_tick);
             }
+            self.follow_mid();
+            Ok((Side::Sell, prev_best_tick, self.best_ask_tick))
         }
     }
 
@@ -805,7 +959,14 @@ impl L3MarketDepth for ROIVectorMarketDepth {
 #[cfg(test)]
 mod tests {
     use crate::{
-        depth::{INVALID_MAX, INVALID_MIN, L3MarketDepth, MarketDepth, ROIVectorMarketDepth},
+        depth::{
+            INVALID_MAX,
+            INVALID_MIN,
+            L2MarketDepth,
+            L3MarketDepth,
+            MarketDepth,
+            ROIVectorMarketDepth,
+        },
         types::Side,
     };
 
@@ -1029,4 +1190,51 @@ mod tests {
         assert_eq_qty!(depth.ask_qty_at_tick(4981), 0.0, lot_size);
         assert_eq_qty!(depth.ask_qty_at_tick(5002), 0.002, lot_size);
     }
+
+    #[test]
+    fn test_adaptive_roi_follows_mid() {
+        let mut depth = ROIVectorMarketDepth::adaptive(1.0, 1.0, 100.0);
+        assert!(depth.is_adaptive());
+        assert_eq!(depth.roi_tick(), (0, 99));
+
+        depth.update_bid_depth(1000.0, 1.0, 0);
+        depth.update_ask_depth(1002.0, 2.0, 0);
+        assert_eq!(depth.roi_tick(), (950, 1049));
+        assert_eq!(depth.roi_offset(), 0);
+        assert_eq!(depth.best_bid_tick(), 1000);
+        assert_eq!(depth.best_ask_tick(), 1002);
+
+        // Shifts the range partially, so that the levels within both ranges stay in place.
+        depth.update_ask_depth(1032.0, 3.0, 0);
+        depth.update_ask_depth(1002.0, 0.0, 0);
+        depth.update_bid_depth(1030.0, 4.0, 0);
+        assert_eq!(depth.roi_tick(), (981, 1080));
+        assert_eq!(depth.roi_offset(), 31);
+        assert_eq!(depth.bid_depth()[50], 1.0);
+        assert_eq!(depth.bid_depth()[80], 4.0);
+        assert_eq!(depth.ask_depth()[82], 3.0);
+        assert_eq!(depth.best_bid_tick(), 1030);
+        assert_eq!(depth.best_ask_tick(), 1032);
+
+        // Moves the range away, keeping the levels left behind in the overflow.
+        depth.update_bid_depth(1030.0, 0.0, 0);
+        depth.update_ask_depth(1032.0, 0.0, 0);
+        depth.update_ask_depth(1400.0, 5.0, 0);
+        assert_eq!(depth.roi_tick(), (1150, 1249));
+        assert_eq!(depth.best_bid_tick(), 1000);
+        assert_eq!(depth.best_ask_tick(), 1400);
+        assert_eq!(depth.bid_qty_at_tick(1000), 1.0);
+        assert_eq!(depth.ask_qty_at_tick(1400), 5.0);
+        assert_eq!(depth.bid_qty_at_tick(1030), 0.0);
+        assert!(depth.bid_depth().iter().all(|&qty| qty == 0.0));
+
+        // Moves the range back, restoring the level from the overflow.
+        depth.clear_depth(Side::Sell, f64::INFINITY);
+        assert_eq!(depth.best_ask_tick(), INVALID_MAX);
+        assert_eq!(depth.roi_tick(), (950, 1049));
+        let (roi_lb, _) = depth.roi_tick();
+        let t = (1000 - roi_lb) as usize + depth.roi_offset();
+        assert_eq!(depth.bid_depth()[t % depth.bid_depth().len()], 1.0);
+        assert_eq!(depth.ask_qty_at_tick(1400), 0.0);
+    }
 }
@@ -17,7 +17,10 @@ use dyn_clone::DynClone;
 use hftbacktest_derive::NpyDTyped;
 use thiserror::Error;
 
-use crate::{backtest::data::POD, depth::MarketDepth};
+use crate::{
+    backtest::{BacktestError, data::POD},
+    depth::MarketDepth,
+};
 
 #[derive(Clone, Debug, Decode, Encode)]
 pub enum Value {
@@ -367,6 +370,20 @@ pub enum Side {
     Unsupported = 127,
 }
 
+impl TryFrom<i8> for Side {
+    type Error = BacktestError;
+
+    /// Converts the raw value of [`Side::Buy`], [`Side::Sell`], or [`Side::None`].
+    fn try_from(value: i8) -> Result<Self, Self::Error> {
+        match value {
+            1 => Ok(Side::Buy),
+            -1 => Ok(Side::Sell),
+            0 => Ok(Side::None),
+            _ => Err(BacktestError::InvalidOrderRequest),
+        }
+    }
+}
+
 impl AsRef<f64> for Side {
     fn as_ref(&self) -> &f64 {
         match self {
@@ -423,6 +440,21 @@ pub enum TimeInForce {
     Unsupported = 255,
 }
 
+impl TryFrom<u8> for TimeInForce {
+    type Error = BacktestError;
+
+    /// Converts the raw value of a time-in-force other than [`TimeInForce::Unsupported`].
+    fn try_from(value: u8) -> Result<Self, Self::Error> {
+        match value {
+            0 => Ok(TimeInForce::GTC),
+            1 => Ok(TimeInForce::GTX),
+            2 => Ok(TimeInForce::FOK),
+            3 => Ok(TimeInForce::IOC),
+            _ => Err(BacktestError::InvalidOrderRequest),
+        }
+    }
+}
+
 impl AsRef<str> for TimeInForce {
     fn as_ref(&self) -> &'static str {
         match self {
@@ -444,6 +476,19 @@ pub enum OrdType {
     Unsupported = 255,
 }
 
+impl TryFrom<u8> for OrdType {
+    type Error = BacktestError;
+
+    /// Converts the raw value of an order type other than [`OrdType::Unsupported`].
+    fn try_from(value: u8) -> Result<Self, Self::Error> {
+        match value {
+            0 => Ok(OrdType::Limit),
+            1 => Ok(OrdType::Market),
+            _ => Err(BacktestError::InvalidOrderRequest),
+        }
+    }
+}
+
 impl AsRef<str> for OrdType {
     fn as_ref(&self) -> &'static str {
         match self {
@@ -0,0 +1,131 @@
+import numpy as np
+
+from hftbacktest.types import (
+    ADD_ORDER_EVENT,
+    BUY_EVENT,
+    CANCEL_ORDER_EVENT,
+    DEPTH_EVENT,
+    EXCH_EVENT,
+    FILL_EVENT,
+    LOCAL_EVENT,
+    SELL_EVENT,
+    TRADE_EVENT,
+    event_dtype
+)
+
+TICK_SIZE = 0.1
+LOT_SIZE = 0.001
+
+
+def generate_feed(num_events: int, seed: int = 0, interval: int = 1_000_000, trade_ratio: float = 0.1) -> np.ndarray:
+    """
+    Generates a synthetic feed of Level-2 depth and trade events around a random-walking mid price, so that the
+    benchmarks do not depend on collected data.
+
+    Args:
+        num_events: The number of events.
+        seed: The seed of the random number generator.
+        interval: The mean interval between the events in nanoseconds.
+        trade_ratio: The fraction of the events that are trades.
+
+    Returns:
+        The feed data of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+    """
+    rng = np.random.default_rng(seed)
+    data = np.zeros(num_events, event_dtype)
+
+    exch_ts = 1_700_000_000_000_000_000 + np.cumsum(rng.integers(1, 2 * interval, num_events))
+    mid_tick = 500_000 + np.cumsum(rng.integers(-1, 2, num_events))
+    is_buy = rng.random(num_events) < 0.5
+    is_trade = rng.random(num_events) < trade_ratio
+    # Depth updates fall within 20 ticks of the mid; trades occur at the best price.
+    offset = np.where(is_trade, 0, rng.integers(0, 20, num_events)) + 1
+    price_tick = np.where(is_buy, mid_tick - offset, mid_tick + offset)
+
+    data['ev'] = (
+        EXCH_EVENT
+        | LOCAL_EVENT
+        | np.where(is_trade, TRADE_EVENT, DEPTH_EVENT)
+        | np.where(is_buy, BUY_EVENT, SELL_EVENT)
+    )
+    data['exch_ts'] = exch_ts
+    data['local_ts'] = exch_ts + rng.integers(100_000, 1_000_000, num_events)
+    data['px'] = price_tick * TICK_SIZE
+    data['qty'] = np.where(rng.random(num_events) < 0.1, 0.0, rng.integers(1, 1000, num_events) * LOT_SIZE)
+    # Local timestamps must not go backwards.
+    data['local_ts'] = np.maximum.accumulate(data['local_ts'])
+    return data
+
+
+def generate_l3_feed(num_events: int, seed: int = 0, interval: int = 1_000_000, fill_ratio: float = 0.05) -> np.ndarray:
+    """
+    Generates a synthetic Level-3 feed of order additions, cancellations, and fills around a random-walking mid price.
+    Each fill is followed by the cancellation that removes the filled order from the book, and every cancellation
+    refers to a live order, so the feed is consistent for the Level-3 exchange models.
+
+    Args:
+        num_events: The number of events.
+        seed: The seed of the random number generator.
+        interval: The mean interval between the events in nanoseconds.
+        fill_ratio: The fraction of the events that are fills.
+
+    Returns:
+        The feed data of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+    """
+    rng = np.random.default_rng(seed)
+    ev = np.zeros(num_events, np.uint64)
+    px = np.zeros(num_events, np.float64)
+    qty = np.zeros(num_events, np.float64)
+    order_id = np.zeros(num_events, np.uint64)
+
+    rand = rng.random(num_events)
+    steps = rng.integers(-1, 2, num_events)
+    offsets = rng.integers(1, 20, num_events)
+    is_buy = rng.random(num_events) < 0.5
+    qtys = rng.integers(1, 1000, num_events) * LOT_SIZE
+
+    mid_tick = 500_000
+    live = []
+    book = {}
+    next_order_id = 1
+    i = 0
+    while i < num_events:
+        mid_tick += steps[i]
+        if len(live) < 100 or rand[i] < 0.5:
+            side = BUY_EVENT if is_buy[i] else SELL_EVENT
+            price_tick = mid_tick - offsets[i] if is_buy[i] else mid_tick + offsets[i]
+            ev[i] = EXCH_EVENT | LOCAL_EVENT | ADD_ORDER_EVENT | side
+            px[i] = price_tick * TICK_SIZE
+            qty[i] = qtys[i]
+            order_id[i] = next_order_id
+            book[next_order_id] = (side, px[i], qty[i])
+            live.append(next_order_id)
+            next_order_id += 1
+            i += 1
+            continue
+
+        # Removes a random live order by swapping it with the last one.
+        k = int(rand[i] * 1_000_003) % len(live)
+        live[k], live[-1] = live[-1], live[k]
+        removed = live.pop()
+        side, removed_px, removed_qty = book.pop(removed)
+        if rand[i] < 0.5 + fill_ratio and i + 1 < num_events:
+            ev[i] = EXCH_EVENT | LOCAL_EVENT | FILL_EVENT | side
+            px[i] = removed_px
+            qty[i] = removed_qty
+            order_id[i] = removed
+            i += 1
+        ev[i] = EXCH_EVENT | LOCAL_EVENT | CANCEL_ORDER_EVENT | side
+        px[i] = removed_px
+        order_id[i] = removed
+        i += 1
+
+    data = np.zeros(num_events, event_dtype)
+    exch_ts = 1_700_000_000_000_000_000 + np.cumsum(rng.integers(1, 2 * interval, num_events))
+    data['ev'] = ev
+    data['exch_ts'] = exch_ts
+    data['local_ts'] = np.maximum.accumulate(exch_ts + rng.integers(100_000, 1_000_000, num_events))
+    data['px'] = px
+    data['qty'] = qty
+    data['order_id'] = order_id
+    return data
@@ -0,0 +1,163 @@
+"""
+Measures how long it takes from starting a process until the first event of a backtest, split into importing
+:mod:`hftbacktest`, compiling the strategy, and running it, in a fresh process and in a worker forked from a process
+that has called :func:`warmup <hftbacktest.warmup>`.
+
+Usage::
+
+    python benchmarks/startup.py --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from numba import njit, typeof
+
+_IMPORT = 'import time; s = time.perf_counter(); import hftbacktest; print(time.perf_counter() - s)'
+
+_FIRST_EVENT = '''
+import json, sys, time
+s = time.perf_counter()
+import hftbacktest
+import_time = time.perf_counter() - s
+sys.path.insert(0, {bench_dir!r})
+import startup
+print(json.dumps({{'import': import_time, **startup.first_event({feed!r})}}))
+'''
+
+
+def _strategy():
+    @njit
+    def strategy(hbt, recorder):
+        while hbt.elapse(1_000_000) == 0:
+            depth = hbt.depth(0)
+            if depth.best_bid > 0:
+                recorder.record(hbt)
+                return depth.best_bid
+        return 0.0
+
+    return strategy
+
+
+def _backtest(feed: str):
+    from hftbacktest import BacktestAsset, ROIVectorMarketDepthBacktest
+
+    from _feed import LOT_SIZE, TICK_SIZE
+
+    asset = (
+        BacktestAsset()
+            .data([feed])
+            .linear_asset(1.0)
+            .constant_latency(100_000, 100_000)
+            .risk_adverse_queue_model()
+            .no_partial_fill_exchange()
+            .trading_value_fee_model(0.0, 0.0)
+            .tick_size(TICK_SIZE)
+            .lot_size(LOT_SIZE)
+            .roi_lb(0.0)
+            .roi_ub(100_000.0)
+    )
+    return ROIVectorMarketDepthBacktest([asset])
+
+
+def first_event(feed: str, strategy=None) -> dict:
+    """
+    Runs the strategy until the first event and returns the elapsed times of compiling and running it.
+    """
+    from hftbacktest import Recorder
+
+    if strategy is None:
+        strategy = _strategy()
+    hbt = _backtest(feed)
+    recorder = Recorder(1, 1_000)
+
+    s = time.perf_counter()
+    strategy.compile((typeof(hbt), typeof(recorder.recorder)))
+    compile_time = time.perf_counter() - s
+
+    s = time.perf_counter()
+    strategy(hbt, recorder.recorder)
+    run_time = time.perf_counter() - s
+    hbt.close()
+    return {'compile': compile_time, 'run': run_time}
+
+
+def _forked(feed: str, strategy, queue):
+    # hftbacktest is already imported by the parent.
+    queue.put({'import': 0.0, **first_event(feed, strategy)})
+
+
+def _median(samples: list) -> dict:
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--events', type=int, default=100_000)
+    parser.add_argument('--output', help='The JSON file to which the results are written.')
+    args = parser.parse_args()
+
+    bench_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, bench_dir)
+    from _feed import generate_feed
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        feed = os.path.join(tmp_dir, 'feed.npy')
+        np.save(feed, generate_feed(args.events))
+
+        imports = []
+        for _ in range(args.repeat):
+            out = subprocess.run([sys.executable, '-c', _IMPORT], capture_output=True, text=True, check=True)
+            imports.append({'import': float(out.stdout.strip().splitlines()[-1])})
+
+        cold = []
+        for _ in range(args.repeat):
+            out = subprocess.run(
+                [sys.executable, '-c', _FIRST_EVENT.format(bench_dir=bench_dir, feed=feed)],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            cold.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+        from hftbacktest import Recorder, warmup
+
+        strategy = _strategy()
+        s = time.perf_counter()
+        warmup((strategy, (Recorder(1, 1).recorder,)), backtests=('roivec',))
+        warmup_time = time.perf_counter() - s
+
+        ctx = multiprocessing.get_context('fork')
+        warm = []
+        for _ in range(args.repeat):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_forked, args=(feed, strategy, queue))
+            proc.start()
+            warm.append(queue.get())
+            proc.join()
+
+    results = {
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'events': args.events,
+        'import': _median(imports)['import'],
+        'cold': _median(cold),
+        'warmup': warmup_time,
+        'forked_after_warmup': _median(warm),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""
+Measures the throughput of the backtest engine on generated feeds, in events per second, nanoseconds per event, and
+peak resident set size, across the market depth implementations, the queue models, the exchange models, and the
+number of assets. Each case runs in its own process so that its peak RSS is not affected by the other cases.
+
+Usage::
+
+    # Records a baseline.
+    python benchmarks/throughput.py --output baseline.json
+
+    # Compares against the baseline and exits with 1 if any case regresses by more than 10%.
+    python benchmarks/throughput.py --compare baseline.json --threshold 0.1
+
+    # Runs only the cases whose names contain all of the given substrings.
+    python benchmarks/throughput.py --filter roivec --filter risk_adverse
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from numba import njit
+
+from hftbacktest import (
+    ALL_ASSETS,
+    GTX,
+    LIMIT,
+    BacktestAsset,
+    BTreeMarketDepthBacktest,
+    HashMapMarketDepthBacktest,
+    Recorder,
+    ROIVectorMarketDepthBacktest,
+    warmup
+)
+
+DEPTHS = ('hashmap', 'roivec', 'btree')
+QUEUE_MODELS = ('risk_adverse', 'power_prob', 'power_prob_tab', 'power_prob2', 'power_prob3', 'log_prob', 'l3_fifo')
+EXCHANGES = ('no_partial_fill', 'partial_fill')
+NUM_ASSETS = (1, 10, 50)
+
+# The order book of the generated feeds stays within this range of the starting mid price of 50,000.
+_ROI_LB = 40_000.0
+_ROI_UB = 60_000.0
+
+
+@njit
+def _strategy(hbt, recorder) -> int:
+    # Quotes at the best bid and ask of every asset every 100ms, which exercises the order and the queue paths as well
+    # as the feed processing.
+    order_id = 0
+    num_assets = hbt.num_assets
+    while hbt.elapse(100_000_000) == 0:
+        hbt.clear_inactive_orders(ALL_ASSETS)
+        for asset_no in range(num_assets):
+            depth = hbt.depth(asset_no)
+            if depth.best_bid_tick <= 0 or depth.best_ask_tick <= depth.best_bid_tick:
+                continue
+            orders = hbt.orders(asset_no)
+            if len(orders) < 4:
+                order_id += 1
+                hbt.submit_buy_order(asset_no, order_id, depth.best_bid, depth.lot_size, GTX, LIMIT, False)
+                order_id += 1
+                hbt.submit_sell_order(asset_no, order_id, depth.best_ask, depth.lot_size, GTX, LIMIT, False)
+        recorder.record(hbt)
+    return order_id
+
+
+def case_name(depth: str, queue_model: str, exchange: str, num_assets: int) -> str:
+    return f'{depth}-{queue_model}-{exchange}-{num_assets}'
+
+
+def cases() -> List[Dict]:
+    """
+    Returns all cases of the matrix. The Level-3 FIFO queue model is only supported with the no-partial-fill exchange.
+    """
+    out = []
+    for depth, queue_model, exchange, num_assets in itertools.product(DEPTHS, QUEUE_MODELS, EXCHANGES, NUM_ASSETS):
+        if queue_model == 'l3_fifo' and exchange == 'partial_fill':
+            continue
+        out.append({
+            'name': case_name(depth, queue_model, exchange, num_assets),
+            'depth': depth,
+            'queue_model': queue_model,
+            'exchange': exchange,
+            'num_assets': num_assets,
+        })
+    return out
+
+
+def _asset(feed: str, queue_model: str, exchange: str):
+    from _feed import LOT_SIZE, TICK_SIZE
+
+    asset = (
+        BacktestAsset()
+            .data([feed])
+            .linear_asset(1.0)
+            .constant_latency(1_000_000, 1_000_000)
+            .trading_value_fee_model(-0.00005, 0.0007)
+            .tick_size(TICK_SIZE)
+            .lot_size(LOT_SIZE)
+            .roi_lb(_ROI_LB)
+            .roi_ub(_ROI_UB)
+    )
+    if queue_model == 'risk_adverse':
+        asset.risk_adverse_queue_model()
+    elif queue_model == 'power_prob':
+        asset.power_prob_queue_model(2.0)
+    elif queue_model == 'power_prob_tab':
+        asset.power_prob_queue_model(2.0, 1024)
+    elif queue_model == 'power_prob2':
+        asset.power_prob_queue_model2(2.0)
+    elif queue_model == 'power_prob3':
+        asset.power_prob_queue_model3(2.0)
+    elif queue_model == 'log_prob':
+        asset.log_prob_queue_model()
+    elif queue_model == 'l3_fifo':
+        asset.l3_fifo_queue_model()
+    else:
+        raise ValueError(f'Unsupported queue model: {queue_model}')
+    if exchange == 'no_partial_fill':
+        asset.no_partial_fill_exchange()
+    elif exchange == 'partial_fill':
+        asset.partial_fill_exchange()
+    else:
+        raise ValueError(f'Unsupported exchange: {exchange}')
+    return asset
+
+
+def run_case(case: Dict, feeds: List[str]) -> Dict:
+    """
+    Runs the case in the current process and returns its measurements. The strategy is compiled before the
+    measurement begins, and loading the feeds is measured separately from processing them.
+    """
+    assets = [_asset(feed, case['queue_model'], case['exchange']) for feed in feeds]
+    recorder = Recorder(case['num_assets'], 100_000)
+    warmup((_strategy, (recorder.recorder,)), backtests=(case['depth'],))
+
+    start = time.perf_counter()
+    if case['depth'] == 'hashmap':
+        hbt = HashMapMarketDepthBacktest(assets)
+    elif case['depth'] == 'btree':
+        hbt = BTreeMarketDepthBacktest(assets)
+    else:
+        hbt = ROIVectorMarketDepthBacktest(assets)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _strategy(hbt, recorder.recorder)
+    elapsed = time.perf_counter() - start
+    hbt.close()
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        peak_rss *= 1024
+    total_events = sum(len(np.load(feed, mmap_mode='r')) for feed in feeds)
+    return {
+        'events': total_events,
+        'elapsed': elapsed,
+        'load_time': load_time,
+        'events_per_sec': total_events / elapsed,
+        'ns_per_event': elapsed * 1e9 / total_events,
+        'peak_rss_mb': peak_rss / (1024 * 1024),
+    }
+
+
+def _generate_feeds(feed_dir: str, num_assets: int, num_events: int, l3: bool, seed: int) -> List[str]:
+    from _feed import generate_feed, generate_l3_feed
+
+    feeds = []
+    for asset_no in range(num_assets):
+        path = os.path.join(feed_dir, f'{"l3" if l3 else "l2"}_{seed + asset_no}_{num_events}.npy')
+        if not os.path.exists(path):
+            generate = generate_l3_feed if l3 else generate_feed
+            np.save(path, generate(num_events, seed=seed + asset_no))
+        feeds.append(path)
+    return feeds
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compares the results with the baseline and returns the names of the cases whose nanoseconds per event or peak RSS
+    exceed the baseline by more than `threshold`, a fraction of the baseline.
+    """
+    regressions = []
+    print(f'{"case":<40} {"ns/event":>12} {"baseline":>12} {"change":>8} {"rss_mb":>9} {"baseline":>9}')
+    for name, result in results['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f'{name:<40} {result["ns_per_event"]:>12.1f} {"-":>12}')
+            continue
+        change = result['ns_per_event'] / base['ns_per_event'] - 1
+        regressed = (
+            change > threshold
+            or result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + threshold)
+        )
+        print(
+            f'{name:<40} {result["ns_per_event"]:>12.1f} {base["ns_per_event"]:>12.1f} {change:>+8.1%} '
+            f'{result["peak_rss_mb"]:>9.1f} {base["peak_rss_mb"]:>9.1f}{"  REGRESSED" if regressed else ""}'
+        )
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--events',
+        type=int,
+        default=1_000_000,
+        help='The total number of events of each case, split evenly across its assets.'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--filter', action='append', default=[], help='Runs only the cases containing this.')
+    parser.add_argument('--output', help='The JSON file to which the results are written as a baseline.')
+    parser.add_argument('--compare', help='The JSON baseline against which the results are compared.')
+    parser.add_argument('--threshold', type=float, default=0.1, help='The allowed regression as a fraction.')
+    parser.add_argument('--feed-dir', help='The directory in which the generated feeds are kept between runs.')
+    parser.add_argument('--_case', help=argparse.SUPPRESS)
+    parser.add_argument('--_feeds', nargs='*', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    bench_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, bench_dir)
+
+    if args._case is not None:
+        # Runs a single case in this worker process and reports it to the parent.
+        print(json.dumps(run_case(json.loads(args._case), args._feeds)))
+        return 0
+
+    selected = [case for case in cases() if all(f in case['name'] for f in args.filter)]
+    if not selected:
+        raise ValueError('No case matches the filters.')
+
+    import hftbacktest
+
+    results = {
+        'meta': {
+            'hftbacktest': hftbacktest.__version__,
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'events': args.events,
+            'seed': args.seed,
+        },
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        feed_dir = args.feed_dir or tmp_dir
+        os.makedirs(feed_dir, exist_ok=True)
+        for case in selected:
+            feeds = _generate_feeds(
+                feed_dir,
+                case['num_assets'],
+                args.events // case['num_assets'],
+                case['queue_model'] == 'l3_fifo',
+                args.seed
+            )
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--_case', json.dumps(case), '--_feeds', *feeds],
+                capture_output=True,
+                text=True
+            )
+            if out.returncode != 0:
+                print(f'{case["name"]}: failed\n{out.stderr}', file=sys.stderr)
+                continue
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            results['results'][case['name']] = result
+            print(
+                f'{case["name"]:<40} {result["events_per_sec"]:>14,.0f} events/s {result["ns_per_event"]:>9.1f} ns/event '
+                f'{result["peak_rss_mb"]:>9.1f} MB',
+                flush=True
+            )
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {", ".join(regressions)}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,6 @@
+import importlib
+import os
+import tempfile
 from typing import List, Any
 
 import numpy as np
@@ -7,6 +10,7 @@ from ._hftbacktest import (
     BacktestAsset as BacktestAsset_,
     build_hashmap_backtest,
     build_roivec_backtest,
+    build_btree_backtest,
     LiveInstrument
 )
 from .binding import (
@@ -14,6 +18,10 @@ from .binding import (
     HashMapMarketDepthBacktest as HashMapMarketDepthBacktest_TypeHint,
     ROIVectorMarketDepthBacktest_,
     ROIVectorMarketDepthBacktest as ROIVectorMarketDepthBacktest_TypeHint,
+    BTreeMarketDepthBacktest_,
+    BTreeMarketDepthBacktest as BTreeMarketDepthBacktest_TypeHint,
+    OrderTracker_ as OrderTracker,
+    LIVE_FEATURE,
 
     event_dtype
 )
@@ -29,9 +37,14 @@ from .order import (
     GTX,
     LIMIT,
     MARKET,
+    SUBMIT,
+    MODIFY,
+    CANCEL,
 )
 from .recorder import Recorder
 from .types import (
+    depth_level_dtype,
+    order_request_dtype,
     ALL_ASSETS,
     EVENT_ARRAY,
     DEPTH_EVENT,
@@ -46,27 +59,21 @@ from .types import (
     EXCH_EVENT,
     LOCAL_EVENT,
     BUY_EVENT,
-    SELL_EVENT
+    SELL_EVENT,
+    SUB_DEPTH,
+    SUB_BBO,
+    SUB_TRADE,
+    SUB_NEAR_TOUCH,
+    SUB_OTHER,
+    SUB_ALL
 )
-try:
-    from ._hftbacktest import (
-        build_hashmap_livebot,
-        build_roivec_livebot
-    )
-    from .binding import (
-        HashMapMarketDepthLiveBot_,
-        HashMapMarketDepthLiveBot as HashMapMarketDepthLiveBot_TypeHint,
-        ROIVectorMarketDepthLiveBot_,
-        ROIVectorMarketDepthLiveBot as ROIVectorMarketDepthLiveBot_TypeHint,
-    )
-    LIVE_FEATURE = True
-except:
-    LIVE_FEATURE = False
 
 __all__ = (
     'BacktestAsset',
     'HashMapMarketDepthBacktest',
     'ROIVectorMarketDepthBacktest',
+    'BTreeMarketDepthBacktest',
+    'fork_backtest',
 
     'LiveInstrument',
     'HashMapMarketDepthLiveBot',
@@ -91,6 +98,16 @@ __all__ = (
     'BUY_EVENT',
     'SELL_EVENT',
 
+    # Feed subscription classes
+    'SUB_DEPTH',
+    'SUB_BBO',
+    'SUB_TRADE',
+    'SUB_NEAR_TOUCH',
+    'SUB_OTHER',
+    'SUB_ALL',
+
+    'depth_level_dtype',
+
     # Side
     'BUY',
     'SELL',
@@ -108,8 +125,22 @@ __all__ = (
 
     'LIMIT',
     'MARKET',
-    
-    'Recorder'
+
+    # Batch order actions
+    'SUBMIT',
+    'MODIFY',
+    'CANCEL',
+    'order_request_dtype',
+
+    'Recorder',
+    'OrderTracker',
+
+    'run_many',
+    'run_days',
+    'build_eod_snapshots',
+    'stitch_records',
+    'SharedFeeds',
+    'warmup'
 )
 
 __version__ = '2.4.2'
@@ -120,22 +151,35 @@ class BacktestAsset(BacktestAsset_):
         self._add_data_ndarray(data.ctypes.data, len(data))
         return self
 
-    def data(self, data: str | List[str] | EVENT_ARRAY | List[EVENT_ARRAY]):
+    def data(self, data: str | List[str] | EVENT_ARRAY | List[EVENT_ARRAY], mmap: bool = False):
         """
         Sets the feed data.
 
         Args:
             data: A list of file paths for the feed data in `.npz` format, or a list of NumPy arrays containing the feed
-                  data.
+                  data. Files ending with :data:`COMPACT_NPZ_SUFFIX <hftbacktest.data.COMPACT_NPZ_SUFFIX>`, written by
+                  :func:`write_compact_npz <hftbacktest.data.write_compact_npz>`, are decoded from the compact form as
+                  they are loaded. Parquet and Arrow IPC files, ending with one of
+                  :data:`PARQUET_SUFFIXES <hftbacktest.data.PARQUET_SUFFIXES>` and
+                  :data:`IPC_SUFFIXES <hftbacktest.data.IPC_SUFFIXES>`, are decoded immediately by
+                  :func:`read_arrow_feed <hftbacktest.data.read_arrow_feed>`, skipping the row groups outside the
+                  time window set by :meth:`start_time` and :meth:`end_time` beforehand, into temporary `.npy`
+                  files, which are then loaded one at a time like any other file. The temporary files are removed
+                  when the asset is garbage collected, so the asset must be kept alive during the backtest.
+            mmap: If `True`, uncompressed `.npy` files, including those decoded from Parquet and Arrow IPC files, are
+                  memory-mapped instead of being read into memory, so the backtest can start immediately and the
+                  page cache is shared by every process reading the same file. `.npz` files are not affected, and
+                  the files are read into memory anyway if :meth:`latency_offset` is set, since the adjustment
+                  rewrites every row.
         """
         if isinstance(data, str):
-            self.add_file(data)
+            self._add_file(data, mmap)
         elif isinstance(data, np.ndarray):
             self.add_data(data)
         elif isinstance(data, list):
             for item in data:
                 if isinstance(item, str):
-                    self.add_file(item)
+                    self._add_file(item, mmap)
                 elif isinstance(item, np.ndarray):
                     self.add_data(item)
                 else:
@@ -144,6 +188,48 @@ class BacktestAsset(BacktestAsset_):
             raise ValueError
         return self
 
+    def _add_file(self, file: str, mmap: bool):
+        from .data.arrow import IPC_SUFFIXES, PARQUET_SUFFIXES, read_arrow_feed
+
+        if mmap and file.endswith('.npy'):
+            self.add_mmap_file(file)
+        elif file.endswith(PARQUET_SUFFIXES + IPC_SUFFIXES):
+            # Decodes the file straight into a temporary .npy file rather than into memory, so that the reader loads
+            # the decoded files in turn instead of all of them being held in memory for the whole backtest.
+            if not hasattr(self, '_feed_dir'):
+                self._feed_dir = tempfile.TemporaryDirectory(prefix='hftbacktest_feed_', ignore_cleanup_errors=True)
+                self._num_feed_files = 0
+            path = os.path.join(self._feed_dir.name, f'{self._num_feed_files}.npy')
+            self._num_feed_files += 1
+            # The returned memory map is closed right away; the reader opens the file when it is needed.
+            start_time = getattr(self, '_start_time', None)
+            end_time = getattr(self, '_end_time', None)
+            read_arrow_feed(file, start_time, end_time, output_filename=path)
+            if mmap:
+                self.add_mmap_file(path)
+            else:
+                self.add_file(path)
+        else:
+            self.add_file(file)
+
+    def start_time(self, start_time: int):
+        """
+        Sets the start of the time window to be backtested. See the method of the same name of the base class.
+        Parquet and Arrow IPC files given to :meth:`data` afterwards are pruned by it.
+        """
+        super().start_time(start_time)
+        self._start_time = start_time
+        return self
+
+    def end_time(self, end_time: int):
+        """
+        Sets the end of the time window to be backtested. See the method of the same name of the base class.
+        Parquet and Arrow IPC files given to :meth:`data` afterwards are pruned by it.
+        """
+        super().end_time(end_time)
+        self._end_time = end_time
+        return self
+
     def intp_order_latency(self, data: str | NDArray | List[str], latency_offset: int = 0):
         """
         Uses `IntpOrderLatency <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.IntpOrderLatency.html>`_
@@ -152,6 +238,10 @@ class BacktestAsset(BacktestAsset_):
         The units of the historical latencies should match the timestamp units of your data.
         Nanoseconds are typically used in HftBacktest.
 
+        The NumPy array can also be in the compact form of
+        :data:`compact_order_latency_dtype <hftbacktest.data.compact_order_latency_dtype>`, in which case it is read
+        as it is, like with :meth:`compact_intp_order_latency`.
+
         Args:
             data: A list of file paths for the historical order latency data in `npz`, or a NumPy array of the
                   historical order latency data.
@@ -163,13 +253,42 @@ class BacktestAsset(BacktestAsset_):
         if isinstance(data, str):
             super().intp_order_latency([data], latency_offset)
         elif isinstance(data, np.ndarray):
-            self._intp_order_latency_ndarray(data.ctypes.data, len(data), latency_offset)
+            from .data.latency import compact_order_latency_dtype
+
+            if data.dtype == compact_order_latency_dtype:
+                self._compact_intp_order_latency_ndarray(data.ctypes.data, len(data), latency_offset)
+            else:
+                self._intp_order_latency_ndarray(data.ctypes.data, len(data), latency_offset)
         elif isinstance(data, list):
             super().intp_order_latency(data, latency_offset)
         else:
             raise ValueError
         return self
 
+    def compact_intp_order_latency(self, data: str | NDArray | List[str], latency_offset: int = 0):
+        """
+        Uses `IntpOrderLatency <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.IntpOrderLatency.html>`_
+        for the order latency model, with the historical order latency data in the compact form of
+        :data:`compact_order_latency_dtype <hftbacktest.data.compact_order_latency_dtype>`, which takes half the
+        space of the full form. The data is read as it is, without being converted back into the full form.
+        :func:`to_compact_order_latency <hftbacktest.data.to_compact_order_latency>` converts the data into it.
+
+        Args:
+            data: A list of file paths for the historical order latency data in the compact form in `npz`, or a
+                  NumPy array of it.
+            latency_offset: the latency offset to adjust the order entry and response latency by the
+                            specified amount.
+        """
+        if isinstance(data, str):
+            super().compact_intp_order_latency([data], latency_offset)
+        elif isinstance(data, np.ndarray):
+            self._compact_intp_order_latency_ndarray(data.ctypes.data, len(data), latency_offset)
+        elif isinstance(data, list):
+            super().compact_intp_order_latency(data, latency_offset)
+        else:
+            raise ValueError
+        return self
+
     def initial_snapshot(self, data: str | np.ndarray[Any, event_dtype]):
         """
         Sets the initial snapshot.
@@ -218,10 +337,131 @@ def ROIVectorMarketDepthBacktest(
     return ROIVectorMarketDepthBacktest_(ptr)
 
 
+def BTreeMarketDepthBacktest(
+        assets: List[BacktestAsset]
+) -> BTreeMarketDepthBacktest_TypeHint:
+    """
+    Constructs an instance of `BTreeMarketDepthBacktest`, whose market depth keeps the populated price levels in
+    B-trees. Unlike `ROIVectorMarketBacktest`, it needs no range of interest, and unlike `HashMapMarketDepthBacktest`,
+    it finds the next best price after a level is removed and walks the top levels in `O(log n)`, which suits sparse
+    books spanning a wide price range.
+
+    Args:
+        assets: A list of backtesting assets constructed using :class:`BacktestAsset`.
+
+    Returns:
+        A jit`ed `BTreeMarketDepthBacktest` that can be used in an ``njit`` function.
+    """
+    ptr = build_btree_backtest(assets)
+    return BTreeMarketDepthBacktest_(ptr)
+
+
+def fork_backtest(
+        hbt: HashMapMarketDepthBacktest_TypeHint
+             | ROIVectorMarketDepthBacktest_TypeHint
+             | BTreeMarketDepthBacktest_TypeHint,
+        n: int = 1
+) -> List[
+    HashMapMarketDepthBacktest_TypeHint | ROIVectorMarketDepthBacktest_TypeHint | BTreeMarketDepthBacktest_TypeHint
+]:
+    """
+    Forks the backtest into `n` copies in its current state, including the market depth, the open orders with their
+    queue positions, the orders in transit, the state values, the latency models, and the read position of the data.
+    This allows several variants of a strategy to be continued from the same point, such as after a long warm-up,
+    without replaying it for each variant.
+
+    The copies share the loaded data with the original backtest, so they must all be used on the same thread, and each
+    copy must be closed separately. Backtests with the level-3 exchange models or with ``chunk_size`` set cannot be
+    forked.
+
+    **Example**
+
+    .. code-block:: python
+
+        hbt = ROIVectorMarketDepthBacktest([asset])
+        warm_up(hbt)
+
+        for params, forked in zip(variants, fork_backtest(hbt, len(variants))):
+            recorder = Recorder(1, 1_000_000)
+            strategy(forked, recorder.recorder, params)
+            forked.close()
+
+    Args:
+        hbt: The backtest to fork.
+        n: The number of copies.
+
+    Returns:
+        The forked backtests.
+    """
+    if isinstance(hbt, HashMapMarketDepthBacktest_):
+        cls = HashMapMarketDepthBacktest_
+    elif isinstance(hbt, ROIVectorMarketDepthBacktest_):
+        cls = ROIVectorMarketDepthBacktest_
+    elif isinstance(hbt, BTreeMarketDepthBacktest_):
+        cls = BTreeMarketDepthBacktest_
+    else:
+        raise ValueError('Unsupported backtest.')
+    forked = []
+    for _ in range(n):
+        ptr = hbt._fork()
+        if ptr is None or ptr == 0:
+            raise RuntimeError('The backtest cannot be forked.')
+        forked.append(cls(ptr))
+    return forked
+
+
+# The process runners and the warm-up are loaded on first access, so that importing the package does not pay for them.
+_lazy_attributes = {
+    'run_many': ('.runner', 'run_many'),
+    'run_days': ('.runner', 'run_days'),
+    'build_eod_snapshots': ('.runner', 'build_eod_snapshots'),
+    'stitch_records': ('.runner', 'stitch_records'),
+    'SharedFeeds': ('.runner', 'SharedFeeds'),
+    'warmup': ('._warmup', 'warmup'),
+}
+
+# The live bot bindings are loaded on first access, so that backtesting does not pay for them at import time.
+_live_bindings = {
+    'build_hashmap_livebot': ('._hftbacktest', 'build_hashmap_livebot'),
+    'build_roivec_livebot': ('._hftbacktest', 'build_roivec_livebot'),
+    'HashMapMarketDepthLiveBot_': ('.live_binding', 'HashMapMarketDepthLiveBot_'),
+    'HashMapMarketDepthLiveBot_TypeHint': ('.live_binding', 'HashMapMarketDepthLiveBot'),
+    'ROIVectorMarketDepthLiveBot_': ('.live_binding', 'ROIVectorMarketDepthLiveBot_'),
+    'ROIVectorMarketDepthLiveBot_TypeHint': ('.live_binding', 'ROIVectorMarketDepthLiveBot'),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _lazy_attributes or (LIVE_FEATURE and name in _live_bindings):
+        module, attr = _lazy_attributes.get(name) or _live_bindings[name]
+        value = getattr(importlib.import_module(module, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 if LIVE_FEATURE:
+    def HashMapMarketDepthLiveBot(
+            assets: List[LiveInstrument]
+    ) -> 'HashMapMarketDepthLiveBot_TypeHint':
+        """
+        Constructs an instance of `HashMapMarketDepthLiveBot`.
+
+        Args:
+            assets: A list of live instruments constructed using :class:`LiveInstrument`.
+
+        Returns:
+            A jit`ed `HashMapMarketDepthLiveBot` that can be used in an ``njit`` function.
+        """
+        from ._hftbacktest import build_hashmap_livebot
+        from .live_binding import HashMapMarketDepthLiveBot_
+
+        ptr = build_hashmap_livebot(assets)
+        return HashMapMarketDepthLiveBot_(ptr)
+
     def ROIVectorMarketDepthLiveBot(
             assets: List[LiveInstrument]
-    ) -> ROIVectorMarketDepthLiveBot_TypeHint:
+    ) -> 'ROIVectorMarketDepthLiveBot_TypeHint':
         """
         Constructs an instance of `ROIVectorMarketDepthLiveBot`.
 
@@ -231,5 +471,8 @@ if LIVE_FEATURE:
         Returns:
             A jit`ed `ROIVectorMarketDepthLiveBot` that can be used in an ``njit`` function.
         """
+        from ._hftbacktest import build_roivec_livebot
+        from .live_binding import ROIVectorMarketDepthLiveBot_
+
         ptr = build_roivec_livebot(assets)
         return ROIVectorMarketDepthLiveBot_(ptr)
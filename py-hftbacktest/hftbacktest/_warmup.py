@@ -0,0 +1,124 @@
+from typing import Any, Callable, Literal, Sequence, Tuple, Union
+
+import numpy as np
+from numba import njit, typeof
+from numba.core.types import Type
+
+from .binding import BTreeMarketDepthBacktest_, HashMapMarketDepthBacktest_, ROIVectorMarketDepthBacktest_
+from .order import GTC, LIMIT
+from .recorder import Recorder_
+from .types import ALL_ASSETS, order_request_dtype
+
+_backtests = {
+    'hashmap': HashMapMarketDepthBacktest_,
+    'roivec': ROIVectorMarketDepthBacktest_,
+    'btree': BTreeMarketDepthBacktest_,
+}
+
+
+@njit
+def _touch(hbt, recorder):
+    # Only compiled, never run, so that the methods most strategies use are compiled ahead of the strategy itself.
+    hbt.current_timestamp
+    hbt.num_assets
+
+    depth = hbt.depth(0)
+    depth.best_bid_tick
+    depth.best_ask_tick
+    depth.best_bid
+    depth.best_ask
+    depth.best_bid_qty
+    depth.best_ask_qty
+    depth.tick_size
+    depth.lot_size
+    depth.bid_qty_at_tick(0)
+    depth.ask_qty_at_tick(0)
+
+    hbt.position(0)
+    state_values = hbt.state_values(0)
+    state_values.position
+    state_values.balance
+    state_values.fee
+    state_values.num_trades
+    state_values.trading_volume
+    state_values.trading_value
+
+    hbt.last_trades(0)
+    hbt.clear_last_trades(ALL_ASSETS)
+
+    orders = hbt.orders(0)
+    values = orders.values()
+    values.next()
+    orders.get(0)
+    len(orders)
+    0 in orders
+    hbt.clear_inactive_orders(ALL_ASSETS)
+
+    hbt.submit_buy_order(0, 0, 0.0, 0.0, GTC, LIMIT, False)
+    hbt.submit_sell_order(0, 0, 0.0, 0.0, GTC, LIMIT, False)
+    hbt.modify(0, 0, 0.0, 0.0, False)
+    hbt.cancel(0, 0, False)
+    hbt.submit_batch(0, np.zeros(0, order_request_dtype), np.zeros(0, np.int64), False)
+    hbt.wait_order_response(0, 0, 0)
+    hbt.wait_next_feed(False, 0)
+    hbt.subscribe(0, 0, 0)
+    hbt.last_wake()
+    hbt.elapse(0)
+    hbt.elapse_bt(0)
+    hbt.feed_latency(0)
+    hbt.order_latency(0)
+
+    recorder.record(hbt)
+
+
+def warmup(
+        *strategies: Union[Callable[..., Any], Tuple[Callable[..., Any], Sequence[Any]]],
+        backtests: Sequence[Literal['hashmap', 'roivec', 'btree']] = ('hashmap', 'roivec')
+):
+    """
+    Compiles the methods of the backtest bindings that strategies commonly use, and the given strategies, ahead of
+    time without running them, so that the first backtest does not pay for the compilation before its first event.
+
+    The compiled code lives in the current process. Compiled functions cannot be cached on disk, because the bindings
+    call into the native library through ctypes function pointers, which Numba treats as dynamic globals, and because
+    a jitclass instance type is unique to the process in which it is defined. Instead, warming up once in the parent
+    process lets every worker process forked from it, such as the workers of :func:`run_many
+    <hftbacktest.runner.run_many>` and :func:`run_days <hftbacktest.runner.run_days>` under the ``fork`` start method,
+    skip the compilation entirely.
+
+    **Example**
+
+    .. code-block:: python
+
+        from hftbacktest import Recorder, run_many, warmup
+
+        @njit
+        def strategy(hbt, recorder):
+            ...
+
+        if __name__ == '__main__':
+            warmup((strategy, (Recorder(1, 1).recorder,)), backtests=('roivec',))
+            results = run_many(strategy, jobs)
+
+    Args:
+        strategies: The ``njit`` strategies to compile. Each is either a function whose only argument is the backtest,
+                    or a tuple of the function and the example values or Numba types of the arguments following the
+                    backtest.
+        backtests: The backtests for which the methods and the strategies are compiled. ``'hashmap'`` stands for
+                   :func:`HashMapMarketDepthBacktest <hftbacktest.HashMapMarketDepthBacktest>`, ``'roivec'`` for
+                   :func:`ROIVectorMarketDepthBacktest <hftbacktest.ROIVectorMarketDepthBacktest>`, and ``'btree'``
+                   for :func:`BTreeMarketDepthBacktest <hftbacktest.BTreeMarketDepthBacktest>`.
+    """
+    recorder_type = Recorder_.class_type.instance_type
+    for backtest in backtests:
+        if backtest not in _backtests:
+            raise ValueError(f'Unsupported backtest: {backtest}')
+        hbt_type = _backtests[backtest].class_type.instance_type
+        _touch.compile((hbt_type, recorder_type))
+
+        for strategy in strategies:
+            if isinstance(strategy, tuple):
+                func, args = strategy
+            else:
+                func, args = strategy, ()
+            func.compile((hbt_type,) + tuple(arg if isinstance(arg, Type) else typeof(arg) for arg in args))
@@ -12,6 +12,7 @@ from typing import Tuple, Any
 
 import numba
 import numpy as np
+from numpy.typing import NDArray
 from numba import (
     carray,
     uint64,
@@ -27,7 +28,18 @@ from . import _hftbacktest
 from .intrinsic import ptr_from_val, address_as_void_pointer, val_from_ptr, is_null_ptr
 from .order import order_dtype, Order, Order_
 from .state import StateValues, StateValues_
-from .types import event_dtype, state_values_dtype, EVENT_ARRAY, DEPTH_EVENT, BUY_EVENT, SELL_EVENT
+from .types import (
+    event_dtype,
+    state_values_dtype,
+    EVENT_ARRAY,
+    ORDER_ARRAY,
+    DEPTH_LEVEL_ARRAY,
+    RECORD_ARRAY,
+    ORDER_REQUEST_ARRAY,
+    DEPTH_EVENT,
+    BUY_EVENT,
+    SELL_EVENT
+)
 
 LIVE_FEATURE = 'build_hashmap_livebot' in dir(_hftbacktest)
 
@@ -81,6 +93,14 @@ hashmapdepth_snapshot_free = lib.hashmapdepth_snapshot_free
 hashmapdepth_snapshot_free.restype = c_void_p
 hashmapdepth_snapshot_free.argtypes = [c_void_p, c_uint64]
 
+hashmapdepth_bid_levels = lib.hashmapdepth_bid_levels
+hashmapdepth_bid_levels.restype = c_uint64
+hashmapdepth_bid_levels.argtypes = [c_void_p, c_void_p, c_uint64]
+
+hashmapdepth_ask_levels = lib.hashmapdepth_ask_levels
+hashmapdepth_ask_levels.restype = c_uint64
+hashmapdepth_ask_levels.argtypes = [c_void_p, c_void_p, c_uint64]
+
 
 class HashMapMarketDepth:
     ptr: voidptr
@@ -181,6 +201,35 @@ class HashMapMarketDepth:
     def snapshot_free(self, arr: EVENT_ARRAY):
         hashmapdepth_snapshot_free(arr.ctypes.data, len(arr))
 
+    def top_levels(self, n: uint64, out: DEPTH_LEVEL_ARRAY) -> Tuple[uint64, uint64]:
+        """
+        Writes the best `n` price levels on each side into the caller-owned buffer in a single call. Unlike
+        :func:`snapshot`, nothing is allocated, so the same buffer can be reused on every step.
+
+        **Example**
+
+        .. code-block:: python
+
+            levels = np.zeros((2, 5), depth_level_dtype)
+            num_bids, num_asks = depth.top_levels(5, levels)
+            bid_qty = levels[0, :num_bids].qty.sum()
+            ask_qty = levels[1, :num_asks].qty.sum()
+
+        Args:
+            n: The number of price levels to retrieve per side.
+            out: A 2-D array of :data:`depth_level_dtype <hftbacktest.types.depth_level_dtype>` whose shape is at least
+                 `(2, n)`. `out[0]` receives the bid levels from the best bid downward, and `out[1]` receives the ask
+                 levels from the best ask upward.
+
+        Returns:
+            The numbers of bid and ask levels written. The elements beyond these counts are left untouched.
+        """
+        if out.shape[0] < 2 or out.shape[1] < n:
+            raise ValueError
+        num_bids = hashmapdepth_bid_levels(self.ptr, out[0].ctypes.data, n)
+        num_asks = hashmapdepth_ask_levels(self.ptr, out[1].ctypes.data, n)
+        return num_bids, num_asks
+
 
 HashMapMarketDepth_ = jitclass(HashMapMarketDepth)
 
@@ -241,6 +290,10 @@ roivecdepth_roi_ub_tick = lib.roivecdepth_roi_ub_tick
 roivecdepth_roi_ub_tick.restype = c_int64
 roivecdepth_roi_ub_tick.argtypes = [c_void_p]
 
+roivecdepth_roi_offset = lib.roivecdepth_roi_offset
+roivecdepth_roi_offset.restype = c_uint64
+roivecdepth_roi_offset.argtypes = [c_void_p]
+
 
 class ROIVectorMarketDepth:
     ptr: voidptr
@@ -334,8 +387,9 @@ class ROIVectorMarketDepth:
         Returns the bid market depth array, which contains the quantity at each price. Its length is
         `ROI upper bound in ticks + 1 - ROI lower bound in ticks`, the array contains the quantities at prices from
         the ROI lower bound to the ROI upper bound. The index is calculated as
-        `price in ticks - ROI lower bound in ticks`. Respectively, the price is
-        `(index + ROI lower bound in ticks) * tick_size`.
+        `(price in ticks - ROI lower bound in ticks + ROI offset) % length`, where the :attr:`roi_offset` is always
+        zero unless the range of interest follows the mid-price. Respectively, the price is
+        `((index - ROI offset) % length + ROI lower bound in ticks) * tick_size`.
         """
         length = uint64(0)
         len_ptr = ptr_from_val(length)
@@ -352,8 +406,9 @@ class ROIVectorMarketDepth:
         Returns the ask market depth array, which contains the quantity at each price. Its length is
         `ROI upper bound in ticks + 1 - ROI lower bound in ticks`, the array contains the quantities at prices from
         the ROI lower bound to the ROI upper bound. The index is calculated as
-        `price in ticks - ROI lower bound in ticks`. Respectively, the price is
-        `(index + ROI lower bound in ticks) * tick_size`.
+        `(price in ticks - ROI lower bound in ticks + ROI offset) % length`, where the :attr:`roi_offset` is always
+        zero unless the range of interest follows the mid-price. Respectively, the price is
+        `((index - ROI offset) % length + ROI lower bound in ticks) * tick_size`.
         """
         length = uint64(0)
         len_ptr = ptr_from_val(length)
@@ -378,9 +433,211 @@ class ROIVectorMarketDepth:
         """
         return roivecdepth_roi_ub_tick(self.ptr)
 
+    @property
+    def roi_offset(self) -> uint64:
+        """
+        Returns the index in the depth arrays at which the quantity at the ROI lower bound is stored. It is always zero
+        unless the range of interest follows the mid-price, set by :meth:`BacktestAsset.roi_width
+        <hftbacktest.BacktestAsset.roi_width>`, in which case the depth arrays act as ring buffers and the range of
+        interest moves as the mid-price drifts.
+        """
+        return roivecdepth_roi_offset(self.ptr)
+
 
 ROIVectorMarketDepth_ = jitclass(ROIVectorMarketDepth)
 
+
+btreedepth_best_bid_tick = lib.btreedepth_best_bid_tick
+btreedepth_best_bid_tick.restype = c_int64
+btreedepth_best_bid_tick.argtypes = [c_void_p]
+
+btreedepth_best_ask_tick = lib.btreedepth_best_ask_tick
+btreedepth_best_ask_tick.restype = c_int64
+btreedepth_best_ask_tick.argtypes = [c_void_p]
+
+btreedepth_best_bid = lib.btreedepth_best_bid
+btreedepth_best_bid.restype = c_double
+btreedepth_best_bid.argtypes = [c_void_p]
+
+btreedepth_best_ask = lib.btreedepth_best_ask
+btreedepth_best_ask.restype = c_double
+btreedepth_best_ask.argtypes = [c_void_p]
+
+btreedepth_best_bid_qty = lib.btreedepth_best_bid_qty
+btreedepth_best_bid_qty.restype = c_double
+btreedepth_best_bid_qty.argtypes = [c_void_p]
+
+btreedepth_best_ask_qty = lib.btreedepth_best_ask_qty
+btreedepth_best_ask_qty.restype = c_double
+btreedepth_best_ask_qty.argtypes = [c_void_p]
+
+btreedepth_tick_size = lib.btreedepth_tick_size
+btreedepth_tick_size.restype = c_double
+btreedepth_tick_size.argtypes = [c_void_p]
+
+btreedepth_lot_size = lib.btreedepth_lot_size
+btreedepth_lot_size.restype = c_double
+btreedepth_lot_size.argtypes = [c_void_p]
+
+btreedepth_bid_qty_at_tick = lib.btreedepth_bid_qty_at_tick
+btreedepth_bid_qty_at_tick.restype = c_double
+btreedepth_bid_qty_at_tick.argtypes = [c_void_p, c_int64]
+
+btreedepth_ask_qty_at_tick = lib.btreedepth_ask_qty_at_tick
+btreedepth_ask_qty_at_tick.restype = c_double
+btreedepth_ask_qty_at_tick.argtypes = [c_void_p, c_int64]
+
+btreedepth_snapshot = lib.btreedepth_snapshot
+btreedepth_snapshot.restype = c_void_p
+btreedepth_snapshot.argtypes = [c_void_p, POINTER(c_uint64)]
+
+btreedepth_snapshot_free = lib.btreedepth_snapshot_free
+btreedepth_snapshot_free.restype = c_void_p
+btreedepth_snapshot_free.argtypes = [c_void_p, c_uint64]
+
+btreedepth_bid_levels = lib.btreedepth_bid_levels
+btreedepth_bid_levels.restype = c_uint64
+btreedepth_bid_levels.argtypes = [c_void_p, c_void_p, c_uint64]
+
+btreedepth_ask_levels = lib.btreedepth_ask_levels
+btreedepth_ask_levels.restype = c_uint64
+btreedepth_ask_levels.argtypes = [c_void_p, c_void_p, c_uint64]
+
+
+class BTreeMarketDepth:
+    ptr: voidptr
+
+    def __init__(self, ptr: voidptr):
+        self.ptr = ptr
+
+    @property
+    def best_bid_tick(self) -> int64:
+        """
+        Returns the best bid price in ticks.
+        """
+        return btreedepth_best_bid_tick(self.ptr)
+
+    @property
+    def best_ask_tick(self) -> int64:
+        """
+        Returns the best ask price in ticks.
+        """
+        return btreedepth_best_ask_tick(self.ptr)
+
+    @property
+    def best_bid(self) -> float64:
+        """
+        Returns the best bid price.
+        """
+        return btreedepth_best_bid(self.ptr)
+
+    @property
+    def best_ask(self) -> float64:
+        """
+        Returns the best ask price.
+        """
+        return btreedepth_best_ask(self.ptr)
+
+    @property
+    def best_bid_qty(self) -> float64:
+        """
+        Returns the quantity at the best bid price.
+        """
+        return btreedepth_best_bid_qty(self.ptr)
+
+    @property
+    def best_ask_qty(self) -> float64:
+        """
+        Returns the quantity at the best ask price.
+        """
+        return btreedepth_best_ask_qty(self.ptr)
+
+    @property
+    def tick_size(self) -> float64:
+        """
+        Returns the tick size.
+        """
+        return btreedepth_tick_size(self.ptr)
+
+    @property
+    def lot_size(self) -> float64:
+        """
+        Returns the lot size.
+        """
+        return btreedepth_lot_size(self.ptr)
+
+    def bid_qty_at_tick(self, price_tick: int64) -> float64:
+        """
+        Returns the quantity at the bid market depth for a given price in ticks.
+
+        Args:
+            price_tick: Price in ticks.
+
+        Returns:
+            The quantity at the specified price.
+        """
+        return btreedepth_bid_qty_at_tick(self.ptr, price_tick)
+
+    def ask_qty_at_tick(self, price_tick: int64) -> float64:
+        """
+        Returns the quantity at the ask market depth for a given price in ticks.
+
+        Args:
+            price_tick: Price in ticks.
+
+        Returns:
+            The quantity at the specified price.
+        """
+        return btreedepth_ask_qty_at_tick(self.ptr, price_tick)
+
+    def snapshot(self) -> EVENT_ARRAY:
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = btreedepth_snapshot(self.ptr, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            event_dtype
+        )
+
+    def snapshot_free(self, arr: EVENT_ARRAY):
+        btreedepth_snapshot_free(arr.ctypes.data, len(arr))
+
+    def top_levels(self, n: uint64, out: DEPTH_LEVEL_ARRAY) -> Tuple[uint64, uint64]:
+        """
+        Writes the best `n` price levels on each side into the caller-owned buffer in a single call. Unlike
+        :func:`snapshot`, nothing is allocated, so the same buffer can be reused on every step.
+
+        The levels are walked in price order over the populated levels only, so this takes `O(log m + n)`, where `m` is
+        the number of populated levels, no matter how far apart the levels are.
+
+        **Example**
+
+        .. code-block:: python
+
+            levels = np.zeros((2, 5), depth_level_dtype)
+            num_bids, num_asks = depth.top_levels(5, levels)
+            bid_qty = levels[0, :num_bids].qty.sum()
+            ask_qty = levels[1, :num_asks].qty.sum()
+
+        Args:
+            n: The number of price levels to retrieve per side.
+            out: A 2-D array of :data:`depth_level_dtype <hftbacktest.types.depth_level_dtype>` whose shape is at least
+                 `(2, n)`. `out[0]` receives the bid levels from the best bid downward, and `out[1]` receives the ask
+                 levels from the best ask upward.
+
+        Returns:
+            The numbers of bid and ask levels written. The elements beyond these counts are left untouched.
+        """
+        if out.shape[0] < 2 or out.shape[1] < n:
+            raise ValueError
+        num_bids = btreedepth_bid_levels(self.ptr, out[0].ctypes.data, n)
+        num_asks = btreedepth_ask_levels(self.ptr, out[1].ctypes.data, n)
+        return num_bids, num_asks
+
+
+BTreeMarketDepth_ = jitclass(BTreeMarketDepth)
+
 orders_get = lib.orders_get
 orders_get.restype = c_void_p
 orders_get.argtypes = [c_void_p, c_uint64]
@@ -401,6 +658,22 @@ orders_values_next = lib.orders_values_next
 orders_values_next.restype = c_void_p
 orders_values_next.argtypes = [c_void_p]
 
+orders_copy = lib.orders_copy
+orders_copy.restype = c_uint64
+orders_copy.argtypes = [c_void_p, c_void_p, c_uint64]
+
+orders_tracker_new = lib.orders_tracker_new
+orders_tracker_new.restype = c_void_p
+orders_tracker_new.argtypes = []
+
+orders_tracker_free = lib.orders_tracker_free
+orders_tracker_free.restype = c_void_p
+orders_tracker_free.argtypes = [c_void_p]
+
+orders_copy_changed = lib.orders_copy_changed
+orders_copy_changed.restype = c_uint64
+orders_copy_changed.argtypes = [c_void_p, c_void_p, c_void_p, c_uint64]
+
 
 class Values:
     ptr: voidptr
@@ -463,6 +736,28 @@ class Values:
 Values_ = jitclass(Values)
 
 
+class OrderTracker:
+    """
+    Tracks the orders copied by :meth:`OrderDict.copy_changed_into` so that only the orders that have changed since
+    the last call are copied. A tracker should be used with the orders of a single asset.
+    """
+    ptr: voidptr
+
+    def __init__(self):
+        self.ptr = orders_tracker_new()
+
+    def close(self) -> None:
+        """
+        Releases resources associated with this `OrderTracker` instance.
+
+        This method must be called to free the underlying memory allocated by the native implementation.
+        """
+        orders_tracker_free(self.ptr)
+
+
+OrderTracker_ = jitclass(OrderTracker)
+
+
 class OrderDict:
     """
     This is a wrapper for the order dictionary. It only supports :func:`get` method, ``in`` operator through
@@ -526,6 +821,58 @@ class OrderDict:
             )
             return Order_(arr)
 
+    def copy_into(self, out: ORDER_ARRAY) -> uint64:
+        """
+        Copies the orders into the preallocated array in a single call, rather than wrapping each order while
+        iterating, so that the orders can be processed as an array.
+
+        **Example**
+
+        .. code-block:: python
+
+            orders = np.empty(100, order_dtype)
+            while hbt.elapse(100_000_000) == 0:
+                n = hbt.orders(0).copy_into(orders)
+                open_orders = orders[:n]
+                buy_orders = open_orders[open_orders.side == BUY]
+                # ...
+
+        Args:
+            out: The array of :data:`order_dtype <hftbacktest.types.order_dtype>` into which the orders are copied.
+
+        Returns:
+            The number of orders copied, which is at most the length of `out`.
+        """
+        return orders_copy(self.ptr, out.ctypes.data, len(out))
+
+    def copy_changed_into(self, tracker: OrderTracker, out: ORDER_ARRAY) -> uint64:
+        """
+        Copies only the orders that are new or whose status, request status, or leaves quantity has changed since they
+        were last copied with the given tracker into the preallocated array. The orders that do not fit are copied by
+        the next call.
+
+        **Example**
+
+        .. code-block:: python
+
+            tracker = OrderTracker()
+            changed = np.empty(100, order_dtype)
+            while hbt.elapse(100_000_000) == 0:
+                n = hbt.orders(0).copy_changed_into(tracker, changed)
+                for i in range(n):
+                    if changed[i].status == FILLED:
+                        # ...
+            tracker.close()
+
+        Args:
+            tracker: The tracker of the orders last copied.
+            out: The array of :data:`order_dtype <hftbacktest.types.order_dtype>` into which the orders are copied.
+
+        Returns:
+            The number of orders copied, which is at most the length of `out`.
+        """
+        return orders_copy_changed(self.ptr, tracker.ptr, out.ctypes.data, len(out))
+
     def __len__(self) -> uint64:
         return orders_len(self.ptr)
 
@@ -557,6 +904,14 @@ hashmapbt_wait_next_feed = lib.hashmapbt_wait_next_feed
 hashmapbt_wait_next_feed.restype = c_int64
 hashmapbt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
 
+hashmapbt_subscribe = lib.hashmapbt_subscribe
+hashmapbt_subscribe.restype = c_void_p
+hashmapbt_subscribe.argtypes = [c_void_p, c_uint64, c_uint8, c_int64]
+
+hashmapbt_last_wake = lib.hashmapbt_last_wake
+hashmapbt_last_wake.restype = c_bool
+hashmapbt_last_wake.argtypes = [c_void_p, POINTER(c_uint64), POINTER(c_uint64)]
+
 hashmapbt_close = lib.hashmapbt_close
 hashmapbt_close.restype = c_int64
 hashmapbt_close.argtypes = [c_void_p]
@@ -615,6 +970,10 @@ hashmapbt_cancel = lib.hashmapbt_cancel
 hashmapbt_cancel.restype = c_int64
 hashmapbt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
 
+hashmapbt_submit_batch = lib.hashmapbt_submit_batch
+hashmapbt_submit_batch.restype = c_int64
+hashmapbt_submit_batch.argtypes = [c_void_p, c_uint64, c_void_p, c_void_p, c_uint64, c_bool]
+
 hashmapbt_clear_last_trades = lib.hashmapbt_clear_last_trades
 hashmapbt_clear_last_trades.restype = c_void_p
 hashmapbt_clear_last_trades.argtypes = [c_void_p, c_uint64]
@@ -631,6 +990,10 @@ hashmapbt_state_values = lib.hashmapbt_state_values
 hashmapbt_state_values.restype = c_void_p
 hashmapbt_state_values.argtypes = [c_void_p, c_uint64]
 
+hashmapbt_record_state_values = lib.hashmapbt_record_state_values
+hashmapbt_record_state_values.restype = c_uint64
+hashmapbt_record_state_values.argtypes = [c_void_p, c_void_p, c_uint64]
+
 hashmapbt_feed_latency = lib.hashmapbt_feed_latency
 hashmapbt_feed_latency.restype = c_bool
 hashmapbt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
@@ -643,6 +1006,10 @@ hashmapbt_goto_end = lib.hashmapbt_goto_end
 hashmapbt_goto_end.restype = c_int64
 hashmapbt_goto_end.argtypes = [c_void_p]
 
+hashmapbt_fork = lib.hashmapbt_fork
+hashmapbt_fork.restype = c_void_p
+hashmapbt_fork.argtypes = [c_void_p]
+
 
 class HashMapMarketDepthBacktest:
     ptr: voidptr
@@ -700,6 +1067,27 @@ class HashMapMarketDepthBacktest:
         )
         return StateValues_(arr)
 
+    def record_state_values(self, out: RECORD_ARRAY) -> uint64:
+        """
+        Writes the current timestamp, mid price, and state values of all assets into the caller-owned buffer in a
+        single call, instead of querying :func:`depth` and :func:`state_values` asset by asset.
+
+        **Example**
+
+        .. code-block:: python
+
+            row = np.zeros(hbt.num_assets, record_dtype)
+            hbt.record_state_values(row)
+
+        Args:
+            out: A 1-D contiguous array of :data:`record_dtype <hftbacktest.types.record_dtype>`. The element at
+                 index `asset_no` receives the record of that asset.
+
+        Returns:
+            The number of records written, which is the smaller of the number of assets and the length of `out`.
+        """
+        return hashmapbt_record_state_values(self.ptr, out.ctypes.data, len(out))
+
     def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
         """
         Args:
@@ -853,6 +1241,66 @@ class HashMapMarketDepthBacktest:
         """
         return hashmapbt_cancel(self.ptr, asset_no, order_id, wait)
 
+    def submit_batch(
+            self,
+            asset_no: uint64,
+            requests: ORDER_REQUEST_ARRAY,
+            status: NDArray[np.int64],
+            wait: bool
+    ) -> int64:
+        """
+        Applies a batch of order submissions, modifications, and cancellations in a single call. All requests are
+        applied in order at the current timestamp without any event being processed in between, as an exchange's batch
+        order endpoint does.
+
+        The batch is applied atomically: every request is validated before any of them is applied, and if any request
+        is invalid, none is applied. A request is invalid if its `action`, `side`, `time_in_force`, or `order_type` is
+        not one of the defined values, or if it would fail as a single :meth:`submit_buy_order`, :meth:`modify`, or
+        :meth:`cancel` call, including a request for an order already requested earlier in the batch.
+
+        **Example**
+
+        .. code-block:: python
+
+            requests = np.zeros(2, order_request_dtype)
+            status = np.zeros(2, np.int64)
+
+            requests[0].action = SUBMIT
+            requests[0].order_id = 1
+            requests[0].side = BUY
+            requests[0].price = depth.best_bid
+            requests[0].qty = 1.0
+            requests[0].time_in_force = GTX
+            requests[0].order_type = LIMIT
+
+            requests[1].action = CANCEL
+            requests[1].order_id = 0
+
+            hbt.submit_batch(0, requests, status, False)
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            requests: A 1-D contiguous array of :data:`order_request_dtype <hftbacktest.types.order_request_dtype>`.
+                      `action` is one of :const:`SUBMIT <hftbacktest.order.SUBMIT>`,
+                      :const:`MODIFY <hftbacktest.order.MODIFY>`, and :const:`CANCEL <hftbacktest.order.CANCEL>`.
+                      `side`, `time_in_force`, and `order_type` are only used to submit, and `price` and `qty` are not
+                      used to cancel.
+            status: A 1-D contiguous `int64` array at least as long as `requests`, which receives the result of the
+                    validation of each request: `0` if it is valid, otherwise the same error code that
+                    :meth:`submit_buy_order`, :meth:`modify`, or :meth:`cancel` returns, which is `13` for the
+                    requests with undefined values.
+            wait: If `True`, wait until the responses to all the requests are received.
+
+        Returns:
+            * `0` when the batch is applied.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * `13` when the batch is not applied because some of its requests are invalid.
+            * Otherwise, an error occurred.
+        """
+        if len(status) < len(requests):
+            raise ValueError('status is shorter than requests.')
+        return hashmapbt_submit_batch(self.ptr, asset_no, requests.ctypes.data, status.ctypes.data, len(requests), wait)
+
     def clear_inactive_orders(self, asset_no: uint64) -> None:
         """
         Clears inactive orders from the local order dictionary whose status is neither
@@ -902,6 +1350,48 @@ class HashMapMarketDepthBacktest:
         """
         return hashmapbt_wait_next_feed(self.ptr, include_order_resp, timeout)
 
+    def subscribe(self, asset_no: uint64, classes: uint8, depth_range: int64) -> None:
+        """
+        Sets the feed event classes of the asset that wake :meth:`wait_next_feed`, so that the strategy only returns
+        from it when something it subscribed to happens. The classes are evaluated natively as the events are
+        processed. By default, every feed event of every asset wakes it.
+
+        **Example**
+
+        .. code-block:: python
+
+            # Wakes only on BBO changes, trades, and depth changes within 5 ticks of the best prices.
+            hbt.subscribe(0, SUB_BBO | SUB_TRADE | SUB_NEAR_TOUCH, 5)
+            # Never wakes on the feed of asset 1.
+            hbt.subscribe(1, 0, 0)
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            classes: The bitwise OR of :const:`SUB_DEPTH <hftbacktest.types.SUB_DEPTH>`,
+                     :const:`SUB_BBO <hftbacktest.types.SUB_BBO>`, :const:`SUB_TRADE <hftbacktest.types.SUB_TRADE>`,
+                     :const:`SUB_NEAR_TOUCH <hftbacktest.types.SUB_NEAR_TOUCH>`, and
+                     :const:`SUB_OTHER <hftbacktest.types.SUB_OTHER>`, or :const:`SUB_ALL <hftbacktest.types.SUB_ALL>`.
+            depth_range: The distance in ticks from the best price of its side within which a depth change falls into
+                         :const:`SUB_NEAR_TOUCH <hftbacktest.types.SUB_NEAR_TOUCH>`.
+        """
+        hashmapbt_subscribe(self.ptr, asset_no, classes, depth_range)
+
+    def last_wake(self) -> Tuple[uint64, uint64] | None:
+        """
+        Returns:
+            The asset number and the subscribed classes of the feed event that woke the last :meth:`wait_next_feed`,
+            or the asset number and `0` if an order response woke it. If several events at the same timestamp are
+            subscribed to, the last one is returned. Returns `None` if it returned on timeout or at the end of the
+            data.
+        """
+        asset_no = uint64(0)
+        classes = uint64(0)
+        asset_no_ptr = ptr_from_val(asset_no)
+        classes_ptr = ptr_from_val(classes)
+        if hashmapbt_last_wake(self.ptr, asset_no_ptr, classes_ptr):
+            return val_from_ptr(asset_no_ptr), val_from_ptr(classes_ptr)
+        return None
+
     def elapse(self, duration: uint64) -> int64:
         """
         Elapses the specified duration.
@@ -984,6 +1474,9 @@ class HashMapMarketDepthBacktest:
     def _goto_end(self) -> int64:
         return hashmapbt_goto_end(self.ptr)
 
+    def _fork(self) -> voidptr:
+        return hashmapbt_fork(self.ptr)
+
 
 HashMapMarketDepthBacktest_ = jitclass(HashMapMarketDepthBacktest)
 
@@ -1004,6 +1497,14 @@ roivecbt_wait_next_feed = lib.roivecbt_wait_next_feed
 roivecbt_wait_next_feed.restype = c_int64
 roivecbt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
 
+roivecbt_subscribe = lib.roivecbt_subscribe
+roivecbt_subscribe.restype = c_void_p
+roivecbt_subscribe.argtypes = [c_void_p, c_uint64, c_uint8, c_int64]
+
+roivecbt_last_wake = lib.roivecbt_last_wake
+roivecbt_last_wake.restype = c_bool
+roivecbt_last_wake.argtypes = [c_void_p, POINTER(c_uint64), POINTER(c_uint64)]
+
 roivecbt_close = lib.roivecbt_close
 roivecbt_close.restype = c_int64
 roivecbt_close.argtypes = [c_void_p]
@@ -1062,6 +1563,10 @@ roivecbt_cancel = lib.roivecbt_cancel
 roivecbt_cancel.restype = c_int64
 roivecbt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
 
+roivecbt_submit_batch = lib.roivecbt_submit_batch
+roivecbt_submit_batch.restype = c_int64
+roivecbt_submit_batch.argtypes = [c_void_p, c_uint64, c_void_p, c_void_p, c_uint64, c_bool]
+
 roivecbt_clear_last_trades = lib.roivecbt_clear_last_trades
 roivecbt_clear_last_trades.restype = c_void_p
 roivecbt_clear_last_trades.argtypes = [c_void_p, c_uint64]
@@ -1078,6 +1583,10 @@ roivecbt_state_values = lib.roivecbt_state_values
 roivecbt_state_values.restype = c_void_p
 roivecbt_state_values.argtypes = [c_void_p, c_uint64]
 
+roivecbt_record_state_values = lib.roivecbt_record_state_values
+roivecbt_record_state_values.restype = c_uint64
+roivecbt_record_state_values.argtypes = [c_void_p, c_void_p, c_uint64]
+
 roivecbt_feed_latency = lib.roivecbt_feed_latency
 roivecbt_feed_latency.restype = c_bool
 roivecbt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
@@ -1086,6 +1595,10 @@ roivecbt_order_latency = lib.roivecbt_order_latency
 roivecbt_order_latency.restype = c_bool
 roivecbt_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
 
+roivecbt_fork = lib.roivecbt_fork
+roivecbt_fork.restype = c_void_p
+roivecbt_fork.argtypes = [c_void_p]
+
 
 class ROIVectorMarketDepthBacktest:
     ptr: voidptr
@@ -1143,6 +1656,12 @@ class ROIVectorMarketDepthBacktest:
         )
         return StateValues_(arr)
 
+    def record_state_values(self, out: RECORD_ARRAY) -> uint64:
+        """
+        See :meth:`HashMapMarketDepthBacktest.record_state_values`.
+        """
+        return roivecbt_record_state_values(self.ptr, out.ctypes.data, len(out))
+
     def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
         """
         Args:
@@ -1296,15 +1815,75 @@ class ROIVectorMarketDepthBacktest:
         """
         return roivecbt_cancel(self.ptr, asset_no, order_id, wait)
 
-    def clear_inactive_orders(self, asset_no: uint64) -> None:
+    def submit_batch(
+            self,
+            asset_no: uint64,
+            requests: ORDER_REQUEST_ARRAY,
+            status: NDArray[np.int64],
+            wait: bool
+    ) -> int64:
         """
-        Clears inactive orders from the local order dictionary whose status is neither
-        :const:`NEW <hftbacktest.order.NEW>` nor :const:`PARTIALLY_FILLED <hftbacktest.order.PARTIALLY_FILLED>`.
+        Applies a batch of order submissions, modifications, and cancellations in a single call. All requests are
+        applied in order at the current timestamp without any event being processed in between, as an exchange's batch
+        order endpoint does.
 
-        Args:
-            asset_no: Asset number at which this command will be executed.
-                      If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
-                      all inactive orders in any assets will be cleared.
+        The batch is applied atomically: every request is validated before any of them is applied, and if any request
+        is invalid, none is applied. A request is invalid if its `action`, `side`, `time_in_force`, or `order_type` is
+        not one of the defined values, or if it would fail as a single :meth:`submit_buy_order`, :meth:`modify`, or
+        :meth:`cancel` call, including a request for an order already requested earlier in the batch.
+
+        **Example**
+
+        .. code-block:: python
+
+            requests = np.zeros(2, order_request_dtype)
+            status = np.zeros(2, np.int64)
+
+            requests[0].action = SUBMIT
+            requests[0].order_id = 1
+            requests[0].side = BUY
+            requests[0].price = depth.best_bid
+            requests[0].qty = 1.0
+            requests[0].time_in_force = GTX
+            requests[0].order_type = LIMIT
+
+            requests[1].action = CANCEL
+            requests[1].order_id = 0
+
+            hbt.submit_batch(0, requests, status, False)
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            requests: A 1-D contiguous array of :data:`order_request_dtype <hftbacktest.types.order_request_dtype>`.
+                      `action` is one of :const:`SUBMIT <hftbacktest.order.SUBMIT>`,
+                      :const:`MODIFY <hftbacktest.order.MODIFY>`, and :const:`CANCEL <hftbacktest.order.CANCEL>`.
+                      `side`, `time_in_force`, and `order_type` are only used to submit, and `price` and `qty` are not
+                      used to cancel.
+            status: A 1-D contiguous `int64` array at least as long as `requests`, which receives the result of the
+                    validation of each request: `0` if it is valid, otherwise the same error code that
+                    :meth:`submit_buy_order`, :meth:`modify`, or :meth:`cancel` returns, which is `13` for the
+                    requests with undefined values.
+            wait: If `True`, wait until the responses to all the requests are received.
+
+        Returns:
+            * `0` when the batch is applied.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * `13` when the batch is not applied because some of its requests are invalid.
+            * Otherwise, an error occurred.
+        """
+        if len(status) < len(requests):
+            raise ValueError('status is shorter than requests.')
+        return roivecbt_submit_batch(self.ptr, asset_no, requests.ctypes.data, status.ctypes.data, len(requests), wait)
+
+    def clear_inactive_orders(self, asset_no: uint64) -> None:
+        """
+        Clears inactive orders from the local order dictionary whose status is neither
+        :const:`NEW <hftbacktest.order.NEW>` nor :const:`PARTIALLY_FILLED <hftbacktest.order.PARTIALLY_FILLED>`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
+                      all inactive orders in any assets will be cleared.
         """
         roivecbt_clear_inactive_orders(self.ptr, asset_no)
 
@@ -1345,6 +1924,48 @@ class ROIVectorMarketDepthBacktest:
         """
         return roivecbt_wait_next_feed(self.ptr, include_order_resp, timeout)
 
+    def subscribe(self, asset_no: uint64, classes: uint8, depth_range: int64) -> None:
+        """
+        Sets the feed event classes of the asset that wake :meth:`wait_next_feed`, so that the strategy only returns
+        from it when something it subscribed to happens. The classes are evaluated natively as the events are
+        processed. By default, every feed event of every asset wakes it.
+
+        **Example**
+
+        .. code-block:: python
+
+            # Wakes only on BBO changes, trades, and depth changes within 5 ticks of the best prices.
+            hbt.subscribe(0, SUB_BBO | SUB_TRADE | SUB_NEAR_TOUCH, 5)
+            # Never wakes on the feed of asset 1.
+            hbt.subscribe(1, 0, 0)
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            classes: The bitwise OR of :const:`SUB_DEPTH <hftbacktest.types.SUB_DEPTH>`,
+                     :const:`SUB_BBO <hftbacktest.types.SUB_BBO>`, :const:`SUB_TRADE <hftbacktest.types.SUB_TRADE>`,
+                     :const:`SUB_NEAR_TOUCH <hftbacktest.types.SUB_NEAR_TOUCH>`, and
+                     :const:`SUB_OTHER <hftbacktest.types.SUB_OTHER>`, or :const:`SUB_ALL <hftbacktest.types.SUB_ALL>`.
+            depth_range: The distance in ticks from the best price of its side within which a depth change falls into
+                         :const:`SUB_NEAR_TOUCH <hftbacktest.types.SUB_NEAR_TOUCH>`.
+        """
+        roivecbt_subscribe(self.ptr, asset_no, classes, depth_range)
+
+    def last_wake(self) -> Tuple[uint64, uint64] | None:
+        """
+        Returns:
+            The asset number and the subscribed classes of the feed event that woke the last :meth:`wait_next_feed`,
+            or the asset number and `0` if an order response woke it. If several events at the same timestamp are
+            subscribed to, the last one is returned. Returns `None` if it returned on timeout or at the end of the
+            data.
+        """
+        asset_no = uint64(0)
+        classes = uint64(0)
+        asset_no_ptr = ptr_from_val(asset_no)
+        classes_ptr = ptr_from_val(classes)
+        if roivecbt_last_wake(self.ptr, asset_no_ptr, classes_ptr):
+            return val_from_ptr(asset_no_ptr), val_from_ptr(classes_ptr)
+        return None
+
     def elapse(self, duration: uint64) -> int64:
         """
         Elapses the specified duration.
@@ -1424,10 +2045,591 @@ class ROIVectorMarketDepthBacktest:
             return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
         return None
 
+    def _fork(self) -> voidptr:
+        return roivecbt_fork(self.ptr)
+
 
 ROIVectorMarketDepthBacktest_ = jitclass(ROIVectorMarketDepthBacktest)
 
 
+btreebt_elapse = lib.btreebt_elapse
+btreebt_elapse.restype = c_int64
+btreebt_elapse.argtypes = [c_void_p, c_uint64]
+
+btreebt_elapse_bt = lib.btreebt_elapse_bt
+btreebt_elapse_bt.restype = c_int64
+btreebt_elapse_bt.argtypes = [c_void_p, c_uint64]
+
+btreebt_btreebt_wait_order_response = lib.btreebt_wait_order_response
+btreebt_btreebt_wait_order_response.restype = c_int64
+btreebt_btreebt_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
+
+btreebt_wait_next_feed = lib.btreebt_wait_next_feed
+btreebt_wait_next_feed.restype = c_int64
+btreebt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
+
+btreebt_subscribe = lib.btreebt_subscribe
+btreebt_subscribe.restype = c_void_p
+btreebt_subscribe.argtypes = [c_void_p, c_uint64, c_uint8, c_int64]
+
+btreebt_last_wake = lib.btreebt_last_wake
+btreebt_last_wake.restype = c_bool
+btreebt_last_wake.argtypes = [c_void_p, POINTER(c_uint64), POINTER(c_uint64)]
+
+btreebt_close = lib.btreebt_close
+btreebt_close.restype = c_int64
+btreebt_close.argtypes = [c_void_p]
+
+btreebt_position = lib.btreebt_position
+btreebt_position.restype = c_double
+btreebt_position.argtypes = [c_void_p, c_uint64]
+
+btreebt_current_timestamp = lib.btreebt_current_timestamp
+btreebt_current_timestamp.restype = c_int64
+btreebt_current_timestamp.argtypes = [c_void_p]
+
+btreebt_depth = lib.btreebt_depth
+btreebt_depth.restype = c_void_p
+btreebt_depth.argtypes = [c_void_p, c_uint64]
+
+btreebt_last_trades = lib.btreebt_last_trades
+btreebt_last_trades.restype = c_void_p
+btreebt_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
+
+btreebt_num_assets = lib.btreebt_num_assets
+btreebt_num_assets.restype = c_uint64
+btreebt_num_assets.argtypes = [c_void_p]
+
+btreebt_submit_buy_order = lib.btreebt_submit_buy_order
+btreebt_submit_buy_order.restype = c_int64
+btreebt_submit_buy_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+btreebt_submit_sell_order = lib.btreebt_submit_sell_order
+btreebt_submit_sell_order.restype = c_int64
+btreebt_submit_sell_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+btreebt_modify = lib.btreebt_modify
+btreebt_modify.restype = c_int64
+btreebt_modify.argtypes = [c_void_p, c_uint64, c_uint64, c_double, c_double, c_bool]
+
+btreebt_cancel = lib.btreebt_cancel
+btreebt_cancel.restype = c_int64
+btreebt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
+
+btreebt_submit_batch = lib.btreebt_submit_batch
+btreebt_submit_batch.restype = c_int64
+btreebt_submit_batch.argtypes = [c_void_p, c_uint64, c_void_p, c_void_p, c_uint64, c_bool]
+
+btreebt_clear_last_trades = lib.btreebt_clear_last_trades
+btreebt_clear_last_trades.restype = c_void_p
+btreebt_clear_last_trades.argtypes = [c_void_p, c_uint64]
+
+btreebt_clear_inactive_orders = lib.btreebt_clear_inactive_orders
+btreebt_clear_inactive_orders.restype = c_void_p
+btreebt_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
+
+btreebt_orders = lib.btreebt_orders
+btreebt_orders.restype = c_void_p
+btreebt_orders.argtypes = [c_void_p, c_uint64]
+
+btreebt_state_values = lib.btreebt_state_values
+btreebt_state_values.restype = c_void_p
+btreebt_state_values.argtypes = [c_void_p, c_uint64]
+
+btreebt_record_state_values = lib.btreebt_record_state_values
+btreebt_record_state_values.restype = c_uint64
+btreebt_record_state_values.argtypes = [c_void_p, c_void_p, c_uint64]
+
+btreebt_feed_latency = lib.btreebt_feed_latency
+btreebt_feed_latency.restype = c_bool
+btreebt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
+
+btreebt_order_latency = lib.btreebt_order_latency
+btreebt_order_latency.restype = c_bool
+btreebt_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
+
+btreebt_goto_end = lib.btreebt_goto_end
+btreebt_goto_end.restype = c_int64
+btreebt_goto_end.argtypes = [c_void_p]
+
+btreebt_fork = lib.btreebt_fork
+btreebt_fork.restype = c_void_p
+btreebt_fork.argtypes = [c_void_p]
+
+
+class BTreeMarketDepthBacktest:
+    ptr: voidptr
+
+    def __init__(self, ptr: voidptr):
+        self.ptr = ptr
+
+    @property
+    def current_timestamp(self) -> int64:
+        """
+        In backtesting, this timestamp reflects the time at which the backtesting is conducted within the provided data.
+        """
+        return btreebt_current_timestamp(self.ptr)
+
+    def depth(self, asset_no: uint64) -> BTreeMarketDepth:
+        """
+        Args:
+            asset_no: Asset number from which the market depth will be retrieved.
+
+        Returns:
+            The depth of market of the specific asset.
+        """
+        return BTreeMarketDepth_(btreebt_depth(self.ptr, asset_no))
+
+    @property
+    def num_assets(self) -> uint64:
+        """
+        Returns the number of assets.
+        """
+        return btreebt_num_assets(self.ptr)
+
+    def position(self, asset_no: uint64) -> float64:
+        """
+        Args:
+            asset_no: Asset number from which the position will be retrieved.
+
+        Returns:
+            The quantity of the held position.
+        """
+        return btreebt_position(self.ptr, asset_no)
+
+    def state_values(self, asset_no: uint64) -> StateValues:
+        """
+        Args:
+            asset_no: Asset number from which the state values will be retrieved.
+
+        Returns:
+            The state’s values.
+        """
+        ptr = btreebt_state_values(self.ptr, asset_no)
+        arr = numba.carray(
+            address_as_void_pointer(ptr),
+            1,
+            state_values_dtype
+        )
+        return StateValues_(arr)
+
+    def record_state_values(self, out: RECORD_ARRAY) -> uint64:
+        """
+        See :meth:`HashMapMarketDepthBacktest.record_state_values`.
+        """
+        return btreebt_record_state_values(self.ptr, out.ctypes.data, len(out))
+
+    def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
+        """
+        Args:
+            asset_no: Asset number from which the trades will be retrieved.
+
+        Returns:
+            An array of `Event` representing trades occurring in the market for the specific asset.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = btreebt_last_trades(self.ptr, asset_no, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            event_dtype
+        )
+
+    def clear_last_trades(self, asset_no: uint64) -> None:
+        """
+        Clears the last trades occurring in the market from the buffer for :func:`last_trades`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
+                      all last trades in any assets will be cleared.
+        """
+        btreebt_clear_last_trades(self.ptr, asset_no)
+
+    def orders(self, asset_no: uint64) -> OrderDict:
+        """
+        Args:
+            asset_no: Asset number from which orders will be retrieved.
+
+        Returns:
+            An order dictionary where the keys are order IDs and the corresponding values are
+            :class:`Order <hftbacktest.order.Order>`.
+        """
+        return OrderDict_(btreebt_orders(self.ptr, asset_no))
+
+    def submit_buy_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a buy order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to buy.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftbacktest.order.GTC>`
+                * :const:`GTX <hftbacktest.order.GTX>`
+                * :const:`FOK <hftbacktest.order.FOK>`
+                * :const:`IOC <hftbacktest.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftbacktest.order.LIMIT>`
+                * :const:`MARKET <hftbacktest.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def submit_sell_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a sell order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to sell.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftbacktest.order.GTC>`
+                * :const:`GTX <hftbacktest.order.GTX>`
+                * :const:`FOK <hftbacktest.order.FOK>`
+                * :const:`IOC <hftbacktest.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftbacktest.order.LIMIT>`
+                * :const:`MARKET <hftbacktest.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def modify(self, asset_no: uint64, order_id: uint64, price: float, qty: float, wait: bool) -> int64:
+        """
+        Modifies the specified order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: Order ID to modify.
+            price: Order price.
+            qty: Order quantity.
+            wait: If `True`, wait until the order cancel response is received.
+
+        Returns:
+            * `0` when it successfully modifies an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_modify(self.ptr, asset_no, order_id, price, qty, wait)
+
+    def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
+        """
+        Cancels the specified order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: Order ID to cancel.
+            wait: If `True`, wait until the order cancel response is received.
+
+        Returns:
+            * `0` when it successfully cancels an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_cancel(self.ptr, asset_no, order_id, wait)
+
+    def submit_batch(
+            self,
+            asset_no: uint64,
+            requests: ORDER_REQUEST_ARRAY,
+            status: NDArray[np.int64],
+            wait: bool
+    ) -> int64:
+        """
+        Applies a batch of order submissions, modifications, and cancellations in a single call. All requests are
+        applied in order at the current timestamp without any event being processed in between, as an exchange's batch
+        order endpoint does.
+
+        The batch is applied atomically: every request is validated before any of them is applied, and if any request
+        is invalid, none is applied. A request is invalid if its `action`, `side`, `time_in_force`, or `order_type` is
+        not one of the defined values, or if it would fail as a single :meth:`submit_buy_order`, :meth:`modify`, or
+        :meth:`cancel` call, including a request for an order already requested earlier in the batch.
+
+        **Example**
+
+        .. code-block:: python
+
+            requests = np.zeros(2, order_request_dtype)
+            status = np.zeros(2, np.int64)
+
+            requests[0].action = SUBMIT
+            requests[0].order_id = 1
+            requests[0].side = BUY
+            requests[0].price = depth.best_bid
+            requests[0].qty = 1.0
+            requests[0].time_in_force = GTX
+            requests[0].order_type = LIMIT
+
+            requests[1].action = CANCEL
+            requests[1].order_id = 0
+
+            hbt.submit_batch(0, requests, status, False)
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            requests: A 1-D contiguous array of :data:`order_request_dtype <hftbacktest.types.order_request_dtype>`.
+                      `action` is one of :const:`SUBMIT <hftbacktest.order.SUBMIT>`,
+                      :const:`MODIFY <hftbacktest.order.MODIFY>`, and :const:`CANCEL <hftbacktest.order.CANCEL>`.
+                      `side`, `time_in_force`, and `order_type` are only used to submit, and `price` and `qty` are not
+                      used to cancel.
+            status: A 1-D contiguous `int64` array at least as long as `requests`, which receives the result of the
+                    validation of each request: `0` if it is valid, otherwise the same error code that
+                    :meth:`submit_buy_order`, :meth:`modify`, or :meth:`cancel` returns, which is `13` for the
+                    requests with undefined values.
+            wait: If `True`, wait until the responses to all the requests are received.
+
+        Returns:
+            * `0` when the batch is applied.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * `13` when the batch is not applied because some of its requests are invalid.
+            * Otherwise, an error occurred.
+        """
+        if len(status) < len(requests):
+            raise ValueError('status is shorter than requests.')
+        return btreebt_submit_batch(self.ptr, asset_no, requests.ctypes.data, status.ctypes.data, len(requests), wait)
+
+    def clear_inactive_orders(self, asset_no: uint64) -> None:
+        """
+        Clears inactive orders from the local order dictionary whose status is neither
+        :const:`NEW <hftbacktest.order.NEW>` nor :const:`PARTIALLY_FILLED <hftbacktest.order.PARTIALLY_FILLED>`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
+                      all inactive orders in any assets will be cleared.
+        """
+        btreebt_clear_inactive_orders(self.ptr, asset_no)
+
+    def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
+        """
+        Waits for the response of the order with the given order ID until timeout.
+
+        Args:
+            asset_no: Asset number where an order with `order_id` exists.
+            order_id: Order ID to wait for the response.
+            timeout: Timeout for waiting for the order response. Nanoseconds is the default unit. However, unit should
+                     be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it receives an order response for the specified order ID of the specified asset number, or
+              reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_btreebt_wait_order_response(self.ptr, asset_no, order_id, timeout)
+
+    def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
+        """
+        Waits until the next feed is received, or until timeout.
+
+        Args:
+            include_order_resp: If set to `True`, it will return when any order response is received, in addition to the
+                                next feed.
+            timeout: Timeout for waiting for the next feed or an order response. Nanoseconds is the default unit.
+                     However, unit should be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * `2` when it receives a market feed.
+            * `3` when it receives an order response if `include_order_resp` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_wait_next_feed(self.ptr, include_order_resp, timeout)
+
+    def subscribe(self, asset_no: uint64, classes: uint8, depth_range: int64) -> None:
+        """
+        Sets the feed event classes of the asset that wake :meth:`wait_next_feed`, so that the strategy only returns
+        from it when something it subscribed to happens. The classes are evaluated natively as the events are
+        processed. By default, every feed event of every asset wakes it.
+
+        **Example**
+
+        .. code-block:: python
+
+            # Wakes only on BBO changes, trades, and depth changes within 5 ticks of the best prices.
+            hbt.subscribe(0, SUB_BBO | SUB_TRADE | SUB_NEAR_TOUCH, 5)
+            # Never wakes on the feed of asset 1.
+            hbt.subscribe(1, 0, 0)
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            classes: The bitwise OR of :const:`SUB_DEPTH <hftbacktest.types.SUB_DEPTH>`,
+                     :const:`SUB_BBO <hftbacktest.types.SUB_BBO>`, :const:`SUB_TRADE <hftbacktest.types.SUB_TRADE>`,
+                     :const:`SUB_NEAR_TOUCH <hftbacktest.types.SUB_NEAR_TOUCH>`, and
+                     :const:`SUB_OTHER <hftbacktest.types.SUB_OTHER>`, or :const:`SUB_ALL <hftbacktest.types.SUB_ALL>`.
+            depth_range: The distance in ticks from the best price of its side within which a depth change falls into
+                         :const:`SUB_NEAR_TOUCH <hftbacktest.types.SUB_NEAR_TOUCH>`.
+        """
+        btreebt_subscribe(self.ptr, asset_no, classes, depth_range)
+
+    def last_wake(self) -> Tuple[uint64, uint64] | None:
+        """
+        Returns:
+            The asset number and the subscribed classes of the feed event that woke the last :meth:`wait_next_feed`,
+            or the asset number and `0` if an order response woke it. If several events at the same timestamp are
+            subscribed to, the last one is returned. Returns `None` if it returned on timeout or at the end of the
+            data.
+        """
+        asset_no = uint64(0)
+        classes = uint64(0)
+        asset_no_ptr = ptr_from_val(asset_no)
+        classes_ptr = ptr_from_val(classes)
+        if btreebt_last_wake(self.ptr, asset_no_ptr, classes_ptr):
+            return val_from_ptr(asset_no_ptr), val_from_ptr(classes_ptr)
+        return None
+
+    def elapse(self, duration: uint64) -> int64:
+        """
+        Elapses the specified duration.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_elapse(self.ptr, duration)
+
+    def elapse_bt(self, duration: int64) -> int64:
+        """
+        Elapses time only in backtesting. In live mode, it is ignored. (Supported only in the Rust implementation)
+
+        The `elapse` method exclusively manages time during backtesting, meaning that factors such as computing time are
+        not properly accounted for. So, this method can be utilized to simulate such processing times.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_elapse_bt(self.ptr, duration)
+
+    def close(self) -> int64:
+        """
+        Closes this backtester or bot.
+
+        Returns:
+            * `0` when it successfully closes the bot.
+            * Otherwise, an error occurred.
+        """
+        return btreebt_close(self.ptr)
+
+    def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
+        """
+        Args:
+            asset_no: Asset number from which the last feed latency will be retrieved.
+
+        Returns:
+            The last feed’s exchange timestamp and local receipt timestamp if a feed has been received; otherwise,
+            returns `None`.
+        """
+        exch_ts = int64(0)
+        local_ts = int64(0)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        local_ts_ptr = ptr_from_val(local_ts)
+        if btreebt_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
+            return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
+        return None
+
+    def order_latency(self, asset_no: uint64) -> Tuple[int64, int64, int64] | None:
+        """
+        Args:
+            asset_no: Asset number from which the last order latency will be retrieved.
+
+        Returns:
+            The last order’s request timestamp, exchange timestamp, and response receipt timestamp if there has been an
+            order submission; otherwise, returns `None`.
+        """
+        req_ts = int64(0)
+        exch_ts = int64(0)
+        resp_ts = int64(0)
+        req_ts_ptr = ptr_from_val(req_ts)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        resp_ts_ptr = ptr_from_val(resp_ts)
+        if btreebt_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
+            return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
+        return None
+
+    def _goto_end(self) -> int64:
+        return btreebt_goto_end(self.ptr)
+
+    def _fork(self) -> voidptr:
+        return btreebt_fork(self.ptr)
+
+
+BTreeMarketDepthBacktest_ = jitclass(BTreeMarketDepthBacktest)
+
+
 fusemarketdepth_new = lib.fusemarketdepth_new
 fusemarketdepth_new.restype = c_void_p
 fusemarketdepth_new.argtypes = [c_double, c_double]
@@ -1440,6 +2642,14 @@ fusemarketdepth_process_event = lib.fusemarketdepth_process_event
 fusemarketdepth_process_event.restype = c_bool
 fusemarketdepth_process_event.argtypes = [c_void_p, c_void_p, c_bool]
 
+fusemarketdepth_process_events = lib.fusemarketdepth_process_events
+fusemarketdepth_process_events.restype = c_uint64
+fusemarketdepth_process_events.argtypes = [c_void_p, c_void_p, c_uint64, c_uint64, c_void_p]
+
+fusemarketdepth_drain = lib.fusemarketdepth_drain
+fusemarketdepth_drain.restype = c_uint64
+fusemarketdepth_drain.argtypes = [c_void_p, c_void_p, c_uint64]
+
 fusemarketdepth_fused_events = lib.fusemarketdepth_fused_events
 fusemarketdepth_fused_events.restype = c_void_p
 fusemarketdepth_fused_events.argtypes = [c_void_p, POINTER(c_uint64)]
@@ -1489,10 +2699,41 @@ class FuseMarketDepth:
         if not ok:
             raise ValueError
 
+    def process_events(self, ev: EVENT_ARRAY, start: uint64, end: uint64, add_mask: np.ndarray) -> uint64:
+        """
+        Processes the market events from `start` up to `end` in a single native call, stopping at the first event that
+        cannot be fused, such as a trade event.
+
+        Args:
+            ev: The array of events to process.
+            start: The index of the first event to process.
+            end: The index after the last event to process.
+            add_mask: An array of the same length as `ev` indicating, for each event, whether it is added to the fused
+                      events, as `add` in :meth:`process_event`.
+
+        Returns:
+            The index of the first event that cannot be fused, which is left unprocessed, or `end` if all events are
+            processed.
+        """
+        return fusemarketdepth_process_events(self.ptr, ev.ctypes.data, start, end, add_mask.ctypes.data)
+
+    def drain(self, buf: EVENT_ARRAY) -> uint64:
+        """
+        Moves the earliest fused events, as many as fit, into the given buffer, so that the fused output can be
+        consumed incrementally rather than held until the end.
+
+        Args:
+            buf: The buffer into which the fused events are moved.
+
+        Returns:
+            The number of events moved. If it equals the length of `buf`, more fused events may remain.
+        """
+        return fusemarketdepth_drain(self.ptr, buf.ctypes.data, len(buf))
+
     @property
     def fused_events(self) -> EVENT_ARRAY:
         """
-        Returns the array of fused events generated so far.
+        Returns the array of fused events generated so far, excluding those moved out by :meth:`drain`.
         """
         length = uint64(0)
         len_ptr = ptr_from_val(length)
@@ -1504,887 +2745,3 @@ class FuseMarketDepth:
         )
 
 FuseMarketDepth_ = jitclass(FuseMarketDepth)
-
-
-if LIVE_FEATURE:
-    hashmaplive_elapse = lib.hashmaplive_elapse
-    hashmaplive_elapse.restype = c_int64
-    hashmaplive_elapse.argtypes = [c_void_p, c_uint64]
-
-    hashmaplive_elapse_bt = lib.hashmaplive_elapse_bt
-    hashmaplive_elapse_bt.restype = c_int64
-    hashmaplive_elapse_bt.argtypes = [c_void_p, c_uint64]
-
-    hashmaplive_hashmaplive_wait_order_response = lib.hashmaplive_wait_order_response
-    hashmaplive_hashmaplive_wait_order_response.restype = c_int64
-    hashmaplive_hashmaplive_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
-
-    hashmaplive_wait_next_feed = lib.hashmaplive_wait_next_feed
-    hashmaplive_wait_next_feed.restype = c_int64
-    hashmaplive_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
-
-    hashmaplive_close = lib.hashmaplive_close
-    hashmaplive_close.restype = c_int64
-    hashmaplive_close.argtypes = [c_void_p]
-
-    hashmaplive_position = lib.hashmaplive_position
-    hashmaplive_position.restype = c_double
-    hashmaplive_position.argtypes = [c_void_p, c_uint64]
-
-    hashmaplive_current_timestamp = lib.hashmaplive_current_timestamp
-    hashmaplive_current_timestamp.restype = c_int64
-    hashmaplive_current_timestamp.argtypes = [c_void_p]
-
-    hashmaplive_depth = lib.hashmaplive_depth
-    hashmaplive_depth.restype = c_void_p
-    hashmaplive_depth.argtypes = [c_void_p, c_uint64]
-
-    hashmaplive_last_trades = lib.hashmaplive_last_trades
-    hashmaplive_last_trades.restype = c_void_p
-    hashmaplive_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
-
-    hashmaplive_num_assets = lib.hashmaplive_num_assets
-    hashmaplive_num_assets.restype = c_uint64
-    hashmaplive_num_assets.argtypes = [c_void_p]
-
-    hashmaplive_submit_buy_order = lib.hashmaplive_submit_buy_order
-    hashmaplive_submit_buy_order.restype = c_int64
-    hashmaplive_submit_buy_order.argtypes = [
-        c_void_p,
-        c_uint64,
-        c_uint64,
-        c_double,
-        c_double,
-        c_uint8,
-        c_uint8,
-        c_bool
-    ]
-
-    hashmaplive_submit_sell_order = lib.hashmaplive_submit_sell_order
-    hashmaplive_submit_sell_order.restype = c_int64
-    hashmaplive_submit_sell_order.argtypes = [
-        c_void_p,
-        c_uint64,
-        c_uint64,
-        c_double,
-        c_double,
-        c_uint8,
-        c_uint8,
-        c_bool
-    ]
-
-    hashmaplive_modify = lib.hashmaplive_modify
-    hashmaplive_modify.restype = c_int64
-    hashmaplive_modify.argtypes = [c_void_p, c_uint64, c_uint64, c_double, c_double, c_bool]
-
-    hashmaplive_cancel = lib.hashmaplive_cancel
-    hashmaplive_cancel.restype = c_int64
-    hashmaplive_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
-
-    hashmaplive_clear_last_trades = lib.hashmaplive_clear_last_trades
-    hashmaplive_clear_last_trades.restype = c_void_p
-    hashmaplive_clear_last_trades.argtypes = [c_void_p, c_uint64]
-
-    hashmaplive_clear_inactive_orders = lib.hashmaplive_clear_inactive_orders
-    hashmaplive_clear_inactive_orders.restype = c_void_p
-    hashmaplive_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
-
-    hashmaplive_orders = lib.hashmaplive_orders
-    hashmaplive_orders.restype = c_void_p
-    hashmaplive_orders.argtypes = [c_void_p, c_uint64]
-
-    hashmaplive_state_values = lib.hashmaplive_state_values
-    hashmaplive_state_values.restype = c_void_p
-    hashmaplive_state_values.argtypes = [c_void_p, c_uint64]
-
-    hashmaplive_feed_latency = lib.hashmaplive_feed_latency
-    hashmaplive_feed_latency.restype = c_bool
-    hashmaplive_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
-
-    hashmaplive_order_latency = lib.hashmaplive_order_latency
-    hashmaplive_order_latency.restype = c_bool
-    hashmaplive_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
-
-
-    class HashMapMarketDepthLiveBot:
-        ptr: voidptr
-
-        def __init__(self, ptr: voidptr):
-            self.ptr = ptr
-
-        @property
-        def current_timestamp(self) -> int64:
-            """
-            In LiveBoting, this timestamp reflects the time at which the LiveBoting is conducted within the provided data.
-            """
-            return hashmaplive_current_timestamp(self.ptr)
-
-        def depth(self, asset_no: uint64) -> HashMapMarketDepth:
-            """
-            Args:
-                asset_no: Asset number from which the market depth will be retrieved.
-
-            Returns:
-                The depth of market of the specific asset.
-            """
-            return HashMapMarketDepth_(hashmaplive_depth(self.ptr, asset_no))
-
-        @property
-        def num_assets(self) -> uint64:
-            """
-            Returns the number of assets.
-            """
-            return hashmaplive_num_assets(self.ptr)
-
-        def position(self, asset_no: uint64) -> float64:
-            """
-            Args:
-                asset_no: Asset number from which the position will be retrieved.
-
-            Returns:
-                The quantity of the held position.
-            """
-            return hashmaplive_position(self.ptr, asset_no)
-
-        def state_values(self, asset_no: uint64) -> StateValues:
-            """
-            Args:
-                asset_no: Asset number from which the state values will be retrieved.
-
-            Returns:
-                The state’s values.
-            """
-            ptr = hashmaplive_state_values(self.ptr, asset_no)
-            arr = numba.carray(
-                address_as_void_pointer(ptr),
-                1,
-                state_values_dtype
-            )
-            return StateValues_(arr)
-
-        def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
-            """
-            Args:
-                asset_no: Asset number from which the trades will be retrieved.
-
-            Returns:
-                An array of `Event` representing trades occurring in the market for the specific asset.
-            """
-            length = uint64(0)
-            len_ptr = ptr_from_val(length)
-            ptr = hashmaplive_last_trades(self.ptr, asset_no, len_ptr)
-            return numba.carray(
-                address_as_void_pointer(ptr),
-                val_from_ptr(len_ptr),
-                event_dtype
-            )
-
-        def clear_last_trades(self, asset_no: uint64) -> None:
-            """
-            Clears the last trades occurring in the market from the buffer for :func:`last_trades`.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                          If :const:`ALL_ASSETS <hftLiveBot.types.ALL_ASSETS>`,
-                          all last trades in any assets will be cleared.
-            """
-            hashmaplive_clear_last_trades(self.ptr, asset_no)
-
-        def orders(self, asset_no: uint64) -> OrderDict:
-            """
-            Args:
-                asset_no: Asset number from which orders will be retrieved.
-
-            Returns:
-                An order dictionary where the keys are order IDs and the corresponding values are
-                :class:`Order <hftLiveBot.order.Order>`.
-            """
-            return OrderDict_(hashmaplive_orders(self.ptr, asset_no))
-
-        def submit_buy_order(
-                self,
-                asset_no: uint64,
-                order_id: uint64,
-                price: float64,
-                qty: float64,
-                time_in_force: uint8,
-                order_type: uint8,
-                wait: bool
-        ) -> int64:
-            """
-            Submits a buy order.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                order_id: The unique order ID; there should not be any existing order with the same ID on both local and
-                          exchange sides.
-                price: Order price.
-                qty: Quantity to buy.
-                time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
-
-                    * :const:`GTC <hftLiveBot.order.GTC>`
-                    * :const:`GTX <hftLiveBot.order.GTX>`
-                    * :const:`FOK <hftLiveBot.order.FOK>`
-                    * :const:`IOC <hftLiveBot.order.IOC>`
-
-                order_type: Available options vary depending on the exchange model. See to the exchange model for details.
-
-                    * :const:`LIMIT <hftLiveBot.order.LIMIT>`
-                    * :const:`MARKET <hftLiveBot.order.MARKET>`
-
-                wait: If `True`, wait until the order placement response is received.
-
-            Returns:
-                * `0` when it successfully submits an order.
-                * `1` when it reaches the end of the data, if `wait` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
-
-        def submit_sell_order(
-                self,
-                asset_no: uint64,
-                order_id: uint64,
-                price: float64,
-                qty: float64,
-                time_in_force: uint8,
-                order_type: uint8,
-                wait: bool
-        ) -> int64:
-            """
-            Submits a sell order.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                order_id: The unique order ID; there should not be any existing order with the same ID on both local and
-                          exchange sides.
-                price: Order price.
-                qty: Quantity to sell.
-                time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
-
-                    * :const:`GTC <hftLiveBot.order.GTC>`
-                    * :const:`GTX <hftLiveBot.order.GTX>`
-                    * :const:`FOK <hftLiveBot.order.FOK>`
-                    * :const:`IOC <hftLiveBot.order.IOC>`
-
-                order_type: Available options vary depending on the exchange model. See to the exchange model for details.
-
-                    * :const:`LIMIT <hftLiveBot.order.LIMIT>`
-                    * :const:`MARKET <hftLiveBot.order.MARKET>`
-
-                wait: If `True`, wait until the order placement response is received.
-
-            Returns:
-                * `0` when it successfully submits an order.
-                * `1` when it reaches the end of the data, if `wait` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
-
-        def modify(self, asset_no: uint64, order_id: uint64, price: float, qty: float, wait: bool) -> int64:
-            """
-            Modifies the specified order.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                order_id: Order ID to modify.
-                price: Order price.
-                qty: Order quantity.
-                wait: If `True`, wait until the order cancel response is received.
-
-            Returns:
-                * `0` when it successfully modifies an order.
-                * `1` when it reaches the end of the data, if `wait` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_modify(self.ptr, asset_no, order_id, price, qty, wait)
-
-        def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
-            """
-            Cancels the specified order.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                order_id: Order ID to cancel.
-                wait: If `True`, wait until the order cancel response is received.
-
-            Returns:
-                * `0` when it successfully cancels an order.
-                * `1` when it reaches the end of the data, if `wait` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_cancel(self.ptr, asset_no, order_id, wait)
-
-        def clear_inactive_orders(self, asset_no: uint64) -> None:
-            """
-            Clears inactive orders from the local order dictionary whose status is neither
-            :const:`NEW <hftLiveBot.order.NEW>` nor :const:`PARTIALLY_FILLED <hftLiveBot.order.PARTIALLY_FILLED>`.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                          If :const:`ALL_ASSETS <hftLiveBot.types.ALL_ASSETS>`,
-                          all inactive orders in any assets will be cleared.
-            """
-            hashmaplive_clear_inactive_orders(self.ptr, asset_no)
-
-        def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
-            """
-            Waits for the response of the order with the given order ID until timeout.
-
-            Args:
-                asset_no: Asset number where an order with `order_id` exists.
-                order_id: Order ID to wait for the response.
-                timeout: Timeout for waiting for the order response. Nanoseconds is the default unit. However, unit should
-                         be the same as the data’s timestamp unit.
-
-            Returns:
-                * `0` when it receives an order response for the specified order ID of the specified asset number, or
-                  reaches the timeout.
-                * `1` when it reaches the end of the data.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_hashmaplive_wait_order_response(self.ptr, asset_no, order_id, timeout)
-
-        def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
-            """
-            Waits until the next feed is received, or until timeout.
-
-            Args:
-                include_order_resp: If set to `True`, it will return when any order response is received, in addition to
-                                    the next feed.
-                timeout: Timeout for waiting for the next feed or an order response. Nanoseconds is the default unit.
-                         However, unit should be the same as the data’s timestamp unit.
-
-            Returns:
-                * `0` when it reaches the timeout.
-                * `1` when it reaches the end of the data.
-                * `2` when it receives a market feed.
-                * `3` when it receives an order response if `include_order_resp` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_wait_next_feed(self.ptr, include_order_resp, timeout)
-
-        def elapse(self, duration: uint64) -> int64:
-            """
-            Elapses the specified duration.
-
-            Args:
-                duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
-                          data’s timestamp unit.
-
-            Returns:
-                * `0` when it successfully elapses the given duration.
-                * `1` when it reaches the end of the data.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_elapse(self.ptr, duration)
-
-        def elapse_bt(self, duration: int64) -> int64:
-            """
-            Elapses time only in LiveBoting. In live mode, it is ignored. (Supported only in the Rust implementation)
-
-            The `elapse` method exclusively manages time during LiveBoting, meaning that factors such as computing time are
-            not properly accounted for. So, this method can be utilized to simulate such processing times.
-
-            Args:
-                duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
-                          data’s timestamp unit.
-
-            Returns:
-                * `0` when it successfully elapses the given duration.
-                * `1` when it reaches the end of the data.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_elapse_bt(self.ptr, duration)
-
-        def close(self) -> int64:
-            """
-            Closes this LiveBoter or bot.
-
-            Returns:
-                * `0` when it successfully closes the bot.
-                * Otherwise, an error occurred.
-            """
-            return hashmaplive_close(self.ptr)
-
-        def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
-            """
-            Args:
-                asset_no: Asset number from which the last feed latency will be retrieved.
-
-            Returns:
-                The last feed’s exchange timestamp and local receipt timestamp if a feed has been received; otherwise,
-                returns `None`.
-            """
-            exch_ts = int64(0)
-            local_ts = int64(0)
-            exch_ts_ptr = ptr_from_val(exch_ts)
-            local_ts_ptr = ptr_from_val(local_ts)
-            if hashmaplive_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
-                return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
-            return None
-
-        def order_latency(self, asset_no: uint64) -> Tuple[int64, int64, int64] | None:
-            """
-            Args:
-                asset_no: Asset number from which the last order latency will be retrieved.
-
-            Returns:
-                The last order’s request timestamp, exchange timestamp, and response receipt timestamp if there has been an
-                order submission; otherwise, returns `None`.
-            """
-            req_ts = int64(0)
-            exch_ts = int64(0)
-            resp_ts = int64(0)
-            req_ts_ptr = ptr_from_val(req_ts)
-            exch_ts_ptr = ptr_from_val(exch_ts)
-            resp_ts_ptr = ptr_from_val(resp_ts)
-            if hashmaplive_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
-                return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
-            return None
-
-        def _goto_end(self) -> int64:
-            return hashmaplive_goto_end(self.ptr)
-
-
-    HashMapMarketDepthLiveBot_ = jitclass(HashMapMarketDepthLiveBot)
-
-
-    roiveclive_elapse = lib.roiveclive_elapse
-    roiveclive_elapse.restype = c_int64
-    roiveclive_elapse.argtypes = [c_void_p, c_uint64]
-
-    roiveclive_elapse_bt = lib.roiveclive_elapse_bt
-    roiveclive_elapse_bt.restype = c_int64
-    roiveclive_elapse_bt.argtypes = [c_void_p, c_uint64]
-
-    roiveclive_roiveclive_wait_order_response = lib.roiveclive_wait_order_response
-    roiveclive_roiveclive_wait_order_response.restype = c_int64
-    roiveclive_roiveclive_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
-
-    roiveclive_wait_next_feed = lib.roiveclive_wait_next_feed
-    roiveclive_wait_next_feed.restype = c_int64
-    roiveclive_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
-
-    roiveclive_close = lib.roiveclive_close
-    roiveclive_close.restype = c_int64
-    roiveclive_close.argtypes = [c_void_p]
-
-    roiveclive_position = lib.roiveclive_position
-    roiveclive_position.restype = c_double
-    roiveclive_position.argtypes = [c_void_p, c_uint64]
-
-    roiveclive_current_timestamp = lib.roiveclive_current_timestamp
-    roiveclive_current_timestamp.restype = c_int64
-    roiveclive_current_timestamp.argtypes = [c_void_p]
-
-    roiveclive_depth = lib.roiveclive_depth
-    roiveclive_depth.restype = c_void_p
-    roiveclive_depth.argtypes = [c_void_p, c_uint64]
-
-    roiveclive_last_trades = lib.roiveclive_last_trades
-    roiveclive_last_trades.restype = c_void_p
-    roiveclive_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
-
-    roiveclive_num_assets = lib.roiveclive_num_assets
-    roiveclive_num_assets.restype = c_uint64
-    roiveclive_num_assets.argtypes = [c_void_p]
-
-    roiveclive_submit_buy_order = lib.roiveclive_submit_buy_order
-    roiveclive_submit_buy_order.restype = c_int64
-    roiveclive_submit_buy_order.argtypes = [
-        c_void_p,
-        c_uint64,
-        c_uint64,
-        c_double,
-        c_double,
-        c_uint8,
-        c_uint8,
-        c_bool
-    ]
-
-    roiveclive_submit_sell_order = lib.roiveclive_submit_sell_order
-    roiveclive_submit_sell_order.restype = c_int64
-    roiveclive_submit_sell_order.argtypes = [
-        c_void_p,
-        c_uint64,
-        c_uint64,
-        c_double,
-        c_double,
-        c_uint8,
-        c_uint8,
-        c_bool
-    ]
-
-    roiveclive_modify = lib.roiveclive_modify
-    roiveclive_modify.restype = c_int64
-    roiveclive_modify.argtypes = [c_void_p, c_uint64, c_uint64, c_double, c_double, c_bool]
-
-    roiveclive_cancel = lib.roiveclive_cancel
-    roiveclive_cancel.restype = c_int64
-    roiveclive_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
-
-    roiveclive_clear_last_trades = lib.roiveclive_clear_last_trades
-    roiveclive_clear_last_trades.restype = c_void_p
-    roiveclive_clear_last_trades.argtypes = [c_void_p, c_uint64]
-
-    roiveclive_clear_inactive_orders = lib.roiveclive_clear_inactive_orders
-    roiveclive_clear_inactive_orders.restype = c_void_p
-    roiveclive_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
-
-    roiveclive_orders = lib.roiveclive_orders
-    roiveclive_orders.restype = c_void_p
-    roiveclive_orders.argtypes = [c_void_p, c_uint64]
-
-    roiveclive_state_values = lib.roiveclive_state_values
-    roiveclive_state_values.restype = c_void_p
-    roiveclive_state_values.argtypes = [c_void_p, c_uint64]
-
-    roiveclive_feed_latency = lib.roiveclive_feed_latency
-    roiveclive_feed_latency.restype = c_bool
-    roiveclive_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
-
-    roiveclive_order_latency = lib.roiveclive_order_latency
-    roiveclive_order_latency.restype = c_bool
-    roiveclive_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
-
-
-    class ROIVectorMarketDepthLiveBot:
-        ptr: voidptr
-
-        def __init__(self, ptr: voidptr):
-            self.ptr = ptr
-
-        @property
-        def current_timestamp(self) -> int64:
-            """
-            In LiveBoting, this timestamp reflects the time at which the LiveBoting is conducted within the provided data.
-            """
-            return roiveclive_current_timestamp(self.ptr)
-
-        def depth(self, asset_no: uint64) -> ROIVectorMarketDepth:
-            """
-            Args:
-                asset_no: Asset number from which the market depth will be retrieved.
-
-            Returns:
-                The depth of market of the specific asset.
-            """
-            return ROIVectorMarketDepth_(roiveclive_depth(self.ptr, asset_no))
-
-        @property
-        def num_assets(self) -> uint64:
-            """
-            Returns the number of assets.
-            """
-            return roiveclive_num_assets(self.ptr)
-
-        def position(self, asset_no: uint64) -> float64:
-            """
-            Args:
-                asset_no: Asset number from which the position will be retrieved.
-
-            Returns:
-                The quantity of the held position.
-            """
-            return roiveclive_position(self.ptr, asset_no)
-
-        def state_values(self, asset_no: uint64) -> StateValues:
-            """
-            Args:
-                asset_no: Asset number from which the state values will be retrieved.
-
-            Returns:
-                The state’s values.
-            """
-            ptr = roiveclive_state_values(self.ptr, asset_no)
-            arr = numba.carray(
-                address_as_void_pointer(ptr),
-                1,
-                state_values_dtype
-            )
-            return StateValues_(arr)
-
-        def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
-            """
-            Args:
-                asset_no: Asset number from which the trades will be retrieved.
-
-            Returns:
-                An array of `Event` representing trades occurring in the market for the specific asset.
-            """
-            length = uint64(0)
-            len_ptr = ptr_from_val(length)
-            ptr = roiveclive_last_trades(self.ptr, asset_no, len_ptr)
-            return numba.carray(
-                address_as_void_pointer(ptr),
-                val_from_ptr(len_ptr),
-                event_dtype
-            )
-
-        def clear_last_trades(self, asset_no: uint64) -> None:
-            """
-            Clears the last trades occurring in the market from the buffer for :func:`last_trades`.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                          If :const:`ALL_ASSETS <hftLiveBot.types.ALL_ASSETS>`,
-                          all last trades in any assets will be cleared.
-            """
-            roiveclive_clear_last_trades(self.ptr, asset_no)
-
-        def orders(self, asset_no: uint64) -> OrderDict:
-            """
-            Args:
-                asset_no: Asset number from which orders will be retrieved.
-
-            Returns:
-                An order dictionary where the keys are order IDs and the corresponding values are
-                :class:`Order <hftLiveBot.order.Order>`.
-            """
-            return OrderDict_(roiveclive_orders(self.ptr, asset_no))
-
-        def submit_buy_order(
-                self,
-                asset_no: uint64,
-                order_id: uint64,
-                price: float64,
-                qty: float64,
-                time_in_force: uint8,
-                order_type: uint8,
-                wait: bool
-        ) -> int64:
-            """
-            Submits a buy order.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                order_id: The unique order ID; there should not be any existing order with the same ID on both local and
-                          exchange sides.
-                price: Order price.
-                qty: Quantity to buy.
-                time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
-
-                    * :const:`GTC <hftLiveBot.order.GTC>`
-                    * :const:`GTX <hftLiveBot.order.GTX>`
-                    * :const:`FOK <hftLiveBot.order.FOK>`
-                    * :const:`IOC <hftLiveBot.order.IOC>`
-
-                order_type: Available options vary depending on the exchange model. See to the exchange model for details.
-
-                    * :const:`LIMIT <hftLiveBot.order.LIMIT>`
-                    * :const:`MARKET <hftLiveBot.order.MARKET>`
-
-                wait: If `True`, wait until the order placement response is received.
-
-            Returns:
-                * `0` when it successfully submits an order.
-                * `1` when it reaches the end of the data, if `wait` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
-
-        def submit_sell_order(
-                self,
-                asset_no: uint64,
-                order_id: uint64,
-                price: float64,
-                qty: float64,
-                time_in_force: uint8,
-                order_type: uint8,
-                wait: bool
-        ) -> int64:
-            """
-            Submits a sell order.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                order_id: The unique order ID; there should not be any existing order with the same ID on both local and
-                          exchange sides.
-                price: Order price.
-                qty: Quantity to sell.
-                time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
-
-                    * :const:`GTC <hftLiveBot.order.GTC>`
-                    * :const:`GTX <hftLiveBot.order.GTX>`
-                    * :const:`FOK <hftLiveBot.order.FOK>`
-                    * :const:`IOC <hftLiveBot.order.IOC>`
-
-                order_type: Available options vary depending on the exchange model. See to the exchange model for details.
-
-                    * :const:`LIMIT <hftLiveBot.order.LIMIT>`
-                    * :const:`MARKET <hftLiveBot.order.MARKET>`
-
-                wait: If `True`, wait until the order placement response is received.
-
-            Returns:
-                * `0` when it successfully submits an order.
-                * `1` when it reaches the end of the data, if `wait` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
-
-        def modify(self, asset_no: uint64, order_id: uint64, price: float, qty: float, wait: bool) -> int64:
-            """
-            Modifies the specified order.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                order_id: Order ID to modify.
-                price: Order price.
-                qty: Order quantity.
-                wait: If `True`, wait until the order cancel response is received.
-
-            Returns:
-                * `0` when it successfully modifies an order.
-                * `1` when it reaches the end of the data, if `wait` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_modify(self.ptr, asset_no, order_id, price, qty, wait)
-
-        def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
-            """
-            Cancels the specified order.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                order_id: Order ID to cancel.
-                wait: If `True`, wait until the order cancel response is received.
-
-            Returns:
-                * `0` when it successfully cancels an order.
-                * `1` when it reaches the end of the data, if `wait` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_cancel(self.ptr, asset_no, order_id, wait)
-
-        def clear_inactive_orders(self, asset_no: uint64) -> None:
-            """
-            Clears inactive orders from the local order dictionary whose status is neither
-            :const:`NEW <hftLiveBot.order.NEW>` nor :const:`PARTIALLY_FILLED <hftLiveBot.order.PARTIALLY_FILLED>`.
-
-            Args:
-                asset_no: Asset number at which this command will be executed.
-                          If :const:`ALL_ASSETS <hftLiveBot.types.ALL_ASSETS>`,
-                          all inactive orders in any assets will be cleared.
-            """
-            roiveclive_clear_inactive_orders(self.ptr, asset_no)
-
-        def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
-            """
-            Waits for the response of the order with the given order ID until timeout.
-
-            Args:
-                asset_no: Asset number where an order with `order_id` exists.
-                order_id: Order ID to wait for the response.
-                timeout: Timeout for waiting for the order response. Nanoseconds is the default unit. However, unit should
-                         be the same as the data’s timestamp unit.
-
-            Returns:
-                * `0` when it receives an order response for the specified order ID of the specified asset number, or
-                  reaches the timeout.
-                * `1` when it reaches the end of the data.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_roiveclive_wait_order_response(self.ptr, asset_no, order_id, timeout)
-
-        def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
-            """
-            Waits until the next feed is received, or until timeout.
-
-            Args:
-                include_order_resp: If set to `True`, it will return when any order response is received, in addition to
-                                    the next feed.
-                timeout: Timeout for waiting for the next feed or an order response. Nanoseconds is the default unit.
-                         However, unit should be the same as the data’s timestamp unit.
-
-            Returns:
-                * `0` when it reaches the timeout.
-                * `1` when it reaches the end of the data.
-                * `2` when it receives a market feed.
-                * `3` when it receives an order response if `include_order_resp` is `True`.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_wait_next_feed(self.ptr, include_order_resp, timeout)
-
-        def elapse(self, duration: uint64) -> int64:
-            """
-            Elapses the specified duration.
-
-            Args:
-                duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
-                          data’s timestamp unit.
-
-            Returns:
-                * `0` when it successfully elapses the given duration.
-                * `1` when it reaches the end of the data.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_elapse(self.ptr, duration)
-
-        def elapse_bt(self, duration: int64) -> int64:
-            """
-            Elapses time only in LiveBoting. In live mode, it is ignored. (Supported only in the Rust implementation)
-
-            The `elapse` method exclusively manages time during LiveBoting, meaning that factors such as computing time are
-            not properly accounted for. So, this method can be utilized to simulate such processing times.
-
-            Args:
-                duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
-                          data’s timestamp unit.
-
-            Returns:
-                * `0` when it successfully elapses the given duration.
-                * `1` when it reaches the end of the data.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_elapse_bt(self.ptr, duration)
-
-        def close(self) -> int64:
-            """
-            Closes this LiveBoter or bot.
-
-            Returns:
-                * `0` when it successfully closes the bot.
-                * Otherwise, an error occurred.
-            """
-            return roiveclive_close(self.ptr)
-
-        def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
-            """
-            Args:
-                asset_no: Asset number from which the last feed latency will be retrieved.
-
-            Returns:
-                The last feed’s exchange timestamp and local receipt timestamp if a feed has been received; otherwise,
-                returns `None`.
-            """
-            exch_ts = int64(0)
-            local_ts = int64(0)
-            exch_ts_ptr = ptr_from_val(exch_ts)
-            local_ts_ptr = ptr_from_val(local_ts)
-            if roiveclive_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
-                return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
-            return None
-
-        def order_latency(self, asset_no: uint64) -> Tuple[int64, int64, int64] | None:
-            """
-            Args:
-                asset_no: Asset number from which the last order latency will be retrieved.
-
-            Returns:
-                The last order’s request timestamp, exchange timestamp, and response receipt timestamp if there has been an
-                order submission; otherwise, returns `None`.
-            """
-            req_ts = int64(0)
-            exch_ts = int64(0)
-            resp_ts = int64(0)
-            req_ts_ptr = ptr_from_val(req_ts)
-            exch_ts_ptr = ptr_from_val(exch_ts)
-            resp_ts_ptr = ptr_from_val(resp_ts)
-            if roiveclive_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
-                return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
-            return None
-
-
-    ROIVectorMarketDepthLiveBot_ = jitclass(ROIVectorMarketDepthLiveBot)
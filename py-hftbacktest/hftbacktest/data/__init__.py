@@ -0,0 +1,63 @@
+from .arrow import (
+    PARQUET_SUFFIXES,
+    IPC_SUFFIXES,
+    read_parquet_feed,
+    read_ipc_feed,
+    read_arrow_feed
+)
+from .compact import (
+    compact_event_dtype,
+    compact_event_meta_dtype,
+    ESCAPED_COMPACT_EVENT,
+    COMPACT_NPZ_SUFFIX,
+    to_compact_events,
+    from_compact_events,
+    write_compact_npz,
+    read_compact_npz
+)
+from .index import (
+    time_index_dtype,
+    build_time_index,
+    write_time_index
+)
+from .latency import (
+    order_latency_dtype,
+    compact_order_latency_dtype,
+    REJECTED_ENTRY_LATENCY,
+    to_compact_order_latency,
+    from_compact_order_latency
+)
+from .validation import (
+    correct_local_timestamp,
+    correct_event_order,
+    validate_event_order,
+    sort_events
+)
+
+__all__ = (
+    'PARQUET_SUFFIXES',
+    'IPC_SUFFIXES',
+    'read_parquet_feed',
+    'read_ipc_feed',
+    'read_arrow_feed',
+    'compact_event_dtype',
+    'compact_event_meta_dtype',
+    'ESCAPED_COMPACT_EVENT',
+    'COMPACT_NPZ_SUFFIX',
+    'to_compact_events',
+    'from_compact_events',
+    'write_compact_npz',
+    'read_compact_npz',
+    'time_index_dtype',
+    'build_time_index',
+    'write_time_index',
+    'order_latency_dtype',
+    'compact_order_latency_dtype',
+    'REJECTED_ENTRY_LATENCY',
+    'to_compact_order_latency',
+    'from_compact_order_latency',
+    'correct_local_timestamp',
+    'correct_event_order',
+    'validate_event_order',
+    'sort_events',
+)
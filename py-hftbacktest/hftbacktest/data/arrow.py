@@ -0,0 +1,248 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..types import (
+    DEPTH_CLEAR_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EVENT_ARRAY,
+    event_dtype
+)
+
+#: The file name suffixes of the Parquet feed data files.
+PARQUET_SUFFIXES = ('.parquet',)
+
+#: The file name suffixes of the Arrow IPC (Feather v2) feed data files.
+IPC_SUFFIXES = ('.arrow', '.feather', '.ipc')
+
+_TS_COLUMNS = ('exch_ts', 'local_ts')
+
+_I64_MIN = np.iinfo(np.int64).min
+_I64_MAX = np.iinfo(np.int64).max
+
+# (exch_ts min, local_ts min, exch_ts max, local_ts max) of a group of rows, or None if unknown.
+_Bounds = Optional[Tuple[int, int, int, int]]
+
+
+def _snapshot_begins(ev: np.ndarray, prev_kind: int) -> Tuple[bool, int]:
+    # A depth snapshot begins at a DEPTH_CLEAR_EVENT that does not follow another clear or snapshot event, as in
+    # build_time_index.
+    if len(ev) == 0:
+        return False, prev_kind
+    kind = ev.astype(np.uint64) & np.uint64(0xff)
+    prev = np.concatenate(([prev_kind], kind[:-1]))
+    begins = (kind == DEPTH_CLEAR_EVENT) & (prev != DEPTH_CLEAR_EVENT) & (prev != DEPTH_SNAPSHOT_EVENT)
+    return bool(begins.any()), int(kind[-1])
+
+
+def _select_groups(
+        bounds: Sequence[_Bounds],
+        read_ev: Callable[[int], np.ndarray],
+        start_time: int,
+        end_time: int
+) -> List[int]:
+    # Groups at or after the end of the window are not needed. Groups before the window are needed only from the one
+    # in which the latest depth snapshot before the window begins, so that the market depth can be rebuilt.
+    first = 0
+    prev_kind = 0
+    for i, b in enumerate(bounds):
+        if start_time == _I64_MIN or b is None or b[2] >= start_time or b[3] >= start_time:
+            break
+        begins, prev_kind = _snapshot_begins(read_ev(i), prev_kind)
+        if begins:
+            first = i
+    return [
+        i for i in range(first, len(bounds))
+        if bounds[i] is None or bounds[i][0] < end_time or bounds[i][1] < end_time
+    ]
+
+
+def _copy_columns(out: EVENT_ARRAY, table) -> None:
+    for name in event_dtype.names:
+        if name in table.column_names:
+            column = table.column(name)
+            if column.null_count > 0:
+                column = column.fill_null(0)
+            out[name] = column.to_numpy()
+        else:
+            out[name] = 0
+
+
+def _read_groups(
+        num_rows: Sequence[int],
+        groups: List[int],
+        read: Callable[[int], object],
+        num_threads: Optional[int],
+        output_filename: Optional[str]
+) -> EVENT_ARRAY:
+    offsets = np.concatenate(([0], np.cumsum([num_rows[i] for i in groups], dtype=np.int64)))
+    if output_filename is None:
+        out = np.empty(int(offsets[-1]), event_dtype)
+    else:
+        out = np.lib.format.open_memmap(output_filename, mode='w+', dtype=event_dtype, shape=(int(offsets[-1]),))
+
+    def load(n: int):
+        _copy_columns(out[offsets[n]:offsets[n + 1]], read(groups[n]))
+
+    with ThreadPoolExecutor(num_threads or os.cpu_count()) as executor:
+        # Consumes the results to raise the first exception, if any.
+        list(executor.map(load, range(len(groups))))
+    if output_filename is not None:
+        out.flush()
+    return out
+
+
+def _window(start_time: Optional[int], end_time: Optional[int]) -> Tuple[int, int]:
+    return (
+        _I64_MIN if start_time is None else start_time,
+        _I64_MAX if end_time is None else end_time
+    )
+
+
+def read_parquet_feed(
+        path: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        num_threads: Optional[int] = None,
+        output_filename: Optional[str] = None
+) -> EVENT_ARRAY:
+    """
+    Reads feed data from a Parquet file whose columns are named after the fields of
+    :data:`event_dtype <hftbacktest.types.event_dtype>`, without materializing an intermediate table of the whole file.
+    Missing ``order_id``, ``ival``, and ``fval`` columns are filled with zeros.
+
+    The row groups are pruned by the ``exch_ts`` and ``local_ts`` column statistics: those entirely at or after
+    `end_time` are skipped, and those entirely before `start_time` are skipped up to the one in which the latest depth
+    snapshot before `start_time` begins, determined by reading only their ``ev`` column, so that the market depth can
+    still be rebuilt. The remaining row groups are decoded in parallel, each straight into its part of the resulting
+    array.
+
+    Requires ``pyarrow``.
+
+    Args:
+        path: The Parquet file path.
+        start_time: The start timestamp of the time window to be backtested, inclusive.
+        end_time: The end timestamp of the time window to be backtested, exclusive.
+        num_threads: The number of threads decoding the row groups. Defaults to the number of CPUs.
+        output_filename: If given, the row groups are decoded straight into a `.npy` file of this name instead of
+                         into memory, and the file is returned memory-mapped.
+
+    Returns:
+        The feed data of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+    """
+    import pyarrow.parquet as pq
+
+    start_time, end_time = _window(start_time, end_time)
+    metadata = pq.ParquetFile(path).metadata
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+
+    def bounds(i: int) -> _Bounds:
+        stats = []
+        for name in _TS_COLUMNS:
+            if name not in names:
+                return None
+            s = metadata.row_group(i).column(names.index(name)).statistics
+            if s is None or not s.has_min_max or not isinstance(s.min, int):
+                return None
+            stats.append(s)
+        return stats[0].min, stats[1].min, stats[0].max, stats[1].max
+
+    def read(i: int, columns: Optional[List[str]] = None):
+        # A ParquetFile is not shared between the threads.
+        return pq.ParquetFile(path, metadata=metadata).read_row_group(
+            i,
+            columns=columns or [name for name in event_dtype.names if name in names],
+            use_threads=False
+        )
+
+    num_groups = metadata.num_row_groups
+    groups = _select_groups(
+        [bounds(i) for i in range(num_groups)],
+        lambda i: read(i, ['ev']).column('ev').to_numpy(),
+        start_time,
+        end_time
+    )
+    return _read_groups(
+        [metadata.row_group(i).num_rows for i in range(num_groups)],
+        groups,
+        read,
+        num_threads,
+        output_filename
+    )
+
+
+def read_ipc_feed(
+        path: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        num_threads: Optional[int] = None,
+        output_filename: Optional[str] = None
+) -> EVENT_ARRAY:
+    """
+    Reads feed data from an Arrow IPC (Feather v2) file in the same way as :func:`read_parquet_feed`, pruning and
+    decoding its record batches instead of row groups. The file is memory-mapped, so uncompressed record batches are
+    read without being copied until they are decoded into the resulting array.
+
+    Requires ``pyarrow``.
+
+    Args:
+        path: The Arrow IPC file path.
+        start_time: The start timestamp of the time window to be backtested, inclusive.
+        end_time: The end timestamp of the time window to be backtested, exclusive.
+        num_threads: The number of threads decoding the record batches. Defaults to the number of CPUs.
+        output_filename: If given, the record batches are decoded straight into a `.npy` file of this name instead
+                         of into memory, and the file is returned memory-mapped.
+
+    Returns:
+        The feed data of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    start_time, end_time = _window(start_time, end_time)
+    # The record batches keep the memory map alive.
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+
+    def bounds(i: int) -> _Bounds:
+        batch = batches[i]
+        if batch.num_rows == 0 or any(name not in batch.schema.names for name in _TS_COLUMNS):
+            return None
+        exch = pc.min_max(batch.column('exch_ts'))
+        local = pc.min_max(batch.column('local_ts'))
+        return exch['min'].as_py(), local['min'].as_py(), exch['max'].as_py(), local['max'].as_py()
+
+    groups = _select_groups(
+        [bounds(i) for i in range(len(batches))] if start_time != _I64_MIN or end_time != _I64_MAX
+        else [None] * len(batches),
+        lambda i: batches[i].column('ev').to_numpy(),
+        start_time,
+        end_time
+    )
+    return _read_groups(
+        [batch.num_rows for batch in batches],
+        groups,
+        lambda i: batches[i],
+        num_threads,
+        output_filename
+    )
+
+
+def read_arrow_feed(
+        path: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        num_threads: Optional[int] = None,
+        output_filename: Optional[str] = None
+) -> EVENT_ARRAY:
+    """
+    Reads feed data with :func:`read_parquet_feed` or :func:`read_ipc_feed` by the file name suffix, one of
+    :data:`PARQUET_SUFFIXES` and :data:`IPC_SUFFIXES`.
+    """
+    if path.endswith(PARQUET_SUFFIXES):
+        return read_parquet_feed(path, start_time, end_time, num_threads, output_filename)
+    elif path.endswith(IPC_SUFFIXES):
+        return read_ipc_feed(path, start_time, end_time, num_threads, output_filename)
+    raise ValueError(f'Unsupported file: {path}')
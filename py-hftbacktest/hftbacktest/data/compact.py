@@ -0,0 +1,197 @@
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..types import (
+    BUY_EVENT,
+    EVENT_ARRAY,
+    EXCH_EVENT,
+    LOCAL_EVENT,
+    SELL_EVENT,
+    event_dtype
+)
+
+compact_event_dtype = np.dtype(
+    [
+        ('exch_dt', 'i4'),
+        ('local_dt', 'i4'),
+        ('px_tick', 'i4'),
+        ('qty_lot', 'i4'),
+        ('ev', 'u1')
+    ],
+    align=True
+)
+"""
+A row of the feed data in the compact form, which takes less than a third of the space of
+:data:`event_dtype <hftbacktest.types.event_dtype>`. Rows that do not fit in the compact form are escaped and stored
+in full.
+
+* ``exch_dt``: ``exch_ts`` minus the ``exch_ts`` of the preceding row, or of ``base_ts`` for the first row.
+* ``local_dt``: ``local_ts - exch_ts``.
+* ``px_tick``: The price in ticks minus ``base_px_tick``.
+* ``qty_lot``: The quantity in lots.
+* ``ev``: The event kind in the low 4 bits, and ``SELL_EVENT``, ``BUY_EVENT``, ``LOCAL_EVENT``, and ``EXCH_EVENT`` from
+  the lowest of the high 4 bits; or :data:`ESCAPED_COMPACT_EVENT` if the row is the next one of the escaped rows.
+"""
+
+compact_event_meta_dtype = np.dtype(
+    [
+        ('tick_size', 'f8'),
+        ('lot_size', 'f8'),
+        ('base_ts', 'i8'),
+        ('base_px_tick', 'i8')
+    ],
+    align=True
+)
+"""
+The parameters with which the feed data in the compact form is decoded.
+"""
+
+#: The ``ev`` that marks a row escaped and stored in full in the compact form.
+ESCAPED_COMPACT_EVENT = 0
+
+#: The file name suffix of the compact feed data files, by which the backtester recognizes them.
+COMPACT_NPZ_SUFFIX = '.compact.npz'
+
+_COMPACT_EV_MASK = np.uint64(0x0f | EXCH_EVENT | LOCAL_EVENT | BUY_EVENT | SELL_EVENT)
+
+
+def _to_units(value: NDArray, unit: float) -> Tuple[NDArray, NDArray]:
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        scaled = value / unit
+        units = np.round(scaled)
+        ok = np.isfinite(units) & (np.abs(scaled - units) < 1e-6) & (np.abs(units) < 2 ** 62)
+    return np.where(ok, units, 0).astype(np.int64), ok
+
+
+def _fits_i32(value: NDArray) -> NDArray:
+    i32 = np.iinfo(np.int32)
+    return (value >= i32.min) & (value <= i32.max)
+
+
+def to_compact_events(data: EVENT_ARRAY, tick_size: float, lot_size: float) -> Tuple[NDArray, EVENT_ARRAY, NDArray]:
+    """
+    Converts the feed data into the compact form. The price and the quantity are restored as multiples of the tick
+    size and the lot size, so rows whose price or quantity is not within a millionth of a tick or a lot of such a
+    multiple are escaped, as are rows with an order ID or the reserved values, timestamps whose deltas do not fit in
+    32 bits, or flags other than the event kind up to 15, the side, and the event source.
+
+    Args:
+        data: The feed data of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+        tick_size: The tick size of the asset.
+        lot_size: The lot size of the asset.
+
+    Returns:
+        A tuple of the rows of :data:`compact_event_dtype`, the escaped rows of
+        :data:`event_dtype <hftbacktest.types.event_dtype>`, and the single-row parameters of
+        :data:`compact_event_meta_dtype`.
+    """
+    ev = data['ev'].astype(np.uint64)
+    exch_ts = data['exch_ts'].astype(np.int64)
+    local_ts = data['local_ts'].astype(np.int64)
+    px_tick, px_ok = _to_units(data['px'], tick_size)
+    qty_lot, qty_ok = _to_units(data['qty'], lot_size)
+
+    meta = np.zeros(1, compact_event_meta_dtype)
+    meta['tick_size'] = tick_size
+    meta['lot_size'] = lot_size
+    base_ts = exch_ts[0] if len(data) > 0 else 0
+    base_px_tick = px_tick[np.argmax(px_ok)] if px_ok.any() else 0
+    meta['base_ts'] = base_ts
+    meta['base_px_tick'] = base_px_tick
+
+    exch_dt = np.diff(exch_ts, prepend=base_ts)
+    local_dt = local_ts - exch_ts
+    px_tick = px_tick - base_px_tick
+    ev_byte = (ev & np.uint64(0x0f)) | ((ev >> np.uint64(28)) << np.uint64(4))
+
+    compact = (
+        (data['order_id'] == 0)
+        & (data['ival'] == 0)
+        & (data['fval'] == 0)
+        & _fits_i32(exch_dt)
+        & _fits_i32(local_dt)
+        & px_ok
+        & _fits_i32(px_tick)
+        & qty_ok
+        & _fits_i32(qty_lot)
+        & ((ev & ~_COMPACT_EV_MASK) == 0)
+        & (ev_byte != ESCAPED_COMPACT_EVENT)
+    )
+
+    out = np.zeros(len(data), compact_event_dtype)
+    out['exch_dt'] = np.where(compact, exch_dt, 0)
+    out['local_dt'] = np.where(compact, local_dt, 0)
+    out['px_tick'] = np.where(compact, px_tick, 0)
+    out['qty_lot'] = np.where(compact, qty_lot, 0)
+    out['ev'] = np.where(compact, ev_byte, ESCAPED_COMPACT_EVENT)
+    return out, data[~compact].astype(event_dtype), meta
+
+
+def from_compact_events(data: NDArray, escaped: EVENT_ARRAY, meta: NDArray) -> EVENT_ARRAY:
+    """
+    Converts the feed data in the compact form back into the full form.
+
+    Args:
+        data: The rows of :data:`compact_event_dtype`.
+        escaped: The escaped rows of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+        meta: The single-row parameters of :data:`compact_event_meta_dtype`.
+
+    Returns:
+        The feed data of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+    """
+    is_escaped = data['ev'] == ESCAPED_COMPACT_EVENT
+    escaped_rows = np.flatnonzero(is_escaped)
+    if len(escaped) < len(escaped_rows):
+        raise ValueError('There are fewer escaped rows than the compact rows refer to.')
+    escaped = escaped[:len(escaped_rows)]
+
+    # The exchange timestamps accumulate the deltas from the base timestamp, and from the timestamp of each escaped
+    # row onwards.
+    exch_dt = np.where(is_escaped, 0, data['exch_dt'].astype(np.int64))
+    acc = np.cumsum(exch_dt)
+    anchors = np.concatenate(([meta['base_ts'][0]], escaped['exch_ts'] - acc[escaped_rows]))
+    exch_ts = anchors[np.cumsum(is_escaped)] + acc
+
+    ev = data['ev'].astype(np.uint64)
+    out = np.zeros(len(data), event_dtype)
+    out['ev'] = (ev & np.uint64(0x0f)) | ((ev >> np.uint64(4)) << np.uint64(28))
+    out['exch_ts'] = exch_ts
+    out['local_ts'] = exch_ts + data['local_dt']
+    out['px'] = (meta['base_px_tick'][0] + data['px_tick'].astype(np.int64)) * meta['tick_size'][0]
+    out['qty'] = data['qty_lot'] * meta['lot_size'][0]
+    out[escaped_rows] = escaped
+    return out
+
+
+def write_compact_npz(output_filename: str, data: EVENT_ARRAY, tick_size: float, lot_size: float):
+    """
+    Writes the feed data into a compressed compact feed data file, which can be given to
+    :meth:`BacktestAsset.data <hftbacktest.BacktestAsset.data>` like `.npz` files and is decoded as it is loaded.
+    See :func:`to_compact_events` for the rows that are escaped and stored in full.
+
+    Args:
+        output_filename: The file name, which must end with :data:`COMPACT_NPZ_SUFFIX`.
+        data: The feed data of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+        tick_size: The tick size of the asset.
+        lot_size: The lot size of the asset.
+    """
+    if not output_filename.endswith(COMPACT_NPZ_SUFFIX):
+        raise ValueError(f'The file name must end with {COMPACT_NPZ_SUFFIX}.')
+    compact, escaped, meta = to_compact_events(data, tick_size, lot_size)
+    np.savez_compressed(output_filename, data=compact, escaped=escaped, meta=meta)
+
+
+def read_compact_npz(filename: str) -> EVENT_ARRAY:
+    """
+    Reads a compact feed data file written by :func:`write_compact_npz`.
+
+    Args:
+        filename: The file name.
+
+    Returns:
+        The feed data of :data:`event_dtype <hftbacktest.types.event_dtype>`.
+    """
+    with np.load(filename) as file:
+        return from_compact_events(file['data'], file['escaped'], file['meta'])
@@ -0,0 +1,125 @@
+from typing import Optional
+
+import numpy as np
+from numba import njit
+
+from ..types import (
+    DEPTH_CLEAR_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EVENT_ARRAY,
+    EXCH_EVENT,
+    LOCAL_EVENT
+)
+
+time_index_dtype = np.dtype(
+    [
+        ('row', 'u8'),
+        ('exch_ts', 'i8'),
+        ('local_ts', 'i8'),
+        ('snapshot_row', 'i8')
+    ],
+    align=True
+)
+"""
+An entry of the sparse timestamp index of a feed file, taken every `interval` rows.
+
+* ``row``: The row at which the entry is taken.
+* ``exch_ts``: The latest exchange timestamp of the exchange-side events before the row.
+* ``local_ts``: The latest local timestamp of the local-side events before the row.
+* ``snapshot_row``: The row at which the latest depth snapshot before the row begins, or `-1` if there is none.
+"""
+
+DEFAULT_INDEX_INTERVAL = 65_536
+
+
+@njit(cache=True)
+def _build_time_index(data: EVENT_ARRAY, interval: int, index: np.ndarray) -> int:
+    exch_ts = np.iinfo(np.int64).min
+    local_ts = np.iinfo(np.int64).min
+    snapshot_row = -1
+    in_snapshot = False
+    n = 0
+    for row in range(len(data)):
+        if row % interval == 0:
+            index[n].row = row
+            index[n].exch_ts = exch_ts
+            index[n].local_ts = local_ts
+            index[n].snapshot_row = snapshot_row
+            n += 1
+        ev = data[row].ev
+        if ev & EXCH_EVENT == EXCH_EVENT:
+            exch_ts = max(exch_ts, data[row].exch_ts)
+        if ev & LOCAL_EVENT == LOCAL_EVENT:
+            local_ts = max(local_ts, data[row].local_ts)
+        kind = ev & 0xff
+        if kind == DEPTH_CLEAR_EVENT and not in_snapshot:
+            snapshot_row = row
+        in_snapshot = kind == DEPTH_CLEAR_EVENT or kind == DEPTH_SNAPSHOT_EVENT
+    index[n].row = len(data)
+    index[n].exch_ts = exch_ts
+    index[n].local_ts = local_ts
+    index[n].snapshot_row = snapshot_row
+    return n + 1
+
+
+def build_time_index(data: EVENT_ARRAY, interval: int = DEFAULT_INDEX_INTERVAL) -> np.ndarray:
+    """
+    Builds the sparse timestamp index of the feed data with an entry every `interval` rows. The last entry is taken at
+    the end of the data. A depth snapshot begins at a :const:`DEPTH_CLEAR_EVENT <hftbacktest.types.DEPTH_CLEAR_EVENT>`
+    that does not follow another clear or :const:`DEPTH_SNAPSHOT_EVENT <hftbacktest.types.DEPTH_SNAPSHOT_EVENT>`.
+
+    Args:
+        data: The feed data.
+        interval: The number of rows between the entries.
+
+    Returns:
+        The index of :data:`time_index_dtype`.
+    """
+    interval = max(interval, 1)
+    index = np.empty(len(data) // interval + 2, time_index_dtype)
+    n = _build_time_index(data, interval, index)
+    return index[:n]
+
+
+def write_time_index(
+        filepath: str,
+        data: Optional[EVENT_ARRAY] = None,
+        interval: int = DEFAULT_INDEX_INTERVAL
+) -> str:
+    """
+    Writes the index sidecar file, ``<filepath>.idx.npy``, of the given feed file. It allows
+    :meth:`BacktestAsset.start_time <hftbacktest.BacktestAsset.start_time>` and
+    :meth:`BacktestAsset.end_time <hftbacktest.BacktestAsset.end_time>` to skip the files outside the time window
+    without loading them and to slice each file without scanning it.
+
+    **Example**
+
+    .. code-block:: python
+
+        for file in files:
+            write_time_index(file)
+
+        asset = (
+            BacktestAsset()
+                .data(files)
+                .start_time(1722520800_000_000_000)  # 2024-08-01 14:00:00 UTC
+                .end_time(1722528000_000_000_000)  # 2024-08-01 16:00:00 UTC
+                # ...
+        )
+
+    Args:
+        filepath: The feed file in `.npz` or `.npy` format.
+        data: The data of the feed file, if already loaded. If `None`, it is loaded from `filepath`.
+        interval: The number of rows between the entries.
+
+    Returns:
+        The path of the index sidecar file.
+    """
+    if data is None:
+        if filepath.endswith('.npz'):
+            data = np.load(filepath)['data']
+        else:
+            data = np.load(filepath, mmap_mode='r')
+    path = f'{filepath}.idx.npy'
+    np.save(path, build_time_index(data, interval))
+    return path
@@ -0,0 +1,146 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Literal, Optional, Sequence, Union
+
+from . import binancefutures, bybit, hyperliquid
+from .fuse import fuse, fuse_file
+
+_converters = {
+    'binancefutures': binancefutures.convert,
+    'bybit': bybit.convert,
+    'hyperliquid': hyperliquid.convert,
+}
+
+
+def _output_filename(input_filename: str, output_dir: Optional[str]) -> str:
+    name = os.path.basename(input_filename)
+    for ext in ('.gz', '.txt', '.jsonl'):
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+            break
+    return os.path.join(output_dir or os.path.dirname(input_filename), name + '.npz')
+
+
+def _convert(convert: Callable[..., Any], input_filename: str, output_filename: str, kwargs: dict) -> str:
+    # Returns only the file name; sending the converted data back to the parent process would be wasted work.
+    convert(input_filename, output_filename, **kwargs)
+    return output_filename
+
+
+def convert_many(
+        input_filenames: Sequence[str],
+        exchange: Union[Literal['binancefutures', 'bybit', 'hyperliquid'], Callable[..., Any]],
+        output_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        **kwargs
+) -> List[str]:
+    """
+    Converts many collector files in parallel, one file per process. Each file is converted by the exchange's
+    ``convert`` function and saved as a `.npz` file named after the input file, for example,
+    ``btcusdt_20240808.gz`` to ``btcusdt_20240808.npz``.
+
+    **Example**
+
+    .. code-block:: python
+
+        from glob import glob
+
+        from hftbacktest.data.utils import convert_many
+
+        if __name__ == '__main__':
+            files = convert_many(sorted(glob('collected/btcusdt_202408*.gz')), 'binancefutures', 'npz')
+
+    Args:
+        input_filenames: The collector's output files.
+        exchange: The exchange whose converter is used, or a converter function with the same signature as
+                  :func:`binancefutures.convert <hftbacktest.data.utils.binancefutures.convert>`, which must be
+                  picklable, that is, defined at the top level of a module.
+        output_dir: The directory in which the converted files are saved. If `None`, each file is saved next to its
+                    input file.
+        max_workers: The maximum number of worker processes. If `None`, the number of CPUs is used.
+        **kwargs: Additional keyword arguments passed to the converter, such as `base_latency`.
+
+    Returns:
+        The converted files in the order of `input_filenames`.
+    """
+    if isinstance(exchange, str):
+        if exchange not in _converters:
+            raise ValueError(f'Unsupported exchange: {exchange}')
+        convert = _converters[exchange]
+    else:
+        convert = exchange
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_convert, convert, input_filename, _output_filename(input_filename, output_dir), kwargs)
+            for input_filename in input_filenames
+        ]
+        return [future.result() for future in futures]
+
+
+def fuse_many(
+        input_filenames: Sequence[str],
+        tick_size: float,
+        lot_size: float,
+        output_dir: Optional[str] = None,
+        max_workers: Optional[int] = None
+) -> List[str]:
+    """
+    Fuses the depth streams of many files in parallel, one file per process, using :func:`fuse_file`. Each fused file
+    is saved as a `.npz` file named after the input file with a ``_fused`` suffix, for example,
+    ``btcusdt_20240808.npz`` to ``btcusdt_20240808_fused.npz``.
+
+    **Example**
+
+    .. code-block:: python
+
+        from glob import glob
+
+        from hftbacktest.data.utils import fuse_many
+
+        if __name__ == '__main__':
+            files = fuse_many(sorted(glob('npz/btcusdt_202408*.npz')), 0.1, 0.001, 'fused')
+
+    Args:
+        input_filenames: The files of the data of all streams, each sorted by the local timestamp.
+        tick_size: The tick size of the asset.
+        lot_size: The lot size of the asset.
+        output_dir: The directory in which the fused files are saved. If `None`, each file is saved next to its input
+                    file.
+        max_workers: The maximum number of worker processes. If `None`, the number of CPUs is used.
+
+    Returns:
+        The fused files in the order of `input_filenames`.
+    """
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    output_filenames = []
+    for input_filename in input_filenames:
+        name = os.path.basename(input_filename)
+        for ext in ('.npz', '.npy'):
+            if name.endswith(ext):
+                name = name[:-len(ext)]
+                break
+        output_filenames.append(os.path.join(output_dir or os.path.dirname(input_filename), name + '_fused.npz'))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(fuse_file, input_filename, output_filename, tick_size, lot_size)
+            for input_filename, output_filename in zip(input_filenames, output_filenames)
+        ]
+        return [future.result() for future in futures]
+
+
+__all__ = (
+    'binancefutures',
+    'bybit',
+    'hyperliquid',
+    'convert_many',
+    'fuse',
+    'fuse_file',
+    'fuse_many',
+)
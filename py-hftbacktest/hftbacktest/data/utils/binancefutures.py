@@ -0,0 +1,68 @@
+from typing import Optional
+
+from .common import EventBuilder, loads, read_lines, save
+from ...types import (
+    BUY_EVENT,
+    DEPTH_EVENT,
+    EVENT_ARRAY,
+    SELL_EVENT,
+    TRADE_EVENT
+)
+
+
+def convert(
+        input_filename: str,
+        output_filename: Optional[str] = None,
+        base_latency: float = 0,
+        trade_stream: str = 'trade'
+) -> EVENT_ARRAY:
+    """
+    Converts the Binance Futures feed file written by the collector (``binancefutures`` or ``binancefuturesum``) into
+    the format that can be used by the backtester.
+
+    The depth updates (``depthUpdate``) become :const:`DEPTH_EVENT <hftbacktest.types.DEPTH_EVENT>`, the trades
+    become :const:`TRADE_EVENT <hftbacktest.types.TRADE_EVENT>`, and the REST depth snapshots fetched by the collector
+    whenever a gap in the depth stream is detected become
+    :const:`DEPTH_SNAPSHOT_EVENT <hftbacktest.types.DEPTH_SNAPSHOT_EVENT>`. The transaction time is used as the
+    exchange timestamp. The other streams are ignored.
+
+    Args:
+        input_filename: The collector's output file.
+        output_filename: If provided, the converted data is saved to this `.npz` file.
+        base_latency: The minimum feed latency ensured by
+                      :func:`correct_local_timestamp <hftbacktest.data.correct_local_timestamp>`, in nanoseconds.
+        trade_stream: The trade stream to be converted, either ``'trade'`` or ``'aggTrade'``.
+
+    Returns:
+        The converted data.
+    """
+    trade_tag = b'"e":"%s"' % trade_stream.encode()
+    builder = EventBuilder()
+    for local_ts, message in read_lines(input_filename):
+        # Checks the event type on the raw bytes first so that the messages of the other streams are not parsed.
+        if b'"e":"depthUpdate"' in message:
+            data = loads(message)['data']
+            exch_ts = int(data['T']) * 1_000_000
+            for px, qty in data['b']:
+                builder.append(DEPTH_EVENT | BUY_EVENT, exch_ts, local_ts, float(px), float(qty))
+            for px, qty in data['a']:
+                builder.append(DEPTH_EVENT | SELL_EVENT, exch_ts, local_ts, float(px), float(qty))
+        elif trade_tag in message:
+            data = loads(message)['data']
+            exch_ts = int(data['T']) * 1_000_000
+            # The buyer being the maker means that the trade was initiated by the seller.
+            side = SELL_EVENT if data['m'] else BUY_EVENT
+            builder.append(TRADE_EVENT | side, exch_ts, local_ts, float(data['p']), float(data['q']))
+        elif message.startswith(b'{"lastUpdateId"'):
+            data = loads(message)
+            exch_ts = int(data['T']) * 1_000_000
+            builder.append_snapshot(
+                exch_ts,
+                local_ts,
+                [(float(px), float(qty)) for px, qty in data['bids']],
+                [(float(px), float(qty)) for px, qty in data['asks']]
+            )
+
+    data = builder.build(base_latency)
+    save(data, output_filename)
+    return data
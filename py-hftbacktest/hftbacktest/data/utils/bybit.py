@@ -0,0 +1,63 @@
+from typing import Optional
+
+from .common import EventBuilder, loads, read_lines, save
+from ...types import (
+    BUY_EVENT,
+    DEPTH_EVENT,
+    EVENT_ARRAY,
+    SELL_EVENT,
+    TRADE_EVENT
+)
+
+
+def convert(
+        input_filename: str,
+        output_filename: Optional[str] = None,
+        base_latency: float = 0
+) -> EVENT_ARRAY:
+    """
+    Converts the Bybit feed file written by the collector (``bybit``) into the format that can be used by the
+    backtester.
+
+    The ``orderbook`` deltas become :const:`DEPTH_EVENT <hftbacktest.types.DEPTH_EVENT>`, the ``orderbook`` snapshots
+    become :const:`DEPTH_SNAPSHOT_EVENT <hftbacktest.types.DEPTH_SNAPSHOT_EVENT>`, and the ``publicTrade`` messages
+    become :const:`TRADE_EVENT <hftbacktest.types.TRADE_EVENT>`. For the order book, the matching engine timestamp
+    (``cts``) is used as the exchange timestamp if available. The other topics are ignored.
+
+    Args:
+        input_filename: The collector's output file.
+        output_filename: If provided, the converted data is saved to this `.npz` file.
+        base_latency: The minimum feed latency ensured by
+                      :func:`correct_local_timestamp <hftbacktest.data.correct_local_timestamp>`, in nanoseconds.
+
+    Returns:
+        The converted data.
+    """
+    builder = EventBuilder()
+    for local_ts, message in read_lines(input_filename):
+        # Checks the topic on the raw bytes first so that the messages of the other topics are not parsed.
+        if message.startswith(b'{"topic":"orderbook.'):
+            message = loads(message)
+            data = message['data']
+            exch_ts = int(message.get('cts', message['ts'])) * 1_000_000
+            if message['type'] == 'snapshot':
+                builder.append_snapshot(
+                    exch_ts,
+                    local_ts,
+                    [(float(px), float(qty)) for px, qty in data['b']],
+                    [(float(px), float(qty)) for px, qty in data['a']]
+                )
+            else:
+                for px, qty in data['b']:
+                    builder.append(DEPTH_EVENT | BUY_EVENT, exch_ts, local_ts, float(px), float(qty))
+                for px, qty in data['a']:
+                    builder.append(DEPTH_EVENT | SELL_EVENT, exch_ts, local_ts, float(px), float(qty))
+        elif message.startswith(b'{"topic":"publicTrade.'):
+            for trade in loads(message)['data']:
+                side = BUY_EVENT if trade['S'] == 'Buy' else SELL_EVENT
+                exch_ts = int(trade['T']) * 1_000_000
+                builder.append(TRADE_EVENT | side, exch_ts, local_ts, float(trade['p']), float(trade['v']))
+
+    data = builder.build(base_latency)
+    save(data, output_filename)
+    return data
@@ -0,0 +1,104 @@
+import gzip
+import json
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..validation import sort_events
+from ...types import (
+    BUY_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EVENT_ARRAY,
+    SELL_EVENT,
+    event_dtype
+)
+
+try:
+    import orjson
+
+    loads: Callable[[bytes], object] = orjson.loads
+except ImportError:
+    loads = json.loads
+
+
+def read_lines(filename: str) -> Iterator[Tuple[int, bytes]]:
+    """
+    Reads a file written by the collector, in which each line consists of the local timestamp in nanoseconds and the
+    raw message, separated by a space. The file is decompressed as it is read, so it is never held in memory as a
+    whole.
+
+    Args:
+        filename: The collector's output file, either gzip-compressed or plain.
+
+    Yields:
+        The local timestamp and the raw message of each line.
+    """
+    open_ = gzip.open if filename.endswith('.gz') else open
+    with open_(filename, 'rb') as f:
+        for line in f:
+            timestamp, _, message = line.partition(b' ')
+            if not message:
+                continue
+            yield int(timestamp), message
+
+
+class EventBuilder:
+    """
+    Accumulates the converted events, which are appended as plain tuples for speed and turned into an
+    :data:`event_dtype <hftbacktest.types.event_dtype>` array in blocks of `block_size` rows, so that the Python
+    objects are held for only a bounded number of rows at a time.
+    """
+
+    def __init__(self, block_size: int = 1_000_000):
+        self.block_size = block_size
+        self.rows: List[tuple] = []
+        self.blocks: List[EVENT_ARRAY] = []
+
+    def append(self, ev: int, exch_ts: int, local_ts: int, px: float, qty: float):
+        self.rows.append((ev, exch_ts, local_ts, px, qty, 0, 0, 0.0))
+        if len(self.rows) >= self.block_size:
+            self._flush()
+
+    def append_snapshot(
+            self,
+            exch_ts: int,
+            local_ts: int,
+            bids: List[Tuple[float, float]],
+            asks: List[Tuple[float, float]]
+    ):
+        """
+        Appends a depth snapshot. Each side is first cleared up to its farthest level in the snapshot, so that stale
+        levels within the snapshot's range are removed, and then the levels are appended as
+        :const:`DEPTH_SNAPSHOT_EVENT <hftbacktest.types.DEPTH_SNAPSHOT_EVENT>`.
+        """
+        if bids:
+            self.append(DEPTH_CLEAR_EVENT | BUY_EVENT, exch_ts, local_ts, min(px for px, _ in bids), 0)
+        if asks:
+            self.append(DEPTH_CLEAR_EVENT | SELL_EVENT, exch_ts, local_ts, max(px for px, _ in asks), 0)
+        for px, qty in bids:
+            self.append(DEPTH_SNAPSHOT_EVENT | BUY_EVENT, exch_ts, local_ts, px, qty)
+        for px, qty in asks:
+            self.append(DEPTH_SNAPSHOT_EVENT | SELL_EVENT, exch_ts, local_ts, px, qty)
+
+    def _flush(self):
+        if self.rows:
+            self.blocks.append(np.array(self.rows, dtype=event_dtype))
+            self.rows = []
+
+    def build(self, base_latency: float = 0) -> EVENT_ARRAY:
+        """
+        Returns the events sorted and flagged by :func:`sort_events <hftbacktest.data.validation.sort_events>`.
+        """
+        self._flush()
+        if len(self.blocks) == 0:
+            return np.empty(0, event_dtype)
+        data = self.blocks[0] if len(self.blocks) == 1 else np.concatenate(self.blocks)
+        self.blocks = []
+        return sort_events(data, base_latency)
+
+
+def save(data: EVENT_ARRAY, output_filename: Optional[str]):
+    if output_filename is not None:
+        print('Saving to %s' % output_filename)
+        np.savez_compressed(output_filename, data=data)
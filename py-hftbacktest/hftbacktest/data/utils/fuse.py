@@ -0,0 +1,100 @@
+from typing import Optional
+
+import numpy as np
+from numba import njit
+
+from .common import save
+from ...types import EVENT_ARRAY, event_dtype
+
+
+@njit(cache=True)
+def _grow(out: EVENT_ARRAY, n: int) -> EVENT_ARRAY:
+    grown = np.empty(len(out) * 2, event_dtype)
+    grown[:n] = out[:n]
+    return grown
+
+
+@njit
+def _fuse(fuse, data: EVENT_ARRAY, add_mask: np.ndarray, out: EVENT_ARRAY):
+    n = 0
+    i = 0
+    while True:
+        j = fuse.process_events(data, i, len(data), add_mask)
+        # Moves the fused events into the output until no more remain.
+        while True:
+            if n == len(out):
+                out = _grow(out, n)
+            n += fuse.drain(out[n:])
+            if n < len(out):
+                break
+        if j >= len(data):
+            break
+        # Passes through the event that cannot be fused, such as a trade event, in its place.
+        if n == len(out):
+            out = _grow(out, n)
+        out[n] = data[j]
+        n += 1
+        i = j + 1
+    return out[:n]
+
+
+def fuse(
+        data: EVENT_ARRAY,
+        tick_size: float,
+        lot_size: float,
+        output_filename: Optional[str] = None,
+        add_mask: Optional[np.ndarray] = None
+) -> EVENT_ARRAY:
+    """
+    Fuses the depth streams in the given data, such as the conflated Level-2 depth stream and the Level-1 book ticker
+    stream given as :const:`DEPTH_BBO_EVENT <hftbacktest.types.DEPTH_BBO_EVENT>`, into a single depth stream using
+    :class:`FuseMarketDepth <hftbacktest.binding.FuseMarketDepth>`. The events that cannot be fused, such as trade
+    events, are passed through in their places.
+
+    The slices of depth events are processed by :meth:`FuseMarketDepth.process_events
+    <hftbacktest.binding.FuseMarketDepth.process_events>` in a single native call each, rather than one call per event.
+
+    Args:
+        data: The data of all streams, sorted by the local timestamp.
+        tick_size: The tick size of the asset.
+        lot_size: The lot size of the asset.
+        output_filename: If provided, the fused data is saved to this `.npz` file.
+        add_mask: An array of the same length as `data` indicating, for each depth event, whether its fused events are
+                  added to the output. If `None`, all are added.
+
+    Returns:
+        The fused data.
+    """
+    from ...binding import FuseMarketDepth_
+
+    if add_mask is None:
+        add_mask = np.ones(len(data), np.bool_)
+    fuse_depth = FuseMarketDepth_(tick_size, lot_size)
+    try:
+        fused = _fuse(fuse_depth, data, add_mask, np.empty(max(len(data), 1), event_dtype))
+    finally:
+        fuse_depth.close()
+
+    save(fused, output_filename)
+    return fused
+
+
+def fuse_file(input_filename: str, output_filename: str, tick_size: float, lot_size: float) -> str:
+    """
+    Fuses the depth streams in the given `.npz` or `.npy` file and saves the fused data. See :func:`fuse`.
+
+    Args:
+        input_filename: The file of the data of all streams, sorted by the local timestamp.
+        output_filename: The `.npz` file to which the fused data is saved.
+        tick_size: The tick size of the asset.
+        lot_size: The lot size of the asset.
+
+    Returns:
+        The file to which the fused data is saved.
+    """
+    if input_filename.endswith('.npz'):
+        data = np.load(input_filename)['data']
+    else:
+        data = np.load(input_filename)
+    fuse(data, tick_size, lot_size, output_filename)
+    return output_filename
@@ -0,0 +1,57 @@
+from typing import Optional
+
+from .common import EventBuilder, loads, read_lines, save
+from ...types import (
+    BUY_EVENT,
+    EVENT_ARRAY,
+    SELL_EVENT,
+    TRADE_EVENT
+)
+
+
+def convert(
+        input_filename: str,
+        output_filename: Optional[str] = None,
+        base_latency: float = 0
+) -> EVENT_ARRAY:
+    """
+    Converts the Hyperliquid feed file written by the collector (``hyperliquid``) into the format that can be used by
+    the backtester.
+
+    Hyperliquid publishes the order book (``l2Book``) only as snapshots of the top levels, so each of them becomes
+    :const:`DEPTH_SNAPSHOT_EVENT <hftbacktest.types.DEPTH_SNAPSHOT_EVENT>` preceded by the clearing of the levels
+    within its range. The ``trades`` messages become :const:`TRADE_EVENT <hftbacktest.types.TRADE_EVENT>`. The other
+    channels are ignored.
+
+    Args:
+        input_filename: The collector's output file.
+        output_filename: If provided, the converted data is saved to this `.npz` file.
+        base_latency: The minimum feed latency ensured by
+                      :func:`correct_local_timestamp <hftbacktest.data.correct_local_timestamp>`, in nanoseconds.
+
+    Returns:
+        The converted data.
+    """
+    builder = EventBuilder()
+    for local_ts, message in read_lines(input_filename):
+        # Checks the channel on the raw bytes first so that the messages of the other channels are not parsed.
+        if message.startswith(b'{"channel":"l2Book"'):
+            data = loads(message)['data']
+            exch_ts = int(data['time']) * 1_000_000
+            bids, asks = data['levels']
+            builder.append_snapshot(
+                exch_ts,
+                local_ts,
+                [(float(level['px']), float(level['sz'])) for level in bids],
+                [(float(level['px']), float(level['sz'])) for level in asks]
+            )
+        elif message.startswith(b'{"channel":"trades"'):
+            for trade in loads(message)['data']:
+                # The side is that of the aggressor: 'B' for bid and 'A' for ask.
+                side = BUY_EVENT if trade['side'] == 'B' else SELL_EVENT
+                exch_ts = int(trade['time']) * 1_000_000
+                builder.append(TRADE_EVENT | side, exch_ts, local_ts, float(trade['px']), float(trade['sz']))
+
+    data = builder.build(base_latency)
+    save(data, output_filename)
+    return data
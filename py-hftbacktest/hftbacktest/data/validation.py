@@ -0,0 +1,139 @@
+import numpy as np
+from numba import njit
+
+from ..types import (
+    EVENT_ARRAY,
+    EXCH_EVENT,
+    LOCAL_EVENT,
+    event_dtype
+)
+
+
+@njit(cache=True)
+def correct_local_timestamp(data: EVENT_ARRAY, base_latency: float) -> EVENT_ARRAY:
+    """
+    Adjusts the local timestamp if the feed latency is negative, which can occur when the clocks of the exchange and
+    the local machine are not synchronized. All local timestamps are shifted by the same offset so that the minimum
+    feed latency becomes `base_latency`.
+
+    Args:
+        data: The feed data to be corrected.
+        base_latency: The minimum feed latency to be ensured after the correction, in the same unit as the
+                      timestamps.
+
+    Returns:
+        The corrected feed data. The correction is performed in place.
+    """
+    latency = np.inf
+    for row_num in range(len(data)):
+        latency = min(latency, data[row_num].local_ts - data[row_num].exch_ts)
+
+    if latency < 0:
+        local_timestamp_offset = int(-latency + base_latency)
+        print('local_timestamp is ahead of exch_timestamp by', -latency)
+        for row_num in range(len(data)):
+            data[row_num].local_ts += local_timestamp_offset
+
+    return data
+
+
+@njit(cache=True)
+def correct_event_order(
+        data: EVENT_ARRAY,
+        sorted_exch_index: np.ndarray,
+        sorted_local_index: np.ndarray
+) -> EVENT_ARRAY:
+    """
+    Arranges the events so that the exchange-side events are in exchange timestamp order and the local-side events are
+    in local timestamp order, and sets :const:`EXCH_EVENT <hftbacktest.types.EXCH_EVENT>` and
+    :const:`LOCAL_EVENT <hftbacktest.types.LOCAL_EVENT>` accordingly. An event that falls at a different position in
+    the two orders is duplicated: one row is flagged as the exchange-side event and the other as the local-side event.
+
+    Args:
+        data: The feed data to be arranged.
+        sorted_exch_index: The indices of `data` sorted by the exchange timestamp.
+        sorted_local_index: The indices of `data` sorted by the local timestamp.
+
+    Returns:
+        The arranged feed data.
+    """
+    sorted_final = np.zeros(len(data) * 2, event_dtype)
+
+    exch_rn = 0
+    local_rn = 0
+    out_rn = 0
+    while exch_rn < len(data) or local_rn < len(data):
+        if exch_rn < len(data) and local_rn < len(data):
+            exch_i = sorted_exch_index[exch_rn]
+            local_i = sorted_local_index[local_rn]
+            if exch_i == local_i:
+                sorted_final[out_rn] = data[exch_i]
+                sorted_final[out_rn].ev = data[exch_i].ev | EXCH_EVENT | LOCAL_EVENT
+                exch_rn += 1
+                local_rn += 1
+            elif data[exch_i].exch_ts <= data[local_i].local_ts:
+                sorted_final[out_rn] = data[exch_i]
+                sorted_final[out_rn].ev = data[exch_i].ev | EXCH_EVENT
+                exch_rn += 1
+            else:
+                sorted_final[out_rn] = data[local_i]
+                sorted_final[out_rn].ev = data[local_i].ev | LOCAL_EVENT
+                local_rn += 1
+        elif exch_rn < len(data):
+            exch_i = sorted_exch_index[exch_rn]
+            sorted_final[out_rn] = data[exch_i]
+            sorted_final[out_rn].ev = data[exch_i].ev | EXCH_EVENT
+            exch_rn += 1
+        else:
+            local_i = sorted_local_index[local_rn]
+            sorted_final[out_rn] = data[local_i]
+            sorted_final[out_rn].ev = data[local_i].ev | LOCAL_EVENT
+            local_rn += 1
+        out_rn += 1
+
+    return sorted_final[:out_rn]
+
+
+@njit(cache=True)
+def validate_event_order(data: EVENT_ARRAY):
+    """
+    Validates that the exchange-side events are in exchange timestamp order and the local-side events are in local
+    timestamp order.
+
+    Args:
+        data: The feed data to be validated.
+
+    Raises:
+        ValueError: If the events are out of order.
+    """
+    last_exch_ts = np.iinfo(np.int64).min
+    last_local_ts = np.iinfo(np.int64).min
+    for row_num in range(len(data)):
+        if data[row_num].ev & EXCH_EVENT == EXCH_EVENT:
+            if data[row_num].exch_ts < last_exch_ts:
+                raise ValueError('exchange events are out of order.')
+            last_exch_ts = data[row_num].exch_ts
+        if data[row_num].ev & LOCAL_EVENT == LOCAL_EVENT:
+            if data[row_num].local_ts < last_local_ts:
+                raise ValueError('local events are out of order.')
+            last_local_ts = data[row_num].local_ts
+
+
+def sort_events(data: EVENT_ARRAY, base_latency: float = 0) -> EVENT_ARRAY:
+    """
+    Corrects the local timestamps, arranges the events, and validates the result. This is the final step of converting
+    raw feed data into the format that can be used by the backtester.
+
+    Args:
+        data: The unflagged feed data in the order in which it was collected.
+        base_latency: See :func:`correct_local_timestamp`.
+
+    Returns:
+        The feed data ready for backtesting.
+    """
+    data = correct_local_timestamp(data, base_latency)
+    sorted_exch_index = np.argsort(data['exch_ts'], kind='stable')
+    sorted_local_index = np.argsort(data['local_ts'], kind='stable')
+    data = correct_event_order(data, sorted_exch_index, sorted_local_index)
+    validate_event_order(data)
+    return data
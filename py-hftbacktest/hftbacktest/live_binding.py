@@ -0,0 +1,946 @@
+"""
+The bindings of the live bots, which are loaded only when first accessed through :mod:`hftbacktest`, so that the
+backtest does not pay for them at import time.
+"""
+from ctypes import (
+    c_void_p,
+    c_bool,
+    c_double,
+    c_uint8,
+    c_uint64,
+    c_int64,
+    POINTER
+)
+from typing import Tuple
+
+import numba
+from numba import (
+    uint64,
+    int64,
+    float64,
+    uint8
+)
+from numba.core.types import voidptr
+from numba.experimental import jitclass
+
+from .binding import (
+    lib,
+    HashMapMarketDepth,
+    HashMapMarketDepth_,
+    ROIVectorMarketDepth,
+    ROIVectorMarketDepth_,
+    OrderDict,
+    OrderDict_
+)
+from .intrinsic import ptr_from_val, address_as_void_pointer, val_from_ptr
+from .state import StateValues, StateValues_
+from .types import (
+    event_dtype,
+    state_values_dtype,
+    EVENT_ARRAY,
+    RECORD_ARRAY
+)
+
+hashmaplive_elapse = lib.hashmaplive_elapse
+hashmaplive_elapse.restype = c_int64
+hashmaplive_elapse.argtypes = [c_void_p, c_uint64]
+
+hashmaplive_elapse_bt = lib.hashmaplive_elapse_bt
+hashmaplive_elapse_bt.restype = c_int64
+hashmaplive_elapse_bt.argtypes = [c_void_p, c_uint64]
+
+hashmaplive_hashmaplive_wait_order_response = lib.hashmaplive_wait_order_response
+hashmaplive_hashmaplive_wait_order_response.restype = c_int64
+hashmaplive_hashmaplive_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
+
+hashmaplive_wait_next_feed = lib.hashmaplive_wait_next_feed
+hashmaplive_wait_next_feed.restype = c_int64
+hashmaplive_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
+
+hashmaplive_close = lib.hashmaplive_close
+hashmaplive_close.restype = c_int64
+hashmaplive_close.argtypes = [c_void_p]
+
+hashmaplive_position = lib.hashmaplive_position
+hashmaplive_position.restype = c_double
+hashmaplive_position.argtypes = [c_void_p, c_uint64]
+
+hashmaplive_current_timestamp = lib.hashmaplive_current_timestamp
+hashmaplive_current_timestamp.restype = c_int64
+hashmaplive_current_timestamp.argtypes = [c_void_p]
+
+hashmaplive_depth = lib.hashmaplive_depth
+hashmaplive_depth.restype = c_void_p
+hashmaplive_depth.argtypes = [c_void_p, c_uint64]
+
+hashmaplive_last_trades = lib.hashmaplive_last_trades
+hashmaplive_last_trades.restype = c_void_p
+hashmaplive_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
+
+hashmaplive_num_assets = lib.hashmaplive_num_assets
+hashmaplive_num_assets.restype = c_uint64
+hashmaplive_num_assets.argtypes = [c_void_p]
+
+hashmaplive_submit_buy_order = lib.hashmaplive_submit_buy_order
+hashmaplive_submit_buy_order.restype = c_int64
+hashmaplive_submit_buy_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+hashmaplive_submit_sell_order = lib.hashmaplive_submit_sell_order
+hashmaplive_submit_sell_order.restype = c_int64
+hashmaplive_submit_sell_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+hashmaplive_modify = lib.hashmaplive_modify
+hashmaplive_modify.restype = c_int64
+hashmaplive_modify.argtypes = [c_void_p, c_uint64, c_uint64, c_double, c_double, c_bool]
+
+hashmaplive_cancel = lib.hashmaplive_cancel
+hashmaplive_cancel.restype = c_int64
+hashmaplive_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
+
+hashmaplive_clear_last_trades = lib.hashmaplive_clear_last_trades
+hashmaplive_clear_last_trades.restype = c_void_p
+hashmaplive_clear_last_trades.argtypes = [c_void_p, c_uint64]
+
+hashmaplive_clear_inactive_orders = lib.hashmaplive_clear_inactive_orders
+hashmaplive_clear_inactive_orders.restype = c_void_p
+hashmaplive_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
+
+hashmaplive_orders = lib.hashmaplive_orders
+hashmaplive_orders.restype = c_void_p
+hashmaplive_orders.argtypes = [c_void_p, c_uint64]
+
+hashmaplive_state_values = lib.hashmaplive_state_values
+hashmaplive_state_values.restype = c_void_p
+hashmaplive_state_values.argtypes = [c_void_p, c_uint64]
+
+hashmaplive_record_state_values = lib.hashmaplive_record_state_values
+hashmaplive_record_state_values.restype = c_uint64
+hashmaplive_record_state_values.argtypes = [c_void_p, c_void_p, c_uint64]
+
+hashmaplive_feed_latency = lib.hashmaplive_feed_latency
+hashmaplive_feed_latency.restype = c_bool
+hashmaplive_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
+
+hashmaplive_order_latency = lib.hashmaplive_order_latency
+hashmaplive_order_latency.restype = c_bool
+hashmaplive_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
+
+
+class HashMapMarketDepthLiveBot:
+    ptr: voidptr
+
+    def __init__(self, ptr: voidptr):
+        self.ptr = ptr
+
+    @property
+    def current_timestamp(self) -> int64:
+        """
+        In LiveBoting, this timestamp reflects the time at which the LiveBoting is conducted within the provided data.
+        """
+        return hashmaplive_current_timestamp(self.ptr)
+
+    def depth(self, asset_no: uint64) -> HashMapMarketDepth:
+        """
+        Args:
+            asset_no: Asset number from which the market depth will be retrieved.
+
+        Returns:
+            The depth of market of the specific asset.
+        """
+        return HashMapMarketDepth_(hashmaplive_depth(self.ptr, asset_no))
+
+    @property
+    def num_assets(self) -> uint64:
+        """
+        Returns the number of assets.
+        """
+        return hashmaplive_num_assets(self.ptr)
+
+    def position(self, asset_no: uint64) -> float64:
+        """
+        Args:
+            asset_no: Asset number from which the position will be retrieved.
+
+        Returns:
+            The quantity of the held position.
+        """
+        return hashmaplive_position(self.ptr, asset_no)
+
+    def state_values(self, asset_no: uint64) -> StateValues:
+        """
+        Args:
+            asset_no: Asset number from which the state values will be retrieved.
+
+        Returns:
+            The state’s values.
+        """
+        ptr = hashmaplive_state_values(self.ptr, asset_no)
+        arr = numba.carray(
+            address_as_void_pointer(ptr),
+            1,
+            state_values_dtype
+        )
+        return StateValues_(arr)
+
+    def record_state_values(self, out: RECORD_ARRAY) -> uint64:
+        """
+        See :meth:`HashMapMarketDepthBacktest.record_state_values
+        <hftbacktest.binding.HashMapMarketDepthBacktest.record_state_values>`.
+        """
+        return hashmaplive_record_state_values(self.ptr, out.ctypes.data, len(out))
+
+    def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
+        """
+        Args:
+            asset_no: Asset number from which the trades will be retrieved.
+
+        Returns:
+            An array of `Event` representing trades occurring in the market for the specific asset.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = hashmaplive_last_trades(self.ptr, asset_no, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            event_dtype
+        )
+
+    def clear_last_trades(self, asset_no: uint64) -> None:
+        """
+        Clears the last trades occurring in the market from the buffer for :func:`last_trades`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftLiveBot.types.ALL_ASSETS>`,
+                      all last trades in any assets will be cleared.
+        """
+        hashmaplive_clear_last_trades(self.ptr, asset_no)
+
+    def orders(self, asset_no: uint64) -> OrderDict:
+        """
+        Args:
+            asset_no: Asset number from which orders will be retrieved.
+
+        Returns:
+            An order dictionary where the keys are order IDs and the corresponding values are
+            :class:`Order <hftLiveBot.order.Order>`.
+        """
+        return OrderDict_(hashmaplive_orders(self.ptr, asset_no))
+
+    def submit_buy_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a buy order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to buy.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftLiveBot.order.GTC>`
+                * :const:`GTX <hftLiveBot.order.GTX>`
+                * :const:`FOK <hftLiveBot.order.FOK>`
+                * :const:`IOC <hftLiveBot.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftLiveBot.order.LIMIT>`
+                * :const:`MARKET <hftLiveBot.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def submit_sell_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a sell order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to sell.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftLiveBot.order.GTC>`
+                * :const:`GTX <hftLiveBot.order.GTX>`
+                * :const:`FOK <hftLiveBot.order.FOK>`
+                * :const:`IOC <hftLiveBot.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftLiveBot.order.LIMIT>`
+                * :const:`MARKET <hftLiveBot.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def modify(self, asset_no: uint64, order_id: uint64, price: float, qty: float, wait: bool) -> int64:
+        """
+        Modifies the specified order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: Order ID to modify.
+            price: Order price.
+            qty: Order quantity.
+            wait: If `True`, wait until the order cancel response is received.
+
+        Returns:
+            * `0` when it successfully modifies an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_modify(self.ptr, asset_no, order_id, price, qty, wait)
+
+    def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
+        """
+        Cancels the specified order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: Order ID to cancel.
+            wait: If `True`, wait until the order cancel response is received.
+
+        Returns:
+            * `0` when it successfully cancels an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_cancel(self.ptr, asset_no, order_id, wait)
+
+    def clear_inactive_orders(self, asset_no: uint64) -> None:
+        """
+        Clears inactive orders from the local order dictionary whose status is neither
+        :const:`NEW <hftLiveBot.order.NEW>` nor :const:`PARTIALLY_FILLED <hftLiveBot.order.PARTIALLY_FILLED>`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftLiveBot.types.ALL_ASSETS>`,
+                      all inactive orders in any assets will be cleared.
+        """
+        hashmaplive_clear_inactive_orders(self.ptr, asset_no)
+
+    def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
+        """
+        Waits for the response of the order with the given order ID until timeout.
+
+        Args:
+            asset_no: Asset number where an order with `order_id` exists.
+            order_id: Order ID to wait for the response.
+            timeout: Timeout for waiting for the order response. Nanoseconds is the default unit. However, unit should
+                     be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it receives an order response for the specified order ID of the specified asset number, or
+              reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_hashmaplive_wait_order_response(self.ptr, asset_no, order_id, timeout)
+
+    def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
+        """
+        Waits until the next feed is received, or until timeout.
+
+        Args:
+            include_order_resp: If set to `True`, it will return when any order response is received, in addition to
+                                the next feed.
+            timeout: Timeout for waiting for the next feed or an order response. Nanoseconds is the default unit.
+                     However, unit should be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * `2` when it receives a market feed.
+            * `3` when it receives an order response if `include_order_resp` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_wait_next_feed(self.ptr, include_order_resp, timeout)
+
+    def elapse(self, duration: uint64) -> int64:
+        """
+        Elapses the specified duration.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_elapse(self.ptr, duration)
+
+    def elapse_bt(self, duration: int64) -> int64:
+        """
+        Elapses time only in LiveBoting. In live mode, it is ignored. (Supported only in the Rust implementation)
+
+        The `elapse` method exclusively manages time during LiveBoting, meaning that factors such as computing time are
+        not properly accounted for. So, this method can be utilized to simulate such processing times.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_elapse_bt(self.ptr, duration)
+
+    def close(self) -> int64:
+        """
+        Closes this LiveBoter or bot.
+
+        Returns:
+            * `0` when it successfully closes the bot.
+            * Otherwise, an error occurred.
+        """
+        return hashmaplive_close(self.ptr)
+
+    def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
+        """
+        Args:
+            asset_no: Asset number from which the last feed latency will be retrieved.
+
+        Returns:
+            The last feed’s exchange timestamp and local receipt timestamp if a feed has been received; otherwise,
+            returns `None`.
+        """
+        exch_ts = int64(0)
+        local_ts = int64(0)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        local_ts_ptr = ptr_from_val(local_ts)
+        if hashmaplive_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
+            return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
+        return None
+
+    def order_latency(self, asset_no: uint64) -> Tuple[int64, int64, int64] | None:
+        """
+        Args:
+            asset_no: Asset number from which the last order latency will be retrieved.
+
+        Returns:
+            The last order’s request timestamp, exchange timestamp, and response receipt timestamp if there has been an
+            order submission; otherwise, returns `None`.
+        """
+        req_ts = int64(0)
+        exch_ts = int64(0)
+        resp_ts = int64(0)
+        req_ts_ptr = ptr_from_val(req_ts)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        resp_ts_ptr = ptr_from_val(resp_ts)
+        if hashmaplive_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
+            return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
+        return None
+
+    def _goto_end(self) -> int64:
+        return hashmaplive_goto_end(self.ptr)
+
+
+HashMapMarketDepthLiveBot_ = jitclass(HashMapMarketDepthLiveBot)
+
+
+roiveclive_elapse = lib.roiveclive_elapse
+roiveclive_elapse.restype = c_int64
+roiveclive_elapse.argtypes = [c_void_p, c_uint64]
+
+roiveclive_elapse_bt = lib.roiveclive_elapse_bt
+roiveclive_elapse_bt.restype = c_int64
+roiveclive_elapse_bt.argtypes = [c_void_p, c_uint64]
+
+roiveclive_roiveclive_wait_order_response = lib.roiveclive_wait_order_response
+roiveclive_roiveclive_wait_order_response.restype = c_int64
+roiveclive_roiveclive_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
+
+roiveclive_wait_next_feed = lib.roiveclive_wait_next_feed
+roiveclive_wait_next_feed.restype = c_int64
+roiveclive_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
+
+roiveclive_close = lib.roiveclive_close
+roiveclive_close.restype = c_int64
+roiveclive_close.argtypes = [c_void_p]
+
+roiveclive_position = lib.roiveclive_position
+roiveclive_position.restype = c_double
+roiveclive_position.argtypes = [c_void_p, c_uint64]
+
+roiveclive_current_timestamp = lib.roiveclive_current_timestamp
+roiveclive_current_timestamp.restype = c_int64
+roiveclive_current_timestamp.argtypes = [c_void_p]
+
+roiveclive_depth = lib.roiveclive_depth
+roiveclive_depth.restype = c_void_p
+roiveclive_depth.argtypes = [c_void_p, c_uint64]
+
+roiveclive_last_trades = lib.roiveclive_last_trades
+roiveclive_last_trades.restype = c_void_p
+roiveclive_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
+
+roiveclive_num_assets = lib.roiveclive_num_assets
+roiveclive_num_assets.restype = c_uint64
+roiveclive_num_assets.argtypes = [c_void_p]
+
+roiveclive_submit_buy_order = lib.roiveclive_submit_buy_order
+roiveclive_submit_buy_order.restype = c_int64
+roiveclive_submit_buy_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+roiveclive_submit_sell_order = lib.roiveclive_submit_sell_order
+roiveclive_submit_sell_order.restype = c_int64
+roiveclive_submit_sell_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+roiveclive_modify = lib.roiveclive_modify
+roiveclive_modify.restype = c_int64
+roiveclive_modify.argtypes = [c_void_p, c_uint64, c_uint64, c_double, c_double, c_bool]
+
+roiveclive_cancel = lib.roiveclive_cancel
+roiveclive_cancel.restype = c_int64
+roiveclive_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
+
+roiveclive_clear_last_trades = lib.roiveclive_clear_last_trades
+roiveclive_clear_last_trades.restype = c_void_p
+roiveclive_clear_last_trades.argtypes = [c_void_p, c_uint64]
+
+roiveclive_clear_inactive_orders = lib.roiveclive_clear_inactive_orders
+roiveclive_clear_inactive_orders.restype = c_void_p
+roiveclive_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
+
+roiveclive_orders = lib.roiveclive_orders
+roiveclive_orders.restype = c_void_p
+roiveclive_orders.argtypes = [c_void_p, c_uint64]
+
+roiveclive_state_values = lib.roiveclive_state_values
+roiveclive_state_values.restype = c_void_p
+roiveclive_state_values.argtypes = [c_void_p, c_uint64]
+
+roiveclive_record_state_values = lib.roiveclive_record_state_values
+roiveclive_record_state_values.restype = c_uint64
+roiveclive_record_state_values.argtypes = [c_void_p, c_void_p, c_uint64]
+
+roiveclive_feed_latency = lib.roiveclive_feed_latency
+roiveclive_feed_latency.restype = c_bool
+roiveclive_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
+
+roiveclive_order_latency = lib.roiveclive_order_latency
+roiveclive_order_latency.restype = c_bool
+roiveclive_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
+
+
+class ROIVectorMarketDepthLiveBot:
+    ptr: voidptr
+
+    def __init__(self, ptr: voidptr):
+        self.ptr = ptr
+
+    @property
+    def current_timestamp(self) -> int64:
+        """
+        In LiveBoting, this timestamp reflects the time at which the LiveBoting is conducted within the provided data.
+        """
+        return roiveclive_current_timestamp(self.ptr)
+
+    def depth(self, asset_no: uint64) -> ROIVectorMarketDepth:
+        """
+        Args:
+            asset_no: Asset number from which the market depth will be retrieved.
+
+        Returns:
+            The depth of market of the specific asset.
+        """
+        return ROIVectorMarketDepth_(roiveclive_depth(self.ptr, asset_no))
+
+    @property
+    def num_assets(self) -> uint64:
+        """
+        Returns the number of assets.
+        """
+        return roiveclive_num_assets(self.ptr)
+
+    def position(self, asset_no: uint64) -> float64:
+        """
+        Args:
+            asset_no: Asset number from which the position will be retrieved.
+
+        Returns:
+            The quantity of the held position.
+        """
+        return roiveclive_position(self.ptr, asset_no)
+
+    def state_values(self, asset_no: uint64) -> StateValues:
+        """
+        Args:
+            asset_no: Asset number from which the state values will be retrieved.
+
+        Returns:
+            The state’s values.
+        """
+        ptr = roiveclive_state_values(self.ptr, asset_no)
+        arr = numba.carray(
+            address_as_void_pointer(ptr),
+            1,
+            state_values_dtype
+        )
+        return StateValues_(arr)
+
+    def record_state_values(self, out: RECORD_ARRAY) -> uint64:
+        """
+        See :meth:`HashMapMarketDepthBacktest.record_state_values
+        <hftbacktest.binding.HashMapMarketDepthBacktest.record_state_values>`.
+        """
+        return roiveclive_record_state_values(self.ptr, out.ctypes.data, len(out))
+
+    def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
+        """
+        Args:
+            asset_no: Asset number from which the trades will be retrieved.
+
+        Returns:
+            An array of `Event` representing trades occurring in the market for the specific asset.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = roiveclive_last_trades(self.ptr, asset_no, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            event_dtype
+        )
+
+    def clear_last_trades(self, asset_no: uint64) -> None:
+        """
+        Clears the last trades occurring in the market from the buffer for :func:`last_trades`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftLiveBot.types.ALL_ASSETS>`,
+                      all last trades in any assets will be cleared.
+        """
+        roiveclive_clear_last_trades(self.ptr, asset_no)
+
+    def orders(self, asset_no: uint64) -> OrderDict:
+        """
+        Args:
+            asset_no: Asset number from which orders will be retrieved.
+
+        Returns:
+            An order dictionary where the keys are order IDs and the corresponding values are
+            :class:`Order <hftLiveBot.order.Order>`.
+        """
+        return OrderDict_(roiveclive_orders(self.ptr, asset_no))
+
+    def submit_buy_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a buy order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to buy.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftLiveBot.order.GTC>`
+                * :const:`GTX <hftLiveBot.order.GTX>`
+                * :const:`FOK <hftLiveBot.order.FOK>`
+                * :const:`IOC <hftLiveBot.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftLiveBot.order.LIMIT>`
+                * :const:`MARKET <hftLiveBot.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def submit_sell_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a sell order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to sell.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftLiveBot.order.GTC>`
+                * :const:`GTX <hftLiveBot.order.GTX>`
+                * :const:`FOK <hftLiveBot.order.FOK>`
+                * :const:`IOC <hftLiveBot.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftLiveBot.order.LIMIT>`
+                * :const:`MARKET <hftLiveBot.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def modify(self, asset_no: uint64, order_id: uint64, price: float, qty: float, wait: bool) -> int64:
+        """
+        Modifies the specified order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: Order ID to modify.
+            price: Order price.
+            qty: Order quantity.
+            wait: If `True`, wait until the order cancel response is received.
+
+        Returns:
+            * `0` when it successfully modifies an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_modify(self.ptr, asset_no, order_id, price, qty, wait)
+
+    def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
+        """
+        Cancels the specified order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: Order ID to cancel.
+            wait: If `True`, wait until the order cancel response is received.
+
+        Returns:
+            * `0` when it successfully cancels an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_cancel(self.ptr, asset_no, order_id, wait)
+
+    def clear_inactive_orders(self, asset_no: uint64) -> None:
+        """
+        Clears inactive orders from the local order dictionary whose status is neither
+        :const:`NEW <hftLiveBot.order.NEW>` nor :const:`PARTIALLY_FILLED <hftLiveBot.order.PARTIALLY_FILLED>`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftLiveBot.types.ALL_ASSETS>`,
+                      all inactive orders in any assets will be cleared.
+        """
+        roiveclive_clear_inactive_orders(self.ptr, asset_no)
+
+    def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
+        """
+        Waits for the response of the order with the given order ID until timeout.
+
+        Args:
+            asset_no: Asset number where an order with `order_id` exists.
+            order_id: Order ID to wait for the response.
+            timeout: Timeout for waiting for the order response. Nanoseconds is the default unit. However, unit should
+                     be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it receives an order response for the specified order ID of the specified asset number, or
+              reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_roiveclive_wait_order_response(self.ptr, asset_no, order_id, timeout)
+
+    def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
+        """
+        Waits until the next feed is received, or until timeout.
+
+        Args:
+            include_order_resp: If set to `True`, it will return when any order response is received, in addition to
+                                the next feed.
+            timeout: Timeout for waiting for the next feed or an order response. Nanoseconds is the default unit.
+                     However, unit should be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * `2` when it receives a market feed.
+            * `3` when it receives an order response if `include_order_resp` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_wait_next_feed(self.ptr, include_order_resp, timeout)
+
+    def elapse(self, duration: uint64) -> int64:
+        """
+        Elapses the specified duration.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_elapse(self.ptr, duration)
+
+    def elapse_bt(self, duration: int64) -> int64:
+        """
+        Elapses time only in LiveBoting. In live mode, it is ignored. (Supported only in the Rust implementation)
+
+        The `elapse` method exclusively manages time during LiveBoting, meaning that factors such as computing time are
+        not properly accounted for. So, this method can be utilized to simulate such processing times.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_elapse_bt(self.ptr, duration)
+
+    def close(self) -> int64:
+        """
+        Closes this LiveBoter or bot.
+
+        Returns:
+            * `0` when it successfully closes the bot.
+            * Otherwise, an error occurred.
+        """
+        return roiveclive_close(self.ptr)
+
+    def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
+        """
+        Args:
+            asset_no: Asset number from which the last feed latency will be retrieved.
+
+        Returns:
+            The last feed’s exchange timestamp and local receipt timestamp if a feed has been received; otherwise,
+            returns `None`.
+        """
+        exch_ts = int64(0)
+        local_ts = int64(0)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        local_ts_ptr = ptr_from_val(local_ts)
+        if roiveclive_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
+            return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
+        return None
+
+    def order_latency(self, asset_no: uint64) -> Tuple[int64, int64, int64] | None:
+        """
+        Args:
+            asset_no: Asset number from which the last order latency will be retrieved.
+
+        Returns:
+            The last order’s request timestamp, exchange timestamp, and response receipt timestamp if there has been an
+            order submission; otherwise, returns `None`.
+        """
+        req_ts = int64(0)
+        exch_ts = int64(0)
+        resp_ts = int64(0)
+        req_ts_ptr = ptr_from_val(req_ts)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        resp_ts_ptr = ptr_from_val(resp_ts)
+        if roiveclive_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
+            return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
+        return None
+
+
+ROIVectorMarketDepthLiveBot_ = jitclass(ROIVectorMarketDepthLiveBot)
@@ -59,6 +59,15 @@ LIMIT = 0
 #: MARKET
 MARKET = 1
 
+#: Submits a new order in a batch.
+SUBMIT = 0
+
+#: Modifies an existing order in a batch.
+MODIFY = 1
+
+#: Cancels an existing order in a batch.
+CANCEL = 2
+
 
 class Order:
     arr: from_dtype(order_dtype)[:]
@@ -1,53 +1,307 @@
-from typing import Any
+import itertools
+import os
+import tempfile
+import weakref
+import zipfile
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Sequence
 
 import numpy as np
-from numba import uint64, from_dtype
+from numba import uint64, int64, from_dtype, objmode
 from numba.experimental import jitclass
 
 from .types import record_dtype
 
+if TYPE_CHECKING:
+    import polars as pl
+
+# The stores are keyed by a counter rather than by id(), which can be reused once a store is garbage collected.
+_chunk_stores: Dict[int, '_ChunkStore'] = {}
+_store_ids = itertools.count()
+
+
+class _ChunkStore:
+    """
+    Holds the completed chunks of a :class:`Recorder`, each spilled to its own memory-mapped ``.npy`` file.
+    """
+
+    def __init__(self, spill_dir: Optional[str]):
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._dir = tempfile.TemporaryDirectory(
+            prefix='hftbacktest_recorder_',
+            dir=spill_dir,
+            ignore_cleanup_errors=True
+        )
+        self.chunks: List[np.ndarray] = []
+
+    def spill(self, chunk: np.ndarray):
+        path = os.path.join(self._dir.name, f'{len(self.chunks)}.npy')
+        mm = np.lib.format.open_memmap(path, mode='w+', dtype=chunk.dtype, shape=chunk.shape)
+        mm[:] = chunk
+        mm.flush()
+        del mm
+        self.chunks.append(np.load(path, mmap_mode='r'))
+
+
+def _spill_chunk(store_id: int, chunk: np.ndarray) -> bool:
+    # The store is gone if its Recorder has been garbage collected while the jitted recorder is still in use.
+    store = _chunk_stores.get(store_id)
+    if store is None:
+        return False
+    store.spill(chunk)
+    return True
+
 
 @jitclass
 class Recorder_:
     records: from_dtype(record_dtype)[:, :]
     i: uint64
+    store_id: int64
+    num_spilled: uint64
+    record_every: uint64
+    min_interval: int64
+    num_calls: uint64
+    last_timestamp: int64
 
-    def __init__(self, num_assets: uint64, record_size: uint64):
+    def __init__(
+            self,
+            num_assets: uint64,
+            record_size: uint64,
+            record_every: uint64 = 1,
+            min_interval: int64 = 0,
+            store_id: int64 = -1
+    ):
         self.records = np.empty((record_size, num_assets), record_dtype)
         self.i = 0
+        self.store_id = store_id
+        self.num_spilled = 0
+        self.record_every = max(record_every, 1)
+        self.min_interval = min_interval
+        self.num_calls = 0
+        self.last_timestamp = 0
 
     def record(self, hbt):
-        timestamp = hbt.current_timestamp
-        for asset_no in range(hbt.num_assets):
-            depth = hbt.depth(asset_no)
-            mid_price = (depth.best_bid + depth.best_ask) / 2.0
-            state_values = hbt.state_values(asset_no)
-            self.records[self.i, asset_no].timestamp = timestamp
-            self.records[self.i, asset_no].price = mid_price
-            self.records[self.i, asset_no].position = state_values.position
-            self.records[self.i, asset_no].balance = state_values.balance
-            self.records[self.i, asset_no].fee = state_values.fee
-            self.records[self.i, asset_no].num_trades = state_values.num_trades
-            self.records[self.i, asset_no].trading_volume = state_values.trading_volume
-            self.records[self.i, asset_no].trading_value = state_values.trading_value
+        skip = self.num_calls % self.record_every != 0
+        self.num_calls += 1
+        if skip:
+            return
+
+        if self.min_interval > 0:
+            timestamp = hbt.current_timestamp
+            if self.num_spilled + self.i > 0 and timestamp - self.last_timestamp < self.min_interval:
+                return
+            self.last_timestamp = timestamp
 
+        hbt.record_state_values(self.records[self.i])
         self.i += 1
         if self.i == len(self.records):
-            raise IndexError
+            spilled = False
+            if self.store_id >= 0:
+                # Hands the full chunk over to the Python side to be written to disk, then reuses the buffer.
+                store_id = self.store_id
+                chunk = self.records
+                with objmode(spilled='boolean'):
+                    spilled = _spill_chunk(store_id, chunk)
+                if not spilled:
+                    # Keeps growing in memory from now on, as the chunk store no longer exists.
+                    self.store_id = -1
+            if spilled:
+                self.num_spilled += self.i
+                self.i = 0
+            else:
+                records = np.empty((2 * len(self.records), self.records.shape[1]), record_dtype)
+                records[:self.i] = self.records
+                self.records = records
 
 
 class Recorder:
-    def __init__(self, num_assets: uint64, record_size: uint64):
-        self._recorder = Recorder_(num_assets, record_size)
+    """
+    Records the state values of all assets. Records are written into an in-memory chunk of `record_size` rows; once
+    the chunk is full, it is spilled to a memory-mapped file under `spill_dir` and the buffer is reused, so the
+    recorder grows on demand instead of raising `IndexError`.
+
+    **Example**
+
+    .. code-block:: python
+
+        # Records at most once every 100ms, keeping up to 1,000,000 rows in memory at a time.
+        recorder = Recorder(hbt.num_assets, 1_000_000, min_interval=100_000_000)
+
+        strategy(hbt, recorder.recorder)
+
+        recorder.to_npz('stats.npz')
+
+    Args:
+        num_assets: The number of assets.
+        record_size: The number of rows held in memory before they are spilled to disk.
+        record_every: Records only on every `record_every`-th call to ``record``.
+        min_interval: The minimum interval between records in nanoseconds. Calls within this interval of the last
+                      record are skipped. `0` disables it.
+        spill_dir: The directory in which a temporary subdirectory is created for the spilled chunks. If `None`, the
+                   system's default temporary directory is used. The spilled files are removed when the recorder is
+                   garbage collected; if the jitted :attr:`recorder` outlives it, the further records are kept in
+                   memory instead.
+    """
+
+    def __init__(
+            self,
+            num_assets: uint64,
+            record_size: uint64,
+            record_every: uint64 = 1,
+            min_interval: int64 = 0,
+            spill_dir: Optional[str] = None
+    ):
+        self._store = _ChunkStore(spill_dir)
+        store_id = next(_store_ids)
+        _chunk_stores[store_id] = self._store
+        weakref.finalize(self, _chunk_stores.pop, store_id, None)
+        self._recorder = Recorder_(num_assets, record_size, record_every, min_interval, store_id)
 
     @property
     def recorder(self):
         return self._recorder
 
     def to_npz(self, file: str):
-        data = self._recorder.records[:self._recorder.i]
-        kwargs = {str(asset_no): data[:, asset_no] for asset_no in range(data.shape[1])}
-        np.savez_compressed(file, **kwargs)
+        if not file.endswith('.npz'):
+            file += '.npz'
+        # Writes one asset at a time so that only a single asset's records are materialized in memory.
+        with zipfile.ZipFile(file, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for asset_no in range(self._recorder.records.shape[1]):
+                with zf.open(f'{asset_no}.npy', 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, self.get(asset_no), allow_pickle=False)
 
     def get(self, asset_no: int) -> np.ndarray[Any, record_dtype]:
-        return self._recorder.records[:self._recorder.i, asset_no]
+        current = self._recorder.records[:self._recorder.i, asset_no]
+        if len(self._store.chunks) == 0:
+            return current
+        return np.concatenate([chunk[:, asset_no] for chunk in self._store.chunks] + [current])
+
+    @property
+    def num_assets(self) -> int:
+        """
+        Returns the number of assets.
+        """
+        return self._recorder.records.shape[1]
+
+    def to_polars(self, asset_no: int = 0) -> 'pl.DataFrame':
+        """
+        Converts the records of the given asset into a Polars DataFrame. Each field is copied once, from the in-memory
+        and spilled chunks into its own contiguous column, which Polars then adopts as is; the structured records are
+        not concatenated first and then converted by Polars, which would copy them twice.
+
+        Args:
+            asset_no: Asset number from which the records will be retrieved.
+
+        Returns:
+            A DataFrame with one column per field of :data:`record_dtype <hftbacktest.types.record_dtype>`.
+        """
+        import polars as pl
+
+        parts = [chunk[:, asset_no] for chunk in self._store.chunks]
+        parts.append(self._recorder.records[:self._recorder.i, asset_no])
+        columns = {}
+        for name in record_dtype.names:
+            column = np.empty(sum(len(part) for part in parts), record_dtype[name])
+            offset = 0
+            for part in parts:
+                column[offset:offset + len(part)] = part[name]
+                offset += len(part)
+            columns[name] = pl.Series(name, column)
+        return pl.DataFrame(columns)
+
+    def to_parquet(
+            self,
+            path: str,
+            partition_by: Sequence[Literal['asset', 'day']] = (),
+            compression: str = 'zstd',
+            compression_level: Optional[int] = None,
+            time_unit: Literal['ns', 'us', 'ms', 's'] = 'ns'
+    ):
+        """
+        Writes the records into Parquet using Polars' multi-threaded writer.
+
+        **Example**
+
+        .. code-block:: python
+
+            # Writes stats/asset_no=0/date=2024-01-01/0.parquet, ...
+            recorder.to_parquet('stats', partition_by=['asset', 'day'])
+
+            df = pl.read_parquet('stats/**/*.parquet', hive_partitioning=True)
+
+        Args:
+            path: The file path if `partition_by` is empty; otherwise, the root directory of the Hive-style
+                  partitions.
+            partition_by: Partitions the output by ``'asset'`` (``asset_no=<n>``) and/or by ``'day'``
+                          (``date=<YYYY-MM-DD>``, in UTC). If the output is not partitioned by asset, an
+                          ``asset_no`` column is added.
+            compression: The compression codec passed to :meth:`polars.DataFrame.write_parquet`.
+            compression_level: The compression level passed to :meth:`polars.DataFrame.write_parquet`.
+            time_unit: The unit of the timestamps, used to determine the day.
+        """
+        self._write_partitioned(
+            path,
+            partition_by,
+            time_unit,
+            'parquet',
+            lambda df, file: df.write_parquet(file, compression=compression, compression_level=compression_level)
+        )
+
+    def to_ipc(
+            self,
+            path: str,
+            partition_by: Sequence[Literal['asset', 'day']] = (),
+            compression: Literal['uncompressed', 'lz4', 'zstd'] = 'zstd',
+            time_unit: Literal['ns', 'us', 'ms', 's'] = 'ns'
+    ):
+        """
+        Writes the records into Arrow IPC (Feather v2) files. See :meth:`to_parquet` for the partitioning layout.
+
+        Args:
+            path: The file path if `partition_by` is empty; otherwise, the root directory of the Hive-style
+                  partitions.
+            partition_by: Partitions the output by ``'asset'`` and/or by ``'day'``.
+            compression: The compression codec passed to :meth:`polars.DataFrame.write_ipc`.
+            time_unit: The unit of the timestamps, used to determine the day.
+        """
+        self._write_partitioned(
+            path,
+            partition_by,
+            time_unit,
+            'arrow',
+            lambda df, file: df.write_ipc(file, compression=compression)
+        )
+
+    def _write_partitioned(self, path, partition_by, time_unit, ext, write):
+        import polars as pl
+
+        for key in partition_by:
+            if key not in ('asset', 'day'):
+                raise ValueError(f'Unknown partition key: {key}')
+
+        frames = []
+        for asset_no in range(self.num_assets):
+            df = self.to_polars(asset_no)
+            if 'asset' not in partition_by:
+                df = df.with_columns(pl.lit(asset_no, pl.UInt32).alias('asset_no'))
+            frames.append((asset_no, df))
+
+        if len(partition_by) == 0:
+            write(pl.concat([df for _, df in frames]), path)
+            return
+
+        if 'asset' not in partition_by:
+            frames = [(None, pl.concat([df for _, df in frames]))]
+
+        for asset_no, df in frames:
+            dir_ = path if asset_no is None else os.path.join(path, f'asset_no={asset_no}')
+            if 'day' in partition_by:
+                date = pl.from_epoch(pl.col('timestamp'), time_unit=time_unit).dt.date()
+                days = df.with_columns(date.alias('_date')).partition_by('_date', as_dict=True, include_key=False)
+                for (day,), df_day in days.items():
+                    day_dir = os.path.join(dir_, f'date={day}')
+                    os.makedirs(day_dir, exist_ok=True)
+                    write(df_day, os.path.join(day_dir, f'0.{ext}'))
+            else:
+                os.makedirs(dir_, exist_ok=True)
+                write(df, os.path.join(dir_, f'0.{ext}'))
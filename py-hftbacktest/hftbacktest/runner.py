@@ -0,0 +1,325 @@
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .recorder import Recorder
+from .types import EVENT_ARRAY, RECORD_ARRAY
+
+_feeds: Dict[str, EVENT_ARRAY] = {}
+
+# Elapses up to about 30 years at a time, which reaches the end of any daily file without overflowing the timestamp.
+_EOD_ELAPSE = 1_000_000_000_000_000_000
+
+_CUMULATIVE_FIELDS = ('balance', 'fee', 'num_trades', 'trading_volume', 'trading_value')
+
+
+class SharedFeeds:
+    """
+    Decompresses each feed file once into a shared-memory-backed ``.npy`` file, so that any number of processes can map
+    the same pages instead of each one re-loading and re-decompressing the file. On Linux, the files are placed in
+    ``/dev/shm``.
+
+    ``.npy`` files are already uncompressed, so they are mapped in place without being copied.
+
+    Args:
+        files: The feed files in `.npz` or `.npy` format.
+        shm_dir: The directory in which the decompressed files are stored. If `None`, ``/dev/shm`` is used if it
+                 exists; otherwise, the system's default temporary directory is used.
+    """
+
+    def __init__(self, files: Sequence[str], shm_dir: Optional[str] = None):
+        if shm_dir is None and os.path.isdir('/dev/shm'):
+            shm_dir = '/dev/shm'
+        self._dir = tempfile.TemporaryDirectory(prefix='hftbacktest_feeds_', dir=shm_dir, ignore_cleanup_errors=True)
+        self.paths: Dict[str, str] = {}
+        for file in files:
+            if file in self.paths:
+                continue
+            if file.endswith('.npy'):
+                self.paths[file] = file
+            else:
+                path = os.path.join(self._dir.name, f'{len(self.paths)}.npy')
+                _decompress_npz(file, path)
+                self.paths[file] = path
+
+    def views(self) -> Dict[str, EVENT_ARRAY]:
+        """
+        Returns zero-copy views of the shared feed data keyed by the original file path, which can be passed to
+        :meth:`BacktestAsset.add_data <hftbacktest.BacktestAsset.add_data>`.
+        """
+        return _map_feeds(self.paths)
+
+    def close(self):
+        """
+        Removes the decompressed files. The views obtained from this instance must not be used afterward.
+        """
+        for path in self.paths.values():
+            _feeds.pop(path, None)
+        self._dir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _decompress_npz(file: str, path: str):
+    # Streams the decompressed array straight into the destination file, so the feed is never held in memory twice.
+    with zipfile.ZipFile(file) as zf, zf.open('data.npy') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        if fortran_order:
+            raise ValueError(f'{file}: Fortran-ordered arrays are not supported.')
+
+        mm = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+        buf = memoryview(mm.reshape(-1).view(np.uint8))
+        offset = 0
+        while offset < len(buf):
+            n = f.readinto(buf[offset:])
+            if n == 0:
+                raise ValueError(f'{file}: unexpected end of data.')
+            offset += n
+        mm.flush()
+        del buf
+        del mm
+
+
+def _map_feeds(paths: Dict[str, str]) -> Dict[str, EVENT_ARRAY]:
+    # Copy-on-write mappings share the pages across processes; only the pages that are written, if any, are copied.
+    return {file: _map_feed(path) for file, path in paths.items()}
+
+
+def _map_feed(path: str) -> EVENT_ARRAY:
+    feed = _feeds.get(path)
+    if feed is None:
+        feed = np.load(path, mmap_mode='c')
+        _feeds[path] = feed
+    return feed
+
+
+def _gather(result: Any) -> Any:
+    if isinstance(result, Recorder):
+        return [result.get(asset_no) for asset_no in range(result.num_assets)]
+    return result
+
+
+def _run_job(func: Callable[..., Any], paths: Dict[str, str], job: Any) -> Any:
+    return _gather(func(_map_feeds(paths), job))
+
+
+def run_many(
+        func: Callable[[Dict[str, EVENT_ARRAY], Any], Any],
+        jobs: Sequence[Any],
+        files: Sequence[str],
+        max_workers: Optional[int] = None,
+        shm_dir: Optional[str] = None
+) -> List[Any]:
+    """
+    Runs many backtests across processes, sharing the feed data among them. Each feed file is loaded and
+    decompressed only once into shared memory, and every worker receives zero-copy views of it.
+
+    **Example**
+
+    .. code-block:: python
+
+        def run(feeds, params):
+            asset = (
+                BacktestAsset()
+                    .add_data(feeds['btcusdt_20240808.npz'])
+                    .add_data(feeds['btcusdt_20240809.npz'])
+                    .linear_asset(1.0)
+                    # ...
+            )
+            hbt = ROIVectorMarketDepthBacktest([asset])
+            recorder = Recorder(1, 5_000_000)
+            strategy(hbt, recorder.recorder, *params)
+            hbt.close()
+            return recorder
+
+        if __name__ == '__main__':
+            records = run_many(
+                run,
+                [(0.5, 10), (1.0, 10), (1.0, 20)],
+                ['btcusdt_20240808.npz', 'btcusdt_20240809.npz'],
+            )
+            stats = LinearAssetRecord(records[0][0]).stats()
+
+    Args:
+        func: The function that runs a single backtest. It is called as ``func(feeds, job)``, where `feeds` maps each
+              file path in `files` to a zero-copy view of its data. It must be picklable, that is, defined at the top
+              level of a module. If it returns a :class:`Recorder`, the records of each asset are gathered as a list
+              of arrays; otherwise, the returned value is gathered as is.
+        jobs: The argument passed to `func` for each run.
+        files: The feed files in `.npz` or `.npy` format that are shared across the runs.
+        max_workers: The maximum number of worker processes. If `None`, the number of CPUs is used.
+        shm_dir: The directory in which the decompressed feed data is stored. See :class:`SharedFeeds`.
+
+    Returns:
+        The results of the runs in the order of `jobs`.
+    """
+    with SharedFeeds(files, shm_dir) as feeds:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_job, func, feeds.paths, job) for job in jobs]
+            return [future.result() for future in futures]
+
+
+def build_eod_snapshots(
+        files: Sequence[str],
+        tick_size: float,
+        lot_size: float,
+        initial_snapshot: Optional[str] = None,
+        output_dir: Optional[str] = None
+) -> List[str]:
+    """
+    Makes a single pass over the daily feed files and writes the end-of-day market depth snapshot of each file, so that
+    every day can then be backtested independently by :func:`run_days`. Only the market depth is replayed, with no
+    strategy involved, and each day is seeded from the previous day's snapshot, so the pass is still sequential but
+    far faster than a backtest.
+
+    Each snapshot is written to ``<output_dir>/<file name>_eod.npz``, which can be passed to
+    :meth:`BacktestAsset.initial_snapshot <hftbacktest.BacktestAsset.initial_snapshot>`.
+
+    Args:
+        files: The daily feed files of a single asset in chronological order.
+        tick_size: The tick size of the asset.
+        lot_size: The lot size of the asset.
+        initial_snapshot: The snapshot from which the first day is seeded, if any.
+        output_dir: The directory in which the snapshots are written. If `None`, each snapshot is written next to its
+                    feed file.
+
+    Returns:
+        The end-of-day snapshot file of each feed file.
+    """
+    from . import BacktestAsset, HashMapMarketDepthBacktest
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    snapshots = []
+    snapshot = initial_snapshot
+    for file in files:
+        asset = BacktestAsset().data(file).tick_size(tick_size).lot_size(lot_size)
+        if snapshot is not None:
+            asset.initial_snapshot(snapshot)
+        hbt = HashMapMarketDepthBacktest([asset])
+        while hbt.elapse(_EOD_ELAPSE) == 0:
+            pass
+        depth = hbt.depth(0)
+        arr = depth.snapshot()
+        eod = arr.copy()
+        depth.snapshot_free(arr)
+        hbt.close()
+
+        name = os.path.basename(file)
+        for ext in ('.npz', '.npy'):
+            if name.endswith(ext):
+                name = name[:-len(ext)]
+        snapshot = os.path.join(output_dir or os.path.dirname(file), f'{name}_eod.npz')
+        np.savez_compressed(snapshot, data=eod)
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def _run_day(func: Callable[..., Any], file: str, initial_snapshot: Optional[str], day: int) -> Any:
+    return _gather(func(file, initial_snapshot, day))
+
+
+def run_days(
+        func: Callable[[str, Optional[str], int], Any],
+        files: Sequence[str],
+        eod_snapshots: Sequence[str],
+        initial_snapshot: Optional[str] = None,
+        max_workers: Optional[int] = None
+) -> List[RECORD_ARRAY]:
+    """
+    Backtests every day independently in parallel, each seeded from the previous day's end-of-day snapshot made by
+    :func:`build_eod_snapshots`, and stitches the daily records into one record array per asset.
+
+    Since each day starts without a position, the result matches a continuous backtest only if the strategy is flat
+    at the end of each day. The cumulative values, such as the balance, fee, and trading volume, are carried over from
+    the previous day when stitching; the position is not.
+
+    **Example**
+
+    .. code-block:: python
+
+        def run(file, initial_snapshot, day):
+            asset = (
+                BacktestAsset()
+                    .data(file)
+                    .linear_asset(1.0)
+                    # ...
+            )
+            if initial_snapshot is not None:
+                asset.initial_snapshot(initial_snapshot)
+            hbt = ROIVectorMarketDepthBacktest([asset])
+            recorder = Recorder(1, 1_000_000)
+            strategy(hbt, recorder.recorder)
+            hbt.close()
+            return recorder
+
+        if __name__ == '__main__':
+            eod_snapshots = build_eod_snapshots(files, 0.1, 0.001)
+            records = run_days(run, files, eod_snapshots)
+            stats = LinearAssetRecord(records[0]).stats()
+
+    Args:
+        func: The function that backtests a single day. It is called as ``func(file, initial_snapshot, day)``, where
+              `initial_snapshot` is the snapshot file from which the day is seeded, or `None` for the first day
+              without `initial_snapshot`. It must return a :class:`Recorder` or a list of per-asset record arrays,
+              and be picklable, that is, defined at the top level of a module.
+        files: The daily feed files in chronological order.
+        eod_snapshots: The end-of-day snapshot of each file made by :func:`build_eod_snapshots`.
+        initial_snapshot: The snapshot from which the first day is seeded, if any.
+        max_workers: The maximum number of worker processes. If `None`, the number of CPUs is used.
+
+    Returns:
+        The stitched records of each asset.
+    """
+    if len(files) != len(eod_snapshots):
+        raise ValueError('The number of files and end-of-day snapshots must match.')
+    initial_snapshots = [initial_snapshot] + list(eod_snapshots[:-1])
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_run_day, func, file, snapshot, day)
+            for day, (file, snapshot) in enumerate(zip(files, initial_snapshots))
+        ]
+        return stitch_records([future.result() for future in futures])
+
+
+def stitch_records(days: Sequence[Sequence[RECORD_ARRAY]]) -> List[RECORD_ARRAY]:
+    """
+    Stitches the records of consecutive, independently backtested days into one record array per asset. The
+    cumulative values, the balance, fee, number of trades, trading volume, and trading value, of each day are offset
+    by their final values of the previous day.
+
+    Args:
+        days: The records of each day, each of which is a list of per-asset record arrays.
+
+    Returns:
+        The stitched records of each asset.
+    """
+    if len(days) == 0:
+        return []
+    stitched = []
+    for asset_no in range(len(days[0])):
+        parts = []
+        offsets = {name: 0 for name in _CUMULATIVE_FIELDS}
+        for records in days:
+            part = records[asset_no].copy()
+            for name in _CUMULATIVE_FIELDS:
+                part[name] += offsets[name]
+            if len(part) > 0:
+                for name in _CUMULATIVE_FIELDS:
+                    offsets[name] = part[name][-1]
+            parts.append(part)
+        stitched.append(np.concatenate(parts))
+    return stitched
@@ -6,6 +6,7 @@ import numpy as np
 import polars as pl
 from numpy.typing import NDArray
 
+from ..recorder import Recorder
 from .metrics import (
     Metric,
     SR,
@@ -259,7 +260,7 @@ class Record(ABC):
         MaxPositionValue
     )
 
-    def __init__(self, data: NDArray | pl.DataFrame):
+    def __init__(self, data: NDArray | pl.DataFrame | Recorder):
         self._contract_size = 1.0
         self._time_unit = 'ns'
         self._frequency = '10s'
@@ -269,6 +270,10 @@ class Record(ABC):
             self.df = pl.DataFrame(data)
         elif isinstance(data, pl.DataFrame):
             self.df = data
+        elif isinstance(data, Recorder):
+            if data.num_assets != 1:
+                raise ValueError('The recorder holds multiple assets; use `Recorder.to_polars(asset_no)` instead.')
+            self.df = data.to_polars(0)
         else:
             raise ValueError
 
@@ -59,6 +59,25 @@ For example, when combined with a depth event, it means an ask-side event, while
 it means that the trade initiator is a seller.
 """
 
+#: Subscribes to any change of the market depth, including clears, snapshots, and Level-3 order events.
+SUB_DEPTH = 1
+
+#: Subscribes to changes of the best bid or ask price or quantity.
+SUB_BBO = 1 << 1
+
+#: Subscribes to market trades, including Level-3 fills.
+SUB_TRADE = 1 << 2
+
+#: Subscribes to market depth changes within the subscribed range of ticks from the best price of their side,
+#: including clears and snapshots.
+SUB_NEAR_TOUCH = 1 << 3
+
+#: Subscribes to the feed events that fall into none of the other classes.
+SUB_OTHER = 1 << 4
+
+#: Subscribes to every feed event.
+SUB_ALL = SUB_DEPTH | SUB_BBO | SUB_TRADE | SUB_NEAR_TOUCH | SUB_OTHER
+
 state_values_dtype = np.dtype(
     [
         ('position', 'f8'),
@@ -110,6 +129,33 @@ order_dtype = np.dtype(
     align=True
 )
 
+ORDER_ARRAY = np.ndarray[Any, order_dtype]
+
+depth_level_dtype = np.dtype(
+    [
+        ('price_tick', 'i8'),
+        ('qty', 'f8')
+    ],
+    align=True
+)
+
+DEPTH_LEVEL_ARRAY = np.ndarray[Any, depth_level_dtype]
+
+order_request_dtype = np.dtype(
+    [
+        ('order_id', 'u8'),
+        ('price', 'f8'),
+        ('qty', 'f8'),
+        ('action', 'u1'),
+        ('side', 'i1'),
+        ('time_in_force', 'u1'),
+        ('order_type', 'u1')
+    ],
+    align=True
+)
+
+ORDER_REQUEST_ARRAY = np.ndarray[Any, order_request_dtype]
+
 record_dtype = np.dtype(
     [
         ('timestamp', 'i8'),
@@ -123,3 +169,5 @@ record_dtype = np.dtype(
     ],
     align=True
 )
+
+RECORD_ARRAY = np.ndarray[Any, record_dtype]
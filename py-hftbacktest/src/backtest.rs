@@ -1,16 +1,22 @@
 #![allow(clippy::not_unsafe_ptr_arg_deref)]
 
-use std::{collections::HashMap, mem};
+use std::{
+    collections::HashMap,
+    mem,
+    ptr::null_mut,
+    slice::{from_raw_parts, from_raw_parts_mut},
+};
 
 use hftbacktest::{
-    backtest::{Backtest, BacktestError},
-    depth::{HashMapMarketDepth, ROIVectorMarketDepth},
+    backtest::{Backtest, BacktestError, BatchOrderRequest, Subscription, recorder::Record},
+    depth::{BTreeMarketDepth, HashMapMarketDepth, MarketDepth, ROIVectorMarketDepth},
     prelude::{Bot, ElapseResult, Event, Order, StateValues},
     types::{OrdType, TimeInForce},
 };
 
 type HashMapMarketDepthBacktest = Backtest<HashMapMarketDepth>;
 type ROIVectorMarketDepthBacktest = Backtest<ROIVectorMarketDepth>;
+type BTreeMarketDepthBacktest = Backtest<BTreeMarketDepth>;
 
 fn handle_result(result: Result<ElapseResult, BacktestError>) -> i64 {
     match result {
@@ -31,6 +37,25 @@ fn handle_result(result: Result<ElapseResult, BacktestError>) -> i64 {
     }
 }
 
+/// Applies the batch of order requests and writes the result code of each request to the
+/// corresponding element of `status`, using the same codes as the single order functions. Every
+/// bit pattern of the requests is a valid [`BatchOrderRequest`]; the rows whose raw values are
+/// invalid receive the code of [`BacktestError::InvalidOrderRequest`].
+fn submit_batch<MD: MarketDepth>(
+    hbt: &mut Backtest<MD>,
+    asset_no: usize,
+    requests: &[BatchOrderRequest],
+    status: &mut [i64],
+    wait: bool,
+) -> i64 {
+    let mut results = Vec::with_capacity(requests.len());
+    let result = handle_result(hbt.submit_batch(asset_no, requests, &mut results, wait));
+    for (status, result) in status.iter_mut().zip(results) {
+        *status = handle_result(result.map(|_| ElapseResult::Ok));
+    }
+    result
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn hashmapbt_current_timestamp(hbt_ptr: *const HashMapMarketDepthBacktest) -> i64 {
     let hbt = unsafe { &*hbt_ptr };
@@ -127,6 +152,36 @@ pub extern "C" fn hashmapbt_wait_next_feed(
     handle_result(hbt.wait_next_feed(include_resp, timeout))
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn hashmapbt_subscribe(
+    hbt_ptr: *mut HashMapMarketDepthBacktest,
+    asset_no: usize,
+    classes: u8,
+    depth_range: i64,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    hbt.subscribe(asset_no, Subscription::new(classes, depth_range));
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn hashmapbt_last_wake(
+    hbt_ptr: *const HashMapMarketDepthBacktest,
+    asset_no: *mut usize,
+    classes: *mut u64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.last_wake() {
+        None => false,
+        Some((asset_no_, classes_)) => {
+            unsafe {
+                *asset_no = asset_no_;
+                *classes = classes_ as u64;
+            }
+            true
+        },
+    }
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn hashmapbt_submit_buy_order(
     hbt_ptr: *mut HashMapMarketDepthBacktest,
@@ -198,6 +253,21 @@ pub extern "C" fn hashmapbt_cancel(
     handle_result(hbt.cancel(asset_no, order_id, wait))
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn hashmapbt_submit_batch(
+    hbt_ptr: *mut HashMapMarketDepthBacktest,
+    asset_no: usize,
+    requests_ptr: *const BatchOrderRequest,
+    status_ptr: *mut i64,
+    len: usize,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    let requests = unsafe { from_raw_parts(requests_ptr, len) };
+    let status = unsafe { from_raw_parts_mut(status_ptr, len) };
+    submit_batch(hbt, asset_no, requests, status, wait)
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn hashmapbt_clear_last_trades(
     hbt_ptr: *mut HashMapMarketDepthBacktest,
@@ -242,6 +312,17 @@ pub extern "C" fn hashmapbt_state_values(
     hbt.state_values(asset_no) as *const _
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn hashmapbt_record_state_values(
+    hbt_ptr: *const HashMapMarketDepthBacktest,
+    out_ptr: *mut Record,
+    len: usize,
+) -> usize {
+    let hbt = unsafe { &*hbt_ptr };
+    let out = unsafe { from_raw_parts_mut(out_ptr, len) };
+    Record::write_all(hbt, out)
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn hashmapbt_feed_latency(
     hbt_ptr: *const HashMapMarketDepthBacktest,
@@ -290,6 +371,20 @@ pub extern "C" fn hashmapbt_goto_end(hbt_ptr: *mut HashMapMarketDepthBacktest) -
     handle_result(hbt.goto_end())
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn hashmapbt_fork(
+    hbt_ptr: *const HashMapMarketDepthBacktest,
+) -> *mut HashMapMarketDepthBacktest {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.fork() {
+        Ok(forked) => Box::into_raw(Box::new(forked)),
+        Err(error) => {
+            println!("BacktestError: {error:?}");
+            null_mut()
+        },
+    }
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn roivecbt_current_timestamp(hbt_ptr: *const ROIVectorMarketDepthBacktest) -> i64 {
     let hbt = unsafe { &*hbt_ptr };
@@ -389,6 +484,36 @@ pub extern "C" fn roivecbt_wait_next_feed(
     handle_result(hbt.wait_next_feed(include_resp, timeout))
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn roivecbt_subscribe(
+    hbt_ptr: *mut ROIVectorMarketDepthBacktest,
+    asset_no: usize,
+    classes: u8,
+    depth_range: i64,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    hbt.subscribe(asset_no, Subscription::new(classes, depth_range));
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn roivecbt_last_wake(
+    hbt_ptr: *const ROIVectorMarketDepthBacktest,
+    asset_no: *mut usize,
+    classes: *mut u64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.last_wake() {
+        None => false,
+        Some((asset_no_, classes_)) => {
+            unsafe {
+                *asset_no = asset_no_;
+                *classes = classes_ as u64;
+            }
+            true
+        },
+    }
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn roivecbt_submit_buy_order(
     hbt_ptr: *mut ROIVectorMarketDepthBacktest,
@@ -460,6 +585,21 @@ pub extern "C" fn roivecbt_cancel(
     handle_result(hbt.cancel(asset_no, order_id, wait))
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn roivecbt_submit_batch(
+    hbt_ptr: *mut ROIVectorMarketDepthBacktest,
+    asset_no: usize,
+    requests_ptr: *const BatchOrderRequest,
+    status_ptr: *mut i64,
+    len: usize,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    let requests = unsafe { from_raw_parts(requests_ptr, len) };
+    let status = unsafe { from_raw_parts_mut(status_ptr, len) };
+    submit_batch(hbt, asset_no, requests, status, wait)
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn roivecbt_clear_last_trades(
     hbt_ptr: *mut ROIVectorMarketDepthBacktest,
@@ -504,6 +644,17 @@ pub extern "C" fn roivecbt_state_values(
     hbt.state_values(asset_no) as *const _
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn roivecbt_record_state_values(
+    hbt_ptr: *const ROIVectorMarketDepthBacktest,
+    out_ptr: *mut Record,
+    len: usize,
+) -> usize {
+    let hbt = unsafe { &*hbt_ptr };
+    let out = unsafe { from_raw_parts_mut(out_ptr, len) };
+    Record::write_all(hbt, out)
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn roivecbt_feed_latency(
     hbt_ptr: *const ROIVectorMarketDepthBacktest,
@@ -545,3 +696,343 @@ pub extern "C" fn roivecbt_order_latency(
         },
     }
 }
+
+#[unsafe(no_mangle)]
+pub extern "C" fn roivecbt_fork(
+    hbt_ptr: *const ROIVectorMarketDepthBacktest,
+) -> *mut ROIVectorMarketDepthBacktest {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.fork() {
+        Ok(forked) => Box::into_raw(Box::new(forked)),
+        Err(error) => {
+            println!("BacktestError: {error:?}");
+            null_mut()
+        },
+    }
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_current_timestamp(hbt_ptr: *const BTreeMarketDepthBacktest) -> i64 {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.current_timestamp()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_depth(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+) -> *const BTreeMarketDepth {
+    let hbt = unsafe { &*hbt_ptr };
+    let depth = hbt.depth(asset_no);
+    depth as *const _
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_last_trades(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+    len_ptr: *mut usize,
+) -> *const Event {
+    let hbt = unsafe { &*hbt_ptr };
+    let trade = hbt.last_trades(asset_no);
+    unsafe {
+        *len_ptr = trade.len();
+    }
+    trade.as_ptr() as *mut _
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_position(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+) -> f64 {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.position(asset_no)
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_close(hbt_ptr: *mut BTreeMarketDepthBacktest) -> i64 {
+    let mut hbt = unsafe { Box::from_raw(hbt_ptr) };
+    match hbt.close() {
+        Ok(()) => 0,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_elapse(hbt_ptr: *mut BTreeMarketDepthBacktest, duration: i64) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    handle_result(hbt.elapse(duration))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_elapse_bt(hbt_ptr: *mut BTreeMarketDepthBacktest, duration: i64) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    handle_result(hbt.elapse_bt(duration))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_num_assets(hbt_ptr: *const BTreeMarketDepthBacktest) -> usize {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.num_assets()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_wait_order_response(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    timeout: i64,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    handle_result(hbt.wait_order_response(asset_no, order_id, timeout))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_wait_next_feed(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    include_resp: bool,
+    timeout: i64,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    handle_result(hbt.wait_next_feed(include_resp, timeout))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_subscribe(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    classes: u8,
+    depth_range: i64,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    hbt.subscribe(asset_no, Subscription::new(classes, depth_range));
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_last_wake(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: *mut usize,
+    classes: *mut u64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.last_wake() {
+        None => false,
+        Some((asset_no_, classes_)) => {
+            unsafe {
+                *asset_no = asset_no_;
+                *classes = classes_ as u64;
+            }
+            true
+        },
+    }
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_submit_buy_order(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    price: f64,
+    qty: f64,
+    time_in_force: u8,
+    order_type: u8,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    let tif = unsafe { mem::transmute::<u8, TimeInForce>(time_in_force) };
+    handle_result(hbt.submit_buy_order(
+        asset_no,
+        order_id,
+        price,
+        qty,
+        tif,
+        unsafe { mem::transmute::<u8, OrdType>(order_type) },
+        wait,
+    ))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_submit_sell_order(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    price: f64,
+    qty: f64,
+    time_in_force: u8,
+    order_type: u8,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    handle_result(hbt.submit_sell_order(
+        asset_no,
+        order_id,
+        price,
+        qty,
+        unsafe { mem::transmute::<u8, TimeInForce>(time_in_force) },
+        unsafe { mem::transmute::<u8, OrdType>(order_type) },
+        wait,
+    ))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_modify(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    price: f64,
+    qty: f64,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    handle_result(hbt.modify(asset_no, order_id, price, qty, wait))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_cancel(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    handle_result(hbt.cancel(asset_no, order_id, wait))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_submit_batch(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    requests_ptr: *const BatchOrderRequest,
+    status_ptr: *mut i64,
+    len: usize,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    let requests = unsafe { from_raw_parts(requests_ptr, len) };
+    let status = unsafe { from_raw_parts_mut(status_ptr, len) };
+    submit_batch(hbt, asset_no, requests, status, wait)
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_clear_last_trades(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    if asset_no == usize::MAX {
+        hbt.clear_last_trades(None);
+    } else {
+        hbt.clear_last_trades(Some(asset_no));
+    }
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_clear_inactive_orders(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    if asset_no == usize::MAX {
+        hbt.clear_inactive_orders(None);
+    } else {
+        hbt.clear_inactive_orders(Some(asset_no));
+    }
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_orders(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+) -> *const HashMap<u64, Order> {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.orders(asset_no) as *const _
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_state_values(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+) -> *const StateValues {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.state_values(asset_no) as *const _
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_record_state_values(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    out_ptr: *mut Record,
+    len: usize,
+) -> usize {
+    let hbt = unsafe { &*hbt_ptr };
+    let out = unsafe { from_raw_parts_mut(out_ptr, len) };
+    Record::write_all(hbt, out)
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_feed_latency(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+    exch_ts: *mut i64,
+    local_ts: *mut i64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.feed_latency(asset_no) {
+        None => false,
+        Some((exch_ts_, local_ts_)) => {
+            unsafe {
+                *exch_ts = exch_ts_;
+                *local_ts = local_ts_;
+            }
+            true
+        },
+    }
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_order_latency(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+    req_ts: *mut i64,
+    exch_ts: *mut i64,
+    resp_ts: *mut i64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.order_latency(asset_no) {
+        None => false,
+        Some((req_ts_, exch_ts_, resp_ts_)) => {
+            unsafe {
+                *req_ts = req_ts_;
+                *exch_ts = exch_ts_;
+                *resp_ts = resp_ts_;
+            }
+            true
+        },
+    }
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_goto_end(hbt_ptr: *mut BTreeMarketDepthBacktest) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    handle_result(hbt.goto_end())
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreebt_fork(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+) -> *mut BTreeMarketDepthBacktest {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.fork() {
+        Ok(forked) => Box::into_raw(Box::new(forked)),
+        Err(error) => {
+            println!("BacktestError: {error:?}");
+            null_mut()
+        },
+    }
+}
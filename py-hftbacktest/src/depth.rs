@@ -1,9 +1,11 @@
 #![allow(clippy::not_unsafe_ptr_arg_deref)]
 
-use std::mem::forget;
+use std::{mem::forget, slice::from_raw_parts_mut};
 
 use hftbacktest::prelude::{
     ApplySnapshot,
+    BTreeMarketDepth,
+    DepthLevel,
     Event,
     HashMapMarketDepth,
     MarketDepth,
@@ -97,6 +99,28 @@ pub extern "C" fn hashmapdepth_snapshot_free(event_ptr: *mut Event, len: usize)
     let _ = unsafe { Vec::from_raw_parts(event_ptr, len, len) };
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn hashmapdepth_bid_levels(
+    ptr: *const HashMapMarketDepth,
+    levels_ptr: *mut DepthLevel,
+    len: usize,
+) -> usize {
+    let depth = unsafe { &*ptr };
+    let levels = unsafe { from_raw_parts_mut(levels_ptr, len) };
+    depth.bid_levels(levels)
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn hashmapdepth_ask_levels(
+    ptr: *const HashMapMarketDepth,
+    levels_ptr: *mut DepthLevel,
+    len: usize,
+) -> usize {
+    let depth = unsafe { &*ptr };
+    let levels = unsafe { from_raw_parts_mut(levels_ptr, len) };
+    depth.ask_levels(levels)
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn roivecdepth_best_bid_tick(ptr: *const ROIVectorMarketDepth) -> i64 {
     let depth = unsafe { &*ptr };
@@ -193,3 +217,112 @@ pub extern "C" fn roivecdepth_roi_ub_tick(ptr: *const ROIVectorMarketDepth) -> i
     let depth = unsafe { &*ptr };
     depth.roi_tick().1
 }
+
+#[unsafe(no_mangle)]
+pub extern "C" fn roivecdepth_roi_offset(ptr: *const ROIVectorMarketDepth) -> usize {
+    let depth = unsafe { &*ptr };
+    depth.roi_offset()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_best_bid_tick(ptr: *const BTreeMarketDepth) -> i64 {
+    let depth = unsafe { &*ptr };
+    depth.best_bid_tick()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_best_ask_tick(ptr: *const BTreeMarketDepth) -> i64 {
+    let depth = unsafe { &*ptr };
+    depth.best_ask_tick()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_best_bid(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.best_bid()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_best_ask(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.best_ask()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_best_bid_qty(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.best_bid_qty()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_best_ask_qty(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.best_ask_qty()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_tick_size(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.tick_size()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_lot_size(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.lot_size()
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_bid_qty_at_tick(ptr: *const BTreeMarketDepth, price_tick: i64) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.bid_qty_at_tick(price_tick)
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_ask_qty_at_tick(ptr: *const BTreeMarketDepth, price_tick: i64) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.ask_qty_at_tick(price_tick)
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_snapshot(
+    ptr: *const BTreeMarketDepth,
+    len: *mut usize,
+) -> *const Event {
+    let depth = unsafe { &*ptr };
+    let mut snapshot = depth.snapshot();
+    snapshot.shrink_to_fit();
+    let ptr = snapshot.as_ptr();
+    unsafe {
+        *len = snapshot.len();
+        forget(snapshot);
+    }
+    ptr
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_snapshot_free(event_ptr: *mut Event, len: usize) {
+    let _ = unsafe { Vec::from_raw_parts(event_ptr, len, len) };
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_bid_levels(
+    ptr: *const BTreeMarketDepth,
+    levels_ptr: *mut DepthLevel,
+    len: usize,
+) -> usize {
+    let depth = unsafe { &*ptr };
+    let levels = unsafe { from_raw_parts_mut(levels_ptr, len) };
+    depth.bid_levels(levels)
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn btreedepth_ask_levels(
+    ptr: *const BTreeMarketDepth,
+    levels_ptr: *mut DepthLevel,
+    len: usize,
+) -> usize {
+    let depth = unsafe { &*ptr };
+    let levels = unsafe { from_raw_parts_mut(levels_ptr, len) };
+    depth.ask_levels(levels)
+}
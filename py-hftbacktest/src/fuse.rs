@@ -1,5 +1,7 @@
 #![allow(clippy::not_unsafe_ptr_arg_deref)]
 
+use std::slice::from_raw_parts_mut;
+
 use hftbacktest::{
     depth::FusedHashMapMarketDepth,
     prelude::Event,
@@ -16,6 +18,10 @@ use hftbacktest::{
 
 pub struct FuseMarketDepth {
     fused: Vec<Event>,
+    /// The number of the earliest fused events already moved out by [`fusemarketdepth_drain`].
+    /// They are removed from `fused` only once all of it is drained, or once they outnumber the
+    /// remaining events, so that a drain does not shift the remaining events each time.
+    drained: usize,
     depth: FusedHashMapMarketDepth,
 }
 
@@ -23,6 +29,7 @@ pub struct FuseMarketDepth {
 pub extern "C" fn fusemarketdepth_new(tick_size: f64, lot_size: f64) -> *mut FuseMarketDepth {
     let boxed = Box::new(FuseMarketDepth {
         fused: Default::default(),
+        drained: 0,
         depth: FusedHashMapMarketDepth::new(tick_size, lot_size),
     });
     Box::into_raw(boxed)
@@ -37,6 +44,51 @@ pub extern "C" fn fusemarketdepth_free(slf: *mut FuseMarketDepth) {
     }
 }
 
+impl FuseMarketDepth {
+    /// Processes the event, returning `false` if it is not a depth event that can be fused.
+    fn process(&mut self, ev: &Event, add: bool) -> bool {
+        let mut ev = ev.clone();
+        if ev.is(DEPTH_EVENT) | ev.is(DEPTH_SNAPSHOT_EVENT) {
+            let mut evs = if ev.is(BUY_EVENT) {
+                self.depth.update_bid_depth(ev)
+            } else if ev.is(SELL_EVENT) {
+                self.depth.update_ask_depth(ev)
+            } else {
+                return false;
+            };
+            if add {
+                self.fused.append(&mut evs);
+            }
+        } else if ev.is(DEPTH_CLEAR_EVENT) {
+            if ev.is(BUY_EVENT) {
+                self.depth.clear_depth(Side::Buy, ev.px, ev.exch_ts);
+            } else if ev.is(SELL_EVENT) {
+                self.depth.clear_depth(Side::Sell, ev.px, ev.exch_ts);
+            } else {
+                self.depth.clear_depth(Side::None, 0.0, ev.exch_ts);
+            }
+            if add {
+                self.fused.push(ev);
+            }
+        } else if ev.is(DEPTH_BBO_EVENT) {
+            ev.ev = (ev.ev & !DEPTH_BBO_EVENT) | DEPTH_EVENT;
+            let mut evs = if ev.is(BUY_EVENT) {
+                self.depth.update_best_bid(ev)
+            } else if ev.is(SELL_EVENT) {
+                self.depth.update_best_ask(ev)
+            } else {
+                return false;
+            };
+            if add {
+                self.fused.append(&mut evs);
+            }
+        } else {
+            return false;
+        }
+        true
+    }
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn fusemarketdepth_process_event(
     slf: *mut FuseMarketDepth,
@@ -44,45 +96,54 @@ pub extern "C" fn fusemarketdepth_process_event(
     add: bool,
 ) -> bool {
     let slf = unsafe { &mut *slf };
-    let mut ev = unsafe { &*ev }.clone();
-    if ev.is(DEPTH_EVENT) | ev.is(DEPTH_SNAPSHOT_EVENT) {
-        let mut evs = if ev.is(BUY_EVENT) {
-            slf.depth.update_bid_depth(ev)
-        } else if ev.is(SELL_EVENT) {
-            slf.depth.update_ask_depth(ev)
-        } else {
-            return false;
-        };
-        if add {
-            slf.fused.append(&mut evs);
-        }
-    } else if ev.is(DEPTH_CLEAR_EVENT) {
-        if ev.is(BUY_EVENT) {
-            slf.depth.clear_depth(Side::Buy, ev.px, ev.exch_ts);
-        } else if ev.is(SELL_EVENT) {
-            slf.depth.clear_depth(Side::Sell, ev.px, ev.exch_ts);
-        } else {
-            slf.depth.clear_depth(Side::None, 0.0, ev.exch_ts);
-        }
-        if add {
-            slf.fused.push(ev);
-        }
-    } else if ev.is(DEPTH_BBO_EVENT) {
-        ev.ev = (ev.ev & !DEPTH_BBO_EVENT) | DEPTH_EVENT;
-        let mut evs = if ev.is(BUY_EVENT) {
-            slf.depth.update_best_bid(ev)
-        } else if ev.is(SELL_EVENT) {
-            slf.depth.update_best_ask(ev)
-        } else {
-            return false;
-        };
-        if add {
-            slf.fused.append(&mut evs);
+    slf.process(unsafe { &*ev }, add)
+}
+
+/// Processes the events from `start` up to `end`, stopping at the first event that cannot be
+/// fused, and returns its index, or `end` if all events are processed. `add_mask` points to a flag
+/// for each event of `ev` indicating whether it is added to the fused events; if it is null, all
+/// events are added.
+#[unsafe(no_mangle)]
+pub extern "C" fn fusemarketdepth_process_events(
+    slf: *mut FuseMarketDepth,
+    ev: *const Event,
+    start: usize,
+    end: usize,
+    add_mask: *const bool,
+) -> usize {
+    let slf = unsafe { &mut *slf };
+    for i in start..end {
+        let add = add_mask.is_null() || unsafe { *add_mask.add(i) };
+        if !slf.process(unsafe { &*ev.add(i) }, add) {
+            return i;
         }
-    } else {
-        return false;
     }
-    true
+    end
+}
+
+/// Moves up to `capacity` of the earliest fused events into `buf` and returns the number of events
+/// moved.
+#[unsafe(no_mangle)]
+pub extern "C" fn fusemarketdepth_drain(
+    slf: *mut FuseMarketDepth,
+    buf: *mut Event,
+    capacity: usize,
+) -> usize {
+    let slf = unsafe { &mut *slf };
+    let pending = &slf.fused[slf.drained..];
+    let n = pending.len().min(capacity);
+    let buf = unsafe { from_raw_parts_mut(buf, n) };
+    buf.clone_from_slice(&pending[..n]);
+    slf.drained += n;
+    if slf.drained == slf.fused.len() {
+        // Keeps the capacity for the events fused next.
+        slf.fused.clear();
+        slf.drained = 0;
+    } else if slf.drained >= slf.fused.len() - slf.drained {
+        slf.fused.drain(..slf.drained);
+        slf.drained = 0;
+    }
+    n
 }
 
 #[unsafe(no_mangle)]
@@ -91,6 +152,7 @@ pub extern "C" fn fusemarketdepth_fused_events(
     len: *mut usize,
 ) -> *const Event {
     let slf = unsafe { &mut *slf };
-    unsafe { *len = slf.fused.len() }
-    slf.fused.as_ptr()
+    let pending = &slf.fused[slf.drained..];
+    unsafe { *len = pending.len() }
+    pending.as_ptr()
 }
@@ -1,4 +1,10 @@
-use std::{ffi::c_void, mem::size_of, ptr::slice_from_raw_parts_mut};
+use std::{
+    collections::HashMap,
+    ffi::c_void,
+    mem::size_of,
+    ptr::slice_from_raw_parts_mut,
+    sync::Arc,
+};
 
 pub use backtest::*;
 pub use depth::*;
@@ -11,9 +17,18 @@ use hftbacktest::{
         Backtest,
         DataSource,
         assettype::{InverseAsset, LinearAsset},
-        data::{Data, DataPtr, FeedLatencyAdjustment, Reader, read_npz_file},
+        data::{
+            Data,
+            DataPtr,
+            FeedLatencyAdjustment,
+            Reader,
+            ReaderStats,
+            read_npy_mmap,
+            read_npz_file,
+        },
         models::{
             CommonFees,
+            CompactOrderLatencyRow,
             ConstantLatency,
             FlatPerTradeFeeModel,
             IntpOrderLatency,
@@ -25,12 +40,16 @@ use hftbacktest::{
             PowerProbQueueFunc2,
             PowerProbQueueFunc3,
             ProbQueueModel,
+            Probability,
+            RelativeProbability,
             RiskAdverseQueueModel,
+            TabulatedProbQueueFunc,
             TradingQtyFeeModel,
             TradingValueFeeModel,
         },
         order::order_bus,
         proc::{
+            Forkable,
             L3Local,
             L3NoPartialFillExchange,
             Local,
@@ -41,7 +60,7 @@ use hftbacktest::{
         },
         state::State,
     },
-    prelude::{ApplySnapshot, Event, HashMapMarketDepth, ROIVectorMarketDepth},
+    prelude::{ApplySnapshot, BTreeMarketDepth, Event, HashMapMarketDepth, ROIVectorMarketDepth},
 };
 use hftbacktest_derive::build_asset;
 pub use order::*;
@@ -78,16 +97,20 @@ pub enum LatencyModel {
         data: Vec<DataSource<OrderLatencyRow>>,
         latency_offset: i64,
     },
+    CompactIntpOrderLatency {
+        data: Vec<DataSource<CompactOrderLatencyRow>>,
+        latency_offset: i64,
+    },
 }
 
 #[derive(Clone)]
 pub enum QueueModel {
     RiskAdverseQueueModel {},
-    PowerProbQueueModel { n: f64 },
+    PowerProbQueueModel { n: f64, table_size: usize },
     LogProbQueueModel {},
     LogProbQueueModel2 {},
-    PowerProbQueueModel2 { n: f64 },
-    PowerProbQueueModel3 { n: f64 },
+    PowerProbQueueModel2 { n: f64, table_size: usize },
+    PowerProbQueueModel3 { n: f64, table_size: usize },
     L3FIFOQueueModel {},
 }
 
@@ -117,10 +140,17 @@ pub struct BacktestAsset {
     last_trades_cap: usize,
     roi_lb: f64,
     roi_ub: f64,
+    roi_width: f64,
     initial_snapshot: Option<DataSource<Event>>,
     fee_model: FeeModel,
     latency_offset: i64,
     parallel_load: bool,
+    readahead: usize,
+    memory_budget: usize,
+    chunk_size: usize,
+    start_time: i64,
+    end_time: i64,
+    reader_stats: Arc<ReaderStats>,
 }
 
 unsafe impl Send for BacktestAsset {}
@@ -146,12 +176,19 @@ impl BacktestAsset {
             last_trades_cap: 0,
             roi_lb: 0.0,
             roi_ub: 0.0,
+            roi_width: 0.0,
             initial_snapshot: None,
             fee_model: FeeModel::TradingValueFeeModel {
                 fees: CommonFees::new(0.0, 0.0),
             },
             latency_offset: 0,
             parallel_load: true,
+            readahead: 1,
+            memory_budget: 0,
+            chunk_size: 0,
+            start_time: i64::MIN,
+            end_time: i64::MAX,
+            reader_stats: Default::default(),
         }
     }
 
@@ -166,6 +203,85 @@ impl BacktestAsset {
         slf
     }
 
+    /// Sets the number of subsequent files to preload when `parallel_load` is enabled. Files are
+    /// decompressed by a bounded thread pool shared by all assets.
+    ///
+    /// Args:
+    ///     readahead: the number of files to preload ahead of the file being read.
+    ///                The default value is `1`.
+    pub fn readahead(mut slf: PyRefMut<Self>, readahead: usize) -> PyRefMut<Self> {
+        slf.readahead = readahead;
+        slf
+    }
+
+    /// Sets the memory budget that throttles preloading. Subsequent files are not preloaded while
+    /// the feed data held for this asset exceeds the budget. The file currently needed is always
+    /// loaded.
+    ///
+    /// Args:
+    ///     memory_budget: the memory budget in bytes. `0` means unlimited.
+    ///                    The default value is `0`.
+    pub fn memory_budget(mut slf: PyRefMut<Self>, memory_budget: usize) -> PyRefMut<Self> {
+        slf.memory_budget = memory_budget;
+        slf
+    }
+
+    /// Sets the number of rows in each chunk in which `.npz` files are decoded. Instead of
+    /// decompressing a whole file into memory, the file is decoded incrementally as the backtest
+    /// advances, so only a few chunks are held in memory at a time regardless of the file size.
+    /// Memory-mapped files and data given as arrays are not affected.
+    ///
+    /// Args:
+    ///     chunk_size: the number of rows in each chunk. `0` disables it.
+    ///                 The default value is `0`.
+    pub fn chunk_size(mut slf: PyRefMut<Self>, chunk_size: usize) -> PyRefMut<Self> {
+        slf.chunk_size = chunk_size;
+        slf
+    }
+
+    /// Sets the start of the time window to be backtested. The backtest begins at the first event
+    /// at or after it. The events before it are replayed, without the strategy being involved, only
+    /// to rebuild the market depth, starting from the latest depth snapshot before it if available.
+    ///
+    /// With the index sidecar files written by :func:`hftbacktest.data.write_time_index`, the files
+    /// that end before the window are skipped without being loaded if the market depth can be
+    /// rebuilt from a later depth snapshot, and each file is sliced without being scanned.
+    ///
+    /// Args:
+    ///     start_time: the start timestamp of the window, inclusive.
+    pub fn start_time(mut slf: PyRefMut<Self>, start_time: i64) -> PyRefMut<Self> {
+        slf.start_time = start_time;
+        slf
+    }
+
+    /// Sets the end of the time window to be backtested. Reading the data stops once all events at
+    /// or after it are reached, and the subsequent files are not loaded.
+    ///
+    /// Args:
+    ///     end_time: the end timestamp of the window, exclusive.
+    pub fn end_time(mut slf: PyRefMut<Self>, end_time: i64) -> PyRefMut<Self> {
+        slf.end_time = end_time;
+        slf
+    }
+
+    /// Returns the feed data loading statistics of the backtests built from this asset, as a dict
+    /// with the following keys.
+    ///
+    /// * `blocked_time`: the total time in nanoseconds spent blocked waiting for data to be
+    ///   loaded.
+    /// * `blocked_count`: the number of times the backtest had to wait for data to be loaded.
+    /// * `loaded_files`: the number of files loaded.
+    pub fn reader_stats(&self) -> HashMap<&'static str, u64> {
+        HashMap::from([
+            (
+                "blocked_time",
+                self.reader_stats.blocked_time().as_nanos() as u64,
+            ),
+            ("blocked_count", self.reader_stats.blocked_count()),
+            ("loaded_files", self.reader_stats.loaded_files()),
+        ])
+    }
+
     /// Sets the latency offset to adjust the feed latency by the specified amount. This is
     /// particularly useful in cross-exchange backtesting, where the feed data is collected from a
     /// different site than the one where the strategy is intended to run.
@@ -198,11 +314,37 @@ impl BacktestAsset {
         slf
     }
 
+    /// Makes the range of interest of the `ROIVectorMarketDepth <https://docs.rs/hftbacktest/latest/hftbacktest/depth/struct.ROIVectorMarketDepth.html>`_
+    /// follow the mid-price instead of being fixed by :meth:`roi_lb` and :meth:`roi_ub`, so that a
+    /// narrow range suffices however far the price drifts. The levels outside the range are still
+    /// kept, but are slower to access. Only valid if `ROIVectorMarketDepthBacktest` is built.
+    ///
+    /// Args:
+    ///     roi_width: the width in price of the range of interest, which is re-centered on the
+    ///                mid-price once the mid-price comes within a quarter of the width of either
+    ///                bound. If it is zero, the range of interest is fixed.
+    pub fn roi_width(mut slf: PyRefMut<Self>, roi_width: f64) -> PyRefMut<Self> {
+        slf.roi_width = roi_width;
+        slf
+    }
+
     pub fn add_file(mut slf: PyRefMut<Self>, data: String) -> PyRefMut<Self> {
         slf.data.push(DataSource::File(data));
         slf
     }
 
+    /// Adds an uncompressed `.npy` feed file that is memory-mapped instead of being read into
+    /// memory. The backtest can start without waiting for the whole file to be loaded, and the page
+    /// cache is shared by every process reading the same file. If :meth:`latency_offset` is set,
+    /// the file is read into memory instead, since the adjustment rewrites every row.
+    ///
+    /// Args:
+    ///     data: the file path of the feed data in `.npy` format.
+    pub fn add_mmap_file(mut slf: PyRefMut<Self>, data: String) -> PyRefMut<Self> {
+        slf.data.push(DataSource::MmapFile(data));
+        slf
+    }
+
     pub fn _add_data_ndarray(mut slf: PyRefMut<Self>, data: usize, len: usize) -> PyRefMut<Self> {
         let arr = slice_from_raw_parts_mut(data as *mut u8, len * size_of::<Event>());
         let data = unsafe { Data::<Event>::from_data_ptr(DataPtr::from_ptr(arr), 0) };
@@ -322,6 +464,47 @@ impl BacktestAsset {
         slf
     }
 
+    /// Uses `IntpOrderLatency <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.IntpOrderLatency.html>`_
+    /// for the order latency model, with the historical order latency data in the compact form.
+    /// The data is read as it is, without being converted back into the full form.
+    ///
+    /// Args:
+    ///     data: a list of file paths for the historical order latency data of
+    ///           `compact_order_latency_dtype` in `npz`.
+    ///     latency_offset: the latency offset to adjust the order entry and response latency by the
+    ///                     specified amount.
+    pub fn compact_intp_order_latency(
+        mut slf: PyRefMut<Self>,
+        data: Vec<String>,
+        latency_offset: i64,
+    ) -> PyRefMut<Self> {
+        slf.latency_model = LatencyModel::CompactIntpOrderLatency {
+            data: data
+                .iter()
+                .map(|file| DataSource::File(file.to_string()))
+                .collect(),
+            latency_offset,
+        };
+        slf
+    }
+
+    pub fn _compact_intp_order_latency_ndarray(
+        mut slf: PyRefMut<Self>,
+        data: usize,
+        len: usize,
+        latency_offset: i64,
+    ) -> PyRefMut<Self> {
+        let arr =
+            slice_from_raw_parts_mut(data as *mut u8, len * size_of::<CompactOrderLatencyRow>());
+        let data =
+            unsafe { Data::<CompactOrderLatencyRow>::from_data_ptr(DataPtr::from_ptr(arr), 0) };
+        slf.latency_model = LatencyModel::CompactIntpOrderLatency {
+            data: vec![DataSource::Data(data)],
+            latency_offset,
+        };
+        slf
+    }
+
     /// Uses the `RiskAdverseQueueModel <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.RiskAdverseQueueModel.html>`_
     /// for the queue position model.
     ///
@@ -362,8 +545,21 @@ impl BacktestAsset {
     /// * `Order Fill - ProbQueueModel <https://hftbacktest.readthedocs.io/en/latest/order_fill.html#probqueuemodel>`_
     /// * `ProbQueueModel <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.ProbQueueModel.html>`_
     /// * `PowerProbQueueFunc <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.PowerProbQueueFunc.html>`_
-    pub fn power_prob_queue_model(mut slf: PyRefMut<Self>, n: f64) -> PyRefMut<Self> {
-        slf.queue_model = QueueModel::PowerProbQueueModel { n };
+    /// * `TabulatedProbQueueFunc <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.TabulatedProbQueueFunc.html>`_
+    ///
+    /// Args:
+    ///     n: the exponent of the power function.
+    ///     table_size: if non-zero, the probability is interpolated from a table of this many
+    ///                 intervals over the relative queue position instead of evaluating the power
+    ///                 function on every depth change. With 1024 intervals, the error is below
+    ///                 `2e-5` for `1 <= n <= 10`.
+    #[pyo3(signature = (n, table_size = 0))]
+    pub fn power_prob_queue_model(
+        mut slf: PyRefMut<Self>,
+        n: f64,
+        table_size: usize,
+    ) -> PyRefMut<Self> {
+        slf.queue_model = QueueModel::PowerProbQueueModel { n, table_size };
         slf
     }
 
@@ -374,8 +570,21 @@ impl BacktestAsset {
     /// * `Order Fill - ProbQueueModel <https://hftbacktest.readthedocs.io/en/latest/order_fill.html#probqueuemodel>`_
     /// * `ProbQueueModel <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.ProbQueueModel.html>`_
     /// * `PowerProbQueueFunc2 <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.PowerProbQueueFunc2.html>`_
-    pub fn power_prob_queue_model2(mut slf: PyRefMut<Self>, n: f64) -> PyRefMut<Self> {
-        slf.queue_model = QueueModel::PowerProbQueueModel2 { n };
+    /// * `TabulatedProbQueueFunc <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.TabulatedProbQueueFunc.html>`_
+    ///
+    /// Args:
+    ///     n: the exponent of the power function.
+    ///     table_size: if non-zero, the probability is interpolated from a table of this many
+    ///                 intervals over the relative queue position instead of evaluating the power
+    ///                 function on every depth change. With 1024 intervals, the error is below
+    ///                 `2e-5` for `1 <= n <= 10`.
+    #[pyo3(signature = (n, table_size = 0))]
+    pub fn power_prob_queue_model2(
+        mut slf: PyRefMut<Self>,
+        n: f64,
+        table_size: usize,
+    ) -> PyRefMut<Self> {
+        slf.queue_model = QueueModel::PowerProbQueueModel2 { n, table_size };
         slf
     }
 
@@ -386,8 +595,21 @@ impl BacktestAsset {
     /// * `Order Fill - ProbQueueModel <https://hftbacktest.readthedocs.io/en/latest/order_fill.html#probqueuemodel>`_
     /// * `ProbQueueModel <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.ProbQueueModel.html>`_
     /// * `PowerProbQueueFunc3 <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.PowerProbQueueFunc3.html>`_
-    pub fn power_prob_queue_model3(mut slf: PyRefMut<Self>, n: f64) -> PyRefMut<Self> {
-        slf.queue_model = QueueModel::PowerProbQueueModel3 { n };
+    /// * `TabulatedProbQueueFunc <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.TabulatedProbQueueFunc.html>`_
+    ///
+    /// Args:
+    ///     n: the exponent of the power function.
+    ///     table_size: if non-zero, the probability is interpolated from a table of this many
+    ///                 intervals over the relative queue position instead of evaluating the power
+    ///                 function on every depth change. With 1024 intervals, the error is below
+    ///                 `2e-5` for `1 <= n <= 10`.
+    #[pyo3(signature = (n, table_size = 0))]
+    pub fn power_prob_queue_model3(
+        mut slf: PyRefMut<Self>,
+        n: f64,
+        table_size: usize,
+    ) -> PyRefMut<Self> {
+        slf.queue_model = QueueModel::PowerProbQueueModel3 { n, table_size };
         slf
     }
 
@@ -496,6 +718,7 @@ impl BacktestAsset {
 fn _hftbacktest(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(build_hashmap_backtest, m)?)?;
     m.add_function(wrap_pyfunction!(build_roivec_backtest, m)?)?;
+    m.add_function(wrap_pyfunction!(build_btree_backtest, m)?)?;
     #[cfg(feature = "live")]
     m.add_function(wrap_pyfunction!(build_hashmap_livebot, m)?)?;
     #[cfg(feature = "live")]
@@ -505,123 +728,150 @@ fn _hftbacktest(m: &Bound<'_, PyModule>) -> PyResult<()> {
     Ok(())
 }
 
+/// Constructs an [`IntpOrderLatency`] from the data in the compact form, so that `build_asset!`
+/// can construct it by the name of its [`LatencyModel`] variant like the other latency models.
+struct CompactIntpOrderLatency;
+
+impl CompactIntpOrderLatency {
+    fn new(data: Vec<DataSource<CompactOrderLatencyRow>>, latency_offset: i64) -> IntpOrderLatency {
+        IntpOrderLatency::new_compact(data, latency_offset)
+    }
+}
+
 type LogProbQueueModelFunc = LogProbQueueFunc;
 type LogProbQueueModel2Func = LogProbQueueFunc2;
-type PowerProbQueueModelFunc = PowerProbQueueFunc;
-type PowerProbQueueModel2Func = PowerProbQueueFunc2;
-type PowerProbQueueModel3Func = PowerProbQueueFunc3;
+type PowerProbQueueModelFunc = MaybeTabulated<PowerProbQueueFunc>;
+type PowerProbQueueModel2Func = MaybeTabulated<PowerProbQueueFunc2>;
+type PowerProbQueueModel3Func = MaybeTabulated<PowerProbQueueFunc3>;
 
-#[pyfunction]
-pub fn build_hashmap_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<usize> {
-    let mut local = Vec::new();
-    let mut exch = Vec::new();
-    let mut readers = Vec::new();
-    for asset in assets {
-        if let (QueueModel::L3FIFOQueueModel {}, ExchangeKind::PartialFillExchange {}) =
-            (&asset.queue_model, &asset.exch_kind)
-        {
-            return PyResult::Err(PyErr::new::<PyValueError, _>(
-                "L3PartialFillExchange is unsupported.",
-            ));
+/// Evaluates the probability function exactly, or through a [`TabulatedProbQueueFunc`] if the
+/// table size is non-zero.
+#[derive(Clone)]
+pub enum MaybeTabulated<P> {
+    Exact(P),
+    Tabulated(TabulatedProbQueueFunc<P>),
+}
+
+impl<P> MaybeTabulated<P>
+where
+    P: RelativeProbability,
+{
+    fn with_table_size(prob: P, table_size: usize) -> Self {
+        if table_size == 0 {
+            MaybeTabulated::Exact(prob)
+        } else {
+            MaybeTabulated::Tabulated(TabulatedProbQueueFunc::new(prob, table_size))
         }
+    }
+}
 
-        let asst = build_asset!(
-            asset,
-            HashMapMarketDepth,
-            [
-                LinearAsset { contract_size },
-                InverseAsset { contract_size }
-            ],
-            [
-                ConstantLatency {
-                    entry_latency,
-                    resp_latency
-                },
-                IntpOrderLatency {
-                    data,
-                    latency_offset
-                }
-            ],
-            [
-                RiskAdverseQueueModel {},
-                LogProbQueueModel {},
-                LogProbQueueModel2 {},
-                PowerProbQueueModel { n },
-                PowerProbQueueModel2 { n },
-                PowerProbQueueModel3 { n },
-                L3FIFOQueueModel {}
-            ],
-            [NoPartialFillExchange {}, PartialFillExchange {}],
-            [
-                TradingValueFeeModel { fees },
-                TradingQtyFeeModel { fees },
-                FlatPerTradeFeeModel { fees },
-            ]
-        );
-        local.push(asst.local);
-        exch.push(asst.exch);
-        readers.push(asst.reader);
-    }
-
-    let hbt = Backtest::new(local, exch, readers);
-    Ok(Box::into_raw(Box::new(hbt)) as *mut c_void as usize)
+impl<P> Probability for MaybeTabulated<P>
+where
+    P: RelativeProbability,
+{
+    #[inline]
+    fn prob(&self, front: f64, back: f64) -> f64 {
+        match self {
+            MaybeTabulated::Exact(prob) => prob.prob(front, back),
+            MaybeTabulated::Tabulated(prob) => prob.prob(front, back),
+        }
+    }
+}
+
+impl MaybeTabulated<PowerProbQueueFunc> {
+    fn new(n: f64, table_size: usize) -> Self {
+        Self::with_table_size(PowerProbQueueFunc::new(n), table_size)
+    }
+}
+
+impl MaybeTabulated<PowerProbQueueFunc2> {
+    fn new(n: f64, table_size: usize) -> Self {
+        Self::with_table_size(PowerProbQueueFunc2::new(n), table_size)
+    }
+}
+
+impl MaybeTabulated<PowerProbQueueFunc3> {
+    fn new(n: f64, table_size: usize) -> Self {
+        Self::with_table_size(PowerProbQueueFunc3::new(n), table_size)
+    }
+}
+
+/// Builds a backtest with the given market depth from the assets. The backtest builders for the
+/// market depth types share this, so that they construct the assets in the same way.
+macro_rules! build_backtest {
+    ($assets:expr, $marketdepth:ident) => {{
+        let mut local = Vec::new();
+        let mut exch = Vec::new();
+        let mut readers = Vec::new();
+        for asset in $assets {
+            if let (QueueModel::L3FIFOQueueModel {}, ExchangeKind::PartialFillExchange {}) =
+                (&asset.queue_model, &asset.exch_kind)
+            {
+                return PyResult::Err(PyErr::new::<PyValueError, _>(
+                    "L3PartialFillExchange is unsupported.",
+                ));
+            }
+
+            let asst = build_asset!(
+                asset,
+                $marketdepth,
+                [
+                    LinearAsset { contract_size },
+                    InverseAsset { contract_size }
+                ],
+                [
+                    ConstantLatency {
+                        entry_latency,
+                        resp_latency
+                    },
+                    IntpOrderLatency {
+                        data,
+                        latency_offset
+                    },
+                    CompactIntpOrderLatency {
+                        data,
+                        latency_offset
+                    }
+                ],
+                [
+                    RiskAdverseQueueModel {},
+                    LogProbQueueModel {},
+                    LogProbQueueModel2 {},
+                    PowerProbQueueModel { n, table_size },
+                    PowerProbQueueModel2 { n, table_size },
+                    PowerProbQueueModel3 { n, table_size },
+                    L3FIFOQueueModel {}
+                ],
+                [NoPartialFillExchange {}, PartialFillExchange {}],
+                [
+                    TradingValueFeeModel { fees },
+                    TradingQtyFeeModel { fees },
+                    FlatPerTradeFeeModel { fees },
+                ]
+            );
+            local.push(asst.local);
+            exch.push(asst.exch);
+            readers.push(asst.reader);
+        }
+
+        let hbt = Backtest::new(local, exch, readers);
+        Ok(Box::into_raw(Box::new(hbt)) as *mut c_void as usize)
+    }};
+}
+
+#[pyfunction]
+pub fn build_hashmap_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<usize> {
+    build_backtest!(assets, HashMapMarketDepth)
 }
 
 #[pyfunction]
 pub fn build_roivec_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<usize> {
-    let mut local = Vec::new();
-    let mut exch = Vec::new();
-    let mut readers = Vec::new();
-
-    for asset in assets {
-        if let (QueueModel::L3FIFOQueueModel {}, ExchangeKind::PartialFillExchange {}) =
-            (&asset.queue_model, &asset.exch_kind)
-        {
-            return PyResult::Err(PyErr::new::<PyValueError, _>(
-                "L3PartialFillExchange is unsupported.",
-            ));
-        }
+    build_backtest!(assets, ROIVectorMarketDepth)
+}
 
-        let asst = build_asset!(
-            asset,
-            ROIVectorMarketDepth,
-            [
-                LinearAsset { contract_size },
-                InverseAsset { contract_size }
-            ],
-            [
-                ConstantLatency {
-                    entry_latency,
-                    resp_latency
-                },
-                IntpOrderLatency {
-                    data,
-                    latency_offset
-                }
-            ],
-            [
-                RiskAdverseQueueModel {},
-                LogProbQueueModel {},
-                LogProbQueueModel2 {},
-                PowerProbQueueModel { n },
-                PowerProbQueueModel2 { n },
-                PowerProbQueueModel3 { n },
-                L3FIFOQueueModel {}
-            ],
-            [NoPartialFillExchange {}, PartialFillExchange {}],
-            [
-                TradingValueFeeModel { fees },
-                TradingQtyFeeModel { fees },
-                FlatPerTradeFeeModel { fees },
-            ]
-        );
-        local.push(asst.local);
-        exch.push(asst.exch);
-        readers.push(asst.reader);
-    }
-
-    let hbt = Backtest::new(local, exch, readers);
-    Ok(Box::into_raw(Box::new(hbt)) as *mut c_void as usize)
+#[pyfunction]
+pub fn build_btree_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<usize> {
+    build_backtest!(assets, BTreeMarketDepth)
 }
 
 /// Builds a live trading instrument.
@@ -1,8 +1,9 @@
 #![allow(clippy::not_unsafe_ptr_arg_deref)]
 
-use std::{collections::HashMap, mem};
+use std::{collections::HashMap, mem, slice::from_raw_parts_mut};
 
 use hftbacktest::{
+    backtest::recorder::Record,
     depth::{HashMapMarketDepth, ROIVectorMarketDepth},
     live::{BotError, LiveBot, ipc::iceoryx::IceoryxUnifiedChannel},
     prelude::{Bot, ElapseResult, Event, Order, StateValues},
@@ -232,6 +233,17 @@ pub extern "C" fn hashmaplive_state_values(
     hbt.state_values(asset_no) as *const _
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn hashmaplive_record_state_values(
+    hbt_ptr: *const HashMapMarketDepthLiveBot,
+    out_ptr: *mut Record,
+    len: usize,
+) -> usize {
+    let hbt = unsafe { &*hbt_ptr };
+    let out = unsafe { from_raw_parts_mut(out_ptr, len) };
+    Record::write_all(hbt, out)
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn hashmaplive_feed_latency(
     hbt_ptr: *const HashMapMarketDepthLiveBot,
@@ -475,6 +487,17 @@ pub extern "C" fn roiveclive_state_values(
     hbt.state_values(asset_no) as *const _
 }
 
+#[unsafe(no_mangle)]
+pub extern "C" fn roiveclive_record_state_values(
+    hbt_ptr: *const ROIVectorMarketDepthLiveBot,
+    out_ptr: *mut Record,
+    len: usize,
+) -> usize {
+    let hbt = unsafe { &*hbt_ptr };
+    let out = unsafe { from_raw_parts_mut(out_ptr, len) };
+    Record::write_all(hbt, out)
+}
+
 #[unsafe(no_mangle)]
 pub extern "C" fn roiveclive_feed_latency(
     hbt_ptr: *const ROIVectorMarketDepthLiveBot,
@@ -2,11 +2,64 @@
 
 use std::{
     collections::{HashMap, hash_map::Values},
+    mem::size_of,
     os::raw::c_void,
     ptr::null,
 };
 
-use hftbacktest::prelude::Order;
+use hftbacktest::prelude::{Order, OrderId, Status};
+
+/// An [`Order`] as a row of `order_dtype`, which holds the plain fields of the order. The slot of
+/// the queue model data is zeroed rather than copied, since it is owned by the original order.
+#[repr(C)]
+pub struct OrderRow {
+    pub qty: f64,
+    pub leaves_qty: f64,
+    pub exec_qty: f64,
+    pub exec_price_tick: i64,
+    pub price_tick: i64,
+    pub tick_size: f64,
+    pub exch_timestamp: i64,
+    pub local_timestamp: i64,
+    pub order_id: u64,
+    pub q: [u64; 2],
+    pub maker: bool,
+    pub order_type: u8,
+    pub req: u8,
+    pub status: u8,
+    pub side: i8,
+    pub time_in_force: u8,
+}
+
+// `order_dtype` describes both an `Order` and an `OrderRow`.
+const _: () = assert!(size_of::<OrderRow>() == size_of::<Order>());
+
+impl From<&Order> for OrderRow {
+    fn from(order: &Order) -> Self {
+        Self {
+            qty: order.qty,
+            leaves_qty: order.leaves_qty,
+            exec_qty: order.exec_qty,
+            exec_price_tick: order.exec_price_tick,
+            price_tick: order.price_tick,
+            tick_size: order.tick_size,
+            exch_timestamp: order.exch_timestamp,
+            local_timestamp: order.local_timestamp,
+            order_id: order.order_id,
+            q: [0; 2],
+            maker: order.maker,
+            order_type: order.order_type as u8,
+            req: order.req as u8,
+            status: order.status as u8,
+            side: order.side as i8,
+            time_in_force: order.time_in_force as u8,
+        }
+    }
+}
+
+/// Holds the status, request status, and leaves quantity of each order as of when it was last
+/// copied by `orders_copy_changed`.
+pub type OrderTracker = HashMap<OrderId, (Status, Status, f64)>;
 
 #[unsafe(no_mangle)]
 pub extern "C" fn orders_get(ptr: *const HashMap<u64, Order>, order_id: u64) -> *const Order {
@@ -48,3 +101,61 @@ pub extern "C" fn orders_values_next(ptr: *mut Values<u64, Order>) -> *const Ord
         Some(order) => order as *const _,
     }
 }
+
+/// Copies up to `capacity` orders into `buf` and returns the number of orders copied.
+#[unsafe(no_mangle)]
+pub extern "C" fn orders_copy(
+    ptr: *const HashMap<u64, Order>,
+    buf: *mut OrderRow,
+    capacity: usize,
+) -> usize {
+    let orders = unsafe { &*ptr };
+    let mut n = 0;
+    for order in orders.values().take(capacity) {
+        unsafe { buf.add(n).write(OrderRow::from(order)) };
+        n += 1;
+    }
+    n
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn orders_tracker_new() -> *mut OrderTracker {
+    Box::into_raw(Box::new(OrderTracker::new()))
+}
+
+#[unsafe(no_mangle)]
+pub extern "C" fn orders_tracker_free(tracker: *mut OrderTracker) {
+    if !tracker.is_null() {
+        unsafe {
+            drop(Box::from_raw(tracker));
+        }
+    }
+}
+
+/// Copies up to `capacity` orders that are new or whose status, request status, or leaves quantity
+/// has changed since they were last copied with the same tracker into `buf`, and returns the
+/// number of orders copied. The orders that do not fit are copied by the next call.
+#[unsafe(no_mangle)]
+pub extern "C" fn orders_copy_changed(
+    ptr: *const HashMap<u64, Order>,
+    tracker: *mut OrderTracker,
+    buf: *mut OrderRow,
+    capacity: usize,
+) -> usize {
+    let orders = unsafe { &*ptr };
+    let tracker = unsafe { &mut *tracker };
+    tracker.retain(|order_id, _| orders.contains_key(order_id));
+    let mut n = 0;
+    for order in orders.values() {
+        if n == capacity {
+            break;
+        }
+        let key = (order.status, order.req, order.leaves_qty);
+        if tracker.get(&order.order_id) != Some(&key) {
+            unsafe { buf.add(n).write(OrderRow::from(order)) };
+            tracker.insert(order.order_id, key);
+            n += 1;
+        }
+    }
+    n
+}
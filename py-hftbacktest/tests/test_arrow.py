@@ -0,0 +1,193 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest.data import read_ipc_feed, read_parquet_feed
+from hftbacktest.data.arrow import _select_groups
+from hftbacktest.types import (
+    BUY_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EXCH_EVENT,
+    LOCAL_EVENT,
+    TRADE_EVENT,
+    event_dtype
+)
+
+FLAGS = EXCH_EVENT | LOCAL_EVENT | BUY_EVENT
+
+
+def make_feed(kinds, exch_ts):
+    feed = np.zeros(len(kinds), event_dtype)
+    feed['ev'] = FLAGS | np.asarray(kinds, np.uint64)
+    feed['exch_ts'] = exch_ts
+    feed['local_ts'] = np.asarray(exch_ts) + 5
+    feed['px'] = 100.0 + np.arange(len(kinds))
+    feed['qty'] = 1.0
+    feed['order_id'] = np.arange(len(kinds))
+    feed['ival'] = 7
+    feed['fval'] = 0.5
+    return feed
+
+
+def bounds_of(groups):
+    return [
+        (int(g['exch_ts'].min()), int(g['local_ts'].min()), int(g['exch_ts'].max()), int(g['local_ts'].max()))
+        for g in groups
+    ]
+
+
+class TestSelectGroups(unittest.TestCase):
+    def setUp(self) -> None:
+        # Four groups of 10ns each. A snapshot begins in group 1, and the last group before group 3 ends with a clear
+        # event that group 3 continues.
+        self.groups = [
+            make_feed([DEPTH_EVENT, DEPTH_EVENT], [0, 5]),
+            make_feed([DEPTH_EVENT, DEPTH_CLEAR_EVENT, DEPTH_SNAPSHOT_EVENT], [10, 12, 12]),
+            make_feed([TRADE_EVENT, DEPTH_CLEAR_EVENT], [20, 25]),
+            make_feed([DEPTH_CLEAR_EVENT, DEPTH_SNAPSHOT_EVENT, DEPTH_EVENT], [30, 30, 35]),
+        ]
+        self.bounds = bounds_of(self.groups)
+        self.read_calls = []
+
+    def read_ev(self, i):
+        self.read_calls.append(i)
+        return self.groups[i]['ev']
+
+    def select(self, start_time, end_time, bounds=None):
+        return _select_groups(self.bounds if bounds is None else bounds, self.read_ev, start_time, end_time)
+
+    def test_unbounded(self):
+        i64 = np.iinfo(np.int64)
+        self.assertEqual(self.select(i64.min, i64.max), [0, 1, 2, 3])
+        self.assertEqual(self.read_calls, [])
+
+    def test_backtracks_to_latest_snapshot(self):
+        # Group 3 is in the window by its local timestamps. Group 2 begins a snapshot with its trailing clear event.
+        self.assertEqual(self.select(40, 100), [2, 3])
+        self.assertEqual(self.read_calls, [0, 1, 2])
+
+    def test_continued_clear_does_not_begin_snapshot(self):
+        # The clear event at the beginning of group 3 continues the one at the end of group 2.
+        self.assertEqual(self.select(41, 100), [2, 3])
+        self.assertEqual(self.read_calls, [0, 1, 2, 3])
+
+        self.groups[2] = make_feed([TRADE_EVENT, DEPTH_EVENT], [20, 25])
+        # Group 3 starts with a clear event after a non-clear event, so it begins a snapshot by itself.
+        self.assertEqual(self.select(41, 100, bounds_of(self.groups)), [3])
+
+        self.groups[3] = make_feed([DEPTH_SNAPSHOT_EVENT, DEPTH_EVENT], [30, 35])
+        # Without a snapshot after group 1, the depth is rebuilt from group 1.
+        self.assertEqual(self.select(41, 100, bounds_of(self.groups)), [1, 2, 3])
+
+    def test_no_snapshot_before_window(self):
+        self.groups = [make_feed([DEPTH_EVENT], [ts]) for ts in (0, 10, 20)]
+        self.assertEqual(self.select(25, 100, bounds_of(self.groups)), [0, 1, 2])
+
+    def test_start_time_edge(self):
+        # Group 1 ends exactly at the start time, so it is in the window. Group 0 has no snapshot, so the depth is
+        # rebuilt from the beginning.
+        self.assertEqual(self.select(12, 100), [0, 1, 2, 3])
+        self.assertEqual(self.read_calls, [0])
+        # The local timestamps run 5ns behind, so group 1 is in the window by them as well.
+        self.read_calls = []
+        self.assertEqual(self.select(17, 100), [0, 1, 2, 3])
+        self.assertEqual(self.read_calls, [0])
+        # Once group 1 is entirely before the window, its snapshot is where the depth is rebuilt from.
+        self.read_calls = []
+        self.assertEqual(self.select(18, 100), [1, 2, 3])
+        self.assertEqual(self.read_calls, [0, 1])
+
+    def test_end_time_edge(self):
+        i64 = np.iinfo(np.int64)
+        # The end time is exclusive.
+        self.assertEqual(self.select(i64.min, 30), [0, 1, 2])
+        self.assertEqual(self.select(i64.min, 31), [0, 1, 2, 3])
+        self.assertEqual(self.select(i64.min, 10), [0])
+
+    def test_unknown_bounds(self):
+        bounds = list(self.bounds)
+        bounds[0] = None
+        bounds[3] = None
+        # A group without statistics stops the pruning before the window, and is always kept.
+        self.assertEqual(self.select(40, 15, bounds), [0, 1, 3])
+
+
+class TestArrowFeed(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.feed = np.concatenate([
+            make_feed([DEPTH_EVENT, DEPTH_EVENT], [0, 5]),
+            make_feed([DEPTH_CLEAR_EVENT, DEPTH_SNAPSHOT_EVENT, DEPTH_EVENT], [10, 10, 15]),
+            make_feed([TRADE_EVENT, DEPTH_EVENT], [20, 25]),
+        ])
+        self.group_sizes = [2, 3, 2]
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def table(self, columns=event_dtype.names):
+        import pyarrow as pa
+
+        return pa.table({name: self.feed[name] for name in columns})
+
+    def write_parquet(self, table):
+        import pyarrow.parquet as pq
+
+        path = os.path.join(self.tmp_dir.name, 'feed.parquet')
+        with pq.ParquetWriter(path, table.schema) as writer:
+            offset = 0
+            for size in self.group_sizes:
+                writer.write_table(table.slice(offset, size))
+                offset += size
+        return path
+
+    def write_ipc(self, table):
+        import pyarrow as pa
+
+        path = os.path.join(self.tmp_dir.name, 'feed.arrow')
+        with pa.ipc.new_file(path, table.schema) as writer:
+            offset = 0
+            for size in self.group_sizes:
+                writer.write_table(table.slice(offset, size))
+                offset += size
+        return path
+
+    def test_read_parquet_feed(self):
+        path = self.write_parquet(self.table())
+        np.testing.assert_array_equal(read_parquet_feed(path), self.feed)
+        # Only the groups from the latest snapshot before the window up to its end are read.
+        np.testing.assert_array_equal(read_parquet_feed(path, 22, 25), self.feed[2:])
+        np.testing.assert_array_equal(read_parquet_feed(path, None, 10), self.feed[:2])
+
+    def test_read_ipc_feed(self):
+        path = self.write_ipc(self.table())
+        np.testing.assert_array_equal(read_ipc_feed(path), self.feed)
+        np.testing.assert_array_equal(read_ipc_feed(path, 22, 25), self.feed[2:])
+
+    def test_missing_columns_are_zero_filled(self):
+        import pyarrow as pa
+
+        table = self.table(('ev', 'exch_ts', 'local_ts', 'px', 'qty'))
+        expected = self.feed.copy()
+        expected['order_id'] = 0
+        expected['ival'] = 0
+        expected['fval'] = 0
+        np.testing.assert_array_equal(read_parquet_feed(self.write_parquet(table)), expected)
+        np.testing.assert_array_equal(read_ipc_feed(self.write_ipc(table)), expected)
+
+        # Nulls are zero-filled as well.
+        qty = pa.array([None] + [1.0] * (len(self.feed) - 1), pa.float64())
+        table = table.set_column(table.schema.get_field_index('qty'), 'qty', qty)
+        expected['qty'][0] = 0
+        np.testing.assert_array_equal(read_parquet_feed(self.write_parquet(table)), expected)
+
+    def test_output_filename(self):
+        output = os.path.join(self.tmp_dir.name, 'decoded.npy')
+        data = read_parquet_feed(self.write_parquet(self.table()), 22, 25, output_filename=output)
+        self.assertIsInstance(data, np.memmap)
+        del data
+        np.testing.assert_array_equal(np.load(output), self.feed[2:])
@@ -0,0 +1,214 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest.data.utils import binancefutures, bybit, convert_many, hyperliquid
+from hftbacktest.types import (
+    BUY_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EXCH_EVENT,
+    LOCAL_EVENT,
+    SELL_EVENT,
+    TRADE_EVENT
+)
+
+# 2023-11-14 22:13:20 UTC in milliseconds.
+T0 = 1_700_000_000_000
+# The feed latency of the fixtures, in nanoseconds.
+LATENCY = 50_000_000
+
+
+def ms(offset):
+    return T0 + offset
+
+
+def ns(offset):
+    return ms(offset) * 1_000_000
+
+
+def write_feed(path, messages, latency=LATENCY):
+    # Writes the lines as the collector does: the local timestamp, a space, and the raw message.
+    open_ = gzip.open if path.endswith('.gz') else open
+    with open_(path, 'wt') as f:
+        for offset, message in messages:
+            f.write(f'{ns(offset) + latency} {json.dumps(message, separators=(",", ":"))}\n')
+    return path
+
+
+def binancefutures_messages():
+    return [
+        (0, {'stream': 'btcusdt@depth@0ms', 'data': {
+            'e': 'depthUpdate', 'E': ms(1), 'T': ms(0), 's': 'BTCUSDT', 'U': 1, 'u': 2, 'pu': 0,
+            'b': [['100.0', '1.5']], 'a': [['100.5', '2.0'], ['100.6', '0.0']]
+        }}),
+        (10, {'stream': 'btcusdt@trade', 'data': {
+            'e': 'trade', 'E': ms(11), 'T': ms(10), 's': 'BTCUSDT', 'p': '100.5', 'q': '0.3', 'm': False
+        }}),
+        # The other trade stream and the other streams are ignored.
+        (15, {'stream': 'btcusdt@aggTrade', 'data': {
+            'e': 'aggTrade', 'E': ms(16), 'T': ms(15), 's': 'BTCUSDT', 'p': '100.5', 'q': '0.3', 'm': False
+        }}),
+        (16, {'stream': 'btcusdt@markPrice', 'data': {'e': 'markPriceUpdate', 'E': ms(16), 'p': '100.2'}}),
+        (20, {'lastUpdateId': 3, 'E': ms(21), 'T': ms(20), 'bids': [['100.1', '1.0'], ['99.9', '2.0']],
+              'asks': [['100.4', '3.0'], ['100.7', '4.0']]}),
+        (30, {'stream': 'btcusdt@trade', 'data': {
+            'e': 'trade', 'E': ms(31), 'T': ms(30), 's': 'BTCUSDT', 'p': '100.1', 'q': '0.2', 'm': True
+        }}),
+    ]
+
+
+def bybit_messages():
+    return [
+        (0, {'topic': 'orderbook.50.BTCUSDT', 'type': 'snapshot', 'ts': ms(1), 'data': {
+            's': 'BTCUSDT', 'b': [['100.0', '1.0'], ['99.5', '2.0']], 'a': [['100.5', '3.0']], 'u': 1, 'seq': 1
+        }, 'cts': ms(0)}),
+        # Without the matching engine timestamp, the message timestamp is used.
+        (10, {'topic': 'orderbook.50.BTCUSDT', 'type': 'delta', 'ts': ms(10), 'data': {
+            's': 'BTCUSDT', 'b': [['99.5', '0']], 'a': [['100.5', '2.5']], 'u': 2, 'seq': 2
+        }}),
+        (20, {'topic': 'publicTrade.BTCUSDT', 'type': 'snapshot', 'ts': ms(21), 'data': [
+            {'T': ms(20), 's': 'BTCUSDT', 'S': 'Buy', 'v': '0.1', 'p': '100.5', 'i': 'a', 'BT': False},
+            {'T': ms(20), 's': 'BTCUSDT', 'S': 'Sell', 'v': '0.2', 'p': '100.0', 'i': 'b', 'BT': False},
+        ]}),
+        (25, {'topic': 'tickers.BTCUSDT', 'type': 'snapshot', 'ts': ms(25), 'data': {'symbol': 'BTCUSDT'}}),
+    ]
+
+
+def hyperliquid_messages():
+    def book(offset, bids, asks):
+        return (offset, {'channel': 'l2Book', 'data': {'coin': 'BTC', 'time': ms(offset), 'levels': [
+            [{'px': px, 'sz': sz, 'n': 1} for px, sz in bids],
+            [{'px': px, 'sz': sz, 'n': 1} for px, sz in asks],
+        ]}})
+
+    return [
+        book(0, [('100.0', '1.0'), ('99.0', '2.0')], [('101.0', '3.0')]),
+        (10, {'channel': 'trades', 'data': [
+            {'coin': 'BTC', 'side': 'A', 'px': '100.0', 'sz': '0.5', 'time': ms(10), 'hash': '0x0', 'tid': 1},
+            {'coin': 'BTC', 'side': 'B', 'px': '101.0', 'sz': '0.1', 'time': ms(10), 'hash': '0x0', 'tid': 2},
+        ]}),
+        (15, {'channel': 'bbo', 'data': {'coin': 'BTC', 'time': ms(15)}}),
+        book(20, [('100.5', '1.0')], [('101.0', '2.0'), ('102.0', '1.0')]),
+    ]
+
+
+class TestConverters(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def assert_events(self, data, expected):
+        # Each row is an event type, an exchange timestamp offset in milliseconds, a price, and a quantity. All
+        # fixtures are in order on both sides, so every event is both an exchange and a local event.
+        self.assertEqual(len(data), len(expected))
+        for row, (ev, offset, px, qty) in zip(data, expected):
+            self.assertEqual(row['ev'], EXCH_EVENT | LOCAL_EVENT | ev)
+            self.assertEqual(row['exch_ts'], ns(offset))
+            self.assertEqual(row['local_ts'], ns(offset) + LATENCY)
+            self.assertEqual(row['px'], px)
+            self.assertEqual(row['qty'], qty)
+
+    def test_binancefutures(self):
+        file = write_feed(self.path('btcusdt_20231114.gz'), binancefutures_messages())
+        data = binancefutures.convert(file)
+        self.assert_events(data, [
+            (DEPTH_EVENT | BUY_EVENT, 0, 100.0, 1.5),
+            (DEPTH_EVENT | SELL_EVENT, 0, 100.5, 2.0),
+            (DEPTH_EVENT | SELL_EVENT, 0, 100.6, 0.0),
+            # The buyer is not the maker, so the buyer initiated the trade.
+            (TRADE_EVENT | BUY_EVENT, 10, 100.5, 0.3),
+            # The snapshot begins by clearing each side up to its farthest level.
+            (DEPTH_CLEAR_EVENT | BUY_EVENT, 20, 99.9, 0.0),
+            (DEPTH_CLEAR_EVENT | SELL_EVENT, 20, 100.7, 0.0),
+            (DEPTH_SNAPSHOT_EVENT | BUY_EVENT, 20, 100.1, 1.0),
+            (DEPTH_SNAPSHOT_EVENT | BUY_EVENT, 20, 99.9, 2.0),
+            (DEPTH_SNAPSHOT_EVENT | SELL_EVENT, 20, 100.4, 3.0),
+            (DEPTH_SNAPSHOT_EVENT | SELL_EVENT, 20, 100.7, 4.0),
+            (TRADE_EVENT | SELL_EVENT, 30, 100.1, 0.2),
+        ])
+
+        data = binancefutures.convert(file, trade_stream='aggTrade')
+        np.testing.assert_array_equal(data[data['ev'] & 0xff == TRADE_EVENT]['exch_ts'], [ns(15)])
+
+    def test_bybit(self):
+        data = bybit.convert(write_feed(self.path('btcusdt_20231114.gz'), bybit_messages()))
+        self.assert_events(data, [
+            (DEPTH_CLEAR_EVENT | BUY_EVENT, 0, 99.5, 0.0),
+            (DEPTH_CLEAR_EVENT | SELL_EVENT, 0, 100.5, 0.0),
+            (DEPTH_SNAPSHOT_EVENT | BUY_EVENT, 0, 100.0, 1.0),
+            (DEPTH_SNAPSHOT_EVENT | BUY_EVENT, 0, 99.5, 2.0),
+            (DEPTH_SNAPSHOT_EVENT | SELL_EVENT, 0, 100.5, 3.0),
+            (DEPTH_EVENT | BUY_EVENT, 10, 99.5, 0.0),
+            (DEPTH_EVENT | SELL_EVENT, 10, 100.5, 2.5),
+            (TRADE_EVENT | BUY_EVENT, 20, 100.5, 0.1),
+            (TRADE_EVENT | SELL_EVENT, 20, 100.0, 0.2),
+        ])
+
+    def test_hyperliquid(self):
+        data = hyperliquid.convert(write_feed(self.path('btc_20231114.txt'), hyperliquid_messages()))
+        self.assert_events(data, [
+            (DEPTH_CLEAR_EVENT | BUY_EVENT, 0, 99.0, 0.0),
+            (DEPTH_CLEAR_EVENT | SELL_EVENT, 0, 101.0, 0.0),
+            (DEPTH_SNAPSHOT_EVENT | BUY_EVENT, 0, 100.0, 1.0),
+            (DEPTH_SNAPSHOT_EVENT | BUY_EVENT, 0, 99.0, 2.0),
+            (DEPTH_SNAPSHOT_EVENT | SELL_EVENT, 0, 101.0, 3.0),
+            # The side is that of the aggressor.
+            (TRADE_EVENT | SELL_EVENT, 10, 100.0, 0.5),
+            (TRADE_EVENT | BUY_EVENT, 10, 101.0, 0.1),
+            # Every book message is a snapshot of its own.
+            (DEPTH_CLEAR_EVENT | BUY_EVENT, 20, 100.5, 0.0),
+            (DEPTH_CLEAR_EVENT | SELL_EVENT, 20, 102.0, 0.0),
+            (DEPTH_SNAPSHOT_EVENT | BUY_EVENT, 20, 100.5, 1.0),
+            (DEPTH_SNAPSHOT_EVENT | SELL_EVENT, 20, 101.0, 2.0),
+            (DEPTH_SNAPSHOT_EVENT | SELL_EVENT, 20, 102.0, 1.0),
+        ])
+
+    def test_base_latency(self):
+        # The local clock runs ahead of the exchange's, so the local timestamps are shifted to ensure the minimum feed
+        # latency.
+        file = write_feed(self.path('btcusdt_20231114.gz'), bybit_messages(), -LATENCY)
+        data = bybit.convert(file, base_latency=LATENCY)
+        np.testing.assert_array_equal(data['local_ts'] - data['exch_ts'], LATENCY)
+        np.testing.assert_array_equal(data['ev'] & (EXCH_EVENT | LOCAL_EVENT), EXCH_EVENT | LOCAL_EVENT)
+
+    def test_convert_many(self):
+        files = [
+            write_feed(self.path('btcusdt_20231114.gz'), binancefutures_messages()),
+            write_feed(self.path('btcusdt_20231115.gz'), binancefutures_messages()[:2]),
+            write_feed(self.path('btcusdt_20231116.txt'), binancefutures_messages()[4:]),
+        ]
+        output_dir = self.path('npz')
+
+        outputs = convert_many(files, 'binancefutures', output_dir, max_workers=2)
+
+        self.assertEqual(outputs, [
+            os.path.join(output_dir, 'btcusdt_20231114.npz'),
+            os.path.join(output_dir, 'btcusdt_20231115.npz'),
+            os.path.join(output_dir, 'btcusdt_20231116.npz'),
+        ])
+        for file, output in zip(files, outputs):
+            with np.load(output) as data:
+                np.testing.assert_array_equal(data['data'], binancefutures.convert(file))
+
+        # The keyword arguments are passed to the converter.
+        outputs = convert_many(files[:1], 'binancefutures', output_dir, max_workers=1, trade_stream='aggTrade')
+        with np.load(outputs[0]) as data:
+            self.assertEqual(np.count_nonzero(data['data']['ev'] & 0xff == TRADE_EVENT), 1)
+
+        # Without an output directory, each file is saved next to its input file.
+        self.assertEqual(convert_many(files[1:2], bybit.convert, max_workers=1), [self.path('btcusdt_20231115.npz')])
+
+    def test_convert_many_unknown_exchange(self):
+        with self.assertRaises(ValueError):
+            convert_many([], 'unknown')
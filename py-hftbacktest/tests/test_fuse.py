@@ -0,0 +1,150 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest.binding import FuseMarketDepth_
+from hftbacktest.data.utils import fuse, fuse_file, fuse_many
+from hftbacktest.types import (
+    BUY_EVENT,
+    DEPTH_BBO_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EXCH_EVENT,
+    LOCAL_EVENT,
+    SELL_EVENT,
+    TRADE_EVENT,
+    event_dtype
+)
+
+FUSED_KINDS = (DEPTH_EVENT, DEPTH_CLEAR_EVENT, DEPTH_SNAPSHOT_EVENT, DEPTH_BBO_EVENT)
+
+
+def make_feed(rows):
+    feed = np.zeros(len(rows), event_dtype)
+    for i, (ts, kind, side, px, qty) in enumerate(rows):
+        feed[i]['ev'] = EXCH_EVENT | LOCAL_EVENT | side | kind
+        feed[i]['exch_ts'] = ts
+        feed[i]['local_ts'] = ts + 100
+        feed[i]['px'] = px
+        feed[i]['qty'] = qty
+    return feed
+
+
+def make_streams(seed):
+    # The depth stream and the book ticker stream, with trades interleaved.
+    rng = np.random.default_rng(seed)
+    rows = [
+        (1_000, DEPTH_CLEAR_EVENT, BUY_EVENT, 99.0, 0),
+        (1_000, DEPTH_SNAPSHOT_EVENT, BUY_EVENT, 100.0, 5),
+        (1_000, DEPTH_SNAPSHOT_EVENT, BUY_EVENT, 99.5, 3),
+        (1_000, DEPTH_CLEAR_EVENT, SELL_EVENT, 101.5, 0),
+        (1_000, DEPTH_SNAPSHOT_EVENT, SELL_EVENT, 100.5, 4),
+        (1_000, DEPTH_SNAPSHOT_EVENT, SELL_EVENT, 101.0, 2),
+    ]
+    for ts in range(2_000, 12_000, 100):
+        kind = rng.choice([DEPTH_EVENT, DEPTH_BBO_EVENT, TRADE_EVENT])
+        side = rng.choice([BUY_EVENT, SELL_EVENT])
+        if side == BUY_EVENT:
+            px = 100.0 - rng.integers(0, 5) * 0.5
+        else:
+            px = 100.5 + rng.integers(0, 5) * 0.5
+        rows.append((ts, kind, side, px, rng.integers(0, 6)))
+    return make_feed(rows)
+
+
+def fuse_one_by_one(data, tick_size, lot_size):
+    # Fuses the events one native call at a time, passing the others through in their places.
+    fuse_depth = FuseMarketDepth_(tick_size, lot_size)
+    try:
+        out = []
+        for i in range(len(data)):
+            if data[i]['ev'] & 0xff in FUSED_KINDS:
+                fuse_depth.process_event(data, i, True)
+            else:
+                out.append(fuse_depth.fused_events.copy())
+                fuse_depth.drain(np.empty(len(out[-1]), event_dtype))
+                out.append(data[i:i + 1])
+        out.append(fuse_depth.fused_events.copy())
+    finally:
+        fuse_depth.close()
+    return np.concatenate(out)
+
+
+class TestFuse(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data = make_streams(1)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_passes_through_unfused_events(self):
+        fused = fuse(self.data, 0.5, 1.0)
+
+        np.testing.assert_array_equal(fused, fuse_one_by_one(self.data, 0.5, 1.0))
+        # The trades are passed through as they are and in order, and the fused events before each trade come from
+        # the depth events before it.
+        trades = self.data[self.data['ev'] & 0xff == TRADE_EVENT]
+        self.assertGreater(len(trades), 0)
+        np.testing.assert_array_equal(fused[fused['ev'] & 0xff == TRADE_EVENT], trades)
+        for i in np.flatnonzero(fused['ev'] & 0xff == TRADE_EVENT):
+            self.assertTrue(np.all(fused[:i]['local_ts'] <= fused[i]['local_ts']))
+        # The book ticker events are fused into depth events.
+        self.assertFalse(np.any(fused['ev'] & 0xff == DEPTH_BBO_EVENT))
+
+    def test_only_unfused_events(self):
+        trades = self.data[self.data['ev'] & 0xff == TRADE_EVENT]
+        np.testing.assert_array_equal(fuse(trades, 0.5, 1.0), trades)
+        self.assertEqual(len(fuse(trades[:0], 0.5, 1.0)), 0)
+
+    def test_drain(self):
+        fuse_depth = FuseMarketDepth_(0.5, 1.0)
+        try:
+            depth = self.data[np.isin(self.data['ev'] & 0xff, FUSED_KINDS)]
+            self.assertEqual(fuse_depth.process_events(depth, 0, len(depth), np.ones(len(depth), np.bool_)), len(depth))
+            expected = fuse_depth.fused_events.copy()
+
+            # Drains in small pieces, which leaves the rest of the fused events in place.
+            buf = np.empty(3, event_dtype)
+            drained = []
+            while True:
+                n = fuse_depth.drain(buf)
+                drained.append(buf[:n].copy())
+                np.testing.assert_array_equal(fuse_depth.fused_events, expected[sum(map(len, drained)):])
+                if n < len(buf):
+                    break
+            np.testing.assert_array_equal(np.concatenate(drained), expected)
+            self.assertEqual(fuse_depth.drain(buf), 0)
+        finally:
+            fuse_depth.close()
+
+    def test_fuse_file(self):
+        npz_file = os.path.join(self.tmp_dir.name, 'feed.npz')
+        npy_file = os.path.join(self.tmp_dir.name, 'feed.npy')
+        np.savez_compressed(npz_file, data=self.data)
+        np.save(npy_file, self.data)
+
+        expected = fuse(self.data, 0.5, 1.0)
+        for file in (npz_file, npy_file):
+            output = os.path.join(self.tmp_dir.name, 'fused.npz')
+            self.assertEqual(fuse_file(file, output, 0.5, 1.0), output)
+            with np.load(output) as data:
+                np.testing.assert_array_equal(data['data'], expected)
+
+    def test_fuse_many(self):
+        files = []
+        for day in range(3):
+            file = os.path.join(self.tmp_dir.name, f'day{day}.npz')
+            np.savez_compressed(file, data=make_streams(day))
+            files.append(file)
+        output_dir = os.path.join(self.tmp_dir.name, 'fused')
+
+        outputs = fuse_many(files, 0.5, 1.0, output_dir, max_workers=2)
+
+        self.assertEqual(outputs, [os.path.join(output_dir, f'day{day}_fused.npz') for day in range(3)])
+        for day, output in enumerate(outputs):
+            with np.load(output) as data:
+                np.testing.assert_array_equal(data['data'], fuse(make_streams(day), 0.5, 1.0))
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest.data import build_time_index, time_index_dtype, write_time_index
+from hftbacktest.types import (
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EXCH_EVENT,
+    LOCAL_EVENT,
+    TRADE_EVENT,
+    event_dtype
+)
+
+I64_MIN = np.iinfo(np.int64).min
+
+
+def make_feed(num_rows, seed):
+    rng = np.random.default_rng(seed)
+    feed = np.zeros(num_rows, event_dtype)
+    feed['ev'] = EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT
+    feed['exch_ts'] = 1_000_000 + np.cumsum(rng.integers(0, 1_000, num_rows))
+    feed['local_ts'] = feed['exch_ts'] + rng.integers(100, 200, num_rows)
+    # A depth snapshot begins at 30 and at 70. The clear event at 50 follows a snapshot event, so it continues the
+    # snapshot at 30 instead of beginning another.
+    feed['ev'][30] = EXCH_EVENT | LOCAL_EVENT | DEPTH_CLEAR_EVENT
+    feed['ev'][31:50] = EXCH_EVENT | LOCAL_EVENT | DEPTH_SNAPSHOT_EVENT
+    feed['ev'][50] = EXCH_EVENT | LOCAL_EVENT | DEPTH_CLEAR_EVENT
+    feed['ev'][70:72] = EXCH_EVENT | LOCAL_EVENT | DEPTH_CLEAR_EVENT
+    feed['ev'][72:80] = EXCH_EVENT | LOCAL_EVENT | DEPTH_SNAPSHOT_EVENT
+    # Exchange-only and local-only events do not count toward the other side's timestamp.
+    feed['ev'][85] = EXCH_EVENT | TRADE_EVENT
+    feed['local_ts'][85] = np.iinfo(np.int64).max
+    feed['ev'][86] = LOCAL_EVENT | TRADE_EVENT
+    feed['exch_ts'][86] = np.iinfo(np.int64).max
+    return feed
+
+
+def brute_force_entry(feed, row):
+    before = feed[:row]
+    exch = before[before['ev'] & EXCH_EVENT == EXCH_EVENT]['exch_ts']
+    local = before[before['ev'] & LOCAL_EVENT == LOCAL_EVENT]['local_ts']
+    snapshot_row = -1
+    for i in range(row):
+        kind = feed[i]['ev'] & 0xff
+        prev = feed[i - 1]['ev'] & 0xff if i > 0 else 0
+        if kind == DEPTH_CLEAR_EVENT and prev not in (DEPTH_CLEAR_EVENT, DEPTH_SNAPSHOT_EVENT):
+            snapshot_row = i
+    return (
+        row,
+        exch.max() if len(exch) > 0 else I64_MIN,
+        local.max() if len(local) > 0 else I64_MIN,
+        snapshot_row
+    )
+
+
+def seek_row(index, start_time):
+    # Mirrors TimeWindow::seek_entry in index.rs: the last entry before which all events occur before the start.
+    row = None
+    for entry in index:
+        if entry['exch_ts'] >= start_time or entry['local_ts'] >= start_time:
+            break
+        row = int(entry['row'])
+    return row
+
+
+class TestTimeIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.feed = make_feed(100, 1)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_layout(self):
+        # read_time_index in index.rs reads the entries as TimeIndexEntry, which has the same fields in this order.
+        self.assertEqual(
+            time_index_dtype.descr,
+            [('row', '<u8'), ('exch_ts', '<i8'), ('local_ts', '<i8'), ('snapshot_row', '<i8')]
+        )
+        self.assertEqual(time_index_dtype.itemsize, 32)
+
+    def test_entries(self):
+        for interval in (1, 7, 10, 100, 1_000):
+            index = build_time_index(self.feed, interval)
+            # An entry is taken every interval rows from the first row, and the last one at the end of the data.
+            rows = list(range(0, len(self.feed), interval)) + [len(self.feed)]
+            np.testing.assert_array_equal(index['row'], rows)
+            self.assertEqual(tuple(index[0]), (0, I64_MIN, I64_MIN, -1))
+            for entry in index:
+                self.assertEqual(tuple(entry), brute_force_entry(self.feed, int(entry['row'])))
+
+    def test_snapshot_rows(self):
+        index = build_time_index(self.feed, 10)
+        np.testing.assert_array_equal(
+            index['snapshot_row'],
+            [-1, -1, -1, -1, 30, 30, 30, 30, 70, 70, 70]
+        )
+
+    def test_seek_matches_searchsorted(self):
+        # Only the events on both sides, whose timestamps increase, are kept, so that searchsorted applies.
+        feed = self.feed[self.feed['ev'] & (EXCH_EVENT | LOCAL_EVENT) == EXCH_EVENT | LOCAL_EVENT]
+        interval = 8
+        index = build_time_index(feed, interval)
+        for start_time in range(feed['exch_ts'][0] - 1, feed['local_ts'][-1] + 2, 97):
+            # All events before the row occur before the start time.
+            first = min(
+                np.searchsorted(feed['exch_ts'], start_time, 'left'),
+                np.searchsorted(feed['local_ts'], start_time, 'left')
+            )
+            self.assertEqual(seek_row(index, start_time), first // interval * interval)
+
+    def test_write_time_index(self):
+        npz_file = os.path.join(self.tmp_dir.name, 'feed.npz')
+        npy_file = os.path.join(self.tmp_dir.name, 'feed.npy')
+        np.savez_compressed(npz_file, data=self.feed)
+        np.save(npy_file, self.feed)
+
+        for file in (npz_file, npy_file):
+            path = write_time_index(file, interval=16)
+            self.assertEqual(path, f'{file}.idx.npy')
+            index = np.load(path)
+            self.assertEqual(index.dtype, time_index_dtype)
+            np.testing.assert_array_equal(index, build_time_index(self.feed, 16))
+
+        # The data given is indexed instead of the file's.
+        path = write_time_index(npy_file, self.feed[:20], interval=16)
+        np.testing.assert_array_equal(np.load(path)['row'], [0, 16, 20])
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from hftbacktest.data import (
+    REJECTED_ENTRY_LATENCY,
+    compact_order_latency_dtype,
+    from_compact_order_latency,
+    order_latency_dtype,
+    to_compact_order_latency
+)
+
+
+def make_latency(rows):
+    data = np.zeros(len(rows), order_latency_dtype)
+    for i, (req_ts, exch_ts, resp_ts) in enumerate(rows):
+        data[i]['req_ts'] = req_ts
+        data[i]['exch_ts'] = exch_ts
+        data[i]['resp_ts'] = resp_ts
+    return data
+
+
+class TestCompactOrderLatency(unittest.TestCase):
+    def setUp(self) -> None:
+        t = 1_704_067_200_000_000_000
+        self.data = make_latency([
+            (t, t + 1_000_000, t + 1_500_000),
+            # Rejected by the exchange, which the zero exchange timestamp indicates.
+            (t + 10_000_000, 0, t + 10_800_000),
+            (t + 20_000_000, t + 20_000_000, t + 20_000_000),
+            (t + 30_000_000, t + 32_000_000, t + 35_000_000),
+            (t + 40_000_000, 0, t + 40_000_000),
+        ])
+
+    def test_round_trip(self):
+        compact = to_compact_order_latency(self.data)
+        self.assertEqual(compact.dtype, compact_order_latency_dtype)
+        self.assertEqual(compact.itemsize * 2, self.data.itemsize)
+        np.testing.assert_array_equal(compact['entry_lat'], [
+            1_000_000, REJECTED_ENTRY_LATENCY, 0, 2_000_000, REJECTED_ENTRY_LATENCY
+        ])
+        # The response latency of a rejected request is measured from the request.
+        np.testing.assert_array_equal(compact['resp_lat'], [500_000, 800_000, 0, 3_000_000, 0])
+
+        np.testing.assert_array_equal(from_compact_order_latency(compact), self.data)
+
+    def test_empty(self):
+        compact = to_compact_order_latency(self.data[:0])
+        self.assertEqual(len(compact), 0)
+        self.assertEqual(len(from_compact_order_latency(compact)), 0)
+
+    def test_latency_out_of_range(self):
+        i32 = np.iinfo(np.int32)
+        t = 1_704_067_200_000_000_000
+        with self.assertRaises(ValueError):
+            to_compact_order_latency(make_latency([(t, t + i32.max + 1, t + i32.max + 1)]))
+        with self.assertRaises(ValueError):
+            to_compact_order_latency(make_latency([(t, 0, t + i32.max + 1)]))
+        # The rejection marker cannot be a genuine latency.
+        with self.assertRaises(ValueError):
+            to_compact_order_latency(make_latency([(t, t + REJECTED_ENTRY_LATENCY, t)]))
+
+        compact = to_compact_order_latency(make_latency([(t, t + i32.max, t + i32.max)]))
+        np.testing.assert_array_equal(compact['entry_lat'], [i32.max])
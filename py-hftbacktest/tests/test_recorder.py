@@ -0,0 +1,162 @@
+import gc
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from numba import int64, njit
+from numba.experimental import jitclass
+
+from hftbacktest import Recorder
+from hftbacktest.types import record_dtype
+
+# 2024-01-01 23:59:58, 23:59:59, 2024-01-02 00:00:00, 00:00:01, and 00:00:02 in nanoseconds.
+TWO_DAY_TIMESTAMPS = 1_704_153_598_000_000_000 + np.arange(5, dtype=np.int64) * 1_000_000_000
+
+
+@jitclass
+class FakeBacktest:
+    current_timestamp: int64
+
+    def __init__(self):
+        self.current_timestamp = 0
+
+    def record_state_values(self, out):
+        for asset_no in range(len(out)):
+            out[asset_no].timestamp = self.current_timestamp
+            out[asset_no].price = asset_no
+            out[asset_no].position = self.current_timestamp * 10 + asset_no
+
+
+@njit
+def run(hbt, recorder, timestamps):
+    for timestamp in timestamps:
+        hbt.current_timestamp = timestamp
+        recorder.record(hbt)
+
+
+class TestRecorder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_spill(self):
+        recorder = Recorder(2, 4, spill_dir=self.tmp_dir.name)
+        timestamps = np.arange(1, 11, dtype=np.int64)
+        run(FakeBacktest(), recorder.recorder, timestamps)
+
+        # Two full chunks are spilled and the last two rows stay in memory.
+        self.assertEqual(len(recorder._store.chunks), 2)
+        self.assertEqual(recorder.recorder.i, 2)
+        self.assertEqual(len(recorder.recorder.records), 4)
+
+        for asset_no in range(2):
+            records = recorder.get(asset_no)
+            np.testing.assert_array_equal(records['timestamp'], timestamps)
+            np.testing.assert_array_equal(records['price'], asset_no)
+            np.testing.assert_array_equal(records['position'], timestamps * 10 + asset_no)
+
+    def test_to_npz(self):
+        recorder = Recorder(2, 4, spill_dir=self.tmp_dir.name)
+        timestamps = np.arange(1, 11, dtype=np.int64)
+        run(FakeBacktest(), recorder.recorder, timestamps)
+
+        file = os.path.join(self.tmp_dir.name, 'stats.npz')
+        recorder.to_npz(file)
+        with np.load(file) as data:
+            self.assertEqual(sorted(data.files), ['0', '1'])
+            for asset_no in range(2):
+                np.testing.assert_array_equal(data[str(asset_no)], recorder.get(asset_no))
+                np.testing.assert_array_equal(data[str(asset_no)]['timestamp'], timestamps)
+
+    def test_record_every(self):
+        recorder = Recorder(1, 2, record_every=3, spill_dir=self.tmp_dir.name)
+        timestamps = np.arange(1, 11, dtype=np.int64)
+        run(FakeBacktest(), recorder.recorder, timestamps)
+
+        np.testing.assert_array_equal(recorder.get(0)['timestamp'], [1, 4, 7, 10])
+
+    def test_min_interval(self):
+        recorder = Recorder(1, 2, min_interval=10, spill_dir=self.tmp_dir.name)
+        timestamps = np.array([0, 5, 9, 10, 15, 25, 34, 35, 100], dtype=np.int64)
+        run(FakeBacktest(), recorder.recorder, timestamps)
+
+        np.testing.assert_array_equal(recorder.get(0)['timestamp'], [0, 10, 25, 35, 100])
+
+    def test_grow_in_memory_once_store_is_gone(self):
+        recorder = Recorder(1, 2, spill_dir=self.tmp_dir.name)
+        jitted = recorder.recorder
+        del recorder
+        gc.collect()
+
+        timestamps = np.arange(1, 6, dtype=np.int64)
+        run(FakeBacktest(), jitted, timestamps)
+
+        self.assertEqual(jitted.store_id, -1)
+        np.testing.assert_array_equal(jitted.records[:jitted.i, 0]['timestamp'], timestamps)
+
+    def test_to_polars(self):
+        recorder = Recorder(2, 4, spill_dir=self.tmp_dir.name)
+        timestamps = np.arange(1, 11, dtype=np.int64)
+        run(FakeBacktest(), recorder.recorder, timestamps)
+
+        df = recorder.to_polars(1)
+        self.assertEqual(df.columns, list(record_dtype.names))
+        self.assertEqual(len(df), 10)
+        for name in record_dtype.names:
+            self.assertEqual(df[name].to_numpy().dtype, record_dtype[name])
+            np.testing.assert_array_equal(df[name].to_numpy(), recorder.get(1)[name])
+
+    def test_to_parquet(self):
+        import polars as pl
+
+        recorder = Recorder(2, 2, spill_dir=self.tmp_dir.name)
+        run(FakeBacktest(), recorder.recorder, TWO_DAY_TIMESTAMPS)
+
+        file = os.path.join(self.tmp_dir.name, 'stats.parquet')
+        recorder.to_parquet(file)
+        df = pl.read_parquet(file)
+        self.assertEqual(df.columns, list(record_dtype.names) + ['asset_no'])
+        np.testing.assert_array_equal(df['asset_no'].to_numpy(), [0] * 5 + [1] * 5)
+        np.testing.assert_array_equal(df['timestamp'].to_numpy(), np.tile(TWO_DAY_TIMESTAMPS, 2))
+
+        root = os.path.join(self.tmp_dir.name, 'by_asset')
+        recorder.to_parquet(root, partition_by=['asset'])
+        self.assertEqual(sorted(os.listdir(root)), ['asset_no=0', 'asset_no=1'])
+        for asset_no in range(2):
+            df = pl.read_parquet(os.path.join(root, f'asset_no={asset_no}', '0.parquet'))
+            self.assertNotIn('asset_no', df.columns)
+            np.testing.assert_array_equal(df['position'].to_numpy(), TWO_DAY_TIMESTAMPS * 10 + asset_no)
+
+        root = os.path.join(self.tmp_dir.name, 'by_asset_day')
+        recorder.to_parquet(root, partition_by=['asset', 'day'])
+        for asset_no in range(2):
+            dir_ = os.path.join(root, f'asset_no={asset_no}')
+            self.assertEqual(sorted(os.listdir(dir_)), ['date=2024-01-01', 'date=2024-01-02'])
+            day1 = pl.read_parquet(os.path.join(dir_, 'date=2024-01-01', '0.parquet'))
+            day2 = pl.read_parquet(os.path.join(dir_, 'date=2024-01-02', '0.parquet'))
+            self.assertNotIn('_date', day1.columns)
+            np.testing.assert_array_equal(day1['timestamp'].to_numpy(), TWO_DAY_TIMESTAMPS[:2])
+            np.testing.assert_array_equal(day2['timestamp'].to_numpy(), TWO_DAY_TIMESTAMPS[2:])
+
+    def test_to_ipc(self):
+        import polars as pl
+
+        recorder = Recorder(2, 2, spill_dir=self.tmp_dir.name)
+        run(FakeBacktest(), recorder.recorder, TWO_DAY_TIMESTAMPS)
+
+        root = os.path.join(self.tmp_dir.name, 'by_day')
+        recorder.to_ipc(root, partition_by=['day'])
+        self.assertEqual(sorted(os.listdir(root)), ['date=2024-01-01', 'date=2024-01-02'])
+        day1 = pl.read_ipc(os.path.join(root, 'date=2024-01-01', '0.arrow'))
+        day2 = pl.read_ipc(os.path.join(root, 'date=2024-01-02', '0.arrow'))
+        np.testing.assert_array_equal(day1['asset_no'].to_numpy(), [0, 0, 1, 1])
+        np.testing.assert_array_equal(day2['asset_no'].to_numpy(), [0, 0, 0, 1, 1, 1])
+        np.testing.assert_array_equal(day2['timestamp'].to_numpy(), np.tile(TWO_DAY_TIMESTAMPS[2:], 2))
+
+    def test_unknown_partition_key(self):
+        recorder = Recorder(1, 2, spill_dir=self.tmp_dir.name)
+        with self.assertRaises(ValueError):
+            recorder.to_parquet(os.path.join(self.tmp_dir.name, 'stats'), partition_by=['hour'])
@@ -0,0 +1,247 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from numba import from_dtype, int64, njit, uint64
+from numba.experimental import jitclass
+
+from hftbacktest import (
+    BacktestAsset,
+    HashMapMarketDepthBacktest,
+    Recorder,
+    SharedFeeds,
+    build_eod_snapshots,
+    run_days,
+    run_many,
+    stitch_records
+)
+from hftbacktest.types import BUY_EVENT, DEPTH_EVENT, EXCH_EVENT, LOCAL_EVENT, SELL_EVENT, event_dtype, record_dtype
+
+
+@jitclass
+class FeedReplay:
+    feed: from_dtype(event_dtype)[:]
+    row: uint64
+    current_timestamp: int64
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.row = 0
+        self.current_timestamp = 0
+
+    def record_state_values(self, out):
+        out[0].timestamp = self.current_timestamp
+        out[0].price = self.feed[self.row].px
+        out[0].position = self.feed[self.row].qty
+        out[0].balance = 0.0
+        out[0].fee = 0.0
+        out[0].num_trades = self.row
+        out[0].trading_volume = 0.0
+        out[0].trading_value = 0.0
+
+
+@njit
+def replay_feed(hbt, recorder):
+    for row in range(len(hbt.feed)):
+        hbt.row = row
+        hbt.current_timestamp = hbt.feed[row].local_ts
+        recorder.record(hbt)
+
+
+def replay(feeds, job):
+    # Called in the worker processes, so it is defined at the top level.
+    file, record_every = job
+    recorder = Recorder(1, 8, record_every=record_every)
+    replay_feed(FeedReplay(feeds[file]), recorder.recorder)
+    return recorder
+
+
+def describe(feeds, file):
+    feed = feeds[file]
+    return os.getpid(), feed.filename, feed.mode
+
+
+def make_feed(num_rows, seed):
+    rng = np.random.default_rng(seed)
+    feed = np.zeros(num_rows, event_dtype)
+    feed['ev'] = EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT
+    feed['exch_ts'] = 1_000_000 + np.arange(num_rows) * 1_000
+    feed['local_ts'] = feed['exch_ts'] + 100
+    feed['px'] = 100.0 + rng.integers(-50, 50, num_rows) * 0.1
+    feed['qty'] = rng.integers(1, 10, num_rows)
+    return feed
+
+
+@njit
+def record_every_step(hbt, recorder):
+    while hbt.elapse(1_000) == 0:
+        recorder.record(hbt)
+
+
+def run_day(file, initial_snapshot, day):
+    # Called in the worker processes, so it is defined at the top level.
+    asset = BacktestAsset().data(file).linear_asset(1.0).tick_size(0.1).lot_size(1.0)
+    if initial_snapshot is not None:
+        asset.initial_snapshot(initial_snapshot)
+    hbt = HashMapMarketDepthBacktest([asset])
+    recorder = Recorder(1, 1_000)
+    record_every_step(hbt, recorder.recorder)
+    hbt.close()
+    return recorder
+
+
+def make_depth_feed(rows):
+    feed = np.zeros(len(rows), event_dtype)
+    for i, (ts, side, px, qty) in enumerate(rows):
+        feed[i]['ev'] = EXCH_EVENT | LOCAL_EVENT | side | DEPTH_EVENT
+        feed[i]['exch_ts'] = ts
+        feed[i]['local_ts'] = ts + 100
+        feed[i]['px'] = px
+        feed[i]['qty'] = qty
+    return feed
+
+
+def make_records(timestamps, position, balance, num_trades):
+    records = np.zeros(len(timestamps), record_dtype)
+    records['timestamp'] = timestamps
+    records['position'] = position
+    records['balance'] = balance
+    records['fee'] = balance / 100
+    records['num_trades'] = num_trades
+    records['trading_volume'] = num_trades * 2
+    records['trading_value'] = num_trades * 200
+    return records
+
+
+class TestRunMany(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.shm_dir = os.path.join(self.tmp_dir.name, 'shm')
+        os.makedirs(self.shm_dir)
+        self.npz_file = os.path.join(self.tmp_dir.name, 'day1.npz')
+        self.npy_file = os.path.join(self.tmp_dir.name, 'day2.npy')
+        np.savez_compressed(self.npz_file, data=make_feed(100, 1))
+        np.save(self.npy_file, make_feed(50, 2))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_matches_sequential_run(self):
+        files = [self.npz_file, self.npy_file]
+        jobs = [(file, record_every) for file in files for record_every in (1, 3)]
+
+        records = run_many(replay, jobs, files, max_workers=2, shm_dir=self.shm_dir)
+
+        feeds = {self.npz_file: np.load(self.npz_file)['data'], self.npy_file: np.load(self.npy_file)}
+        self.assertEqual(len(records), len(jobs))
+        for job, result in zip(jobs, records):
+            expected = replay(feeds, job)
+            # A Recorder is gathered as the records of each asset.
+            self.assertEqual(len(result), 1)
+            np.testing.assert_array_equal(result[0], expected.get(0))
+            self.assertEqual(len(result[0]), -(-len(feeds[job[0]]) // job[1]))
+
+        # The decompressed feed is removed once the runs are done.
+        self.assertEqual(os.listdir(self.shm_dir), [])
+
+    def test_workers_map_shared_feeds(self):
+        files = [self.npz_file, self.npy_file]
+        jobs = [file for file in files for _ in range(4)]
+
+        results = run_many(describe, jobs, files, max_workers=2, shm_dir=self.shm_dir)
+
+        self.assertNotIn(os.getpid(), {pid for pid, _, _ in results})
+        for file, (_, filename, mode) in zip(jobs, results):
+            # Every worker maps the same file copy-on-write: the .npz is decompressed once into the shared
+            # directory, and the .npy is mapped in place.
+            self.assertEqual(mode, 'c')
+            if file == self.npz_file:
+                self.assertEqual(os.path.dirname(os.path.dirname(filename)), self.shm_dir)
+            else:
+                self.assertEqual(filename, os.path.abspath(self.npy_file))
+
+    def test_shared_feeds(self):
+        with SharedFeeds([self.npz_file, self.npy_file, self.npz_file], self.shm_dir) as feeds:
+            self.assertEqual(len(feeds.paths), 2)
+            views = feeds.views()
+            np.testing.assert_array_equal(views[self.npz_file], np.load(self.npz_file)['data'])
+            np.testing.assert_array_equal(views[self.npy_file], np.load(self.npy_file))
+            # Mapping again reuses the views already mapped in this process.
+            self.assertIs(feeds.views()[self.npz_file], views[self.npz_file])
+        self.assertEqual(os.listdir(self.shm_dir), [])
+
+
+class TestRunDays(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.files = [os.path.join(self.tmp_dir.name, f'day{day}.npz') for day in (1, 2)]
+        # Day 1 builds the book up to a 100.1 bid and a 100.5 ask. Day 2 only adds asks behind the best ask, so its
+        # best bid and ask can only come from the book carried over from day 1.
+        np.savez_compressed(self.files[0], data=make_depth_feed([
+            (1_000_000, BUY_EVENT, 100.0, 1),
+            (1_000_000, SELL_EVENT, 100.5, 2),
+            (1_010_000, BUY_EVENT, 100.1, 3),
+            (1_020_000, SELL_EVENT, 100.6, 1),
+        ]))
+        np.savez_compressed(self.files[1], data=make_depth_feed([
+            (2_000_000, SELL_EVENT, 101.0, 1),
+            (2_010_000, SELL_EVENT, 101.0, 2),
+            (2_020_000, SELL_EVENT, 101.2, 1),
+        ]))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_run_days(self):
+        snapshot_dir = os.path.join(self.tmp_dir.name, 'eod')
+        eod_snapshots = build_eod_snapshots(self.files, 0.1, 1.0, output_dir=snapshot_dir)
+        self.assertEqual(
+            eod_snapshots,
+            [os.path.join(snapshot_dir, 'day1_eod.npz'), os.path.join(snapshot_dir, 'day2_eod.npz')]
+        )
+        with np.load(eod_snapshots[0]) as data:
+            np.testing.assert_allclose(np.sort(data['data']['px']), [100.0, 100.1, 100.5, 100.6])
+
+        records = run_days(run_day, self.files, eod_snapshots, max_workers=2)
+
+        days = [run_day(self.files[0], None, 0).get(0), run_day(self.files[1], eod_snapshots[0], 1).get(0)]
+        self.assertEqual(len(records), 1)
+        np.testing.assert_array_equal(records[0], np.concatenate(days))
+
+        # The stitched record is continuous across the day boundary.
+        self.assertGreater(len(days[0]), 0)
+        self.assertGreater(len(days[1]), 0)
+        self.assertTrue(np.all(np.diff(records[0]['timestamp']) >= 0))
+
+        # Day 2 starts from day 1's end-of-day book, which it would not have on its own.
+        np.testing.assert_allclose(days[0]['price'][-1], 100.3)
+        np.testing.assert_allclose(days[1]['price'], 100.3)
+        self.assertTrue(np.all(np.isnan(run_day(self.files[1], None, 1).get(0)['price'])))
+
+    def test_run_days_mismatched_snapshots(self):
+        with self.assertRaises(ValueError):
+            run_days(run_day, self.files, [])
+
+    def test_stitch_records(self):
+        day1 = make_records([1, 2, 3], [1, 2, 0], np.array([10.0, 20.0, 30.0]), np.array([1, 2, 3]))
+        day2 = make_records([4, 5], [5, 0], np.array([1.0, 2.0]), np.array([1, 2]))
+        empty = make_records([], [], np.array([]), np.array([], np.int64))
+        day3 = make_records([6], [7], np.array([4.0]), np.array([5]))
+
+        records = stitch_records([[day1], [day2], [empty], [day3]])
+
+        self.assertEqual(len(records), 1)
+        stitched = records[0]
+        np.testing.assert_array_equal(stitched['timestamp'], [1, 2, 3, 4, 5, 6])
+        # The cumulative values carry over, including across a day without records; the position does not.
+        np.testing.assert_allclose(stitched['balance'], [10, 20, 30, 31, 32, 36])
+        np.testing.assert_allclose(stitched['fee'], [0.1, 0.2, 0.3, 0.31, 0.32, 0.36])
+        np.testing.assert_array_equal(stitched['num_trades'], [1, 2, 3, 4, 5, 10])
+        np.testing.assert_allclose(stitched['trading_volume'], [2, 4, 6, 8, 10, 20])
+        np.testing.assert_allclose(stitched['trading_value'], [200, 400, 600, 800, 1000, 2000])
+        np.testing.assert_array_equal(stitched['position'], [1, 2, 0, 5, 0, 7])
+        # The input records are left untouched.
+        np.testing.assert_allclose(day2['balance'], [1, 2])
+
+        self.assertEqual(stitch_records([]), [])